@@ -112,6 +112,7 @@ export function createDetectionManager(deps) {
               track_id: entry.track_id,
               bbox: entry.bbox,
               bbox_type: entry.bbox_type || 'rect',
+              mask: entry.mask,
               score: entry.score,
               class_id: entry.class_id,
               type: entry.type,
@@ -212,6 +213,7 @@ export function createDetectionManager(deps) {
       track_id: log.track_id ?? '',
       bbox: typeof log.bbox === 'string' ? JSON.parse(log.bbox) : log.bbox,
       bbox_type: log.bbox_type || (Array.isArray(log.bbox) && Array.isArray(log.bbox[0]) ? 'polygon' : 'rect'),
+      mask: log.mask,
       score: log.score ?? null,
       class_id: log.class_id ?? null,
       type: log.type ?? 4,
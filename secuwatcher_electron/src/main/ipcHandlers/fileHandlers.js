@@ -492,6 +492,7 @@ export function registerFileHandlers() {
           track_id: entry.track_id || 0,
           bbox,
           bbox_type: entry.bbox_type || 'rectangle',
+          mask: entry.mask,
           score: entry.score || 0,
           class_id: entry.class_id || 0,
           type: entry.type || 'detection',
@@ -164,6 +164,27 @@ export async function getProgress(jobId) {
   });
 }
 
+/**
+ * 중단된 탐지 작업 재개 API 호출 (체크포인트부터 이어서 탐지)
+ * @param {string} jobId - 중단된 작업 ID (interrupted/error 상태)
+ * @returns {Promise<ApiResult>} data.resumed_from - 재개 시작 프레임
+ */
+export async function resumeJob(jobId) {
+  return apiPost(`/resume/${jobId}`, {}, {
+    errorMessage: '작업 재개 실패: '
+  });
+}
+
+/**
+ * 모델 준비 상태 조회 API 호출 (탐지 버튼 활성화 판단용)
+ * @returns {Promise<ApiResult>} data.ready - 사전 로드 대상 모델이 모두 준비되었는지 여부
+ */
+export async function getModelsHealth() {
+  return apiGet('/health/models', {
+    showError: false // 폴링 중 에러는 직접 처리
+  });
+}
+
 /**
  * 일괄 처리 API 호출
  * @param {Object} params - 일괄 처리 파라미터
@@ -0,0 +1,207 @@
+"""
+SecuWatcher 탐지 백엔드 벤치마크
+같은 영상 구간에서 YOLO 추론 백엔드(torch / onnx / openvino)별 프레임당 지연 시간을 비교합니다.
+--precisions를 주면 torch 백엔드의 정밀도(fp32 / fp16 / bf16)별 지연과 fp32 대비 박스 일치도를 검증합니다.
+
+사용 예:
+    python benchmark_detector.py --video videos/org/sample.mp4 --frames 300
+    python benchmark_detector.py --video sample.mp4 --backends torch,onnx --imgsz 640
+    python benchmark_detector.py --video sample.mp4 --device mps --precisions fp32,fp16,bf16 --channels-last
+
+onnx/openvino 변환 모델은 detector와 같은 model/cache 캐시를 사용합니다 (첫 실행 시 변환 시간 제외).
+정밀도 검증은 박스 일치도(클래스별 IoU≥0.5 매칭 F1)가 --min-agreement 미만이면 종료 코드 1을 반환합니다.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+import cv2
+import numpy as np
+
+
+def read_frames(video_path, count, start=0):
+    """start 프레임부터 최대 count개 프레임을 메모리로 읽음 (디코딩 시간이 측정에 섞이지 않도록)"""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"비디오 파일을 열 수 없습니다: {video_path}")
+    if start:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    frames = []
+    while len(frames) < count:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise ValueError(f"읽을 수 있는 프레임이 없습니다: {video_path}")
+    return frames
+
+
+def run_backend(backend, frames, imgsz, device, warmup):
+    """backend로 프레임별 predict 지연(ms) 측정 → (실제 backend, 지연 목록)"""
+    import detector
+
+    model, loaded = detector._load_yolo(backend)
+    for frame in frames[:warmup]:
+        model.predict(frame, imgsz=imgsz, device=device, verbose=False)
+
+    latencies = []
+    for frame in frames:
+        t0 = time.perf_counter()
+        model.predict(frame, imgsz=imgsz, device=device, verbose=False)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+    return loaded, latencies
+
+
+def run_precision(precision, frames, imgsz, device, warmup, channels_last=False):
+    """torch 백엔드를 precision으로 실행 → (확정 정밀도, 지연 목록, 프레임별 (N, 6) 박스)"""
+    import detector
+    from core import precision as _precision
+
+    model, loaded = detector._load_yolo("torch")
+    resolved = detector._apply_precision(model, loaded, precision, device, channels_last)
+    half = resolved == "fp16"
+
+    def predict(frame):
+        with _precision.autocast("bf16" if resolved == "bf16" else "fp32", device):
+            return model.predict(frame, imgsz=imgsz, device=device, half=half, verbose=False)[0]
+
+    for frame in frames[:warmup]:
+        predict(frame)
+
+    latencies, boxes = [], []
+    for frame in frames:
+        t0 = time.perf_counter()
+        result = predict(frame)
+        latencies.append((time.perf_counter() - t0) * 1000.0)
+        data = result.boxes.data.float().cpu().numpy()[:, :6] if result.boxes is not None else np.zeros((0, 6))
+        boxes.append(data)
+    return resolved, latencies, boxes
+
+
+def _iou(box, boxes):
+    xx1 = np.maximum(box[0], boxes[:, 0])
+    yy1 = np.maximum(box[1], boxes[:, 1])
+    xx2 = np.minimum(box[2], boxes[:, 2])
+    yy2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+    union = (box[2] - box[0]) * (box[3] - box[1]) + (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1]) - inter
+    return inter / np.maximum(union, 1e-6)
+
+
+def compare_boxes(reference, candidate, iou_thres=0.5):
+    """프레임별 박스 목록 비교 → (일치도 F1, 매칭 박스 평균 IoU)
+
+    같은 클래스끼리 신뢰도 순 greedy 매칭, IoU≥iou_thres면 일치.
+    두 쪽 모두 박스가 없으면 일치도 1.0.
+    """
+    matched = total = 0
+    ious = []
+    for ref, cand in zip(reference, candidate):
+        total += len(ref) + len(cand)
+        used = np.zeros(len(cand), dtype=bool)
+        for box in ref[np.argsort(-ref[:, 4])]:
+            candidates = np.where(~used & (cand[:, 5] == box[5]))[0]
+            if not len(candidates):
+                continue
+            iou = _iou(box, cand[candidates])
+            best = int(np.argmax(iou))
+            if iou[best] >= iou_thres:
+                used[candidates[best]] = True
+                matched += 1
+                ious.append(float(iou[best]))
+    agreement = 2.0 * matched / total if total else 1.0
+    return agreement, (statistics.fmean(ious) if ious else 1.0)
+
+
+def summarize(latencies):
+    """평균 / p50 / p95 (ms)"""
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return statistics.fmean(ordered), statistics.median(ordered), p95
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="YOLO 추론 백엔드별 프레임당 지연 비교")
+    parser.add_argument("--video", required=True, help="벤치마크할 영상 경로")
+    parser.add_argument("--frames", type=int, default=200, help="측정 프레임 수 (기본 200)")
+    parser.add_argument("--start", type=int, default=0, help="시작 프레임 (기본 0)")
+    parser.add_argument("--backends", default="torch,onnx,openvino", help="쉼표 구분 백엔드 목록")
+    parser.add_argument("--imgsz", type=int, default=None, help="추론 입력 크기 (기본 config.ini [detect] imgsz)")
+    parser.add_argument("--device", default="cpu", help="추론 장치 (기본 cpu)")
+    parser.add_argument("--warmup", type=int, default=10, help="측정 전 워밍업 프레임 수")
+    parser.add_argument("--precisions", default=None, help="쉼표 구분 정밀도 목록 (예: fp32,fp16,bf16) — 지정 시 정밀도 비교 모드")
+    parser.add_argument("--channels-last", action="store_true", help="정밀도 비교 시 channels_last 적용")
+    parser.add_argument("--min-agreement", type=float, default=0.95, help="fp32 대비 최소 박스 일치도 (기본 0.95)")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import detector
+
+    imgsz = args.imgsz or detector._yolo_imgsz()
+    frames = read_frames(args.video, args.frames, args.start)
+    print(f"영상: {args.video} ({len(frames)}프레임, {frames[0].shape[1]}x{frames[0].shape[0]}), imgsz={imgsz}, device={args.device}")
+
+    if args.precisions:
+        return compare_precisions([p.strip() for p in args.precisions.split(",") if p.strip()],
+                                  frames, imgsz, args.device, args.warmup, args.channels_last, args.min_agreement)
+
+    rows = []
+    for backend in [b.strip() for b in args.backends.split(",") if b.strip()]:
+        try:
+            loaded, latencies = run_backend(backend, frames, imgsz, args.device, args.warmup)
+        except Exception as e:
+            print(f"[{backend}] 실패: {e}")
+            continue
+        if loaded != backend:
+            print(f"[{backend}] 사용 불가 → {loaded}로 폴백되어 제외")
+            continue
+        rows.append((backend,) + summarize(latencies))
+
+    if not rows:
+        return 1
+
+    base = next((r[1] for r in rows if r[0] == "torch"), rows[0][1])
+    print(f"\n{'backend':<10}{'mean(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'fps':>8}{'speedup':>9}")
+    for name, mean, p50, p95 in rows:
+        print(f"{name:<10}{mean:>10.1f}{p50:>10.1f}{p95:>10.1f}{1000.0 / mean:>8.1f}{base / mean:>8.2f}x")
+    return 0
+
+
+def compare_precisions(precisions, frames, imgsz, device, warmup, channels_last, min_agreement):
+    """정밀도별 지연 + fp32 기준 박스 일치도 표 출력, 일치도 미달 시 1 반환"""
+    if "fp32" not in precisions:
+        precisions = ["fp32"] + precisions
+    runs = {}
+    for precision in precisions:
+        try:
+            resolved, latencies, boxes = run_precision(precision, frames, imgsz, device, warmup, channels_last)
+        except Exception as e:
+            print(f"[{precision}] 실패: {e}")
+            continue
+        if resolved != precision:
+            print(f"[{precision}] {device}에서 사용 불가 → {resolved}로 폴백되어 제외")
+            continue
+        runs[precision] = (latencies, boxes)
+    if "fp32" not in runs:
+        return 1
+
+    base = summarize(runs["fp32"][0])[0]
+    failed = False
+    print(f"\n{'precision':<10}{'mean(ms)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'fps':>8}{'speedup':>9}{'agree':>8}{'mIoU':>7}")
+    for precision, (latencies, boxes) in runs.items():
+        mean, p50, p95 = summarize(latencies)
+        agreement, miou = compare_boxes(runs["fp32"][1], boxes)
+        failed |= agreement < min_agreement
+        print(f"{precision:<10}{mean:>10.1f}{p50:>10.1f}{p95:>10.1f}{1000.0 / mean:>8.1f}{base / mean:>8.2f}x"
+              f"{agreement:>8.3f}{miou:>7.3f}")
+    if failed:
+        print(f"\n경고: fp32 대비 박스 일치도가 {min_agreement} 미만인 정밀도가 있습니다")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,14 @@
 import os
 import cv2
-import av
 import ast
 import json
 import logging
 import numpy as np
-import pandas as pd
+import threading
 import configparser
+from collections import OrderedDict
+import mask_rle
+from detection_table import DetectionTable, KIND_POLY, KIND_MASK
 from util import get_resource_path
 
 logger = logging.getLogger(__name__)
@@ -72,7 +74,7 @@ def _find_data_file(video_path: str):
 
 def _load_mask_data(data_path: str):
     """
-    탐지 데이터 파일에서 프레임별 마스킹 로그를 읽어온다.
+    탐지 데이터 파일에서 프레임별 마스킹 로그를 읽어 DetectionTable로 반환한다.
     JSON과 CSV 형식 모두 지원.
     """
     if data_path.lower().endswith('.json'):
@@ -85,24 +87,12 @@ def _load_mask_data_json(json_path: str):
     """JSON 형식 탐지 데이터 로드."""
     with open(json_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
-
-    frame_map = {}
-    for frame_key, entries in data.get('frames', {}).items():
-        frame_num = int(frame_key)
-        frame_map[frame_num] = []
-        for entry in entries:
-            frame_map[frame_num].append({
-                'frame': frame_num,
-                'track_id': str(entry['track_id']),
-                'bbox': entry['bbox'],
-                'object': entry.get('object'),
-                'type': entry.get('type'),
-            })
-    return frame_map
+    return DetectionTable.from_json_frames(data.get('frames', {}))
 
 
 def _load_mask_data_csv(csv_path: str):
     """CSV 형식 탐지 데이터 로드 (하위 호환용)."""
+    import pandas as pd  # CSV 입력일 때만 필요 (지연 import)
     df = pd.read_csv(csv_path)
     colmap = {c.lower(): c for c in df.columns}
 
@@ -160,16 +150,13 @@ def _load_mask_data_csv(csv_path: str):
         except Exception:
             continue
 
-    frame_map = {}
-    for item in logs:
-        frame_map.setdefault(item['frame'], []).append(item)
-    return frame_map
+    return DetectionTable.from_entries((item['frame'], item) for item in logs)
 
 
 # ---------------------------
 # 효과 계산 (프론트 규칙 이식)
 # ---------------------------
-def _apply_mosaic_roi(roi_bgr: np.ndarray, lvl: int, s: float = 1.0) -> np.ndarray:
+def _apply_mosaic_roi(roi_bgr: np.ndarray, lvl: int, s: float = 1.0, dst=None) -> np.ndarray:
     """
     강도(lvl)가 커질수록 더 거칠게 보이도록 스케일을 단조증가로 매핑.
     다운스케일은 INTER_AREA(평균화) / 업스케일은 NEAREST(블록 유지).
@@ -187,48 +174,64 @@ def _apply_mosaic_roi(roi_bgr: np.ndarray, lvl: int, s: float = 1.0) -> np.ndarr
     # 평균화가 되는 보간으로 다운스케일
     small = cv2.resize(roi_bgr, (small_w, small_h), interpolation=cv2.INTER_AREA)
     # 블록 유지 보간으로 업스케일
-    mosaic = cv2.resize(small, (w, h), interpolation=cv2.INTER_NEAREST)
+    mosaic = cv2.resize(small, (w, h), dst=dst, interpolation=cv2.INTER_NEAREST)
     return mosaic
 
 
-def _apply_blur_roi(roi_bgr: np.ndarray, lvl: int, s: float = 1.0) -> np.ndarray:
+def _blur_kernel(lvl: int, s: float = 1.0) -> int:
+    """블러 강도 → 가우시안 커널 크기 (홀수)"""
+    r_canvas = (lvl * 2 + 10)
+    r_src = max(1.0, r_canvas / max(s, 1e-6))
+    k = int(max(3, 2 * round(r_src) + 1))
+    if k % 2 == 0:
+        k += 1
+    return k
+
+
+def _apply_blur_roi(roi_bgr: np.ndarray, lvl: int, s: float = 1.0, dst=None) -> np.ndarray:
     """
     프론트 규칙: blur px = (lvl*2 + 10) [화면픽셀].
     원본 픽셀로 환산: r_src = px / s → 가우시안 커널 크기 홀수로 변환.
     """
     if roi_bgr is None or roi_bgr.size == 0:
         return roi_bgr
-    r_canvas = (lvl * 2 + 10)
-    r_src = max(1.0, r_canvas / max(s, 1e-6))
-    k = int(max(3, 2 * round(r_src) + 1))
-    if k % 2 == 0:
-        k += 1
+    k = _blur_kernel(lvl, s)
     # ROI가 극소일 때 과대 커널 방지
     k = min(k, 2 * max(roi_bgr.shape[0], roi_bgr.shape[1]) - 1)
-    return cv2.GaussianBlur(roi_bgr, (k, k), 0)
+    return cv2.GaussianBlur(roi_bgr, (k, k), 0, dst=dst)
 
 
-def _apply_effect_roi(roi_bgr: np.ndarray, MaskingTool: str, lvl: int, s: float = 1.0) -> np.ndarray:
+def _apply_effect_roi(roi_bgr: np.ndarray, MaskingTool: str, lvl: int, s: float = 1.0, dst=None) -> np.ndarray:
     """
     MaskingTool: '0' = mosaic, '1' = blur
+    dst: 결과를 쓸 같은 크기의 연속 배열 (scratch 버퍼, roi_bgr 자신이면 제자리 처리) — None이면 새로 할당
     """
     if str(MaskingTool) == '0':
-        return _apply_mosaic_roi(roi_bgr, lvl, s)
-    return _apply_blur_roi(roi_bgr, lvl, s)
+        return _apply_mosaic_roi(roi_bgr, lvl, s, dst)
+    return _apply_blur_roi(roi_bgr, lvl, s, dst)
+
+
+class _Scratch:
+    """
+    영상(작업)별로 재사용하는 임시 버퍼 — 프레임마다 효과 결과/복원용 원본을 새로 할당하지 않음
+    take(slot, shape): slot 버퍼 앞부분을 shape의 연속 배열로 반환 (부족하면 키워서 재할당)
+    """
+
+    def __init__(self):
+        self._bufs = {}
+
+    def take(self, slot, shape):
+        n = int(np.prod(shape))
+        buf = self._bufs.get(slot)
+        if buf is None or buf.size < n:
+            buf = np.empty(n, dtype=np.uint8)
+            self._bufs[slot] = buf
+        return buf[:n].reshape(shape)
 
 
 # ---------------------------
 # 폴리곤/사각형 유틸
 # ---------------------------
-def _bbox_to_rect(bbox):
-    # [x0,y0,x1,y1]
-    x0, y0, x1, y1 = bbox
-    x0, y0, x1, y1 = int(round(x0)), int(round(y0)), int(round(x1)), int(round(y1))
-    if x1 < x0: x0, x1 = x1, x0
-    if y1 < y0: y0, y1 = y1, y0
-    return x0, y0, x1, y1
-
-
 def _poly_to_mask(h, w, poly_pts):
     mask = np.zeros((h, w), dtype=np.uint8)
     pts = np.array(poly_pts, dtype=np.int32)
@@ -236,24 +239,113 @@ def _poly_to_mask(h, w, poly_pts):
     return mask
 
 
-def _clip_roi(frame, x0, y0, x1, y1):
-    # 포함 하한 / 배제 상한으로 클램핑
-    h, w = frame.shape[:2]
-    x0 = max(0, min(w - 1, int(round(x0))))
-    y0 = max(0, min(h - 1, int(round(y0))))
-    x1 = max(0, min(w,     int(round(x1))))  # 상한은 w
-    y1 = max(0, min(h,     int(round(y1))))  # 상한은 h
-    # 0폭/0높이 방지
-    if x1 <= x0:
-        x1 = min(w, x0 + 1)
-    if y1 <= y0:
-        y1 = min(h, y0 + 1)
-    return x0, y0, x1, y1
+_POLY_MASK_CACHE_BYTES = 64 * 1024 * 1024   # 다각형 마스크 캐시 최대 용량
+
+
+class _PolyMaskCache:
+    """
+    (ROI 기준 꼭짓점, ROI 크기) → bool 마스크 LRU 캐시
+    - 수동/영역 마스크(type:3/4)처럼 여러 프레임에 같은 다각형이 반복되면 fillPoly를 한 번만 수행
+    - 키가 ROI 기준 좌표라 같은 모양이 평행 이동한 경우도 재사용
+    - 반환 마스크는 읽기 전용 (호출 측에서 수정 금지)
+    """
+
+    def __init__(self, max_bytes: int = _POLY_MASK_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._masks = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, h, w, local_pts):
+        key = (h, w, np.ascontiguousarray(local_pts, dtype=np.int32).tobytes())
+        with self._lock:
+            mask = self._masks.get(key)
+            if mask is not None:
+                self._masks.move_to_end(key)
+                self.hits += 1
+                return mask
+        mask = _poly_to_mask(h, w, local_pts) == 255
+        mask.flags.writeable = False
+        with self._lock:
+            self.misses += 1
+            if key not in self._masks:
+                self._masks[key] = mask
+                self._bytes += mask.nbytes
+            while self._bytes > self.max_bytes and len(self._masks) > 1:
+                _, old = self._masks.popitem(last=False)
+                self._bytes -= old.nbytes
+        return mask
+
+
+_poly_mask_cache = _PolyMaskCache()
+
+
+def _rle_to_roi(bbox, rle, h, w):
+    """bbox_type "mask" 엔트리 → 프레임에 클리핑된 ROI (x0, y0, x1, y1)와 ROI 크기 bool 마스크
+
+    RLE는 bbox 좌상단 기준이므로 프레임 전체가 아닌 bbox 영역만 펼침. 디코딩 실패 시 None (사각형으로 처리)
+    """
+    try:
+        mask = mask_rle.decode(rle)
+    except (KeyError, TypeError, ValueError):
+        return None
+    mx, my = int(round(bbox[0])), int(round(bbox[1]))
+    x0, y0 = max(0, mx), max(0, my)
+    x1, y1 = min(w, mx + mask.shape[1]), min(h, my + mask.shape[0])
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return (x0, y0, x1, y1), mask[y0 - my:y1 - my, x0 - mx:x1 - mx]
 
 
 # ---------------------------
 # 마스킹 본체
 # ---------------------------
+def _clip_rects(rects, h, w):
+    """(N, 4) 사각형을 프레임 안으로 한 번에 클램핑 (포함 하한 / 배제 상한, 0폭/0높이 방지)"""
+    x0 = np.clip(rects[:, 0], 0, w - 1)
+    y0 = np.clip(rects[:, 1], 0, h - 1)
+    x1 = np.clip(rects[:, 2], 0, w)
+    y1 = np.clip(rects[:, 3], 0, h)
+    x1 = np.where(x1 <= x0, np.minimum(w, x0 + 1), x1)
+    y1 = np.where(y1 <= y0, np.minimum(h, y0 + 1), y1)
+    return np.stack([x0, y0, x1, y1], axis=1)
+
+
+def _effect_pad(MaskingTool, lvl, s=1.0):
+    """효과 영역 바깥에서 읽어 올 여백 (px) — 블러는 커널 반경, 모자이크는 블록 격자가 밀리지 않게 0"""
+    if str(MaskingTool) == '0':
+        return 0
+    return _blur_kernel(lvl, s) // 2
+
+
+def _plan_regions(rects, gap):
+    """겹치거나 gap px 이내로 붙은 사각형을 하나의 영역으로 묶음
+
+    rects: [(x0, y0, x1, y1), ...] (배제 상한)
+    반환: [((x0, y0, x1, y1) 합집합 외접 사각형, [rects 인덱스, ...]), ...] — 영역끼리는 gap보다 떨어져 있음
+    """
+    regions = []
+    for i, rect in enumerate(rects):
+        box, members = list(rect), [i]
+        merged = True
+        while merged:
+            # 합쳐서 커진 영역이 다른 영역과 새로 붙을 수 있으므로 변화가 없을 때까지 반복
+            merged = False
+            for r in regions:
+                other = r[0]
+                if (box[0] - gap < other[2] and other[0] - gap < box[2]
+                        and box[1] - gap < other[3] and other[1] - gap < box[3]):
+                    box = [min(box[0], other[0]), min(box[1], other[1]), max(box[2], other[2]), max(box[3], other[3])]
+                    members += r[1]
+                    regions.remove(r)
+                    merged = True
+                    break
+        regions.append((box, members))
+    return [(tuple(box), sorted(members)) for box, members in regions]
+
+
 def _process_frame_with_logs(frame_bgr, logs_for_frame, MaskingRange, MaskingTool, MaskingStrength):
     """
     MaskingRange:
@@ -261,113 +353,106 @@ def _process_frame_with_logs(frame_bgr, logs_for_frame, MaskingRange, MaskingToo
       '1' bg(지정객체 제외 배경 마스킹)
       '2' selected(지정객체만 마스킹)
       '3' unselected(미지정객체만 마스킹)
+
+    logs_for_frame: 한 프레임의 엔트리 dict 목록 (내보내기 루프는 _process_frame_rows로 테이블 행을 직접 사용)
+    """
+    table = DetectionTable.from_entries((0, it) for it in logs_for_frame or [])
+    return _process_frame_rows(frame_bgr, table, 0, len(table), MaskingRange, MaskingTool, MaskingStrength)
+
+
+def _process_frame_rows(frame_bgr, table, start, end, MaskingRange, MaskingTool, MaskingStrength,
+                        inplace=False, scratch=None):
+    """DetectionTable의 start:end 행(한 프레임)으로 마스킹 — 사각형은 로드 시 검증된 int32 그대로 사용
+
+    inplace=True면 frame_bgr(디코딩 버퍼)에 바로 기록하고 반환 (프레임 전체 복사 없음)
+    scratch: 효과 결과/복원 영역용 _Scratch (영상마다 하나, None이면 새로 할당)
     """
     lvl = int(MaskingStrength) if str(MaskingStrength).isdigit() else 3
     s = 1.0  # 시그니처 변경 없이 스케일 1로 가정
 
     h, w = frame_bgr.shape[:2]
-    out = frame_bgr.copy()
-
-    # 로그를 지정/미지정으로 분리
-    sel = []
-    uns = []
-    for it in logs_for_frame or []:
-        obj = it.get('object', None)
-        if obj == 2:
-            uns.append(it)
-        else:
-            # 기본은 지정으로 본다(프론트 'none'에서도 테두리/표시용으로 취급)
-            sel.append(it)
-
-    def apply_roi_effect(rect_or_poly, only_polygon=False):
-        """
-        rect_or_poly: dict { 'type': 'rect'/'poly', 'rect':(x0,y0,x1,y1) or 'poly':[(x,y), ...] }
-        only_polygon: True면 다각형으로 clip 후 합성
-        """
-        nonlocal out, lvl, s
-        if rect_or_poly['type'] == 'rect':
-            x0, y0, x1, y1 = rect_or_poly['rect']
-            x0, y0, x1, y1 = _clip_roi(out, x0, y0, x1, y1)
-            roi = out[y0:y1, x0:x1]
-            effected = _apply_effect_roi(roi, MaskingTool, lvl, s)
-            out[y0:y1, x0:x1] = effected
-        else:
-            # poly
-            pts = rect_or_poly['poly']
-            xs = [int(round(p[0])) for p in pts]
-            ys = [int(round(p[1])) for p in pts]
-
-            # 배제 상한(+1)로 영역 계산
-            minx = max(0, min(xs))
-            miny = max(0, min(ys))
-            maxx = min(w, max(xs) + 1)
-            maxy = min(h, max(ys) + 1)
-            if maxx <= minx: maxx = min(minx + 1, w)
-            if maxy <= miny: maxy = min(miny + 1, h)
-
-            roi = out[miny:maxy, minx:maxx].copy()
-
-            # ROI 좌표계에서 다각형 마스크 생성
-            local_pts = [(x - minx, y - miny) for x, y in zip(xs, ys)]
-            mask = _poly_to_mask(roi.shape[0], roi.shape[1], local_pts)
-
-            effected = _apply_effect_roi(roi, MaskingTool, lvl, s)
-            roi[mask == 255] = effected[mask == 255]
-            out[miny:maxy, minx:maxx] = roi
+    out = frame_bgr if inplace else frame_bgr.copy()
+    scratch = scratch or _Scratch()
 
-    # Range별 처리
-    if str(MaskingRange) == '0':
-        # 아무 것도 하지 않음(프론트 프리뷰는 테두리만, 백엔드는 원본 유지)
+    if str(MaskingRange) not in ('1', '2', '3') or end <= start:
+        # '0': 아무 것도 하지 않음(프론트 프리뷰는 테두리만, 백엔드는 원본 유지), 알 수 없는 Range → 원본
+        if str(MaskingRange) == '1':
+            return _apply_effect_roi(out, MaskingTool, lvl, s, dst=out)
         return out
 
-    if str(MaskingRange) == '1':
-        # 배경 전체에 효과 → 지정객체(sel) 영역만 원본 복원
-        effected_full = _apply_effect_roi(out, MaskingTool, lvl, s)
-        out = effected_full
-        # sel을 원본으로 되살림
-        for it in sel:
-            bbox = it.get('bbox')
-            if isinstance(bbox, (list, tuple)) and len(bbox) == 4 and not isinstance(bbox[0], (list, tuple)):
-                x0, y0, x1, y1 = _bbox_to_rect(bbox)
-                x0, y0, x1, y1 = _clip_roi(frame_bgr, x0, y0, x1, y1)
-                out[y0:y1, x0:x1] = frame_bgr[y0:y1, x0:x1]
-            elif isinstance(bbox, (list, tuple)) and len(bbox) >= 3 and isinstance(bbox[0], (list, tuple)):
-                # polygon 복원
-                pts = [(float(p[0]), float(p[1])) for p in bbox]
-                xs = [int(round(p[0])) for p in pts]
-                ys = [int(round(p[1])) for p in pts]
-
-                # 배제 상한(+1)로 영역 계산
-                minx = max(0, min(xs))
-                miny = max(0, min(ys))
-                maxx = min(w, max(xs) + 1)
-                maxy = min(h, max(ys) + 1)
-                if maxx <= minx: maxx = min(minx + 1, w)
-                if maxy <= miny: maxy = min(miny + 1, h)
-
-                roi_dst = out[miny:maxy, minx:maxx]
-                roi_src = frame_bgr[miny:maxy, minx:maxx]
-                mask = _poly_to_mask(roi_dst.shape[0], roi_dst.shape[1],
-                                     [(x - minx, y - miny) for x, y in zip(xs, ys)])
-                roi_dst[mask == 255] = roi_src[mask == 255]
-                out[miny:maxy, minx:maxx] = roi_dst
-        return out
+    rects = _clip_rects(table.rects[start:end], h, w)
+    kinds = table.kind[start:end]
+    # 기본은 지정으로 본다(프론트 'none'에서도 테두리/표시용으로 취급), object == 2만 미지정
+    unselected = table.object[start:end] == 2
+
+    def region_of(i):
+        """i번째 행 → ((x0, y0, x1, y1), ROI 크기 bool 마스크 — 사각형이면 None)"""
+        row = start + i
+        if kinds[i] == KIND_MASK:
+            region = _rle_to_roi(table.rects[row], table.masks[row], h, w)
+            if region is not None:
+                return region
+        x0, y0, x1, y1 = (int(v) for v in rects[i])
+        if kinds[i] == KIND_POLY:
+            # ROI 좌표계에서 다각형 마스크 생성
+            local_pts = table.polygon(row) - np.array([x0, y0], dtype=np.int32)
+            return (x0, y0, x1, y1), _poly_mask_cache.get(y1 - y0, x1 - x0, local_pts)
+        return (x0, y0, x1, y1), None
 
-    if str(MaskingRange) in ('2', '3'):
-        # selected: 지정객체만 효과
-        # unselected: 미지정객체만 효과
-        target = sel if str(MaskingRange) == '2' else uns
-        for it in target:
-            bbox = it.get('bbox')
-            if isinstance(bbox, (list, tuple)) and len(bbox) == 4 and not isinstance(bbox[0], (list, tuple)):
-                x0, y0, x1, y1 = _bbox_to_rect(bbox)
-                apply_roi_effect({'type': 'rect', 'rect': (x0, y0, x1, y1)})
-            elif isinstance(bbox, (list, tuple)) and len(bbox) >= 3 and isinstance(bbox[0], (list, tuple)):
-                pts = [(float(p[0]), float(p[1])) for p in bbox]
-                apply_roi_effect({'type': 'poly', 'poly': pts})
+    if str(MaskingRange) == '1':
+        # 배경 전체에 효과 → 지정객체 영역만 원본 복원
+        # 원본은 복원 영역만 scratch에 보관해 두고 프레임은 제자리에서 효과 적용
+        parts = [region_of(i) for i in np.flatnonzero(~unselected)]
+        sizes = [(y1 - y0) * (x1 - x0) * 3 for (x0, y0, x1, y1), _ in parts]
+        saved = scratch.take('restore', (sum(sizes),))
+        originals, offset = [], 0
+        for ((x0, y0, x1, y1), _), size in zip(parts, sizes):
+            keep = saved[offset:offset + size].reshape(y1 - y0, x1 - x0, 3)
+            np.copyto(keep, out[y0:y1, x0:x1])
+            originals.append(keep)
+            offset += size
+
+        _apply_effect_roi(out, MaskingTool, lvl, s, dst=out)
+        for ((x0, y0, x1, y1), mask), keep in zip(parts, originals):
+            if mask is None:
+                out[y0:y1, x0:x1] = keep
+            else:
+                np.copyto(out[y0:y1, x0:x1], keep, where=mask[..., None])
         return out
 
-    # 알 수 없는 Range → 원본
+    # selected: 지정객체만 효과 / unselected: 미지정객체만 효과
+    # 겹치거나 붙은 대상은 한 영역으로 묶어 원본 기준 한 번만 효과 (중복 블러 없이 합집합 커버리지 동일)
+    target = ~unselected if str(MaskingRange) == '2' else unselected
+    parts = [region_of(i) for i in np.flatnonzero(target)]
+    pad = _effect_pad(MaskingTool, lvl, s)
+    for (x0, y0, x1, y1), members in _plan_regions([rect for rect, _ in parts], 2 * pad):
+        # 여백만큼 주변 원본 픽셀을 포함해 효과 → 영역 가장자리도 안쪽과 같은 결과
+        # (영역끼리 2*pad 이상 떨어져 있어 제자리 처리 중에도 여백은 아직 원본)
+        px0, py0 = max(0, x0 - pad), max(0, y0 - pad)
+        px1, py1 = min(w, x1 + pad), min(h, y1 + pad)
+        window = out[py0:py1, px0:px1]
+        effected = _apply_effect_roi(window, MaskingTool, lvl, s, dst=scratch.take('effect', window.shape))
+        effected = effected[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+        roi = out[y0:y1, x0:x1]     # out의 view → 제자리 합성
+
+        if len(members) == 1:
+            # 단독 대상: 사각형은 그대로, 다각형/RLE는 자기 마스크(캐시된 배열)로 바로 합성
+            mask = parts[members[0]][1]
+            if mask is None:
+                roi[...] = effected
+            else:
+                np.copyto(roi, effected, where=mask[..., None])
+            continue
+        # 영역 합성 마스크: 사각형은 전체, 다각형/RLE는 자기 마스크
+        mask = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+        for m in members:
+            (mx0, my0, mx1, my1), member_mask = parts[m]
+            sub = mask[my0 - y0:my1 - y0, mx0 - x0:mx1 - x0]
+            if member_mask is None:
+                sub[...] = True
+            else:
+                sub |= member_mask
+        np.copyto(roi, effected, where=mask[..., None])
     return out
 
 
@@ -386,7 +471,7 @@ def output_masking(video_path, MaskingRange, MaskingTool, MaskingStrength, log_q
         output_path = os.path.join(out_dir, f"{base}_masked.mp4")
         return _passthrough(video_path, output_path, log_queue, progress_callback)
 
-    frame_logs = _load_mask_data(data_path)
+    table = _load_mask_data(data_path)
 
     base = os.path.splitext(os.path.basename(video_path))[0]
     output_path = os.path.join(out_dir, f"{base}_masked.mp4")
@@ -404,20 +489,25 @@ def output_masking(video_path, MaskingRange, MaskingTool, MaskingStrength, log_q
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         total  = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
+        import av  # cv2 이후 로드 (FFmpeg 중복 로드 충돌 방지)
         container = av.open(output_path, mode='w')
         stream = container.add_stream('h264', rate=fps_int)
         stream.width  = width
         stream.height = height
         stream.pix_fmt = 'yuv420p'
 
+        # 디코딩 버퍼를 재사용하며 제자리 마스킹 (from_ndarray가 인코딩용으로 복사하므로 안전)
+        scratch = _Scratch()
+        bgr = None
         frame_idx = 0
         while True:
-            ok, bgr = cap.read()
+            ok, bgr = cap.read(bgr)
             if not ok or bgr is None or bgr.size == 0:
                 break
 
-            logs = frame_logs.get(frame_idx, [])
-            out_bgr = _process_frame_with_logs(bgr, logs, MaskingRange, MaskingTool, MaskingStrength)
+            start, end = table.frame_rows(frame_idx)
+            out_bgr = _process_frame_rows(bgr, table, start, end, MaskingRange, MaskingTool, MaskingStrength,
+                                          inplace=True, scratch=scratch)
 
             frame = av.VideoFrame.from_ndarray(out_bgr, format='bgr24')
             for packet in stream.encode(frame):
@@ -475,6 +565,7 @@ def output_allmasking(video_path, MaskingTool, MaskingStrength, log_queue, progr
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         total  = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
+        import av  # cv2 이후 로드 (FFmpeg 중복 로드 충돌 방지)
         container = av.open(output_path, mode='w')
         stream = container.add_stream('h264', rate=fps_int)
         stream.width  = width
@@ -484,13 +575,15 @@ def output_allmasking(video_path, MaskingTool, MaskingStrength, log_queue, progr
         lvl = int(MaskingStrength) if str(MaskingStrength).isdigit() else 3
         s = 1.0  # 시그니처 유지: 스케일 1 가정
 
+        bgr = None
         frame_idx = 0
         while True:
-            ok, bgr = cap.read()
+            ok, bgr = cap.read(bgr)
             if not ok or bgr is None or bgr.size == 0:
                 break
 
-            effected = _apply_effect_roi(bgr, MaskingTool, lvl, s)
+            # 디코딩 버퍼에 제자리 적용
+            effected = _apply_effect_roi(bgr, MaskingTool, lvl, s, dst=bgr)
 
             frame = av.VideoFrame.from_ndarray(effected, format='bgr24')
             for packet in stream.encode(frame):
@@ -544,6 +637,7 @@ def _passthrough(video_path, output_path, log_queue, progress_callback=None):
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         total  = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
 
+        import av  # cv2 이후 로드 (FFmpeg 중복 로드 충돌 방지)
         container = av.open(output_path, mode='w')
         stream = container.add_stream('h264', rate=fps_int)
         stream.width  = width
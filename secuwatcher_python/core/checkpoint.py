@@ -0,0 +1,79 @@
+"""
+탐지 작업 체크포인트 (중단된 작업 이어하기)
+- save_checkpoint(): 진행 위치 + 트래커 상태를 jobs/<job_id>.ckpt 에 원자적으로 저장
+- load_checkpoint(): /resume/{job_id} 에서 체크포인트 로드 (없거나 손상 시 None)
+- delete_checkpoint(): 작업 완료/취소 시 삭제 (24시간 경과분은 load_job_states()에서 정리)
+
+체크포인트 내용 (kind별):
+    autodetect : video_path, video_index, frame_index, results_files, conf_thres, classid, tracker
+    sam2       : video_path, FrameNo, Coordinate, track_id, next_chunk_idx, crop_region, last_crop_bbox, ...
+
+트래커 상태(ByteTrack STrack 목록 / Kalman mean·covariance)는 JSON으로 표현할 수 없어 pickle로 저장합니다.
+체크포인트는 이 프로그램이 자신의 jobs 디렉토리에만 쓰고 읽습니다.
+"""
+import os
+import time
+import pickle
+import logging
+
+from core.state import _get_jobs_state_dir
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+
+def _get_checkpoint_file(job_id: str) -> str:
+    """특정 job_id의 체크포인트 파일 경로 반환"""
+    return os.path.join(_get_jobs_state_dir(), f"{job_id}.ckpt")
+
+
+def save_checkpoint(job_id: str, kind: str, data: dict) -> bool:
+    """
+    체크포인트 저장 (임시 파일에 쓴 뒤 os.replace — 저장 중 종료되어도 이전 체크포인트 유지)
+    반환: 성공 여부 (실패해도 탐지는 계속 진행)
+    """
+    if not job_id:
+        return False
+    payload = dict(data, version=CHECKPOINT_VERSION, job_id=job_id, kind=kind, saved_at=time.time())
+    ckpt_file = _get_checkpoint_file(job_id)
+    tmp_file = ckpt_file + '.tmp'
+    try:
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, ckpt_file)
+        return True
+    except Exception as e:
+        logger.error(f"[CKPT] 체크포인트 저장 실패 ({job_id}): {e}")
+        return False
+
+
+def load_checkpoint(job_id: str, kind: str = None):
+    """체크포인트 로드 — 없거나, 손상되었거나, 버전/종류가 다르면 None"""
+    ckpt_file = _get_checkpoint_file(job_id)
+    if not os.path.exists(ckpt_file):
+        return None
+    try:
+        with open(ckpt_file, 'rb') as f:
+            payload = pickle.load(f)
+    except Exception as e:
+        logger.error(f"[CKPT] 체크포인트 로드 실패 ({job_id}): {e}")
+        return None
+    if not isinstance(payload, dict) or payload.get("version") != CHECKPOINT_VERSION:
+        logger.warning(f"[CKPT] 호환되지 않는 체크포인트 무시: {job_id}")
+        return None
+    if kind is not None and payload.get("kind") != kind:
+        logger.warning(f"[CKPT] 체크포인트 종류 불일치 ({job_id}): {payload.get('kind')} != {kind}")
+        return None
+    return payload
+
+
+def delete_checkpoint(job_id: str):
+    """체크포인트 파일 삭제 (없으면 무시)"""
+    try:
+        ckpt_file = _get_checkpoint_file(job_id)
+        if os.path.exists(ckpt_file):
+            os.remove(ckpt_file)
+            logger.debug(f"[CKPT] 체크포인트 삭제: {job_id}")
+    except Exception as e:
+        logger.error(f"[CKPT] 체크포인트 삭제 실패 ({job_id}): {e}")
@@ -1,44 +1,118 @@
 """
 SQLite 데이터베이스 관리
-- DRM 정보 테이블 생성
-- DRM 정보 삽입
+- 스레드별 영속 커넥션 (WAL 저널, statement 캐시)
+- DRM 정보 테이블/인덱스 생성
+- DRM 정보 삽입 (단건 / 일괄 / 작업 스레드 → 단일 writer 묶음 기록)
+- file_hash 기반 DRM 정보 조회
 """
 import os
 import sqlite3
 import logging
+import queue
+import threading
+from concurrent.futures import Future
 from util import get_resource_path
 
 logger = logging.getLogger(__name__)
 
 DB_FILE = get_resource_path("local.db")
 
+_CREATE_TABLE_SQL = '''
+CREATE TABLE IF NOT EXISTS tb_drm_info (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_hash TEXT,
+    ori_file_name VARCHAR(100),
+    org_filepath VARCHAR(256),
+    masking_file_name VARCHAR(100),
+    masking_status CHAR(10),
+    enc_file_name VARCHAR(100),
+    enc_status CHAR(10),
+    play_date DATETIME,
+    play_count INTEGER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+'''
+
+_CREATE_INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS idx_drm_info_file_hash ON tb_drm_info (file_hash);',
+    'CREATE INDEX IF NOT EXISTS idx_drm_info_enc_file_name ON tb_drm_info (enc_file_name);',
+)
+
+_INSERT_DRM_SQL = '''
+INSERT INTO tb_drm_info (
+    file_hash, ori_file_name, org_filepath, masking_file_name,
+    masking_status, enc_file_name, enc_status, play_date, play_count
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+'''
+
+_SELECT_BY_HASH_SQL = '''
+SELECT seq, file_hash, ori_file_name, org_filepath, masking_file_name,
+       masking_status, enc_file_name, enc_status, play_date, play_count, created_at
+FROM tb_drm_info WHERE file_hash = ? ORDER BY seq DESC LIMIT ?;
+'''
+
+_SELECT_BY_HASHES_SQL = '''
+SELECT seq, file_hash, ori_file_name, org_filepath, masking_file_name,
+       masking_status, enc_file_name, enc_status, play_date, play_count, created_at
+FROM tb_drm_info WHERE file_hash IN ({}) ORDER BY seq DESC LIMIT ?;
+'''
+
+_DRM_COLUMNS = (
+    "file_hash", "ori_file_name", "org_filepath", "masking_file_name",
+    "masking_status", "enc_file_name", "enc_status", "play_date", "play_count",
+)
+
+# ─── 커넥션 관리 ──────────────────────────────────────────────────────
+# sqlite3 커넥션은 생성된 스레드에서만 쓰도록 스레드별로 캐시합니다.
+# 같은 SQL 문자열을 재사용하면 커넥션의 statement 캐시가 prepared statement를 재활용합니다.
+_local = threading.local()
+
+
+def _ensure_schema(conn):
+    """테이블/인덱스 생성 (커넥션 생성 시 한 번)"""
+    conn.execute(_CREATE_TABLE_SQL)
+    for sql in _CREATE_INDEX_SQL:
+        conn.execute(sql)
+    conn.commit()
+
+
+def get_connection(db_path=None):
+    """현재 스레드의 db_path 커넥션 반환 (없으면 생성 + WAL 설정)"""
+    if db_path is None:
+        db_path = DB_FILE
+    conns = getattr(_local, "conns", None)
+    if conns is None:
+        conns = _local.conns = {}
+    conn = conns.get(db_path)
+    if conn is None:
+        conn = sqlite3.connect(db_path, timeout=10, cached_statements=128)
+        conn.row_factory = sqlite3.Row
+        if db_path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+        _ensure_schema(conn)
+        conns[db_path] = conn
+    return conn
+
+
+def close_connections():
+    """현재 스레드의 모든 커넥션 종료"""
+    conns = getattr(_local, "conns", None) or {}
+    for conn in conns.values():
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    conns.clear()
+
 
 def create_drm_table(db_path=None):
-    """tb_drm_info 테이블이 없으면 생성"""
+    """tb_drm_info 테이블과 조회 인덱스가 없으면 생성"""
     if db_path is None:
         db_path = DB_FILE
-    create_table_sql = '''
-    CREATE TABLE IF NOT EXISTS tb_drm_info (
-        seq INTEGER PRIMARY KEY AUTOINCREMENT,
-        file_hash TEXT,
-        ori_file_name VARCHAR(100),
-        org_filepath VARCHAR(256),
-        masking_file_name VARCHAR(100),
-        masking_status CHAR(10),
-        enc_file_name VARCHAR(100),
-        enc_status CHAR(10),
-        play_date DATETIME,
-        play_count INTEGER,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    );
-    '''
     try:
         db_existed = os.path.exists(db_path)
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(create_table_sql)
-        conn.commit()
-        conn.close()
+        get_connection(db_path)
 
         if db_existed:
             logger.info("기존 DB 사용")
@@ -55,19 +129,91 @@ def insert_drm_info(
     db_path=None
 ):
     """DRM 정보를 tb_drm_info 테이블에 삽입"""
-    if db_path is None:
-        db_path = DB_FILE
-    sql = '''
-    INSERT INTO tb_drm_info (
-        file_hash, ori_file_name, org_filepath, masking_file_name,
-        masking_status, enc_file_name, enc_status, play_date, play_count
-    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
-    '''
-    conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-    cursor.execute(sql, (
-        file_hash, ori_file_name, org_filepath, masking_file_name,
-        masking_status, enc_file_name, enc_status, play_date, play_count
-    ))
-    conn.commit()
-    conn.close()
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute(_INSERT_DRM_SQL, (
+            file_hash, ori_file_name, org_filepath, masking_file_name,
+            masking_status, enc_file_name, enc_status, play_date, play_count
+        ))
+
+
+def insert_drm_info_many(rows, db_path=None):
+    """
+    DRM 정보 여러 건을 단일 트랜잭션으로 삽입 (일괄 암호화용)
+    rows: insert_drm_info와 같은 키를 가진 dict 목록
+    반환: 삽입된 행 수
+    """
+    params = [tuple(row.get(c) for c in _DRM_COLUMNS) for row in rows]
+    if not params:
+        return 0
+    conn = get_connection(db_path)
+    with conn:
+        conn.executemany(_INSERT_DRM_SQL, params)
+    return len(params)
+
+
+def lookup_drm_by_hash(file_hash, limit=10, db_path=None):
+    """file_hash로 DRM 정보 조회 (idx_drm_info_file_hash 사용, 최신순)"""
+    conn = get_connection(db_path)
+    rows = conn.execute(_SELECT_BY_HASH_SQL, (file_hash, limit)).fetchall()
+    return [dict(r) for r in rows]
+
+
+def lookup_drm_by_hashes(file_hashes, limit=10, db_path=None):
+    """file_hash 중 하나와 일치하는 DRM 정보 조회 (해시 기준이 다른 이전 기록 포함, 최신순)"""
+    file_hashes = list(dict.fromkeys(file_hashes))
+    if len(file_hashes) == 1:
+        return lookup_drm_by_hash(file_hashes[0], limit=limit, db_path=db_path)
+    conn = get_connection(db_path)
+    sql = _SELECT_BY_HASHES_SQL.format(", ".join("?" * len(file_hashes)))
+    rows = conn.execute(sql, (*file_hashes, limit)).fetchall()
+    return [dict(r) for r in rows]
+
+
+# ─── 묶음 기록 writer ────────────────────────────────────────────────
+class DrmWriter:
+    """
+    암호화 작업들이 submit한 DRM 행을 단일 writer 스레드가 모아 insert_drm_info_many로 기록
+    - 일괄 내보내기는 파일마다 /encrypt 작업 스레드가 새로 생기므로, 스레드별 커넥션 대신
+      writer 스레드 하나의 영속 커넥션을 재사용하고 동시에 끝난 작업들을 한 트랜잭션으로 묶음
+    - submit은 Future 반환 (기록 완료 시 결과, 실패 시 예외) — 작업은 DB 기록 확인 후 완료 처리
+    """
+
+    def __init__(self, db_path=None, max_batch=500, linger=0.05):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.linger = linger       # 첫 행 도착 후 다른 작업의 행을 더 기다리는 시간 (초)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, row):
+        """insert_drm_info와 같은 키의 dict 한 건을 기록 대기열에 추가 → Future"""
+        future = Future()
+        self._queue.put((row, future))
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="drm-writer", daemon=True)
+                self._thread.start()
+        return future
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self.max_batch:
+                    batch.append(self._queue.get(timeout=self.linger))
+            except queue.Empty:
+                pass
+            try:
+                insert_drm_info_many([row for row, _ in batch], db_path=self.db_path)
+            except Exception as e:
+                logger.error(f"DRM 정보 일괄 기록 실패 ({len(batch)}건): {e}")
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for _, future in batch:
+                    future.set_result(True)
+
+
+drm_writer = DrmWriter()
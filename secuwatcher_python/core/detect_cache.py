@@ -0,0 +1,149 @@
+"""
+자동 탐지 결과 캐시 (내용 주소 기반)
+- video_fingerprint(): 파일 크기 + 앞/뒤/균등 간격 블록 해시 (전체 파일을 읽지 않음)
+- cache_key(): 영상 지문 + 모델 가중치 해시 + 탐지 파라미터 → 캐시 키
+- DetectCache: <config 폴더>/cache/detect/<key>.json.gz 에 프레임별 결과를 압축 저장,
+  총 용량 기준 LRU(최근 사용 시각 = mtime) 정리
+
+같은 영상을 같은 모델/설정으로 다시 탐지(프로젝트 재오픈, 일괄 재내보내기)하면
+autodetector가 YOLO를 실행하지 않고 캐시 결과로 JSON을 바로 생성합니다.
+
+config.ini [detect]:
+    cache = yes             ; 탐지 결과 캐시 사용
+    cache_max_mb = 1024     ; 캐시 폴더 최대 용량 (초과 시 오래 쓰지 않은 항목부터 삭제)
+"""
+import os
+import gzip
+import json
+import hashlib
+import logging
+import threading
+
+from util import get_resource_path
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+_FINGERPRINT_BLOCK = 64 * 1024   # 샘플 블록 크기
+_FINGERPRINT_SAMPLES = 16        # 파일 전체에 균등 분포한 샘플 블록 수 (앞/뒤 포함)
+
+
+def video_fingerprint(path: str) -> str:
+    """파일 크기 + 샘플 블록 blake2b (수 GB 영상도 1MB 내외만 읽음)"""
+    size = os.path.getsize(path)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(str(size).encode())
+    with open(path, 'rb') as f:
+        if size <= _FINGERPRINT_BLOCK * _FINGERPRINT_SAMPLES:
+            h.update(f.read())
+        else:
+            step = (size - _FINGERPRINT_BLOCK) / (_FINGERPRINT_SAMPLES - 1)
+            for i in range(_FINGERPRINT_SAMPLES):
+                f.seek(int(i * step))
+                h.update(f.read(_FINGERPRINT_BLOCK))
+    return h.hexdigest()
+
+
+def cache_key(fingerprint: str, model_hash: str, params: dict) -> str:
+    """영상 지문 + 모델 해시 + 탐지 파라미터(정렬된 JSON) → 32자리 키"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"v{CACHE_VERSION}|{fingerprint}|{model_hash}|".encode())
+    h.update(json.dumps(params, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return h.hexdigest()
+
+
+def _pack(tracking_results):
+    """tracking_results → 프레임별 행 목록 {frame: [[track_id, x1, y1, x2, y2, score, class_id, object, interpolated], ...]}"""
+    frames = {}
+    for e in tracking_results:
+        frames.setdefault(str(e["frame"]), []).append(
+            [e["track_id"], *e["bbox"], e["score"], e["class_id"], e["object"], 1 if e.get("interpolated") else 0])
+    return frames
+
+
+def _unpack(frames):
+    """_pack 역변환 → autodetector tracking_results 형식 (type:1)"""
+    results = []
+    for fkey in sorted(frames, key=int):
+        for track_id, x1, y1, x2, y2, score, class_id, obj, interp in frames[fkey]:
+            entry = {"frame": int(fkey), "track_id": track_id, "bbox": [x1, y1, x2, y2],
+                     "score": score, "class_id": class_id, "type": 1, "object": obj}
+            if interp:
+                entry["interpolated"] = True
+            results.append(entry)
+    return results
+
+
+class DetectCache:
+    """압축 JSON 파일 기반 탐지 결과 캐시 (총 용량 LRU)"""
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = 1024 * 1024 * 1024):
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.dirname(get_resource_path('config.ini')), 'cache', 'detect')
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json.gz")
+
+    def get(self, key: str):
+        """캐시 적중 시 (tracking_results, info), 없거나 손상되면 None (적중 시 LRU 시각 갱신)"""
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") != CACHE_VERSION:
+                return None
+            os.utime(path)
+            return _unpack(data["frames"]), data.get("info", {})
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"[CACHE] 손상된 캐시 항목 삭제 ({key}): {e}")
+            self._remove(path)
+            return None
+
+    def put(self, key: str, tracking_results, info: dict = None):
+        """결과 저장 (임시 파일 → os.replace) 후 용량 초과분 정리"""
+        path = self._path(key)
+        tmp = path + '.tmp'
+        payload = {"version": CACHE_VERSION, "info": info or {}, "frames": _pack(tracking_results)}
+        try:
+            with gzip.open(tmp, 'wt', encoding='utf-8', compresslevel=6) as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"[CACHE] 캐시 저장 실패 ({key}): {e}")
+            self._remove(tmp)
+            return
+        self.evict()
+
+    def evict(self):
+        """총 용량이 max_bytes를 넘으면 최근 사용 시각이 오래된 항목부터 삭제"""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.json.gz'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,175 @@
+"""
+모델 사전 로드(pre-warm) 및 준비 상태 관리
+- start_prewarm(): FastAPI lifespan에서 호출, 백그라운드 스레드에서 설정된 모델 로드 + 더미 추론
+- get_model_status(): /health/models 응답용 모델별 상태
+- wait_for_warmup(): 작업이 모델을 쓰기 전 진행 중인 사전 로드 종료를 기다림
+  (ultralytics predictor/SAM2 predictor는 스레드 안전하지 않음 → 워밍업 추론과 작업 추론이 겹치지 않게)
+
+config.ini:
+    [detect] prewarm = yes|no   ; YOLO 사전 로드 (기본 no)
+    [sam2]   prewarm = yes|no   ; SAM2 사전 로드 (기본 no)
+
+사전 로드를 끈 모델도 Event 호출로 lazy loading 되면 ready로 보고합니다.
+UI는 ready가 될 때까지 탐지 버튼을 비활성화해 첫 작업이 모델 로드를 기다리지 않도록 합니다.
+"""
+import os
+import sys
+import time
+import shutil
+import logging
+import tempfile
+import threading
+import configparser
+from util import logLine, timeToStr, get_resource_path
+from core import precision as _precision
+
+logger = logging.getLogger(__name__)
+
+# 모델 상태: disabled → loading → warming → ready | error
+_MODELS = ("yolo", "sam2")
+_status = {name: {"enabled": False, "state": "disabled", "error": None,
+                  "load_seconds": None, "warmup_seconds": None, "updated_at": None}
+           for name in _MODELS}
+_status_lock = threading.Lock()
+_thread = None
+# 모델별 사전 로드 종료 신호 (사전 로드 대상이 아니면 처음부터 set)
+_done = {name: threading.Event() for name in _MODELS}
+for _ev in _done.values():
+    _ev.set()
+
+
+def _set_status(name, **fields):
+    with _status_lock:
+        _status[name].update(fields, updated_at=time.time())
+
+
+def _read_config():
+    cfg = configparser.ConfigParser(allow_no_value=True)
+    cfg.read(get_resource_path('config.ini'), encoding='utf-8')
+    return cfg
+
+
+def _is_enabled(cfg, section):
+    return cfg.get(section, 'prewarm', fallback='no').strip().lower() in ('yes', 'true', '1')
+
+
+def _prewarm_yolo():
+    """YOLO 로드 + [detect] imgsz 크기의 빈 프레임으로 1회 추론 (커널/그래프 워밍업)"""
+    import numpy as np
+    import detector
+
+    _set_status("yolo", state="loading")
+    t0 = time.perf_counter()
+    model = detector._get_yolo_model()
+    _set_status("yolo", state="warming", load_seconds=round(time.perf_counter() - t0, 2))
+
+    imgsz = detector._yolo_imgsz()
+    t1 = time.perf_counter()
+    with detector._yolo_autocast():
+        model.predict(np.zeros((imgsz, imgsz, 3), dtype=np.uint8), imgsz=imgsz,
+                      device=detector._yolo_device(), half=detector._yolo_half(), verbose=False)
+    _set_status("yolo", state="ready", warmup_seconds=round(time.perf_counter() - t1, 2))
+
+
+def _prewarm_sam2(cfg):
+    """SAM2 로드 + crop_size 크기 1프레임 상태 초기화/포인트 프롬프트/전파 1회"""
+    import cv2
+    import numpy as np
+    import sam2_detector
+
+    _set_status("sam2", state="loading")
+    t0 = time.perf_counter()
+    predictor = sam2_detector._get_sam2_model()
+    _set_status("sam2", state="warming", load_seconds=round(time.perf_counter() - t0, 2))
+
+    crop_size = cfg.getint('sam2', 'crop_size', fallback=384)
+    temp_dir = tempfile.mkdtemp(prefix='sam2_warmup_')
+    t1 = time.perf_counter()
+    try:
+        cv2.imwrite(os.path.join(temp_dir, '000000.jpg'), np.zeros((crop_size, crop_size, 3), dtype=np.uint8))
+        with _precision.autocast(sam2_detector._sam2_precision(), sam2_detector._sam2_device()):
+            state = predictor.init_state(video_path=temp_dir, async_loading_frames=False)
+            predictor.add_new_points_or_box(
+                inference_state=state,
+                frame_idx=0,
+                obj_id=1,
+                points=np.array([[crop_size // 2, crop_size // 2]], dtype=np.float32),
+                labels=np.array([1], dtype=np.int32),
+            )
+            for _ in predictor.propagate_in_video(state):
+                pass
+            predictor.reset_state(state)
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+    _set_status("sam2", state="ready", warmup_seconds=round(time.perf_counter() - t1, 2))
+
+
+def _run_prewarm(cfg, log_queue, log_path):
+    """활성화된 모델을 순서대로(YOLO → SAM2) 사전 로드 — GPU 경합을 피하기 위해 직렬 실행"""
+    for name in _MODELS:
+        if not _status[name]["enabled"]:
+            continue
+        try:
+            if name == "yolo":
+                _prewarm_yolo()
+            else:
+                _prewarm_sam2(cfg)
+            st = _status[name]
+            msg = f"[WARMUP] {name} 준비 완료 (load={st['load_seconds']}s, warmup={st['warmup_seconds']}s)"
+        except Exception as e:
+            _set_status(name, state="error", error=str(e))
+            msg = f"[WARMUP] {name} 사전 로드 실패: {e}"
+        finally:
+            _done[name].set()
+        logger.info(msg)
+        if log_queue is not None:
+            log_queue.append(logLine(path=log_path, time=timeToStr(time.time(), 'datetime'), message=msg))
+
+
+def start_prewarm(log_queue=None, log_path=""):
+    """config.ini에서 사전 로드가 켜진 모델을 백그라운드 스레드로 로드 (멱등)"""
+    global _thread
+    if _thread is not None:
+        return _thread
+    cfg = _read_config()
+    enabled = {"yolo": _is_enabled(cfg, 'detect'), "sam2": _is_enabled(cfg, 'sam2')}
+    for name, on in enabled.items():
+        _set_status(name, enabled=on, state="idle" if on else "disabled")
+        if on:
+            _done[name].clear()
+    if not any(enabled.values()):
+        return None
+    _thread = threading.Thread(target=_run_prewarm, args=(cfg, log_queue, log_path),
+                               name="model-prewarm", daemon=True)
+    _thread.start()
+    return _thread
+
+
+def wait_for_warmup(name, timeout=None):
+    """name 모델의 사전 로드(로드 + 더미 추론)가 진행 중이면 끝날 때까지 대기 — 완료(또는 비대상)면 True
+
+    사전 로드 스레드 자신이 모델 getter를 호출할 때는 기다리지 않음
+    """
+    if threading.current_thread() is _thread:
+        return True
+    return _done[name].wait(timeout)
+
+
+def _lazily_loaded(name):
+    """사전 로드와 무관하게 Event 호출로 이미 로드된 모델인지 (무거운 모듈을 새로 import하지 않음)"""
+    if name == "yolo":
+        mod = sys.modules.get("detector")
+        return mod is not None and getattr(mod, "MODEL", None) is not None
+    mod = sys.modules.get("sam2_detector")
+    return mod is not None and getattr(mod, "SAM2_MODEL", None) is not None
+
+
+def get_model_status():
+    """모델별 준비 상태 + 전체 ready 여부 (사전 로드가 켜진 모델이 모두 ready일 때 True)"""
+    with _status_lock:
+        models = {name: dict(st) for name, st in _status.items()}
+    for name, st in models.items():
+        if st["state"] in ("disabled", "idle") and _lazily_loaded(name):
+            st["state"] = "ready"
+    ready = all(st["state"] == "ready" for st in models.values() if st["enabled"])
+    return {"ready": ready, "models": models}
@@ -0,0 +1,82 @@
+"""
+추론 정밀도 / 메모리 형식 설정 (YOLO, SAM2 공용)
+- resolve_precision(): config 정밀도(fp32|fp16|bf16)를 장치에서 실제 사용 가능한 값으로 확정
+- autocast(): bf16(및 SAM2 fp16)용 torch.autocast 컨텍스트 (fp32면 아무 것도 하지 않음)
+- to_channels_last(): conv 가중치를 channels-last(NHWC) 메모리 형식으로 변환
+
+config.ini:
+    [detect] precision = fp32      ; fp32 | fp16 (CUDA/MPS, ultralytics half=True) | bf16 (autocast)
+    [detect] channels_last = no    ; yes면 YOLO conv 가중치를 NHWC로 변환 (torch 백엔드)
+    [sam2]   precision = fp32      ; fp32 | fp16 | bf16 (autocast)
+    [sam2]   channels_last = no    ; yes면 SAM2 이미지 인코더를 NHWC로 변환
+"""
+import logging
+import contextlib
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("fp32", "fp16", "bf16")
+
+
+def _device_type(device):
+    """ultralytics/torch device 인자 → torch.autocast device_type (cuda|mps|cpu)"""
+    if device in (0, "0", "gpu", "cuda") or str(device).startswith("cuda"):
+        return "cuda"
+    if device == "mps":
+        return "mps"
+    return "cpu"
+
+
+def _supports(dtype_name, device_type):
+    """장치에서 해당 dtype 연산(행렬곱)이 가능한지 실제로 확인"""
+    import torch
+    dtype = getattr(torch, dtype_name)
+    try:
+        x = torch.ones((2, 2), dtype=dtype, device=device_type)
+        (x @ x).sum().item()
+        return True
+    except Exception:
+        return False
+
+
+def resolve_precision(precision, device):
+    """설정 정밀도 → 사용할 정밀도 (미지원 조합은 fp32로 폴백하고 경고)
+
+    - fp16은 CPU에서 느리거나 일부 연산이 없어 fp32로 폴백
+    - bf16은 장치가 bfloat16 연산을 지원할 때만 사용 (CPU는 AVX512-BF16/AMX에서 이득)
+    """
+    precision = (precision or "fp32").strip().lower()
+    if precision not in PRECISIONS:
+        logger.warning(f"[PRECISION] 알 수 없는 정밀도 '{precision}' → fp32")
+        return "fp32"
+    if precision == "fp32":
+        return precision
+    device_type = _device_type(device)
+    if precision == "fp16" and device_type == "cpu":
+        logger.warning("[PRECISION] CPU는 fp16 추론을 지원하지 않음 → fp32 (CPU는 bf16 권장)")
+        return "fp32"
+    dtype_name = "float16" if precision == "fp16" else "bfloat16"
+    if not _supports(dtype_name, device_type):
+        logger.warning(f"[PRECISION] {device_type}에서 {precision} 미지원 → fp32")
+        return "fp32"
+    return precision
+
+
+def autocast(precision, device):
+    """precision이 bf16/fp16이면 torch.autocast, fp32면 nullcontext"""
+    if precision == "fp32":
+        return contextlib.nullcontext()
+    import torch
+    dtype = torch.bfloat16 if precision == "bf16" else torch.float16
+    return torch.autocast(device_type=_device_type(device), dtype=dtype)
+
+
+def to_channels_last(module):
+    """nn.Module의 4D 파라미터를 channels-last로 변환 (실패 시 원래 형식 유지)"""
+    import torch
+    try:
+        module.to(memory_format=torch.channels_last)
+        return True
+    except Exception as e:
+        logger.warning(f"[PRECISION] channels_last 변환 실패: {e}")
+        return False
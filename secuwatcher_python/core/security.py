@@ -9,7 +9,6 @@ import logging
 import configparser
 import importlib.util
 from util import get_resource_path
-from Crypto.PublicKey import RSA
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +29,8 @@ def initialize_security():
     if _initialized:
         return
 
+    from Crypto.PublicKey import RSA  # 지연 import (서버 시작 시간 단축)
+
     # ─── RSA 개인키 로드 ───
     try:
         _cfg = configparser.ConfigParser(allow_no_value=True)
@@ -1,9 +1,9 @@
 """
 전역 공유 상태 관리
 - jobs: 모든 비동기 작업의 상태를 추적하는 딕셔너리
-- log_queue: 비동기 로그 쓰기를 위한 큐
+- log_queue: 비동기 로그 쓰기를 위한 큐 (util.LogQueue)
 - 동시 작업 제한: MAX_CONCURRENT_JOBS를 초과하지 않도록 관리
-- 작업 상태 영속화: 디스크에 저장/복원
+- 작업 상태 영속화: 디스크에 저장/복원 (탐지 체크포인트는 core.checkpoint)
 """
 import util
 import threading
@@ -12,8 +12,7 @@ import os
 import time
 import logging
 from typing import Deque
-from collections import deque
-from util import logLine, get_resource_path
+from util import logLine, LogQueue, get_resource_path
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +20,8 @@ logger = logging.getLogger(__name__)
 jobs: dict = {}
 util.jobs = jobs
 
-# 전역 로그 큐
-log_queue: Deque[logLine] = deque()
+# 전역 로그 큐 (append 시 writer 스레드를 깨우고, 포화 시 유실 건수를 집계)
+log_queue: Deque[logLine] = LogQueue()
 
 # 동시 작업 제한
 MAX_CONCURRENT_JOBS = 2
@@ -101,6 +100,7 @@ def save_job_state(job_id: str):
             "start_time": job_data.get("start_time"),
             "eta_seconds": job_data.get("eta_seconds"),
             "created_at": job_data.get("created_at"),
+            "resumed_from": job_data.get("resumed_from"),
             "updated_at": time.time(),
         }
 
@@ -146,6 +146,8 @@ def load_job_states():
 
                 if age_hours > 24:
                     os.remove(state_file)
+                    from core.checkpoint import delete_checkpoint
+                    delete_checkpoint(job_id)
                     removed_count += 1
                     logger.debug(f"[STATE] 24시간 이상 지난 작업 상태 삭제: {job_id}")
                     continue
@@ -156,6 +158,9 @@ def load_job_states():
                     job_data["status"] = "interrupted"
                     job_data["error"] = "Server restarted during execution"
 
+                # 체크포인트가 남아 있으면 /resume/{job_id}로 이어서 처리 가능
+                job_data["resumable"] = os.path.exists(os.path.join(jobs_dir, f"{job_id}.ckpt"))
+
                 # jobs dict에 복원
                 jobs[job_id] = job_data
                 loaded_count += 1
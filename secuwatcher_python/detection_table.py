@@ -0,0 +1,165 @@
+"""
+마스킹 엔진용 프레임 인덱스 열(column) 형식 탐지 테이블
+- 탐지 JSON/CSV 엔트리를 행 단위 dict 대신 numpy 열 배열로 보관 (프레임 순 정렬)
+- CSR 방식 프레임 인덱스: frame_ids[k] 프레임의 행 = offsets[k]:offsets[k + 1]
+- bbox는 로드 시 한 번만 검증·반올림·정규화해 int32 사각형 [x0, y0, x1, y1]로 저장
+  (다각형은 외접 사각형, 꼭짓점은 별도 packed 버퍼 poly_points[poly_offsets[i]:poly_offsets[i + 1]])
+- bbox_type "mask" 엔트리의 RLE는 masks[i] (그 외 행은 None)
+"""
+import numpy as np
+
+KIND_RECT = 0
+KIND_POLY = 1
+KIND_MASK = 2
+
+_NONE = -1      # type/object가 없을 때
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_int(value):
+    """숫자면 int, 아니면 _NONE (프론트 저장 시 object가 {} 등으로 들어오는 경우)"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    return _NONE
+
+
+class DetectionTable:
+    """프레임별 마스킹 대상 열 배열
+
+    rects (N, 4) int32 / kind (N,) uint8 / type, object (N,) int16 / track (N,) str
+    frame (N,) int64 — 행은 프레임 오름차순, 같은 프레임 안에서는 입력 순서 유지
+    """
+
+    def __init__(self, frame, track, type_, object_, kind, rects, poly_offsets, poly_points, masks):
+        self.frame = frame
+        self.track = track
+        self.type = type_
+        self.object = object_
+        self.kind = kind
+        self.rects = rects
+        self.poly_offsets = poly_offsets
+        self.poly_points = poly_points
+        self.masks = masks
+        self.frame_ids, starts = np.unique(frame, return_index=True)
+        self.offsets = np.append(starts, len(frame)).astype(np.int64)
+
+    def __len__(self):
+        return len(self.frame)
+
+    @classmethod
+    def from_entries(cls, entries):
+        """(frame, {'track_id', 'bbox', 'object', 'type', 'mask'}) 순회 → 테이블
+
+        bbox가 [x0,y0,x1,y1]도 [[x,y], ...](3점 이상)도 아닌 엔트리는 제외 (마스킹 불가)
+        사각형 bbox는 모아서 numpy로 한 번에 반올림·정규화 (엔트리별 파이썬 변환 없음)
+        """
+        frame, track, type_, object_, kind, masks = [], [], [], [], [], []
+        rect_rows, rect_raw = [], []        # 사각형 행 번호, 원본 bbox
+        poly_rows, poly_rects = [], []      # 다각형 행 번호, 외접 사각형
+        poly_counts, poly_points = [], []   # 행별 꼭짓점 수 (사각형 행은 0)
+        ordered = True
+
+        for f, e in entries:
+            f = int(f)
+            bbox = e.get('bbox')
+            if not isinstance(bbox, (list, tuple)):
+                continue
+            if len(bbox) == 4 and not isinstance(bbox[0], (list, tuple)):
+                rect_rows.append(len(frame))
+                rect_raw.append(bbox)
+                k = KIND_MASK if e.get('mask') else KIND_RECT
+                poly_counts.append(0)
+            elif len(bbox) >= 3 and isinstance(bbox[0], (list, tuple)):
+                try:
+                    pts = [(int(round(float(p[0]))), int(round(float(p[1])))) for p in bbox]
+                except (TypeError, ValueError, IndexError):
+                    continue
+                xs = [p[0] for p in pts]
+                ys = [p[1] for p in pts]
+                poly_rows.append(len(frame))
+                # 다각형 외접 사각형 (배제 상한 +1)
+                poly_rects.append([min(xs), min(ys), max(xs) + 1, max(ys) + 1])
+                poly_points.extend(pts)
+                poly_counts.append(len(pts))
+                k = KIND_POLY
+            else:
+                continue
+
+            if frame and f < frame[-1]:
+                ordered = False
+            frame.append(f)
+            track.append(e.get('track_id', ''))
+            t, o = e.get('type'), e.get('object')
+            type_.append(t if type(t) is int else _to_int(t))
+            object_.append(o if type(o) is int else _to_int(o))
+            kind.append(k)
+            masks.append(e.get('mask') if k == KIND_MASK else None)
+
+        n = len(frame)
+        rects = np.zeros((n, 4), dtype=np.int32)
+        keep = np.ones(n, dtype=bool)
+        if rect_rows:
+            try:
+                raw = np.array(rect_raw, dtype=np.float64)
+            except (TypeError, ValueError):
+                # 숫자가 아닌 좌표가 섞인 경우에만 행별 변환
+                raw = np.array([[_to_float(v) for v in b] for b in rect_raw], dtype=np.float64)
+            bad = ~np.isfinite(raw).all(axis=1)
+            raw = np.rint(np.nan_to_num(raw))
+            lo = np.minimum(raw[:, :2], raw[:, 2:])
+            hi = np.maximum(raw[:, :2], raw[:, 2:])
+            rects[rect_rows] = np.concatenate([lo, hi], axis=1).astype(np.int32)
+            keep[np.asarray(rect_rows)[bad]] = False
+        if poly_rows:
+            rects[poly_rows] = np.array(poly_rects, dtype=np.int32)
+
+        poly_offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(poly_counts, out=poly_offsets[1:])
+        table = cls(
+            frame=np.array(frame, dtype=np.int64),
+            track=np.array(track, dtype=str),
+            type_=np.array(type_, dtype=np.int16),
+            object_=np.array(object_, dtype=np.int16),
+            kind=np.array(kind, dtype=np.uint8),
+            rects=rects,
+            poly_offsets=poly_offsets,
+            poly_points=np.array(poly_points, dtype=np.int32).reshape(-1, 2),
+            masks=masks,
+        )
+        if ordered and keep.all():
+            return table
+        return table._take(np.flatnonzero(keep)[np.argsort(table.frame[keep], kind='stable')])
+
+    def _take(self, rows):
+        """rows 순서의 행만 남긴 새 테이블 (다각형 packed 버퍼도 같은 순서로 재배치)"""
+        counts = np.diff(self.poly_offsets)[rows]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        poly_rows = rows[counts > 0]
+        points = (np.concatenate([self.polygon(r) for r in poly_rows]) if len(poly_rows)
+                  else np.zeros((0, 2), dtype=np.int32))
+        return DetectionTable(self.frame[rows], self.track[rows], self.type[rows], self.object[rows],
+                              self.kind[rows], self.rects[rows], offsets, points,
+                              [self.masks[r] for r in rows])
+
+    @classmethod
+    def from_json_frames(cls, frames):
+        """탐지 JSON "frames" ({"<frame>": [엔트리, ...]}) → 테이블"""
+        return cls.from_entries((fkey, e) for fkey, entries in frames.items() for e in entries)
+
+    def frame_rows(self, frame_no):
+        """frame_no의 행 범위 (start, end) — 탐지가 없으면 (0, 0)"""
+        k = int(np.searchsorted(self.frame_ids, frame_no))
+        if k < len(self.frame_ids) and self.frame_ids[k] == frame_no:
+            return int(self.offsets[k]), int(self.offsets[k + 1])
+        return 0, 0
+
+    def polygon(self, row):
+        """row 행 다각형 꼭짓점 (K, 2) int32"""
+        return self.poly_points[self.poly_offsets[row]:self.poly_offsets[row + 1]]
@@ -10,10 +10,14 @@ from collections import deque
 from typing import List, Optional, Callable
 
 from util import logLine, timeToStr, get_resource_path, get_log_dir, is_cancelled
+from core.checkpoint import save_checkpoint, load_checkpoint
+from core.detect_cache import DetectCache, video_fingerprint, cache_key
+from core import precision as _precision
+from core import model_warmup as _model_warmup
+import parallel_detect
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'ultralytics'))
-from ultralytics import YOLO
 
 import yaml
 import inspect
@@ -63,6 +67,8 @@ def _write_incremental_json(output_file, tracking_results, metadata):
             "type": entry["type"],
             "object": entry["object"]
         })
+        if entry.get("interpolated"):
+            frames_dict[fkey][-1]["interpolated"] = True
 
     output_data = {
         "schema_version": "1.0.0",
@@ -77,7 +83,7 @@ def _write_incremental_json(output_file, tracking_results, metadata):
 
 
 def _gpu_snapshot(prefix: str, log_queue: deque, log_file_path: str):
-    """CUDA/VRAM 상태를 스냅샷으로 남김 (torch + NVML 가능하면 둘 다)"""
+    """CUDA/VRAM(또는 MPS) 상태를 스냅샷으로 남김 (torch + NVML 가능하면 둘 다, 프로세스 RSS 포함)"""
     try:
         info = [f"[GPU] {prefix}"]
         try:
@@ -88,6 +94,10 @@ def _gpu_snapshot(prefix: str, log_queue: deque, log_file_path: str):
                 alloc = torch.cuda.memory_allocated(dev) / (1024**3)
                 reserv = torch.cuda.memory_reserved(dev) / (1024**3)
                 info.append(f"device={dev} name={props.name} total={props.total_memory/(1024**3):.2f}GB alloc={alloc:.2f}GB reserved={reserv:.2f}GB")
+            elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
+                alloc = torch.mps.current_allocated_memory() / (1024**3)
+                driver = torch.mps.driver_allocated_memory() / (1024**3)
+                info.append(f"device=mps alloc={alloc:.2f}GB driver={driver:.2f}GB")
             else:
                 info.append("cuda.is_available()=False")
         except Exception as e:
@@ -105,6 +115,13 @@ def _gpu_snapshot(prefix: str, log_queue: deque, log_file_path: str):
         except Exception:
             pass
 
+        # 프로세스 상주 메모리 (CPU/MPS 통합 메모리, CPU 오프로드 확인용) — psutil 없으면 생략
+        try:
+            import psutil
+            info.append(f"rss={psutil.Process().memory_info().rss/(1024**3):.2f}GB")
+        except Exception:
+            pass
+
         _push_ai_log(log_queue, log_file_path, " | ".join(info))
     except Exception as e:
         _push_ai_log(log_queue, log_file_path, f"[GPU] {prefix} | snapshot-fail:{e}")
@@ -121,23 +138,461 @@ config.read(config_path, encoding='utf-8')
 # ─── YOLO 모델 전역 변수 (Lazy Loading) ───────────────────────────────────
 import threading as _threading
 MODEL = None
+MODEL_BACKEND = None
+MODEL_PRECISION = "fp32"
+PREDICT_MODEL = None    # 트래커 콜백 없는 predict 전용 인스턴스 (_get_predict_model)
 _MODEL_LOCK = _threading.Lock()
 
+# ─── 추론 백엔드 ([detect] backend) ───────────────────────────────────
+# torch    : .pt를 PyTorch로 실행 (기본)
+# onnx     : ONNX Runtime (CPU 노트북에서 PyTorch CPU 대비 빠름)
+# openvino : Intel OpenVINO (Intel CPU/iGPU)
+# onnx/openvino는 첫 사용 시 vendored exporter로 변환 후 model/cache에 캐시하고 AutoBackend로 로드합니다.
+_EXPORT_FORMATS = {"onnx": ".onnx", "openvino": "_openvino_model"}
+
+def _yolo_backend():
+    """config.ini [detect] backend (torch|onnx|openvino, 기본 torch)"""
+    backend = config.get('detect', 'backend', fallback='torch').strip().lower()
+    return backend if backend in ("torch",) + tuple(_EXPORT_FORMATS) else "torch"
+
+def _model_cache_dir():
+    """변환 모델 캐시 폴더 — 패키징 환경에서는 _MEIPASS(임시) 대신 실행 파일 옆에 보관"""
+    root = os.path.dirname(sys.executable) if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
+    cache_dir = os.path.join(root, 'model', 'cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def _file_hash(path, chunk_size=1 << 20):
+    """모델 파일 sha256 앞 16자리 (가중치가 바뀌면 캐시 키가 바뀜)"""
+    import hashlib
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+def _export_cached(model_path, backend, imgsz):
+    """model_path를 backend 형식으로 변환 (모델 해시 + imgsz 키로 캐시), 변환 결과 경로 반환"""
+    stem = f"{os.path.splitext(os.path.basename(model_path))[0]}_{_file_hash(model_path)}_{imgsz}"
+    cache_dir = _model_cache_dir()
+    cached = os.path.join(cache_dir, stem + _EXPORT_FORMATS[backend])
+    if os.path.exists(cached):
+        return cached
+
+    # exporter는 입력 .pt 옆에 결과를 쓰므로 캐시 키 이름으로 복사한 뒤 변환
+    import shutil
+    from ultralytics import YOLO
+    src = os.path.join(cache_dir, stem + '.pt')
+    shutil.copyfile(model_path, src)
+    try:
+        t0 = time.perf_counter()
+        exported = YOLO(src).export(format=backend, imgsz=imgsz, device='cpu', verbose=False)
+        logger.info(f"YOLO {backend} 변환 완료 ({time.perf_counter() - t0:.1f}s): {exported}")
+    finally:
+        if os.path.exists(src):
+            os.remove(src)
+    return cached
+
+def _model_path():
+    """YOLO 가중치(.pt) 경로"""
+    base_path = sys._MEIPASS if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(base_path, 'model', 'secuwatcher_best.pt')
+
+def _load_yolo(backend=None):
+    """backend 형식의 YOLO 모델 로드 (변환 실패 시 torch로 폴백)"""
+    from ultralytics import YOLO  # 지연 import (torch 로드 포함, 서버 시작 시간 단축)
+    model_path = _model_path()
+    backend = backend or _yolo_backend()
+    if backend != "torch":
+        try:
+            return YOLO(_export_cached(model_path, backend, _yolo_imgsz()), task='detect'), backend
+        except Exception as e:
+            logger.warning(f"YOLO {backend} 백엔드 준비 실패 → torch로 폴백: {e}")
+    return YOLO(model_path), "torch"
+
 def _get_yolo_model():
-    """YOLO 모델 lazy singleton — Event 1 첫 호출 시 로드"""
-    global MODEL
+    """YOLO 모델 lazy singleton — Event 1 첫 호출 시 로드
+
+    백그라운드 사전 로드가 진행 중이면 워밍업 추론이 끝난 뒤 반환 (같은 predictor 동시 사용 방지)
+    """
+    global MODEL, MODEL_BACKEND, MODEL_PRECISION
+    _model_warmup.wait_for_warmup("yolo")
     if MODEL is not None:
         return MODEL
     with _MODEL_LOCK:
         if MODEL is not None:
             return MODEL
-        base_path = sys._MEIPASS if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
-        model_path = os.path.join(base_path, 'model', 'secuwatcher_best.pt')
-        MODEL = YOLO(model_path)
-        logger.info(f"YOLO 모델 로드 완료: {model_path}")
+        model, backend = _load_yolo()
+        MODEL_BACKEND = backend  # _yolo_device()가 backend를 참조하므로 정밀도 확정 전에 설정
+        MODEL_PRECISION = _apply_precision(model, backend, config.get('detect', 'precision', fallback='fp32'),
+                                           _yolo_device(), config.getboolean('detect', 'channels_last', fallback=False))
+        MODEL = model
+        logger.info(f"YOLO 모델 로드 완료 (backend={MODEL_BACKEND}, precision={MODEL_PRECISION})")
         return MODEL
 
-def autodetector(video_path: str, conf_thres: float, classid: List[int], log_queue: deque, progress_callback: Optional[Callable[[float], None]] = None, job_id: str = None):
+def _get_predict_model():
+    """predict 전용 YOLO 인스턴스 — 자체 트래커를 쓰는 경로(타일 추론, 다중 영상 배치, 선택 추적)용
+
+    model.track(persist=True)는 MODEL에 트래커 콜백(on_predict_start/on_predict_postprocess_end)을 등록하고,
+    이 콜백은 이후 MODEL.predict 결과까지 predictor.trackers[0]으로 갱신해 트랙 박스로 바꿉니다.
+    같은 가중치·백엔드·정밀도로 콜백 없는 인스턴스를 따로 로드해 사용합니다.
+    """
+    global PREDICT_MODEL
+    _get_yolo_model()  # 백엔드·정밀도 확정 (워밍업 대기 포함)
+    if PREDICT_MODEL is not None:
+        return PREDICT_MODEL
+    with _MODEL_LOCK:
+        if PREDICT_MODEL is None:
+            model, _ = _load_yolo(MODEL_BACKEND)
+            _apply_precision(model, MODEL_BACKEND, config.get('detect', 'precision', fallback='fp32'),
+                             _yolo_device(), config.getboolean('detect', 'channels_last', fallback=False))
+            PREDICT_MODEL = model
+        return PREDICT_MODEL
+
+def _apply_precision(model, backend, precision, device, channels_last=False):
+    """정밀도 확정 + (torch 백엔드) channels-last 변환 → 사용할 정밀도
+
+    onnx/openvino 변환 모델은 fp32로 변환되므로 항상 fp32.
+    fp16은 ultralytics half=True, bf16은 추론 호출을 torch.autocast로 감쌉니다 (_yolo_autocast).
+    """
+    if backend != "torch":
+        return "fp32"
+    resolved = _precision.resolve_precision(precision, device)
+    if channels_last and _precision.to_channels_last(model.model):
+        logger.info("YOLO channels_last 메모리 형식 적용")
+    return resolved
+
+def _yolo_half():
+    """ultralytics half 인자 (fp16일 때만 True)"""
+    return MODEL_PRECISION == "fp16"
+
+def _yolo_autocast():
+    """bf16이면 torch.autocast 컨텍스트, 그 외 nullcontext (fp16은 half=True로 처리)"""
+    return _precision.autocast("bf16" if MODEL_PRECISION == "bf16" else "fp32", _yolo_device())
+
+def _yolo_device():
+    """config.ini [detect] device → ultralytics device 인자 (gpu=0, mps, 그 외 cpu)"""
+    device = config['detect']['device']
+    if MODEL_BACKEND == "openvino":
+        # OpenVINO 변환 모델은 CPU 실행
+        return "cpu"
+    if device == "gpu":
+        return 0
+    if device == "mps":
+        # Apple Silicon MPS (Metal Performance Shaders)
+        return "mps"
+    return "cpu"
+
+def _yolo_imgsz():
+    """config.ini [detect] imgsz (추론 입력 크기, 기본 640)"""
+    return config.getint('detect', 'imgsz', fallback=640)
+
+def _autodetect_metadata(status, video, width, height, fps, total_frames, conf_thres, classid):
+    """autodetector 결과 JSON의 metadata"""
+    return {
+        "created_at": datetime.now().isoformat(),
+        "updated_at": datetime.now().isoformat(),
+        "generator": "secuwatcher-detector",
+        "status": status,
+        "video": {
+            "filename": os.path.basename(video),
+            "width": width,
+            "height": height,
+            "fps": fps,
+            "total_frames": total_frames
+        },
+        "detection": {
+            "model": os.path.basename(config['path']['model']),
+            "device": config['detect']['device'],
+            "backend": MODEL_BACKEND or "torch",
+            "precision": MODEL_PRECISION,
+            "detect_stride": max(1, config.getint('detect', 'detect_stride', fallback=1)),
+            "tiled": config.getboolean('detect', 'tiled', fallback=False),
+            "confidence_threshold": conf_thres,
+            "class_ids": classid,
+            "tracker": os.path.basename(config['path']['auto_tracker'])
+        }
+    }
+
+def _load_detected_results(output_file, before_frame):
+    """증분 저장된 JSON에서 before_frame 이전의 type:1 결과를 tracking_results 형식으로 복원"""
+    if not os.path.exists(output_file):
+        return []
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            frames = json.load(f).get("frames", {})
+    except (json.JSONDecodeError, IOError):
+        return []
+    restored = []
+    for fkey in sorted(frames, key=int):
+        frame_no = int(fkey)
+        if frame_no >= before_frame:
+            break
+        for e in frames[fkey]:
+            if e.get("type") != 1:
+                continue
+            restored.append({
+                "frame": frame_no,
+                "track_id": e["track_id"],
+                "bbox": e["bbox"],
+                "score": e.get("score"),
+                "class_id": e.get("class_id"),
+                "type": 1,
+                "object": e.get("object", 1)
+            })
+            if e.get("interpolated"):
+                restored[-1]["interpolated"] = True
+    return restored
+
+_TRACKER_FIELDS = ("tracked_stracks", "lost_stracks", "removed_stracks", "frame_id")
+
+def _tracker_snapshot(model, tiler=None):
+    """model.track(persist=True) 또는 타일 추론 트래커 상태 (STrack 목록 + Kalman 상태 + 다음 track ID) — 체크포인트용"""
+    trackers = [tiler.tracker] if tiler is not None else getattr(getattr(model, "predictor", None), "trackers", None)
+    if not trackers:
+        return None
+    from ultralytics.trackers.basetrack import BaseTrack
+    snapshot = {name: getattr(trackers[0], name) for name in _TRACKER_FIELDS}
+    snapshot["track_count"] = BaseTrack._count
+    return snapshot
+
+def _restore_tracker(model, snapshot, height, width, conf_thres, classid, tiler=None):
+    """체크포인트의 트래커 상태 복원
+
+    predictor/트래커가 아직 없으면 빈 프레임으로 1회 track을 호출해 생성한 뒤 상태를 덮어씁니다.
+    """
+    import numpy as np
+    trackers = [tiler.tracker] if tiler is not None else getattr(getattr(model, "predictor", None), "trackers", None)
+    if not trackers:
+        with _yolo_autocast():
+            model.track(np.zeros((height, width, 3), dtype=np.uint8), tracker=config['path']['auto_tracker'],
+                        verbose=False, conf=conf_thres, classes=classid, persist=True,
+                        imgsz=_yolo_imgsz(), device=_yolo_device(), half=_yolo_half())
+        trackers = model.predictor.trackers
+    if snapshot is None:
+        trackers[0].reset()
+        return
+    from ultralytics.trackers.basetrack import BaseTrack
+    for name in _TRACKER_FIELDS:
+        setattr(trackers[0], name, snapshot[name])
+    BaseTrack._count = snapshot["track_count"]
+
+def _report_progress(progress_callback, processed_videos, frame_index, total_frames, total_videos):
+    """영상 내 진행률 → 전체 진행률(0.0~1.0) 콜백"""
+    if progress_callback is None:
+        return
+    current_video_frac = frame_index / max(1, total_frames)   # 0~1
+    overall_frac = (processed_videos + current_video_frac) / max(1, total_videos)  # 0~1
+    try:
+        progress_callback(overall_frac)   # 항상 0.0~1.0 float!
+    except Exception as cb_e:
+        logger.warning(f"Progress callback 실행 오류: {cb_e}")
+
+# ─── 키프레임 간격(detect_stride) 탐지 ─────────────────────────────────
+# [detect] detect_stride = k 이면 k프레임마다 YOLO + 추적을 실행하고, 사이 프레임은
+# 앞뒤 키프레임의 같은 track_id 박스를 선형 보간합니다 (한쪽에만 있는 트랙은 박스 유지).
+# 보간 엔트리는 일반 type:1 엔트리와 같고 "interpolated": true 로 표시됩니다.
+_STRIDE_FAST_MOTION = 0.05   # 프레임당 박스 대각선 대비 이동 비율 — 이상이면 간격 절반
+_STRIDE_SLOW_MOTION = 0.02   # 이하이면 간격 +1 (최대 detect_stride)
+
+def _interpolate_gap(prev_entries, cur_entries, prev_frame, cur_frame):
+    """두 키프레임 사이(prev_frame, cur_frame) 프레임의 보간 엔트리 생성"""
+    prev_by_id = {e["track_id"]: e for e in prev_entries}
+    cur_by_id = {e["track_id"]: e for e in cur_entries}
+    span = cur_frame - prev_frame
+    filled = []
+    for f in range(prev_frame + 1, cur_frame):
+        t = (f - prev_frame) / span
+        for tid, p in prev_by_id.items():
+            c = cur_by_id.get(tid)
+            if c is None:
+                bbox = list(p["bbox"])  # 사라진 트랙: 마지막 박스 유지
+            else:
+                bbox = [int(round(a + (b - a) * t)) for a, b in zip(p["bbox"], c["bbox"])]
+            filled.append(dict(p, frame=f, bbox=bbox, interpolated=True))
+        for tid, c in cur_by_id.items():
+            if tid not in prev_by_id:
+                filled.append(dict(c, frame=f, bbox=list(c["bbox"]), interpolated=True))  # 새 트랙: 박스 앞당김
+    return filled
+
+def _adapt_stride(prev_entries, cur_entries, gap, stride, max_stride):
+    """키프레임 간 박스 이동량으로 다음 키프레임 간격 결정 (트랙이 생기거나 사라지면 간격 축소)"""
+    prev_by_id = {e["track_id"]: e["bbox"] for e in prev_entries}
+    cur_by_id = {e["track_id"]: e["bbox"] for e in cur_entries}
+    if set(prev_by_id) != set(cur_by_id):
+        return max(1, stride // 2)
+    motion = 0.0
+    for tid, (x1, y1, x2, y2) in cur_by_id.items():
+        px1, py1, px2, py2 = prev_by_id[tid]
+        diag = max(1.0, ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5)
+        dx = (x1 + x2 - px1 - px2) / 2.0
+        dy = (y1 + y2 - py1 - py2) / 2.0
+        motion = max(motion, (dx * dx + dy * dy) ** 0.5 / diag / max(1, gap))
+    if motion >= _STRIDE_FAST_MOTION:
+        return max(1, stride // 2)
+    if motion <= _STRIDE_SLOW_MOTION:
+        return min(max_stride, stride + 1)
+    return stride
+
+def _make_tiler():
+    """[detect] tiled 설정으로 영상별 TiledTracker 생성 (트래커는 영상마다 새로 시작, 모델은 predict 전용)"""
+    from tiled_detector import TiledTracker
+    return TiledTracker(
+        _get_predict_model(), config['path']['auto_tracker'],
+        tile_size=config.getint('detect', 'tile_size', fallback=640),
+        overlap=min(0.5, max(0.0, config.getfloat('detect', 'tile_overlap', fallback=0.2))),
+        full_frame=config.getboolean('detect', 'tile_full_frame', fallback=True),
+        motion_only=config.getboolean('detect', 'tile_motion_only', fallback=False),
+    )
+
+# ─── 탐지 결과 캐시 ([detect] cache) ───────────────────────────────────
+_DETECT_CACHE = None
+_MODEL_HASH = None
+
+def _get_detect_cache():
+    """[detect] cache_max_mb 용량의 DetectCache 싱글톤"""
+    global _DETECT_CACHE
+    if _DETECT_CACHE is None:
+        max_mb = config.getint('detect', 'cache_max_mb', fallback=1024)
+        _DETECT_CACHE = DetectCache(max_bytes=max_mb * 1024 * 1024)
+    return _DETECT_CACHE
+
+def _model_hash():
+    """YOLO 가중치 해시 (프로세스당 1회 계산)"""
+    global _MODEL_HASH
+    if _MODEL_HASH is None:
+        _MODEL_HASH = _file_hash(_model_path())
+    return _MODEL_HASH
+
+def _multi_mode():
+    """다중 영상 병렬 탐지 방식 — "pool"(CPU 영상별 프로세스) | "batched"(GPU/MPS 영상 간 배치 추론)"""
+    if (MODEL_BACKEND or _yolo_backend()) == "openvino":
+        return "pool"
+    return "pool" if _yolo_device() == "cpu" else "batched"
+
+def _cache_params(conf_thres, classid, multi=None):
+    """결과에 영향을 주는 탐지 설정 (캐시 키 구성 요소)
+
+    multi: 다중 영상 병렬 탐지 방식 (_multi_mode) — stride/모션 게이트/타일/세그먼트가 적용되지 않으므로
+    해당 설정 대신 방식만 키에 넣습니다.
+    """
+    tracker_path = get_resource_path(config['path']['auto_tracker'])
+    tracker = _file_hash(tracker_path) if os.path.exists(tracker_path) else config['path']['auto_tracker']
+    params = {
+        "conf_thres": conf_thres,
+        "classid": classid,
+        "backend": _yolo_backend(),
+        "imgsz": _yolo_imgsz(),
+        "precision": config.get('detect', 'precision', fallback='fp32').strip().lower(),
+        "tracker": tracker,
+    }
+    if multi:
+        params["multi"] = multi
+        return params
+    params.update({
+        "detect_stride": config.getint('detect', 'detect_stride', fallback=1),
+        "adaptive_stride": config.getboolean('detect', 'adaptive_stride', fallback=True),
+        "motion_threshold": config.getfloat('detect', 'motion_threshold', fallback=0.0),
+        "motion_refresh": config.getint('detect', 'motion_refresh', fallback=30),
+    })
+    if config.getboolean('detect', 'tiled', fallback=False):
+        params["tiled"] = [config.getint('detect', 'tile_size', fallback=640),
+                           config.getfloat('detect', 'tile_overlap', fallback=0.2),
+                           config.getboolean('detect', 'tile_full_frame', fallback=True),
+                           config.getboolean('detect', 'tile_motion_only', fallback=False)]
+    if config.getint('detect', 'parallel_segments', fallback=0) > 1:
+        params["segments"] = [config.getint('detect', 'parallel_segments', fallback=0),
+                              config.getint('detect', 'segment_overlap', fallback=30)]
+    return params
+
+# ─── 모션 게이트 ([detect] motion_threshold) ──────────────────────────
+# 정지 CCTV 장면에서 변화가 없는 프레임은 YOLO를 건너뛰고 직전 트랙을 재사용합니다.
+_MOTION_SIZE = 160          # 차분 계산용 축소 프레임의 긴 변 (px)
+_MOTION_PIXEL_DIFF = 25     # 픽셀 밝기 차 임계값 (0~255)
+
+class _MotionGate:
+    """축소 흑백 프레임 차분으로 정적 프레임 판단
+
+    마지막으로 탐지한 프레임과 비교하므로 느린 변화도 누적되어 결국 탐지를 유발하고,
+    refresh 프레임 동안 탐지를 건너뛰었으면 안전을 위해 강제로 탐지합니다.
+    """
+    def __init__(self, threshold, refresh):
+        self.threshold = threshold  # 변화 픽셀 비율 (0~1)
+        self.refresh = refresh
+        self._ref = None
+        self._skipped = 0
+
+    @staticmethod
+    def _small(frame):
+        h, w = frame.shape[:2]
+        scale = _MOTION_SIZE / max(h, w)
+        small = cv2.resize(frame, (max(1, int(w * scale)), max(1, int(h * scale))), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def score(self, small):
+        """기준 프레임 대비 변화 픽셀 비율"""
+        diff = cv2.absdiff(small, self._ref)
+        return cv2.countNonZero(cv2.threshold(diff, _MOTION_PIXEL_DIFF, 255, cv2.THRESH_BINARY)[1]) / diff.size
+
+    def should_detect(self, frame):
+        """True면 YOLO 실행 (기준 프레임 갱신), False면 직전 트랙 재사용"""
+        small = self._small(frame)
+        if (self._ref is None or self._ref.shape != small.shape or self._skipped >= self.refresh
+                or self.score(small) >= self.threshold):
+            self._ref = small
+            self._skipped = 0
+            return True
+        self._skipped += 1
+        return False
+
+def _autodetect_multi(videos, conf_thres, classid, log_queue, log_file_path,
+                      progress_callback, video_progress, done_videos, total_videos, job_id):
+    """여러 영상 동시 탐지 → {video: (tracking_results, info)}, 실패/취소 시 오류 문자열
+
+    GPU/MPS는 predict 전용 모델 1개로 영상 간 배치 추론(영상별 ByteTrack), CPU는 영상별 프로세스 풀.
+    """
+    device = _yolo_device()
+    workers = config.getint('detect', 'parallel_videos', fallback=0) or parallel_detect.default_workers(device, len(videos))
+    workers = max(1, min(workers, len(videos)))
+    try:
+        infos = {video: parallel_detect.probe_video(video) for video in videos}
+    except Exception as e:
+        err = str(e)
+        _push_ai_log(log_queue, log_file_path, err)
+        return err
+
+    fracs = {video: 0.0 for video in videos}
+
+    def on_progress(video, frac):
+        fracs[video] = frac
+        video_progress(video, frac)
+        if progress_callback is not None:
+            # 저장 단계(아래 루프)가 남았으므로 99%까지만 보고
+            _report_progress(progress_callback, done_videos, 0.99 * sum(fracs.values()), 1, total_videos)
+
+    mode = "CPU 프로세스" if device == "cpu" else "GPU 배치"
+    _push_ai_log(log_queue, log_file_path, f"다중 영상 병렬 탐지: {len(videos)}개 영상, 동시 {workers}개 ({mode})")
+    cancel_check = (lambda: is_cancelled(job_id)) if job_id else None
+    try:
+        if device == "cpu":
+            results = parallel_detect.detect_videos_pool(videos, infos, workers, conf_thres, classid,
+                                                         on_progress, cancel_check)
+        else:
+            results = parallel_detect.detect_videos_batched(videos, infos, workers, _get_predict_model(), config['path']['auto_tracker'],
+                                                            conf_thres, classid, _yolo_imgsz(), device,
+                                                            on_progress, cancel_check,
+                                                            half=_yolo_half(), autocast=_yolo_autocast)
+    except Exception as e:
+        err = f"다중 영상 병렬 탐지 실패: {e}"
+        _push_ai_log(log_queue, log_file_path, err)
+        return err
+    if results is None:
+        _push_ai_log(log_queue, log_file_path, "작업 취소됨 (다중 영상 병렬 탐지)")
+        return "cancelled"
+    return {video: (results[video], infos[video]) for video in videos}
+
+def autodetector(video_path: str, conf_thres: float, classid: List[int], log_queue: deque, progress_callback: Optional[Callable[[float], None]] = None, job_id: str = None, resume: bool = False, video_progress_callback: Optional[Callable[[str, float], None]] = None):
     """
     지정된 비디오 경로들에 대해 자동 객체 탐지 및 추적을 수행하고 결과를 CSV 파일로 저장합니다.
 
@@ -147,6 +602,9 @@ def autodetector(video_path: str, conf_thres: float, classid: List[int], log_que
         classid (list): 탐지할 객체의 클래스 ID 리스트.
         log_queue (deque): 로그 메시지를 전달할 deque 객체.
         progress_callback (function, optional): 진행률 업데이트 콜백 함수. Defaults to None.
+        job_id (str, optional): 진행률/취소/체크포인트에 사용할 작업 ID.
+        resume (bool, optional): True면 job_id의 체크포인트 위치(영상/프레임/트래커 상태)부터 이어서 탐지.
+        video_progress_callback (function, optional): 영상별 진행률 콜백 (video_path, 0.0~1.0).
 
     Returns:
         list or str: 성공 시 생성된 CSV 파일 경로 리스트, 실패 시 오류 메시지 문자열.
@@ -169,33 +627,131 @@ def autodetector(video_path: str, conf_thres: float, classid: List[int], log_que
     else:
         logger.warning(f"autodetector의 log_queue 타입이 deque가 아닙니다: {type(log_queue)}. 로그가 기록되지 않을 수 있습니다.")
 
-    # 모델 로딩 진행률 (0-5%)
-    if job_id:
-        from util import update_progress
-        update_progress(job_id, 0, start_pct=0, end_pct=5)
-        if job_id in globals().get('jobs', {}):
-            jobs[job_id]['phase'] = 'model_loading'
-    try:
-        model = _get_yolo_model()
-    except Exception as e:
-        err = f"YOLO 모델 로드 실패: {e}"
-        _push_ai_log(log_queue, log_file_path, err)
-        return err
-    # 모델 로딩 완료 진행률
-    if job_id:
-        from util import update_progress
-        update_progress(job_id, 1.0, start_pct=0, end_pct=5)
-        if job_id in globals().get('jobs', {}):
-            jobs[job_id]['phase'] = 'processing'
+    # 체크포인트 이어하기: 같은 video_path의 autodetect 체크포인트만 사용
+    ckpt = None
+    if resume and job_id:
+        ckpt = load_checkpoint(job_id, kind="autodetect")
+        if ckpt is not None and ckpt.get("video_path") != video_path:
+            _push_ai_log(log_queue, log_file_path, f"체크포인트 무시 (video_path 불일치): {ckpt.get('video_path')}")
+            ckpt = None
+        if ckpt is not None:
+            # 중단 전과 같은 조건으로 이어서 탐지
+            conf_thres, classid = ckpt["conf_thres"], ckpt["classid"]
+            _push_ai_log(log_queue, log_file_path,
+                         f"체크포인트에서 재개: video_index={ckpt['video_index']}, frame={ckpt['frame_index']}")
+
+    checkpoint_interval = config.getint('detect', 'checkpoint_interval', fallback=300)
+    max_stride = max(1, config.getint('detect', 'detect_stride', fallback=1))
+    adaptive_stride = max_stride > 1 and config.getboolean('detect', 'adaptive_stride', fallback=True)
+    motion_threshold = config.getfloat('detect', 'motion_threshold', fallback=0.0)
+    motion_refresh = max(1, config.getint('detect', 'motion_refresh', fallback=30))
+    tiled = config.getboolean('detect', 'tiled', fallback=False)
+    parallel_segments = config.getint('detect', 'parallel_segments', fallback=0)
+    segment_overlap = max(1, config.getint('detect', 'segment_overlap', fallback=30))
 
     video_paths = video_path.split(',')
-    results_files = []
+    multi = config.getboolean('detect', 'multifiledetect', fallback=False) and ckpt is None and len(video_paths) > 1
+
+    # 탐지 결과 캐시 조회 (모든 영상이 적중하면 모델을 로드하지 않음)
+    # 다중 영상 병렬 탐지 결과는 방식별 키로 따로 저장 → 병렬 키 먼저, 없으면 순차 키 조회
+    cache, cache_keys, cache_hits, fingerprints = None, {}, {}, {}
+    if config.getboolean('detect', 'cache', fallback=True):
+        try:
+            cache = _get_detect_cache()
+            params = _cache_params(conf_thres, classid)
+            multi_params = _cache_params(conf_thres, classid, multi=_multi_mode()) if multi else None
+            for video in video_paths:
+                fingerprints[video] = video_fingerprint(video)
+                cache_keys[video] = cache_key(fingerprints[video], _model_hash(), params)
+                keys = [cache_key(fingerprints[video], _model_hash(), multi_params)] if multi else []
+                for key in keys + [cache_keys[video]]:
+                    hit = cache.get(key)
+                    if hit is not None:
+                        cache_hits[video] = hit
+                        break
+        except Exception as e:
+            _push_ai_log(log_queue, log_file_path, f"탐지 캐시 사용 불가: {e}")
+            cache, cache_keys, cache_hits = None, {}, {}
+
+    model = None
+    if len(cache_hits) < len(video_paths):
+        # 모델 로딩 진행률 (0-5%)
+        if job_id:
+            from util import update_progress
+            update_progress(job_id, 0, start_pct=0, end_pct=5)
+            if job_id in globals().get('jobs', {}):
+                jobs[job_id]['phase'] = 'model_loading'
+        try:
+            model = _get_yolo_model()
+        except Exception as e:
+            err = f"YOLO 모델 로드 실패: {e}"
+            _push_ai_log(log_queue, log_file_path, err)
+            return err
+        # 모델 로딩 완료 진행률
+        if job_id:
+            from util import update_progress
+            update_progress(job_id, 1.0, start_pct=0, end_pct=5)
+            if job_id in globals().get('jobs', {}):
+                jobs[job_id]['phase'] = 'processing'
+
+    def _video_progress(video, frac):
+        if video_progress_callback is not None:
+            try:
+                video_progress_callback(video, frac)
+            except Exception as cb_e:
+                logger.warning(f"Video progress callback 실행 오류: {cb_e}")
+
+    # 다중 영상 병렬 탐지 ([detect] multifiledetect): 캐시 미적중 영상을 동시에 처리한 뒤 아래 루프에서 저장
+    parallel_results = {}
+    pending_videos = [v for v in video_paths if v not in cache_hits]
+    if multi and len(pending_videos) > 1:
+        result = _autodetect_multi(pending_videos, conf_thres, classid, log_queue, log_file_path,
+                                   progress_callback, _video_progress, len(video_paths) - len(pending_videos),
+                                   len(video_paths), job_id)
+        if isinstance(result, str):
+            return result
+        parallel_results = result
+        if cache is not None:
+            # 실제 실행 방식으로 저장 키 결정 (stride/모션 게이트/타일/세그먼트 미적용)
+            try:
+                multi_params = _cache_params(conf_thres, classid, multi=_multi_mode())
+                for video in pending_videos:
+                    cache_keys[video] = cache_key(fingerprints[video], _model_hash(), multi_params)
+            except Exception as e:
+                _push_ai_log(log_queue, log_file_path, f"탐지 캐시 사용 불가: {e}")
+                cache = None
+
+    results_files = list(ckpt["results_files"]) if ckpt else []
     total_videos = len(video_paths)
-    processed_videos = 0
+    start_video = ckpt["video_index"] if ckpt else 0
+    processed_videos = start_video
 
-    for video in video_paths:
+    for video_index, video in enumerate(video_paths):
+        if video_index < start_video:
+            continue  # 체크포인트 이전에 완료된 영상
         # print(f"Processing video: {video}")
         output_file = os.path.splitext(video)[0] + ".json"
+        if video in cache_hits or video in parallel_results:
+            # 캐시 적중 또는 다중 영상 병렬 탐지 완료: 결과로 JSON 생성
+            hit, info = cache_hits[video] if video in cache_hits else parallel_results[video]
+            try:
+                _write_incremental_json(output_file, hit, _autodetect_metadata(
+                    "completed", video, info.get("width"), info.get("height"), info.get("fps"),
+                    info.get("total_frames"), conf_thres, classid))
+            except Exception as e:
+                err = f"JSON 파일 저장 실패 ({output_file}): {e}"
+                _push_ai_log(log_queue, log_file_path, err)
+                return err
+            if video in cache_hits:
+                _push_ai_log(log_queue, log_file_path, f"탐지 캐시 적중: {os.path.basename(video)} ({len(hit)}건)")
+            elif cache is not None and video in cache_keys:
+                cache.put(cache_keys[video], hit, dict(info, video=os.path.basename(video)))
+            results_files.append(output_file)
+            processed_videos += 1
+            _video_progress(video, 1.0)
+            _report_progress(progress_callback, processed_videos, 0, 1, total_videos)
+            continue
+
         try:
             cap = cv2.VideoCapture(video)
             if not cap.isOpened():
@@ -217,6 +773,57 @@ def autodetector(video_path: str, conf_thres: float, classid: List[int], log_que
         if total_frames_in_video <= 0:
             total_frames_in_video = 1
 
+        resuming = ckpt is not None and video_index == ckpt["video_index"] and ckpt["frame_index"] > 0
+        segmented = not resuming and parallel_detect.use_segments(total_frames_in_video, parallel_segments, segment_overlap)
+        # 타일 추론은 순차 경로 전용 (세그먼트 병렬 탐지는 프로세스별 model.track) → 세그먼트면 predict 모델도 로드하지 않음
+        tiler = _make_tiler() if tiled and not segmented else None
+
+        if resuming:
+            # 체크포인트 프레임까지의 결과 복원 → 트래커 상태 복원 → 해당 프레임으로 seek
+            frame_index = ckpt["frame_index"]
+            tracking_results = _load_detected_results(output_file, frame_index)
+            try:
+                _restore_tracker(model, ckpt.get("tracker"), video_height, video_width, conf_thres, classid, tiler)
+            except Exception as e:
+                err = f"트래커 상태 복원 실패: {e}"
+                _push_ai_log(log_queue, log_file_path, err)
+                cap.release()
+                return err
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+        elif segmented:
+            # 세그먼트 병렬 탐지: 구간별 프로세스 탐지 후 트랙 연결 (cap을 닫으므로 아래 순차 루프는 건너뜀)
+            # stride/모션 게이트/타일 추론은 순차 경로에만 적용됩니다.
+            cap.release()
+            _push_ai_log(log_queue, log_file_path,
+                         f"세그먼트 병렬 탐지: {os.path.basename(video)} {parallel_segments}구간 (겹침 {segment_overlap}프레임)")
+            if tiled:
+                _push_ai_log(log_queue, log_file_path, "세그먼트 병렬 탐지에는 타일 추론(tiled)이 적용되지 않습니다")
+            try:
+                tracking_results = parallel_detect.detect_segments(
+                    video, total_frames_in_video, parallel_segments, segment_overlap, conf_thres, classid,
+                    progress_cb=lambda frac: _report_progress(progress_callback, processed_videos,
+                                                              frac * total_frames_in_video,
+                                                              total_frames_in_video, total_videos),
+                    cancel_check=(lambda: is_cancelled(job_id)) if job_id else None)
+            except Exception as e:
+                err = f"세그먼트 병렬 탐지 실패: {e}"
+                _push_ai_log(log_queue, log_file_path, err)
+                return err
+            if tracking_results is None:
+                _push_ai_log(log_queue, log_file_path, "작업 취소됨 (세그먼트 병렬 탐지)")
+                return "cancelled"
+
+        def _metadata(status):
+            return _autodetect_metadata(status, video, video_width, video_height, video_fps,
+                                        total_frames_in_video, conf_thres, classid)
+
+        stride = max_stride          # 현재 키프레임 간격 (adaptive면 이동량에 따라 1~max_stride)
+        last_key_frame = None        # 마지막 키프레임 번호 (YOLO를 실행한 프레임)
+        last_key_entries = []        # 마지막 키프레임의 type:1 결과 (보간 기준)
+        last_saved = last_ckpt = frame_index
+        motion_gate = _MotionGate(motion_threshold, motion_refresh) if motion_threshold > 0 else None
+        gated_frames = 0
+
         while cap.isOpened():  # 비디오가 열려있는 동안 반복합니다.
             # 취소 체크
             if job_id and is_cancelled(job_id):
@@ -224,45 +831,59 @@ def autodetector(video_path: str, conf_thres: float, classid: List[int], log_que
                 cap.release()
                 return "cancelled"
 
+            is_key = (last_key_frame is None or frame_index - last_key_frame >= stride
+                      or frame_index >= total_frames_in_video - 1)
+            if not is_key:
+                # 키프레임 사이: 디코딩만 하고 건너뜀 (결과는 다음 키프레임에서 보간)
+                if not cap.grab():
+                    break
+                frame_index += 1
+                _report_progress(progress_callback, processed_videos, frame_index, total_frames_in_video, total_videos)
+                continue
+
             success, frame = cap.read()  # 비디오에서 한 프레임을 읽습니다.
             if not success:  # 프레임 읽기에 실패하면(비디오 끝)
                 break  # 루프를 종료합니다.
-            
+
+            if motion_gate is not None and last_key_frame is not None and not motion_gate.should_detect(frame):
+                # 정적 프레임: YOLO를 건너뛰고 직전 키프레임 트랙을 그대로 사용
+                gated_frames += 1
+                key_entries = [dict(e, frame=frame_index, interpolated=True) for e in last_key_entries]
+                if frame_index - last_key_frame > 1:
+                    tracking_results.extend(_interpolate_gap(last_key_entries, key_entries, last_key_frame, frame_index))
+                tracking_results.extend(key_entries)
+                last_key_frame, last_key_entries = frame_index, key_entries
+                frame_index += 1
+                _report_progress(progress_callback, processed_videos, frame_index, total_frames_in_video, total_videos)
+                continue
+
             try:
-                # 설정에 따라 CPU, GPU 또는 MPS(Apple Silicon)를 사용하여 모델 추적을 실행합니다.
-                device = config['detect']['device']
-                if device == "gpu":
-                    results = model.track(
-                        frame,
-                        tracker=config['path']['auto_tracker'],
-                        verbose=False,
-                        conf=conf_thres,
-                        classes=classid,
-                        persist=True,
-                        device=0
-                    )
-                elif device == "mps":
-                    # Apple Silicon MPS (Metal Performance Shaders)
-                    results = model.track(
-                        frame,
-                        tracker=config['path']['auto_tracker'],
-                        verbose=False,
-                        conf=conf_thres,
-                        classes=classid,
-                        persist=True,
-                        device="mps"
-                    )
+                if tiler is not None:
+                    # 타일 분할 배치 추론 → 타일 간 병합 → ByteTrack
+                    with _yolo_autocast():
+                        tracks = tiler.track(frame, conf_thres, classid, _yolo_device(), half=_yolo_half())
+                    boxes = [(t[:4].tolist(), int(t[4]), int(t[6]), float(t[5])) for t in tracks]
                 else:
-                    results = model.track(
-                        frame,
-                        tracker=config['path']['auto_tracker'],
-                        verbose=False,
-                        conf=conf_thres,
-                        classes=classid,
-                        persist=True,
-                        device="cpu"
-                    )
-                
+                    # 설정에 따라 CPU, GPU 또는 MPS(Apple Silicon)를 사용하여 모델 추적을 실행합니다.
+                    with _yolo_autocast():
+                        results = model.track(
+                            frame,
+                            tracker=config['path']['auto_tracker'],
+                            verbose=False,
+                            conf=conf_thres,
+                            classes=classid,
+                            persist=True,
+                            imgsz=_yolo_imgsz(),
+                            device=_yolo_device(),
+                            half=_yolo_half()
+                        )
+                    boxes = []
+                    if results and results[0].boxes is not None:  # 탐지 결과가 있는지 확인합니다.
+                        boxes = [(box.xyxy[0].cpu().numpy().tolist(),
+                                  int(box.id.item()) if box.id is not None else -1,  # 추적 ID (없으면 -1)
+                                  int(box.cls.item()), float(box.conf.item()))
+                                 for box in results[0].boxes]
+
             except Exception as e:
                 err = f"프레임 {frame_index} 처리 실패: {e}"
                 log_line = logLine(path=log_file_path, time=timeToStr(time.time(), 'datetime')[11:], message=err)
@@ -271,79 +892,66 @@ def autodetector(video_path: str, conf_thres: float, classid: List[int], log_que
                 cap.release()
                 return err
 
-            if results and results[0].boxes is not None:  # 탐지 결과가 있는지 확인합니다.
-                for box in results[0].boxes:  # 각 탐지된 객체(box)에 대해 반복합니다.
-                    xyxy = [int(coord) for coord in box.xyxy[0].cpu().numpy().tolist()]  # 바운딩 박스 좌표를 정수 리스트로 변환합니다.
-                    raw_id = int(box.id.item()) if box.id is not None else -1  # 추적 ID를 가져옵니다 (없으면 -1).
-                    track_id = f"1_{raw_id}"  # 자동 탐지임을 나타내는 접두사 '1_'을 붙입니다.
-                    cls = int(box.cls.item())  # 객체의 클래스 ID를 가져옵니다.
-                    conf = round(float(box.conf.item()), 2)  # 신뢰도 점수를 소수점 둘째 자리까지 반올림합니다.
-                    tracking_results.append({  # 추적 결과를 딕셔너리 형태로 리스트에 추가합니다.
-                        "frame": frame_index,
-                        "track_id": track_id,
-                        "bbox": xyxy,
-                        "score": conf,
-                        "class_id": cls,
-                        "type": 1,
-                        "object": 1
-                    })
+            key_entries = []
+            for coords, raw_id, cls, conf in boxes:  # 각 탐지된 객체(box)에 대해 반복합니다.
+                key_entries.append({  # 추적 결과를 딕셔너리 형태로 리스트에 추가합니다.
+                    "frame": frame_index,
+                    "track_id": f"1_{raw_id}",  # 자동 탐지임을 나타내는 접두사 '1_'을 붙입니다.
+                    "bbox": [int(c) for c in coords],  # 바운딩 박스 좌표를 정수 리스트로 변환합니다.
+                    "score": round(conf, 2),  # 신뢰도 점수를 소수점 둘째 자리까지 반올림합니다.
+                    "class_id": cls,
+                    "type": 1,
+                    "object": 1
+                })
+
+            # 키프레임 사이 프레임 채우기 (마스킹 내보내기가 모든 프레임을 덮도록)
+            if last_key_frame is not None and frame_index - last_key_frame > 1:
+                tracking_results.extend(_interpolate_gap(last_key_entries, key_entries, last_key_frame, frame_index))
+                if adaptive_stride:
+                    stride = _adapt_stride(last_key_entries, key_entries, frame_index - last_key_frame, stride, max_stride)
+            elif adaptive_stride and last_key_frame is not None:
+                stride = _adapt_stride(last_key_entries, key_entries, 1, stride, max_stride)
+            tracking_results.extend(key_entries)
+            last_key_frame, last_key_entries = frame_index, key_entries
             frame_index += 1
 
-            # 매 30프레임마다 증분 저장 (탐지 중 실시간 데이터 제공)
-            if tracking_results and frame_index % 30 == 0:
+            # 체크포인트: JSON을 먼저 저장한 뒤 트래커 상태 저장 (재개 시 JSON에서 frame_index 이전 결과 복원)
+            # 키프레임 직후에만 저장하므로 frame_index 이전 프레임은 모두 채워진 상태
+            if job_id and checkpoint_interval > 0 and frame_index - last_ckpt >= checkpoint_interval:
+                last_ckpt = last_saved = frame_index
                 try:
-                    _write_incremental_json(output_file, tracking_results, {
-                        "created_at": datetime.now().isoformat(),
-                        "updated_at": datetime.now().isoformat(),
-                        "generator": "secuwatcher-detector",
-                        "status": "detecting",
-                        "video": {
-                            "filename": os.path.basename(video),
-                            "width": video_width,
-                            "height": video_height,
-                            "fps": video_fps,
-                            "total_frames": total_frames_in_video
-                        },
-                        "detection": {
-                            "model": os.path.basename(config['path']['model']),
-                            "device": config['detect']['device'],
-                            "confidence_threshold": conf_thres,
-                            "class_ids": classid,
-                            "tracker": os.path.basename(config['path']['auto_tracker'])
-                        }
+                    _write_incremental_json(output_file, tracking_results, _metadata("detecting"))
+                    save_checkpoint(job_id, "autodetect", {
+                        "video_path": video_path,
+                        "video_index": video_index,
+                        "frame_index": frame_index,
+                        "results_files": results_files,
+                        "conf_thres": conf_thres,
+                        "classid": classid,
+                        "tracker": _tracker_snapshot(model, tiler),
                     })
+                except Exception as e:
+                    _push_ai_log(log_queue, log_file_path, f"체크포인트 저장 실패 (frame {frame_index}): {e}")
+
+            # 30프레임마다 증분 저장 (탐지 중 실시간 데이터 제공)
+            elif tracking_results and frame_index - last_saved >= 30:
+                last_saved = frame_index
+                try:
+                    _write_incremental_json(output_file, tracking_results, _metadata("detecting"))
                 except Exception:
                     pass  # 증분 저장 실패는 무시 (최종 저장에서 처리)
 
-            if progress_callback is not None:
-                current_video_frac = frame_index / max(1, total_frames_in_video)   # 0~1
-                overall_frac = (processed_videos + current_video_frac) / max(1, total_videos)  # 0~1
-                try:
-                    progress_callback(overall_frac)   # 항상 0.0~1.0 float!
-                except Exception as cb_e:
-                    logger.warning(f"Progress callback 실행 오류: {cb_e}")
+            _report_progress(progress_callback, processed_videos, frame_index, total_frames_in_video, total_videos)
+
+        # 마지막 키프레임 이후 남은 프레임 (프레임 수 메타데이터가 실제보다 클 때): 마지막 박스 유지
+        if last_key_frame is not None and frame_index - last_key_frame > 1:
+            tracking_results.extend(_interpolate_gap(last_key_entries, [], last_key_frame, frame_index))
+        if motion_gate is not None:
+            _push_ai_log(log_queue, log_file_path, f"모션 게이트: {os.path.basename(video)} 정적 프레임 {gated_frames}개 탐지 생략")
+
         try:
             if tracking_results:
-                _write_incremental_json(output_file, tracking_results, {
-                    "created_at": datetime.now().isoformat(),
-                    "updated_at": datetime.now().isoformat(),
-                    "generator": "secuwatcher-detector",
-                    "status": "completed",
-                    "video": {
-                        "filename": os.path.basename(video),
-                        "width": video_width,
-                        "height": video_height,
-                        "fps": video_fps,
-                        "total_frames": total_frames_in_video
-                    },
-                    "detection": {
-                        "model": os.path.basename(config['path']['model']),
-                        "device": config['detect']['device'],
-                        "confidence_threshold": conf_thres,
-                        "class_ids": classid,
-                        "tracker": os.path.basename(config['path']['auto_tracker'])
-                    }
-                })
+                _write_incremental_json(output_file, tracking_results, _metadata("completed"))
             else:
                 logger.warning(f"처리 결과 없음: {video}")
         except Exception as e:
@@ -357,6 +965,25 @@ def autodetector(video_path: str, conf_thres: float, classid: List[int], log_que
         cap.release()
         results_files.append(output_file)
         processed_videos += 1
+        _video_progress(video, 1.0)
+
+        if cache is not None and video in cache_keys:
+            cache.put(cache_keys[video], tracking_results, {
+                "video": os.path.basename(video), "width": video_width, "height": video_height,
+                "fps": video_fps, "total_frames": total_frames_in_video,
+            })
+
+        # 영상 경계 체크포인트: 다음 영상의 처음부터 재개
+        if job_id and checkpoint_interval > 0 and processed_videos < total_videos:
+            save_checkpoint(job_id, "autodetect", {
+                "video_path": video_path,
+                "video_index": processed_videos,
+                "frame_index": 0,
+                "results_files": results_files,
+                "conf_thres": conf_thres,
+                "classid": classid,
+                "tracker": _tracker_snapshot(model, tiler),
+            })
 
     log_line = logLine()
     log_line.path = log_file_path
@@ -367,9 +994,136 @@ def autodetector(video_path: str, conf_thres: float, classid: List[int], log_que
 
     return results_files
 
-def selectdetector(video_path: str, FrameNo: str, Coordinate: str, conf_thres: float, log_queue: deque, progress_callback: Optional[Callable[[float], None]] = None):
+# ─── 선택 객체 추적 (YOLO + DeepSORT, SAM2 미사용 환경 폴백) ──────────────
+# 클릭 프레임 앞 select_warmup 프레임으로 seek해 트래커를 초기화하고 클릭 프레임부터 정방향 추적합니다.
+# direction이 backward/both(생략 시 select_backward = yes면 both)면 클릭 프레임 뒤 warmup 프레임에서 시작해 역순으로 추적합니다 (클릭 이전 구간).
+# DeepSORT는 max_age를 넘긴 트랙을 삭제하고 다시 나타나면 새 ID를 주므로, 선택 트랙이 삭제되면 그 방향 추적을 끝냅니다.
+_SELECT_BACKWARD_BYTES = 256 << 20   # 역방향 블록 읽기 메모리 상한 (블록 단위로 seek 후 정방향 디코딩 → 뒤집기)
+
+def _make_select_tracker():
+    """config.ini [path] select_tracker 설정으로 DeepSORT 생성 → (tracker, tracker_type)"""
+    tracker_yaml_path = get_resource_path(config['path']['select_tracker'])
+    with open(tracker_yaml_path, 'r', encoding='utf-8') as f:
+        tracker_cfg = yaml.safe_load(f) # 트래커 설정 YAML 파일을 읽습니다.
+    tracker_args = tracker_cfg.get('args', {})
+    tracker_type = tracker_cfg.get('tracker_type')
+
+    from deep_sort_realtime.deepsort_tracker import DeepSort	# DeepSORT 트래커를 임포트합니다.
+    sig = inspect.signature(DeepSort.__init__)
+    valid_args = {k: v for k, v in tracker_args.items() if k in sig.parameters}
+    invalid_keys = set(tracker_args) - set(valid_args)
+    if invalid_keys:
+        logger.debug(f"DeepSort: 사용되지 않는 tracker args 제거: {invalid_keys}")
+
+    if 'model_filename' in sig.parameters and 'model_filename' not in valid_args:
+        valid_args['model_filename'] = config['path']['model']
+        logger.debug(f"DeepSort: model_filename을 config.ini의 모델 경로로 설정: {config['path']['model']}")
+
+    return DeepSort(**valid_args), tracker_type
+
+def _frames_forward(cap, start):
+    """start 프레임으로 seek 후 순서대로 (frame_index, frame)"""
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+    index = start
+    while True:
+        success, frame = cap.read()
+        if not success:
+            return
+        yield index, frame
+        index += 1
+
+def _frames_backward(cap, first, last, block):
+    """first 프레임부터 last 프레임까지 역순으로 (frame_index, frame)
+
+    block 프레임씩 seek 후 정방향으로 읽어 뒤집습니다 (프레임 단위 seek 대비 디코딩 횟수 절감).
+    """
+    end = first + 1
+    while end > last:
+        begin = max(last, end - block)
+        cap.set(cv2.CAP_PROP_POS_FRAMES, begin)
+        frames = []
+        for _ in range(end - begin):
+            success, frame = cap.read()
+            if not success:
+                break
+            frames.append(frame)
+        for offset in range(len(frames) - 1, -1, -1):
+            yield begin + offset, frames[offset]
+        end = begin
+
+def _match_detection(ltrb, detections):
+    """트랙 박스 안에 중심이 있는 첫 검출의 (score, class_id)"""
+    tl, tt, br, bb = ltrb
+    for (x1, y1, w, h), conf_score, cls_id in detections:
+        cx, cy = x1 + w / 2, y1 + h / 2
+        if tl <= cx <= br and tt <= cy <= bb:
+            return round(conf_score, 2), cls_id
+    return None, None
+
+def _point_in_ltrb(ltrb, x, y):
+    """(x, y)가 [l, t, r, b] 박스 안에 있는지"""
+    tl, tt, br, bb = ltrb
+    return tl <= x <= br and tt <= y <= bb
+
+def _select_pass(frames, yolo_model, conf_thres, start_frame_no, click_x, click_y, record, on_frame=None):
+    """frames 순서대로 YOLO + DeepSORT, start_frame_no에서 클릭 좌표를 포함한 트랙 선택
+
+    record(frame_index)가 True인 프레임의 선택 트랙 박스를 수집합니다.
+    반환: (선택된 원본 track_id 또는 None, [(frame_index, ltrb, score, class_id), ...])
+    """
+    tracker, tracker_type = _make_select_tracker()
+    if tracker_type != 'DeepSORT':
+        raise ValueError(f"지원하지 않는 선택 트래커입니다: {tracker_type}")
+
+    selected_raw = None
+    results = []
+    for frame_index, frame in frames:
+        det = yolo_model.predict(frame, conf=conf_thres, verbose=False)[0]  # 현재 프레임에서 객체를 탐지합니다.
+        detections = []  # DeepSORT에 전달할 탐지 결과 리스트입니다.
+        for box in det.boxes:
+            x1, y1, x2, y2 = [int(c) for c in box.xyxy[0].cpu().numpy()]
+            detections.append([[x1, y1, x2 - x1, y2 - y1], float(box.conf[0]), int(box.cls[0])])
+        tracks = tracker.update_tracks(detections, frame=frame)
+        if on_frame is not None:
+            on_frame()
+
+        if frame_index == start_frame_no:
+            # 클릭 좌표를 포함한 트랙 (확정 트랙 우선, 영상 시작 프레임 클릭은 미확정 트랙도 허용)
+            hits = [t for t in tracks if _point_in_ltrb(t.to_ltrb(), click_x, click_y)]
+            hits.sort(key=lambda t: not t.is_confirmed())
+            if not hits:
+                return None, results
+            selected_raw = hits[0].track_id
+            logger.debug(f"객체 선택됨: Frame={frame_index}, TrackID={selected_raw}")
+        if selected_raw is None:
+            continue
+
+        target = next((t for t in tracks if t.track_id == selected_raw), None)
+        if target is None:
+            break  # 트랙 삭제 → 이후 같은 ID로 다시 나타나지 않음
+        if record(frame_index):
+            ltrb = [int(c) for c in target.to_ltrb()]
+            score, cls_id = _match_detection(ltrb, detections)
+            results.append((frame_index, ltrb, score, cls_id))
+    return selected_raw, results
+
+_SELECT_DIRECTIONS = ("forward", "backward", "both")
+
+def _select_direction(direction=None):
+    """요청 Direction → forward|backward|both (생략 시 [detect] select_backward: yes면 both, 알 수 없는 값은 forward)"""
+    if direction is None:
+        return "both" if config.getboolean('detect', 'select_backward', fallback=False) else "forward"
+    direction = direction.strip().lower()
+    if direction not in _SELECT_DIRECTIONS:
+        logger.warning(f"알 수 없는 direction '{direction}' → forward")
+        return "forward"
+    return direction
+
+def selectdetector(video_path: str, FrameNo: str, Coordinate: str, conf_thres: float, log_queue: deque, progress_callback: Optional[Callable[[float], None]] = None, direction: Optional[str] = None, track_id: Optional[str] = None):
     """
-    지정된 비디오의 특정 프레임에서 특정 좌표를 포함하는 객체를 찾아 이후 프레임에서 추적하고 결과를 CSV로 저장합니다.
+    지정된 비디오의 특정 프레임에서 특정 좌표를 포함하는 객체를 찾아 추적하고 결과를 JSON으로 저장합니다.
+
+    클릭 프레임 앞 [detect] select_warmup 프레임으로 seek해 트래커를 초기화하므로 클릭 프레임 이전 구간은 탐지하지 않습니다.
 
     Args:
         video_path (str): 처리할 비디오 파일 경로 (main.py에서 검증된 절대 경로).
@@ -378,9 +1132,11 @@ def selectdetector(video_path: str, FrameNo: str, Coordinate: str, conf_thres: f
         conf_thres (float): 객체 탐지 시 신뢰도 임계값.
         log_queue (deque): 로그 메시지를 전달할 deque 객체.
         progress_callback (function, optional): 진행률 업데이트 콜백 함수. Defaults to None.
+        direction (str, optional): forward(클릭 이후) | backward(클릭 이전만, 역방향) | both. None이면 [detect] select_backward (yes면 both).
+        track_id (str, optional): 저장할 type:2 track_id. None이면 기존 JSON의 type:2 다음 번호.
 
     Returns:
-        str: 성공 시 생성된 CSV 파일 경로, 실패 시 오류 메시지 문자열.
+        str: 성공 시 생성된 JSON 파일 경로, 실패 시 오류 메시지 문자열.
     """
     ai_dir = get_log_dir('AI Log')
     log_file_path = os.path.join(
@@ -408,36 +1164,21 @@ def selectdetector(video_path: str, FrameNo: str, Coordinate: str, conf_thres: f
             log_queue.append(log_line)
         return err
 
+    direction = _select_direction(direction)
+    forward_on = direction in ("forward", "both")
+    backward_on = direction in ("backward", "both")
+    warmup = max(0, config.getint('detect', 'select_warmup', fallback=30))
+
     output_file = os.path.splitext(video_path)[0] + ".json"
     logger.debug(f"결과 파일 경로: {output_file}")
 
     try:
-        yolo_model = _get_yolo_model()
+        yolo_model = _get_predict_model()  # DeepSORT로 직접 추적 (MODEL의 트래커 콜백 미적용)
     except Exception as e:
         err = f"YOLO 모델 로드 실패: {e}"
         _push_ai_log(log_queue, log_file_path, err)
         return err
 
-    # DeepSORT 트래커를 설정 파일 기반으로 초기화합니다.
-    tracker_yaml_path = get_resource_path(config['path']['select_tracker'])
-    with open(tracker_yaml_path, 'r', encoding='utf-8') as f:
-        tracker_cfg = yaml.safe_load(f) # 트래커 설정 YAML 파일을 읽습니다.
-    tracker_args = tracker_cfg.get('args', {})
-    tracker_type = tracker_cfg.get('tracker_type')
-    
-    from deep_sort_realtime.deepsort_tracker import DeepSort	# DeepSORT 트래커를 임포트합니다.
-    sig = inspect.signature(DeepSort.__init__)
-    valid_args = {k: v for k, v in tracker_args.items() if k in sig.parameters}
-    invalid_keys = set(tracker_args) - set(valid_args)
-    if invalid_keys:
-        logger.debug(f"DeepSort: 사용되지 않는 tracker args 제거: {invalid_keys}")
-
-    if 'model_filename' in sig.parameters and 'model_filename' not in valid_args:
-        valid_args['model_filename'] = config['path']['model']
-        logger.debug(f"DeepSort: model_filename을 config.ini의 모델 경로로 설정: {config['path']['model']}")
-
-    tracker = DeepSort(**valid_args)
-
     try:
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
@@ -452,136 +1193,91 @@ def selectdetector(video_path: str, FrameNo: str, Coordinate: str, conf_thres: f
     video_width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
     video_height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     video_fps = cap.get(cv2.CAP_PROP_FPS)
-
-    frame_index = 0  # 현재 프레임 번호를 초기화합니다.
-    selected_id = None  # 사용자가 선택한 객체의 추적 ID를 저장할 변수입니다.
-    tracking_results = []  # 추적 결과를 담을 리스트입니다.
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1  # 비디오의 전체 프레임 수를 가져옵니다.
 
-    while cap.isOpened():  # 비디오가 열려있는 동안 반복합니다.
-        success, frame = cap.read()  # 프레임을 읽습니다.
-        if not success:
-            break
-
-        det = yolo_model.predict(frame, conf=conf_thres, verbose=False)[0]  # 현재 프레임에서 객체를 탐지합니다.
-        detections = []  # DeepSORT에 전달할 탐지 결과 리스트입니다.
-        for box in det.boxes:  # 각 탐지된 객체에 대해 반복합니다.
-            x1, y1, x2, y2 = [int(c) for c in box.xyxy[0].cpu().numpy()]  # 좌표를 가져옵니다.
-            conf_score = float(box.conf[0])  # 신뢰도를 가져옵니다.
-            cls_id = int(box.cls[0])  # 클래스 ID를 가져옵니다.
-            if tracker_type == 'DeepSORT':
-                w, h = x2 - x1, y2 - y1	# 너비와 높이를 계산합니다.
-                detections.append([[x1, y1, w, h], conf_score, cls_id])	# DeepSORT 형식에 맞게 변환하여 추가합니다.
-            # else:
-
-        if tracker_type == 'DeepSORT':
-            tracks = tracker.update_tracks(detections, frame=frame)
-        # else:
-
-        if frame_index == start_frame_no:	# 사용자가 지정한 시작 프레임이면
-            found = False
-            for t in tracks:
-                if tracker_type == 'DeepSORT':
-                    if not t.is_confirmed(): continue
-                    tl, tt, br, bb = t.to_ltrb()	# Tracking 좌표를 가져옵니다.
-                    if tl <= click_x <= br and tt <= click_y <= bb:	# 사용자가 클릭한 좌표가 객체 내에 있는지 확인합니다.
-                        raw = t.track_id	# Tracking ID를 가져옵니다.
-                        selected_id = f"2_{raw}"
-                        logger.debug(f"객체 선택됨: Frame={frame_index}, TrackID={selected_id}, Box={[int(tl), int(tt), int(br), int(bb)]}")
-                    # 해당 트랙에 대응하는 검출 객체 찾기
-                    matched_conf, matched_cls = None, None
-                    for bbox, conf_score, cls_id in detections:
-                        x1, y1, w, h = bbox
-                        cx, cy = x1 + w/2, y1 + h/2
-                        if tl <= cx <= br and tt <= cy <= bb:
-                            matched_conf = round(conf_score, 2)
-                            matched_cls = cls_id
-                            break
-                        tracking_results.append({
-                            "frame": frame_index,
-                            "track_id": selected_id,
-                            "bbox": [int(tl), int(tt), int(br), int(bb)],
-                            "score": matched_conf,
-                            "class_id": matched_cls,
-                            "type": 2,
-                            "object": 1
-						})
-                        found = True
-                        break
-                # else:
-            if not found:
-                err = f"시작 프레임({start_frame_no})의 좌표에서 객체를 찾을 수 없습니다."
-                log_line = logLine(path=log_file_path, time=timeToStr(time.time(), 'datetime')[11:], message=err)
-                if isinstance(log_queue, deque): log_queue.append(log_line)
-                cap.release()
-                return err
-        elif frame_index > start_frame_no and selected_id is not None:	# 시작 프레임 이후이고, 추적할 객체가 선택되었다면
-            target_raw = selected_id.split('_')[1]
-            for t in tracks:
-                if tracker_type == 'DeepSORT' and t.track_id == target_raw:
-                    tl, tt, br, bb = t.to_ltrb()
-                    logger.debug(f"추적: Frame={frame_index}, TrackID={selected_id}, Box={[int(tl), int(tt), int(br), int(bb)]}")
-                    matched_conf, matched_cls = None, None
-                    for bbox, conf_score, cls_id in detections:
-                        x1, y1, w, h = bbox
-                        cx, cy = x1 + w/2, y1 + h/2
-                        if tl <= cx <= br and tt <= cy <= bb:
-                            matched_conf = round(conf_score, 2)
-                            matched_cls = cls_id
-                            break
-                    tracking_results.append({
-                        "frame": frame_index,
-                        "track_id": selected_id,
-                        "bbox": [int(tl), int(tt), int(br), int(bb)],
-                        "score": matched_conf,
-                        "class_id": matched_cls,
-                        "type": 2,
-                        "object": 1
-                    })
-                    break
-                # elif tracker_type != 'DeepSORT' and int(t[4]) == selected_id:
-
-        frame_index += 1
+    def _metadata(status):
+        return {
+            "created_at": datetime.now().isoformat(),
+            "updated_at": datetime.now().isoformat(),
+            "generator": "secuwatcher-detector",
+            "status": status,
+            "video": {
+                "filename": os.path.basename(video_path),
+                "width": video_width,
+                "height": video_height,
+                "fps": video_fps,
+                "total_frames": total_frames
+            },
+            "detection": {
+                "model": os.path.basename(config['path']['model']),
+                "device": config['detect']['device'],
+                "confidence_threshold": conf_thres,
+                "tracker": os.path.basename(config['path']['select_tracker'])
+            }
+        }
 
-        # 매 30프레임마다 증분 저장 (탐지 중 실시간 데이터 제공)
-        if tracking_results and frame_index % 30 == 0:
-            try:
-                _write_incremental_json(output_file, tracking_results, {
-                    "created_at": datetime.now().isoformat(),
-                    "updated_at": datetime.now().isoformat(),
-                    "generator": "secuwatcher-detector",
-                    "status": "detecting",
-                    "video": {
-                        "filename": os.path.basename(video_path),
-                        "width": video_width,
-                        "height": video_height,
-                        "fps": video_fps,
-                        "total_frames": total_frames
-                    },
-                    "detection": {
-                        "model": os.path.basename(config['path']['model']),
-                        "device": config['detect']['device'],
-                        "confidence_threshold": conf_thres,
-                        "tracker": os.path.basename(config['path']['select_tracker'])
-                    }
-                })
-            except Exception:
-                pass  # 증분 저장 실패는 무시
+    # 진행률: 처리할 프레임 수 기준 (선택 트랙이 사라져 조기 종료되면 건너뜀)
+    warmup_start = max(0, start_frame_no - warmup)
+    backward_first = min(total_frames - 1, start_frame_no + warmup)
+    planned = (total_frames - warmup_start if forward_on else 0) + (backward_first + 1 if backward_on else 0)
+    processed = [0]
 
+    def _on_frame():
+        processed[0] += 1
         if progress_callback:
             try:
-                progress_callback(frame_index / max(1, total_frames))
+                progress_callback(min(1.0, processed[0] / max(1, planned)))
             except Exception:
                 pass
 
-    cap.release()
+    try:
+        # 1) 정방향: warmup 구간에서 트래커 초기화 → 클릭 프레임에서 선택 → 트랙이 사라질 때까지
+        selected_raw, forward = None, []
+        if forward_on:
+            selected_raw, forward = _select_pass(
+                _frames_forward(cap, warmup_start), yolo_model, conf_thres, start_frame_no, click_x, click_y,
+                record=lambda f: f >= start_frame_no, on_frame=_on_frame)
 
-    if selected_id is None:
-        err = "객체 선택 또는 추적 실패."
-        log_line = logLine(path=log_file_path, time=timeToStr(time.time(), 'datetime')[11:], message=err)
-        if isinstance(log_queue, deque):
-            log_queue.append(log_line)
+        # 2) 역방향: 클릭 프레임 뒤 warmup 구간부터 역순으로 → 클릭 이전 구간 기록 (backward만이면 클릭 프레임 포함)
+        backward_results = []
+        if backward_on and (selected_raw is not None or not forward_on):
+            block = max(8, min(120, _SELECT_BACKWARD_BYTES // max(1, video_width * video_height * 3)))
+            last = start_frame_no if forward_on else start_frame_no + 1
+            raw, backward_results = _select_pass(
+                _frames_backward(cap, backward_first, 0, block), yolo_model, conf_thres, start_frame_no,
+                click_x, click_y, record=lambda f: f < last, on_frame=_on_frame)
+            if not forward_on:
+                selected_raw = raw
+
+        if selected_raw is None:
+            err = f"시작 프레임({start_frame_no})의 좌표에서 객체를 찾을 수 없습니다."
+            _push_ai_log(log_queue, log_file_path, err)
+            cap.release()
+            return err
+    except Exception as e:
+        err = f"선택 객체 추적 실패: {e}"
+        _push_ai_log(log_queue, log_file_path, err)
+        cap.release()
         return err
+    cap.release()
+
+    # DeepSORT ID는 선택마다 새 트래커의 로컬 번호 → 기존 JSON의 type:2 다음 번호로 저장 (다른 선택과 병합 방지)
+    if track_id is None:
+        from sam2_detector import _next_select_track_id
+        track_id = _next_select_track_id(output_file)
+    selected_id = track_id
+    tracking_results = [{
+        "frame": frame_index,
+        "track_id": selected_id,
+        "bbox": ltrb,
+        "score": score,
+        "class_id": cls_id,
+        "type": 2,
+        "object": 1
+    } for frame_index, ltrb, score, cls_id in sorted(backward_results + forward, key=lambda r: r[0])]
+    _push_ai_log(log_queue, log_file_path,
+                 f"selectdetector 추적: TrackID={selected_id} (DeepSORT {selected_raw}), 정방향 {len(forward)}프레임, 역방향 {len(backward_results)}프레임 "
+                 f"(탐지 프레임 {processed[0]}/{total_frames})")
 
     if not tracking_results:
          err = f"선택된 객체(TrackID: {selected_id})에 대한 추적 결과가 없습니다."
@@ -591,25 +1287,7 @@ def selectdetector(video_path: str, FrameNo: str, Coordinate: str, conf_thres: f
          return err
 
     try:
-        _write_incremental_json(output_file, tracking_results, {
-            "created_at": datetime.now().isoformat(),
-            "updated_at": datetime.now().isoformat(),
-            "generator": "secuwatcher-detector",
-            "status": "completed",
-            "video": {
-                "filename": os.path.basename(video_path),
-                "width": video_width,
-                "height": video_height,
-                "fps": video_fps,
-                "total_frames": total_frames
-            },
-            "detection": {
-                "model": os.path.basename(config['path']['model']),
-                "device": config['detect']['device'],
-                "confidence_threshold": conf_thres,
-                "tracker": os.path.basename(config['path']['select_tracker'])
-            }
-        })
+        _write_incremental_json(output_file, tracking_results, _metadata("completed"))
     except Exception as e:
         err = f"JSON 파일 저장 실패 ({output_file}): {e}"
         log_line = logLine(path=log_file_path, time=timeToStr(time.time(), 'datetime')[11:], message=err)
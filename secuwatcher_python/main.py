@@ -5,9 +5,10 @@ SecuWatcher Python Backend — FastAPI 진입점
 - 라우터 등록
 - uvicorn 실행
 """
-# NOTE: cv2를 먼저 import하여 OpenCV의 FFmpeg가 PyAV보다 먼저 로드되도록 함
-# (PyAV와의 FFmpeg 중복 로드 충돌 방지)
-import cv2
+# NOTE: 시작 시간 단축을 위해 cv2/torch/ultralytics/pandas/av/Crypto/uvicorn은 여기서 import하지 않음
+# (cv2 → PyAV 로드 순서는 blur.py/watermarking.py가 cv2를 먼저 import하고 av는 함수 안에서 지연 import하여 보장)
+import time
+_STARTUP_T0 = time.perf_counter()
 
 import os
 import sys
@@ -18,13 +19,11 @@ if sys.stdout is None:
 if sys.stderr is None:
     sys.stderr = io.StringIO()
 
-import time
 import logging
 import threading
 
 logger = logging.getLogger(__name__)
 
-import uvicorn
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -35,47 +34,86 @@ from core.state import jobs, log_queue, load_job_states
 from core.config import get_config_data, set_video_masking_path_to_desktop, initialize_config_paths
 from core.logging_setup import setup_logging
 from core.database import DB_FILE, create_drm_table
+from core.model_warmup import start_prewarm, get_model_status
 
 # ─── 로깅 초기화 ───
 daily_log_path, video_log_path = setup_logging()
 
 # ─── 라우터 임포트 및 로그 경로 전달 ───
-from routers import detection, export, encryption
+from routers import detection, export, encryption, sam2_session, preview
 
 detection.init_log_paths(daily_log_path, video_log_path)
 export.init_log_paths(daily_log_path, video_log_path)
 encryption.init_log_paths(daily_log_path, video_log_path)
+sam2_session.init_log_paths(daily_log_path, video_log_path)
+preview.init_log_paths(daily_log_path, video_log_path)
+
+# ─── 시작 시간 측정 (import 단계 + lifespan 단계별, ms) ───
+_startup_timings = [("imports", (time.perf_counter() - _STARTUP_T0) * 1000.0)]
+
+
+def _mark_startup(step: str, t_start: float):
+    """lifespan 단계별 소요 시간 기록"""
+    _startup_timings.append((step, (time.perf_counter() - t_start) * 1000.0))
+
+
+def _report_startup():
+    """시작 시간 리포트를 일별 로그에 기록 (Electron은 포트가 열릴 때까지 대기하므로 사용자에게 보이는 지연)"""
+    steps = ", ".join(f"{name}={ms:.0f}ms" for name, ms in _startup_timings)
+    total = (time.perf_counter() - _STARTUP_T0) * 1000.0
+    msg = f"[STARTUP] {steps} | total={total:.0f}ms"
+    logging.info(msg)
+    log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'), message=msg))
 
 
 # ─── FastAPI 앱 라이프사이클 ───
 @asynccontextmanager
 async def lifespan(app):
+    writer, writer_stop = None, threading.Event()
     try:
         # ─── config.ini 경로 초기화 (상대 경로 → 절대 경로) ───
+        t = time.perf_counter()
         initialize_config_paths()
+        _mark_startup("config", t)
         logging.info("config.ini 경로 초기화 완료")
 
         # ─── 보안 모듈 초기화 (RSA 개인키 + LEA GCM 라이브러리) ───
+        t = time.perf_counter()
         from core.security import initialize_security
         initialize_security()
+        _mark_startup("security", t)
         logging.info("보안 모듈 초기화 완료 (RSA + LEA)")
 
         # ─── 이전 작업 상태 복원 ───
+        t = time.perf_counter()
         load_job_states()
+        _mark_startup("job_states", t)
         logging.info("이전 작업 상태 복원 완료")
 
-        t = threading.Thread(target=log_writer, args=(log_queue, daily_log_path), daemon=True)
-        t.start()
+        writer = threading.Thread(target=log_writer, args=(log_queue, daily_log_path, writer_stop), daemon=True)
+        writer.start()
         logging.info(f"로그 쓰기 스레드 시작됨 (파일: {daily_log_path})")
         # YOLO/SAM2 모델은 각 Event 호출 시 lazy loading (detector.py, sam2_detector.py)
-        logging.info("모델 lazy loading 모드: Event 호출 시 로드됩니다.")
+        # config.ini의 [detect]/[sam2] prewarm = yes 이면 백그라운드에서 미리 로드 + 워밍업
+        if start_prewarm(log_queue, daily_log_path) is not None:
+            logging.info("모델 사전 로드 시작 (상태: /health/models)")
+        else:
+            logging.info("모델 lazy loading 모드: Event 호출 시 로드됩니다.")
     except KeyError as e:
         logging.info(f"오류: config.ini에서 'path.log' 설정을 찾을 수 없습니다: {e}")
     except Exception as e:
         logging.info(f"오류: 서버 시작 프로세스 중 예외 발생: {e}")
+    _report_startup()
 
     yield
 
+    # ─── 종료: 큐에 남은 로그를 모두 기록한 뒤 로그 쓰기 스레드 종료 ───
+    if writer is not None:
+        writer_stop.set()
+        with log_queue.cond:
+            log_queue.cond.notify_all()
+        writer.join(timeout=5)
+
 
 # ─── FastAPI 앱 인스턴스 생성 ───
 app = FastAPI(
@@ -92,13 +130,15 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
-    expose_headers=["X-Estimated-Completion-Time"]
+    expose_headers=["X-Estimated-Completion-Time", "X-Frame-Cache"]
 )
 
 # ─── 라우터 등록 ───
 app.include_router(detection.router)
 app.include_router(export.router)
 app.include_router(encryption.router)
+app.include_router(sam2_session.router)
+app.include_router(preview.router)
 
 
 # ─── 루트 엔드포인트 ───
@@ -132,8 +172,18 @@ def get_jobs_history(limit: int = 50):
         }
 
 
+# ─── 모델 준비 상태 엔드포인트 ───
+@app.get("/health/models")
+def get_models_health():
+    """ 모델별 사전 로드 상태를 반환합니다. (UI 폴링용이므로 요청 로그는 남기지 않음) """
+    return get_model_status()
+
+
 # ─── 메인 실행 ───
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # PyInstaller 빌드에서 세그먼트 병렬 탐지(spawn 워커) 지원
+    import uvicorn
     create_drm_table(DB_FILE)
     set_video_masking_path_to_desktop()
     try:
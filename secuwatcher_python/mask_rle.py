@@ -0,0 +1,76 @@
+"""
+객체 마스크 RLE 인코딩 (bbox_type = "mask")
+- SAM2 마스크를 bbox 영역 기준 run-length로 저장 → 사각형보다 정확한 마스킹, JSON 크기는 작게 유지
+- 엔트리 형식: "bbox": [x1, y1, x2, y2] (마스크 외접 사각형, 기존 소비자 호환)
+              "mask": {"size": [h, w], "counts": "<문자열>"}  — bbox 좌상단 (x1, y1) 기준 h×w 마스크
+- counts: 행 우선(row-major) 0/1 교대 run 길이 (0부터 시작), COCO RLE 문자열 인코딩
+  (run마다 2개 앞 run과의 차이를 5비트 단위 가변 길이 문자로 기록)
+"""
+import numpy as np
+
+
+def _runs(mask):
+    """이진 마스크 → 0부터 시작하는 교대 run 길이 리스트"""
+    flat = np.asarray(mask, dtype=bool).ravel()
+    if flat.size == 0:
+        return []
+    change = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate(([0], change, [flat.size]))
+    runs = np.diff(bounds).tolist()
+    return [0] + runs if flat[0] else runs
+
+
+def _counts_to_string(runs):
+    chars = []
+    for i, x in enumerate(runs):
+        if i > 2:
+            x -= runs[i - 2]
+        more = True
+        while more:
+            c = x & 0x1f
+            x >>= 5
+            more = (x != -1) if (c & 0x10) else (x != 0)
+            if more:
+                c |= 0x20
+            chars.append(chr(c + 48))
+    return "".join(chars)
+
+
+def _string_to_counts(s):
+    runs = []
+    p = 0
+    while p < len(s):
+        x = 0
+        k = 0
+        more = True
+        while more:
+            c = ord(s[p]) - 48
+            x |= (c & 0x1f) << (5 * k)
+            more = c & 0x20
+            p += 1
+            k += 1
+            if not more and (c & 0x10):
+                x |= -1 << (5 * k)
+        if len(runs) > 2:
+            x += runs[-2]
+        runs.append(x)
+    return runs
+
+
+def encode(mask):
+    """이진 마스크(h×w) → {"size": [h, w], "counts": 문자열}"""
+    h, w = mask.shape[:2]
+    return {"size": [int(h), int(w)], "counts": _counts_to_string(_runs(mask))}
+
+
+def decode(rle):
+    """{"size", "counts"} → bool 마스크(h×w) — run을 np.repeat로 한 번에 펼침"""
+    h, w = rle["size"]
+    runs = _string_to_counts(rle["counts"])
+    values = np.zeros(len(runs), dtype=bool)
+    values[1::2] = True
+    flat = np.repeat(values, runs)
+    if flat.size != h * w:
+        raise ValueError(f"RLE 길이({flat.size})가 마스크 크기({h}x{w})와 다릅니다")
+    return flat.reshape(h, w)
+
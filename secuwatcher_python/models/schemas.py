@@ -1,10 +1,16 @@
 """
 Pydantic 요청/응답 모델 및 API 예시 정의
 """
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel, Field
 
 
+class SelectPoint(BaseModel):
+    """Event 2 다중 선택의 클릭 한 개"""
+    FrameNo: str = Field(..., description="클릭 프레임 번호")
+    Coordinate: str = Field(..., description="클릭 좌표 (x,y 형식)")
+
+
 class AutodetectRequest(BaseModel):
     """자동 탐지 / 선택 탐지 / 마스킹 내보내기 요청"""
     Event: str = Field(..., description="처리할 이벤트 유형 (1: 자동 탐지, 2: 선택 탐지, 3: 마스킹 내보내기, 4: 영역 마스킹)")
@@ -12,6 +18,23 @@ class AutodetectRequest(BaseModel):
     FrameNo: Optional[str] = Field(None, description="Event 2에서 사용: 특정 프레임 번호")
     Coordinate: Optional[str] = Field(None, description="Event 2에서 사용: 선택 좌표 (x1,y1,x2,y2 형식)")
     AllMasking: Optional[str] = Field(None, description="Event 3에서 사용: 'yes'인 경우 전체 프레임 마스킹")
+    Points: Optional[List[SelectPoint]] = Field(None, description="Event 2에서 사용: 추가 선택 객체 목록 (프레임이 달라도 됨, 한 번의 SAM2 전파로 객체별 track_id 생성)")
+    Direction: Optional[str] = Field(None, description="Event 2에서 사용: 추적 방향 (forward, backward, both — 생략 시 config.ini [sam2] direction)")
+
+
+class Sam2SessionRequest(BaseModel):
+    """SAM2 대화형 선택 세션 생성 요청 (첫 클릭)"""
+    VideoPath: str = Field(..., description="비디오 파일 경로")
+    FrameNo: str = Field(..., description="클릭 프레임 번호")
+    Coordinate: str = Field(..., description="클릭 좌표 (x,y 형식)")
+    Direction: Optional[str] = Field(None, description="추적 방향 (forward, backward, both — 생략 시 config.ini [sam2] direction)")
+
+
+class Sam2PointRequest(BaseModel):
+    """SAM2 세션에 포인트/네거티브 포인트 추가"""
+    FrameNo: str = Field(..., description="클릭 프레임 번호 (세션 구간 안)")
+    Coordinate: str = Field(..., description="클릭 좌표 (x,y 형식)")
+    ObjId: int = Field(1, description="객체 번호 (첫 클릭은 1, 다른 객체를 추가하려면 2, 3, ...)")
 
 
 class AutoexportRequest(BaseModel):
@@ -36,7 +59,21 @@ autodetect_examples = {
             "Event": "2",
             "VideoPath": "video.mp4",
             "FrameNo": "150",
-            "Coordinate": "100,150,300,400"
+            "Coordinate": "100,150,300,400",
+            "Direction": "both"
+        }
+    },
+    "Event 2 (Multi Select Detect)": {
+        "summary": "다중 객체 선택 탐지 예시",
+        "description": "Points에 여러 클릭을 지정하면 모든 객체를 한 번의 SAM2 전파로 추적하고 객체별 2_<n> track_id를 부여합니다.",
+        "value": {
+            "Event": "2",
+            "VideoPath": "video.mp4",
+            "Points": [
+                {"FrameNo": "150", "Coordinate": "120,200"},
+                {"FrameNo": "150", "Coordinate": "340,180"},
+                {"FrameNo": "162", "Coordinate": "560,240"}
+            ]
         }
     },
     "Event 3 (Masking Export)": {
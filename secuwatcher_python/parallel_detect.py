@@ -0,0 +1,343 @@
+"""
+병렬 자동 탐지
+[세그먼트 병렬] 긴 영상 1개를 K개 시간 구간으로 나눠 프로세스별로 탐지
+- split_segments(): 프레임 범위를 K개 구간으로 분할 (각 구간은 앞 구간과 overlap 프레임 겹침)
+- _segment_worker(): 별도 프로세스에서 모델/트래커를 따로 두고 구간 [read_from, end) 추적
+- stitch_tracks(): 인접 구간의 겹침 프레임에서 트랙 IoU로 ID를 이어 전역 1_<id> 부여
+[다중 영상 병렬] 여러 영상을 동시에 탐지 ([detect] multifiledetect = yes)
+- detect_videos_batched(): GPU/MPS — 모델 1개로 영상별 같은 순번 프레임을 배치 추론, 영상별 ByteTrack
+- detect_videos_pool(): CPU — 영상별 프로세스 (프로세스당 torch 스레드 수 분배)
+
+겹침 프레임은 두 구간이 같은 픽셀을 탐지하므로 같은 객체의 박스가 거의 일치합니다.
+따라서 외형 특징 없이 겹침 구간의 평균 IoU만으로 트랙을 연결합니다.
+겹침 프레임의 결과는 앞 구간 것을 사용하고, 뒤 구간의 겹침 결과는 매칭에만 씁니다
+(트래커 워밍업 구간 역할).
+
+config.ini [detect]:
+    parallel_segments = 0   ; 2 이상이면 긴 영상을 이 수만큼 나눠 프로세스 병렬 탐지 (0/1=끔)
+    segment_overlap = 30    ; 구간 간 겹침 프레임 수 (트랙 연결용)
+    multifiledetect = no    ; yes면 여러 영상을 동시에 탐지
+    parallel_videos = 0     ; 동시 처리 영상 수 (0=자동: CPU는 코어 수 절반, GPU는 4)
+"""
+import os
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+_STITCH_IOU = 0.5        # 겹침 구간 평균 IoU가 이 값 이상이면 같은 트랙으로 연결
+_PROGRESS_EVERY = 30     # 워커 진행률 보고 간격 (프레임)
+_MIN_SEGMENT_FRAMES = 4  # 구간 길이가 overlap의 이 배수 미만이면 병렬화하지 않음
+_BATCH_VIDEOS = 4        # GPU 배치 추론 기본 동시 영상 수
+
+
+def split_segments(total_frames, k, overlap):
+    """[(start, end, read_from), ...] — 출력 구간 [start, end), 읽기 시작 read_from = start - overlap"""
+    k = max(1, min(k, total_frames))
+    bounds = [round(i * total_frames / k) for i in range(k + 1)]
+    return [(bounds[i], bounds[i + 1], max(0, bounds[i] - overlap)) for i in range(k)]
+
+
+def use_segments(total_frames, k, overlap):
+    """구간 병렬화가 의미 있는 길이인지 (짧은 영상은 프로세스/모델 로드 비용이 더 큼)"""
+    return k > 1 and total_frames >= k * max(1, overlap) * _MIN_SEGMENT_FRAMES
+
+
+def _worker_threads(workers):
+    """프로세스당 torch 스레드 수 (코어를 워커 수로 나눔 — 과다 구독 방지)"""
+    return max(1, (os.cpu_count() or 1) // max(1, workers))
+
+
+def _segment_worker(video, seg_index, read_from, end, conf_thres, classid, progress_q, cancel_event, threads=None):
+    """[read_from, end) 프레임 추적 → [(frame, raw_id, bbox, score, class_id), ...] (취소 시 None)
+
+    spawn 프로세스에서 실행되며 프로세스별 YOLO 싱글톤과 트래커를 사용합니다.
+    """
+    import detector
+
+    if threads:
+        import torch
+        torch.set_num_threads(threads)
+    model = detector._get_yolo_model()
+    trackers = getattr(getattr(model, "predictor", None), "trackers", None)
+    if trackers:
+        trackers[0].reset()  # 같은 워커가 이전 구간을 처리했을 수 있음
+
+    cap = cv2.VideoCapture(video)
+    if not cap.isOpened():
+        raise IOError(f"비디오 파일을 열 수 없습니다: {video}")
+    cap.set(cv2.CAP_PROP_POS_FRAMES, read_from)
+
+    rows = []
+    frame_index = read_from
+    try:
+        while frame_index < end:
+            if cancel_event.is_set():
+                return None
+            success, frame = cap.read()
+            if not success:
+                break
+            with detector._yolo_autocast():
+                results = model.track(
+                    frame,
+                    tracker=detector.config['path']['auto_tracker'],
+                    verbose=False,
+                    conf=conf_thres,
+                    classes=classid,
+                    persist=True,
+                    imgsz=detector._yolo_imgsz(),
+                    device=detector._yolo_device(),
+                    half=detector._yolo_half()
+                )
+            if results and results[0].boxes is not None:
+                for box in results[0].boxes:
+                    rows.append((frame_index,
+                                 int(box.id.item()) if box.id is not None else -1,
+                                 [int(c) for c in box.xyxy[0].cpu().numpy().tolist()],
+                                 round(float(box.conf.item()), 2),
+                                 int(box.cls.item())))
+            frame_index += 1
+            if (frame_index - read_from) % _PROGRESS_EVERY == 0:
+                progress_q.put((seg_index, frame_index - read_from))
+    finally:
+        cap.release()
+    progress_q.put((seg_index, end - read_from))
+    return rows
+
+
+def _box_iou(a, b):
+    """두 [x1, y1, x2, y2] 박스의 IoU"""
+    iw = min(a[2], b[2]) - max(a[0], b[0])
+    ih = min(a[3], b[3]) - max(a[1], b[1])
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _match_overlap(prev_rows, cur_rows, lo, hi, iou_thres):
+    """겹침 프레임 [lo, hi)에서 트랙 쌍의 평균 IoU로 greedy 1:1 매칭 → {cur raw_id: prev raw_id}"""
+    def by_track(rows):
+        tracks = {}
+        for frame, raw_id, bbox, _score, cls in rows:
+            if lo <= frame < hi and raw_id >= 0:
+                tracks.setdefault(raw_id, {})[frame] = (bbox, cls)
+        return tracks
+
+    prev, cur = by_track(prev_rows), by_track(cur_rows)
+    candidates = []
+    for b, b_frames in cur.items():
+        for a, a_frames in prev.items():
+            common = b_frames.keys() & a_frames.keys()
+            if not common:
+                continue
+            if any(a_frames[f][1] != b_frames[f][1] for f in common):
+                continue  # 클래스가 다르면 다른 객체
+            iou = sum(_box_iou(a_frames[f][0], b_frames[f][0]) for f in common) / len(common)
+            if iou >= iou_thres:
+                candidates.append((iou, len(common), b, a))
+
+    matched, used = {}, set()
+    for _iou, _n, b, a in sorted(candidates, reverse=True):
+        if b in matched or a in used:
+            continue
+        matched[b] = a
+        used.add(a)
+    return matched
+
+
+def stitch_tracks(segments, seg_rows, iou_thres=_STITCH_IOU):
+    """구간별 결과를 전역 track ID로 이어 autodetector tracking_results 형식으로 반환
+
+    ID는 첫 등장 순서로 1부터 부여하며, 겹침 구간에서 앞 구간 트랙과 매칭된 트랙은 그 ID를 잇습니다.
+    추적 ID가 없는 박스(-1)는 1_-1 그대로 둡니다.
+    """
+    next_id = 1
+    entries = []
+    prev_rows, prev_map = [], {}
+    for i, ((start, end, read_from), rows) in enumerate(zip(segments, seg_rows)):
+        matched = _match_overlap(prev_rows, rows, read_from, start, iou_thres) if i else {}
+        id_map = {}
+        for frame, raw_id, bbox, score, cls in rows:
+            if not start <= frame < end:
+                continue  # 겹침 프레임은 앞 구간 결과 사용
+            if raw_id < 0:
+                global_id = -1
+            else:
+                if raw_id not in id_map:
+                    if matched.get(raw_id) in prev_map:
+                        id_map[raw_id] = prev_map[matched[raw_id]]
+                    else:
+                        id_map[raw_id] = next_id
+                        next_id += 1
+                global_id = id_map[raw_id]
+            entries.append({
+                "frame": frame,
+                "track_id": f"1_{global_id}",
+                "bbox": bbox,
+                "score": score,
+                "class_id": cls,
+                "type": 1,
+                "object": 1
+            })
+        prev_rows, prev_map = rows, id_map
+    return entries
+
+
+def _run_pool(tasks, workers, conf_thres, classid, progress_cb=None, cancel_check=None):
+    """[(video, read_from, end), ...]를 spawn 프로세스 풀에서 _segment_worker로 실행 → 작업별 rows (취소 시 None)
+
+    progress_cb(done): 작업별 처리 프레임 수 목록, cancel_check(): True면 워커 중단
+    워커 예외는 그대로 전파됩니다.
+    """
+    ctx = multiprocessing.get_context("spawn")  # fork는 CUDA/torch 스레드 상태를 복제하므로 사용하지 않음
+    threads = _worker_threads(workers)
+    cancelled = False
+    with ctx.Manager() as manager:
+        progress_q = manager.Queue()
+        cancel_event = manager.Event()
+        done = [0] * len(tasks)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [pool.submit(_segment_worker, video, i, read_from, end, conf_thres, classid,
+                                   progress_q, cancel_event, threads)
+                       for i, (video, read_from, end) in enumerate(tasks)]
+            pending = set(futures)
+            while pending:
+                _done, pending = wait(pending, timeout=0.5)
+                while not progress_q.empty():
+                    index, count = progress_q.get_nowait()
+                    done[index] = count
+                if progress_cb is not None:
+                    progress_cb(done)
+                if not cancelled and cancel_check is not None and cancel_check():
+                    cancelled = True
+                    cancel_event.set()
+            results = [f.result() for f in futures]
+    if cancelled or any(rows is None for rows in results):
+        return None
+    return results
+
+
+def detect_segments(video, total_frames, k, overlap, conf_thres, classid,
+                    progress_cb=None, cancel_check=None):
+    """영상을 k개 구간으로 나눠 프로세스 병렬 탐지 후 트랙 연결 → tracking_results (취소 시 None)
+
+    progress_cb(frac): 0.0~1.0 영상 내 진행률, cancel_check(): True면 워커 중단
+    """
+    segments = split_segments(total_frames, k, overlap)
+    work = sum(end - read_from for _start, end, read_from in segments)
+    seg_rows = _run_pool(
+        [(video, read_from, end) for _start, end, read_from in segments], len(segments),
+        conf_thres, classid,
+        progress_cb=(lambda done: progress_cb(min(1.0, sum(done) / max(1, work)))) if progress_cb else None,
+        cancel_check=cancel_check)
+    if seg_rows is None:
+        return None
+    logger.info(f"세그먼트 병렬 탐지 완료: {video} ({len(segments)}구간)")
+    return stitch_tracks(segments, seg_rows)
+
+
+def probe_video(video):
+    """영상 정보 {"width", "height", "fps", "total_frames"} (열 수 없으면 IOError)"""
+    cap = cv2.VideoCapture(video)
+    if not cap.isOpened():
+        raise IOError(f"비디오 파일을 열 수 없습니다: {video}")
+    try:
+        return {"width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                "fps": cap.get(cv2.CAP_PROP_FPS),
+                "total_frames": max(1, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)))}
+    finally:
+        cap.release()
+
+
+def default_workers(device, count):
+    """[detect] parallel_videos = 0 일 때 동시 처리 영상 수"""
+    if device == "cpu":
+        return max(1, min(count, (os.cpu_count() or 1) // 2))
+    return max(1, min(count, _BATCH_VIDEOS))
+
+
+def detect_videos_pool(videos, infos, workers, conf_thres, classid,
+                       video_progress_cb=None, cancel_check=None):
+    """CPU: 영상별 프로세스 탐지 → {video: tracking_results} (취소 시 None)
+
+    video_progress_cb(video, frac): 영상별 0.0~1.0 진행률
+    """
+    def on_progress(done):
+        for video, count in zip(videos, done):
+            video_progress_cb(video, min(1.0, count / infos[video]["total_frames"]))
+
+    rows = _run_pool([(video, 0, infos[video]["total_frames"]) for video in videos], workers,
+                     conf_thres, classid,
+                     progress_cb=on_progress if video_progress_cb else None, cancel_check=cancel_check)
+    if rows is None:
+        return None
+    return {video: stitch_tracks([(0, infos[video]["total_frames"], 0)], [r]) for video, r in zip(videos, rows)}
+
+
+def detect_videos_batched(videos, infos, workers, model, tracker_cfg, conf_thres, classid, imgsz, device,
+                          video_progress_cb=None, cancel_check=None, half=False, autocast=None):
+    """GPU/MPS: workers개 영상을 열어 프레임 순번마다 한 번의 배치 추론, 영상별 독립 ByteTrack
+    → {video: tracking_results} (취소 시 None)
+
+    한 영상이 끝나면 대기 중인 다음 영상을 열어 배치를 채웁니다.
+    half/autocast: detector 정밀도 설정 (autocast는 컨텍스트 팩토리)
+    """
+    import contextlib
+    from tiled_detector import make_tracker, track_detections, result_to_array
+
+    queue = list(videos)
+    active = []     # [video, cap, tracker, frame_index, rows]
+    results = {}
+
+    def open_next():
+        video = queue.pop(0)
+        cap = cv2.VideoCapture(video)
+        if not cap.isOpened():
+            raise IOError(f"비디오 파일을 열 수 없습니다: {video}")
+        fps = infos[video]["fps"]
+        tracker = make_tracker(tracker_cfg, frame_rate=int(round(fps)) if fps and fps > 0 else 30)
+        active.append([video, cap, tracker, 0, []])
+
+    try:
+        while queue and len(active) < workers:
+            open_next()
+        while active:
+            if cancel_check is not None and cancel_check():
+                return None
+            batch, frames = [], []
+            for item in list(active):
+                success, frame = item[1].read()
+                if not success:
+                    # 영상 끝: 결과 확정 후 다음 영상으로 교체
+                    item[1].release()
+                    active.remove(item)
+                    results[item[0]] = stitch_tracks([(0, item[3], 0)], [item[4]])
+                    if video_progress_cb is not None:
+                        video_progress_cb(item[0], 1.0)
+                    if queue:
+                        open_next()
+                    continue
+                batch.append(item)
+                frames.append(frame)
+            if not frames:
+                continue
+            with (autocast or contextlib.nullcontext)():
+                preds = model.predict(frames, imgsz=imgsz, conf=conf_thres, classes=classid,
+                                      device=device, half=half, verbose=False)
+            for item, frame, pred in zip(batch, frames, preds):
+                for t in track_detections(item[2], result_to_array(pred), frame):
+                    item[4].append((item[3], int(t[4]), [int(c) for c in t[:4].tolist()],
+                                    round(float(t[5]), 2), int(t[6])))
+                item[3] += 1
+                if video_progress_cb is not None and item[3] % _PROGRESS_EVERY == 0:
+                    video_progress_cb(item[0], min(1.0, item[3] / infos[item[0]]["total_frames"]))
+    finally:
+        for item in active:
+            item[1].release()
+    return results
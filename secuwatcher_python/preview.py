@@ -0,0 +1,263 @@
+"""
+단일 프레임 마스킹 프리뷰 렌더링 (/preview/frame)
+- 마스킹은 내보내기(output_masking/output_allmasking)와 같은 blur 경로, 워터마크는 apply_watermark와 같은 합성
+  → 프론트 캔버스 재구현 대신 실제 내보내기 결과와 픽셀 단위로 같은 프리뷰
+- 디코딩 프레임 LRU 캐시: (영상, 프레임 번호) → BGR 프레임, [export] preview_cache_mb 용량 한도
+- 키프레임 시크 인덱스: 영상마다 한 번 PyAV로 패킷만 훑어(디코딩 없음) 키프레임 프레임 번호 수집
+  → 목표 직전 키프레임으로 seek 후 순서대로 디코딩, 현재 위치에서 이어 읽는 편이 가까우면 seek 생략
+  (목표 바로 앞 프레임들도 캐시 → 뒤로 한 칸씩 스크러빙해도 캐시 히트)
+- 탐지 데이터는 (파일, mtime) 단위로 DetectionTable 캐시 — 프론트가 JSON을 저장하면 다음 요청부터 반영
+"""
+import os
+import logging
+import threading
+import configparser
+from collections import OrderedDict
+from functools import lru_cache
+
+import cv2
+import numpy as np
+
+import blur
+from util import get_resource_path
+
+logger = logging.getLogger(__name__)
+
+_MAX_READERS = 4        # 동시에 열어 두는 영상(VideoCapture) 수
+_CACHE_BEHIND = 16      # seek 후 목표까지 디코딩하며 캐시에 남기는 직전 프레임 수
+
+FORMATS = {
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY, "image/jpeg"),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY, "image/webp"),
+}
+
+
+def _cache_bytes():
+    """[export] preview_cache_mb → 디코딩 프레임 캐시 용량 (바이트)"""
+    config = configparser.ConfigParser(allow_no_value=True)
+    config.read(get_resource_path('config.ini'), encoding='utf-8')
+    return config.getint('export', 'preview_cache_mb', fallback=256) * 1024 * 1024
+
+
+class _FrameCache:
+    """디코딩 프레임 LRU — 바이트 한도를 넘으면 가장 오래 안 쓴 프레임부터 제거
+
+    캐시된 프레임은 요청 간에 공유되므로 읽기 전용 (마스킹은 복사본에 적용)
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._frames = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(key)
+            self.hits += 1
+            return frame
+
+    def put(self, key, frame):
+        frame.setflags(write=False)
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self._bytes -= old.nbytes
+            self._frames[key] = frame
+            self._bytes += frame.nbytes
+            while self._bytes > self.max_bytes and len(self._frames) > 1:
+                _, evicted = self._frames.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def drop_video(self, video_path):
+        """영상 파일이 바뀌었을 때 해당 영상 프레임 전부 제거"""
+        with self._lock:
+            for key in [k for k in self._frames if k[0] == video_path]:
+                self._bytes -= self._frames.pop(key).nbytes
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._frames
+
+
+def _keyframe_index(video_path):
+    """PyAV로 영상 패킷만 훑어 키프레임 프레임 번호(오름차순 int64 배열) 반환 — 실패 시 None
+
+    프레임 번호 = (pts - start_time) × time_base × 평균 fps (cv2 CAP_PROP_POS_FRAMES와 같은 기준)
+    """
+    try:
+        import av  # cv2 이후 로드 (FFmpeg 중복 로드 충돌 방지)
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            rate = stream.average_rate or stream.guessed_rate
+            start = stream.start_time or 0
+            keys = [int(round(float((packet.pts - start) * stream.time_base * rate)))
+                    for packet in container.demux(stream)
+                    if packet.is_keyframe and packet.pts is not None]
+    except Exception as e:
+        logger.warning(f"[preview] 키프레임 인덱스 생성 실패, cv2 seek 사용: {video_path} ({e})")
+        return None
+    if not keys:
+        return None
+    return np.unique(np.asarray(keys, dtype=np.int64))
+
+
+class _VideoReader:
+    """열린 VideoCapture 하나 + 다음 read 위치 + 키프레임 인덱스 (영상마다 하나, lock으로 직렬화)"""
+
+    def __init__(self, video_path):
+        self.path = video_path
+        self.mtime = os.path.getmtime(video_path)
+        self.cap = cv2.VideoCapture(video_path)
+        if not self.cap.isOpened():
+            raise FileNotFoundError(f"영상을 열 수 없습니다: {video_path}")
+        self.total = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.keyframes = _keyframe_index(video_path)
+        self.pos = 0        # 다음 cap.read()가 돌려줄 프레임 번호
+        self.lock = threading.Lock()
+
+    def _start_for(self, target):
+        """target 디코딩을 시작할 프레임 — 직전 키프레임, 현재 위치가 그보다 가까우면 현재 위치"""
+        if self.keyframes is None:
+            # 인덱스 없음: 가까우면 이어 읽고, 아니면 cv2 내부 seek에 맡김
+            key = max(0, target - _CACHE_BEHIND)
+        else:
+            k = int(np.searchsorted(self.keyframes, target, side='right')) - 1
+            key = int(self.keyframes[k]) if k >= 0 else 0
+        if key <= self.pos <= target:
+            return self.pos
+        return key
+
+    def read(self, target, cache):
+        """target 프레임을 디코딩해 반환 (지나온 직전 프레임은 cache에 저장) — 범위 밖이면 None"""
+        start = self._start_for(target)
+        if start != self.pos:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, start)
+            self.pos = start
+        frame = None
+        while self.pos <= target:
+            ok, frame = self.cap.read()
+            if not ok or frame is None:
+                self.pos = self.total + 1   # 다음 요청에서 다시 seek
+                return None
+            if self.pos >= target - _CACHE_BEHIND:
+                cache.put((self.path, self.pos), frame)
+            self.pos += 1
+        return frame
+
+    def release(self):
+        self.cap.release()
+
+
+_frame_cache = _FrameCache(_cache_bytes())
+_readers = OrderedDict()    # 영상 경로 → _VideoReader (최근 사용 순)
+_tables = {}                # 영상 경로 → (탐지 파일, mtime, DetectionTable)
+_lock = threading.Lock()
+
+
+def _get_reader(video_path):
+    """영상의 _VideoReader (파일이 바뀌었으면 캐시 프레임과 함께 다시 열기)"""
+    mtime = os.path.getmtime(video_path)
+    with _lock:
+        reader = _readers.get(video_path)
+        if reader is not None and reader.mtime != mtime:
+            _readers.pop(video_path)
+            with reader.lock:
+                reader.release()
+            _frame_cache.drop_video(video_path)
+            reader = None
+        if reader is None:
+            reader = _VideoReader(video_path)
+            _readers[video_path] = reader
+            while len(_readers) > _MAX_READERS:
+                _, old = _readers.popitem(last=False)
+                with old.lock:
+                    old.release()
+        _readers.move_to_end(video_path)
+        return reader
+
+
+def get_frame(video_path, frame_no):
+    """(읽기 전용) 디코딩 프레임 — 캐시 히트면 디코딩 없이 반환, 범위 밖이면 IndexError
+
+    반환: (frame, 캐시 히트 여부)
+    """
+    if frame_no < 0:
+        raise IndexError(f"프레임 번호가 범위를 벗어났습니다: {frame_no}")
+    reader = _get_reader(video_path)
+    key = (video_path, frame_no)
+    frame = _frame_cache.get(key)
+    if frame is not None:
+        return frame, True
+    with reader.lock:
+        frame = _frame_cache.get(key)   # 대기 중 다른 요청이 디코딩했을 수 있음
+        if frame is None:
+            frame = reader.read(frame_no, _frame_cache)
+    if frame is None:
+        raise IndexError(f"프레임 번호가 범위를 벗어났습니다: {frame_no} (총 {reader.total}프레임)")
+    return frame, False
+
+
+def _detection_table(video_path):
+    """영상 옆 탐지 데이터의 DetectionTable (파일 mtime이 바뀌면 다시 로드) — 없으면 None"""
+    data_path = blur._find_data_file(video_path)
+    if not data_path or not os.path.isfile(data_path):
+        return None
+    mtime = os.path.getmtime(data_path)
+    with _lock:
+        cached = _tables.get(video_path)
+        if cached is not None and cached[0] == data_path and cached[1] == mtime:
+            return cached[2]
+    table = blur._load_mask_data(data_path)
+    with _lock:
+        _tables[video_path] = (data_path, mtime, table)
+    return table
+
+
+@lru_cache(maxsize=8)
+def _watermark(width, height, text, transparency, logo_path, location):
+    """프레임 크기·설정별 워터마크 준비 결과 (로고 리사이즈·폰트 로드는 한 번만)"""
+    from watermarking import prepare_watermark  # 워터마크 요청 때만 PIL 로드
+    return prepare_watermark(width, height, text, transparency, logo_path, location)
+
+
+def render_frame(video_path, frame_no, MaskingRange, MaskingTool, MaskingStrength,
+                 all_masking=False, watermark=None):
+    """
+    내보내기와 같은 경로로 마스킹(+워터마크)한 BGR 프레임을 반환
+    - all_masking: output_allmasking과 같이 프레임 전체에 효과
+    - watermark: (text, transparency, logo_path, location) — None이면 워터마크 없음
+    반환: (frame, 디코딩 캐시 히트 여부)
+    """
+    frame, hit = get_frame(video_path, frame_no)
+    if all_masking:
+        lvl = int(MaskingStrength) if str(MaskingStrength).isdigit() else 3
+        out = blur._apply_effect_roi(frame, MaskingTool, lvl, 1.0)
+    else:
+        table = _detection_table(video_path)
+        if table is None:
+            # 탐지 데이터가 없으면 내보내기도 패스스루
+            out = frame.copy()
+        else:
+            start, end = table.frame_rows(frame_no)
+            out = blur._process_frame_rows(frame, table, start, end, MaskingRange, MaskingTool, MaskingStrength)
+    if watermark is not None:
+        from watermarking import draw_watermark
+        h, w = out.shape[:2]
+        out = draw_watermark(out, _watermark(w, h, *watermark))
+    return out, hit
+
+
+def encode_image(frame, fmt="jpeg", quality=90):
+    """BGR 프레임 → (이미지 바이트, media type) — fmt: jpeg | webp"""
+    ext, quality_flag, media_type = FORMATS[fmt]
+    ok, buf = cv2.imencode(ext, frame, [quality_flag, int(quality)])
+    if not ok:
+        raise ValueError(f"이미지 인코딩 실패: {fmt}")
+    return buf.tobytes(), media_type
@@ -1,6 +1,7 @@
 """
 탐지 관련 라우터
 - POST /autodetect  : 자동/선택 객체 탐지, 마스킹 내보내기
+- POST /resume/{job_id} : 중단된 탐지 작업을 체크포인트부터 이어서 실행
 - GET  /progress/{job_id} : 작업 진행 상태 조회
 """
 import os
@@ -8,6 +9,7 @@ import json
 import time
 import uuid
 import logging
+import importlib.util
 import threading
 import traceback
 
@@ -16,6 +18,7 @@ from util import logLine, timeToStr
 import util
 
 from core.state import jobs, log_queue, acquire_job_slot, release_job_slot, MAX_CONCURRENT_JOBS, save_job_state, delete_job_state
+from core.checkpoint import load_checkpoint, delete_checkpoint
 from core.config import get_config_data, get_config, resolve_video_path
 from models.schemas import AutodetectRequest, autodetect_examples
 from core.errors import api_error
@@ -36,6 +39,161 @@ def init_log_paths(daily: str, video: str):
     video_log_path = video
 
 
+def _is_success_result(result):
+    """탐지/마스킹 함수의 성공 결과인지 — 결과 파일 경로 목록 또는 생성된 파일 경로
+
+    실패는 예외 대신 에러 메시지 문자열("JSON 파일 저장 실패" 등)로 반환되므로 파일 존재로 구분
+    """
+    if isinstance(result, list):
+        return True
+    return isinstance(result, str) and os.path.isfile(result)
+
+
+def _run_detection_task(current_job_id: str, event_type: str, video_path_to_process: str, request_data: AutodetectRequest, resume: bool = False):
+    """ 백그라운드에서 실제 비디오 처리를 수행하는 함수 (resume=True면 체크포인트부터 이어서 탐지) """
+    try:
+        logger.info(f"[TASK] 작업 시작: job_id={current_job_id}, event={event_type}, video={video_path_to_process}")
+        if current_job_id not in jobs:
+            logging.info(f"경고: 존재하지 않는 job_id({current_job_id})에 대한 작업 시작 시도됨.")
+            log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                                    message=f"[API] /autodetect 경고: 존재하지 않는 job_id({current_job_id})에 대한 작업 시작 시도됨."))
+            release_job_slot()
+            return
+
+        # 작업 상태 업데이트
+        jobs[current_job_id]["status"] = "running"
+        jobs[current_job_id]["phase"] = "initializing"
+        save_job_state(current_job_id)
+
+        if event_type == "1":  # 자동 탐지
+            logger.info(f"[TASK] 자동 탐지 시작: job_id={current_job_id}")
+            logger.debug("main.py: init_model import 전")
+            from detector import autodetector
+            logger.debug("main.py: init_model import 후")
+            _, conf_thres, classid = get_config(event_type)
+            logger.info(f"[TASK] 설정 로드 완료: conf_thres={conf_thres}, classid={classid}")
+            result = autodetector(video_path_to_process, conf_thres, classid, log_queue,
+                                 lambda frac: util.update_progress(current_job_id, frac, 5, 100),
+                                 job_id=current_job_id, resume=resume,
+                                 video_progress_callback=lambda video, frac: util.update_video_progress(current_job_id, video, frac))
+            logger.info(f"[TASK] 자동 탐지 완료: result={result}")
+
+        elif event_type == "2" and importlib.util.find_spec("sam2") is None:  # 선택 탐지 (SAM2 미설치 → YOLO+DeepSORT 폴백)
+            from detector import selectdetector
+            _, conf_thres = get_config(event_type)
+            log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                                    message=f"[API] /autodetect SAM2 미설치 → selectdetector(DeepSORT)로 폴백: job_id={current_job_id}"))
+            # DeepSORT 폴백은 한 번에 한 객체 → 선택마다 순서대로 실행, 클릭마다 별도 track_id (SAM2 경로와 동일)
+            from sam2_detector import _next_select_track_ids
+            clicks = [(request_data.FrameNo, request_data.Coordinate)] if request_data.FrameNo is not None else []
+            clicks += [(p.FrameNo, p.Coordinate) for p in request_data.Points or []]
+            track_ids = _next_select_track_ids(os.path.splitext(video_path_to_process)[0] + ".json", len(clicks))
+            for i, ((frame_no, coordinate), track_id) in enumerate(zip(clicks, track_ids)):
+                result = selectdetector(
+                    video_path_to_process, frame_no, coordinate, conf_thres, log_queue,
+                    lambda frac, i=i: util.update_progress(current_job_id, (i + frac) / len(clicks), 5, 100),
+                    direction=request_data.Direction, track_id=track_id,
+                )
+                if not (isinstance(result, str) and result.endswith(".json")):
+                    break
+
+        elif event_type == "2":  # 선택 탐지 (SAM2)
+            from sam2_detector import selectdetector_sam2
+            result = selectdetector_sam2(
+                video_path_to_process, request_data.FrameNo, request_data.Coordinate,
+                log_queue, lambda frac: util.update_progress(current_job_id, frac, 5, 100),
+                job_id=current_job_id, resume=resume, direction=request_data.Direction,
+                points=[(p.FrameNo, p.Coordinate) for p in request_data.Points or []],
+            )
+
+        elif event_type == "3":  # 마스킹 → (옵션) 워터마킹
+            from blur import output_masking, output_allmasking
+            MaskingRange, MaskingTool, MaskingStrength = get_config(event_type)
+            logger.debug(f"적용할 마스킹 값: MaskingRange={MaskingRange}, MaskingTool={MaskingTool}, MaskingStrength={MaskingStrength}")
+
+            # 진행률 콜백: 마스킹 0~80%, 워터마킹 80~100%
+            mask_callback = lambda frac: util.update_progress(current_job_id, frac, 0, 80)
+            wm_callback   = lambda frac: util.update_progress(current_job_id, frac, 80, 100)
+
+            # 1) 마스킹
+            if request_data.AllMasking and request_data.AllMasking.lower() == "yes":
+                result = output_allmasking(
+                    video_path_to_process, MaskingTool, MaskingStrength,
+                    log_queue, mask_callback
+                )
+            else:
+                result = output_masking(
+                    video_path_to_process, MaskingRange, MaskingTool, MaskingStrength,
+                    log_queue, mask_callback
+                )
+
+            # 2) (옵션) 워터마킹 — 일반 내보내기이므로 마스킹 중간파일 삭제
+            config_local = get_config_data()
+            if config_local['export'].get('WaterMarking', 'no').lower() == 'yes':
+                from watermarking import apply_watermark
+                wm_text  = config_local['export'].get('WaterText', '')
+                wm_trans = int(config_local['export'].get('WaterTransparency', '100'))
+                wm_logo  = config_local['export'].get('WaterImgPath', '')
+                wm_loc   = int(config_local['export'].get('WaterLocation', '4'))
+                result = apply_watermark(
+                    result, wm_text, wm_trans, wm_logo, wm_loc,
+                    log_queue, wm_callback, remove_input=True,
+                )
+
+        else:
+            log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                                    message=f"[API] /autodetect 경고: 작업 실행 중 유효하지 않은 Event 값 발견: {event_type}"))
+            raise ValueError(f"작업 실행 중 유효하지 않은 Event 값 발견: {event_type}")
+
+        # 작업 결과 기록 (취소된 경우 completed로 변경하지 않음)
+        if current_job_id in jobs:
+            if jobs[current_job_id].get("status") == "cancelled":
+                log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                                        message=f"[API] /autodetect 작업 취소됨: job_id={current_job_id}, event={event_type}"))
+                delete_checkpoint(current_job_id)
+                save_job_state(current_job_id)
+            elif _is_success_result(result):
+                jobs[current_job_id]["result"] = result
+                jobs[current_job_id]["status"] = "completed"
+                util.update_progress(current_job_id, 1.0, 0, 100)
+                log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                                        message=f"[API] /autodetect 작업 완료: job_id={current_job_id}, event={event_type}"))
+                delete_checkpoint(current_job_id)
+                save_job_state(current_job_id)
+            else:
+                # 에러 문자열 반환: 체크포인트를 남겨 /resume/{job_id}로 이어서 실행 가능
+                jobs[current_job_id]["error"] = str(result)
+                jobs[current_job_id]["status"] = "error"
+                log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                                        message=f"[API] /autodetect 작업 오류: job_id={current_job_id}, event={event_type}, error={result}"))
+                save_job_state(current_job_id)
+
+    except (FileNotFoundError, ValueError, ImportError) as e:
+        error_message = f"작업 오류 ({type(e).__name__}): {e}"
+        logger.error(f"[TASK] 작업 오류: {error_message}")
+        logger.error(traceback.format_exc())
+        if current_job_id in jobs:
+            jobs[current_job_id]["error"] = error_message
+            jobs[current_job_id]["status"] = "error"
+            log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                                    message=f"[API] /autodetect 작업 오류: job_id={current_job_id}, event={event_type}, error={error_message}"))
+            save_job_state(current_job_id)
+    except Exception as e:
+        error_message = f"작업 처리 중 예상치 못한 오류 발생: {e}"
+        logger.error(f"[TASK] 예상치 못한 오류: {error_message}")
+        logger.error(traceback.format_exc())
+        if current_job_id in jobs:
+            jobs[current_job_id]["error"] = str(e)
+            jobs[current_job_id]["status"] = "error"
+            log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                                    message=f"[API] /autodetect 작업 오류: job_id={current_job_id}, event={event_type}, error={error_message}"))
+            save_job_state(current_job_id)
+    finally:
+        # 항상 슬롯 해제
+        logger.info(f"[TASK] 작업 종료: job_id={current_job_id}")
+        release_job_slot()
+
+
 @router.post("/autodetect", summary="객체 탐지 또는 마스킹 작업 시작", response_description="생성된 작업 ID")
 def autodetect_route(
     background_tasks: BackgroundTasks,
@@ -87,24 +245,31 @@ def autodetect_route(
 
         # 이벤트 유형별 요청 파라미터 유효성 검사
         if event == "1":
-            if req.FrameNo is not None or req.Coordinate is not None or req.AllMasking is not None:
-                raise HTTPException(status_code=422, detail="Event 1 요청 시 FrameNo, Coordinate, AllMasking 필드는 사용할 수 없습니다.")
+            if req.FrameNo is not None or req.Coordinate is not None or req.Points is not None or req.AllMasking is not None:
+                raise HTTPException(status_code=422, detail="Event 1 요청 시 FrameNo, Coordinate, Points, AllMasking 필드는 사용할 수 없습니다.")
         elif event == "2":
-            if req.FrameNo is None or req.Coordinate is None:
-                raise HTTPException(status_code=422, detail="Event 2 요청 시 FrameNo와 Coordinate 필드는 필수입니다.")
+            if (req.FrameNo is None or req.Coordinate is None) and not req.Points:
+                raise HTTPException(status_code=422, detail="Event 2 요청 시 FrameNo와 Coordinate 필드(또는 Points)는 필수입니다.")
+            if (req.FrameNo is None) != (req.Coordinate is None):
+                raise HTTPException(status_code=422, detail="FrameNo와 Coordinate는 함께 지정해야 합니다.")
             if req.AllMasking is not None:
                 raise HTTPException(status_code=422, detail="Event 2 요청 시 AllMasking 필드는 사용할 수 없습니다.")
-            try:
-                int(req.FrameNo)
-            except ValueError:
-                raise HTTPException(status_code=422, detail="FrameNo는 유효한 숫자여야 합니다.")
-            coords = req.Coordinate.split(',')
-            if len(coords) != 2:
-                raise HTTPException(status_code=422, detail="Coordinate는 'x,y' 형식이어야 합니다.")
-            try:
-                [int(c.strip()) for c in coords]
-            except ValueError:
-                raise HTTPException(status_code=422, detail="Coordinate의 각 값은 유효한 숫자여야 합니다.")
+            if req.Direction is not None and req.Direction.lower() not in ("forward", "backward", "both"):
+                raise HTTPException(status_code=422, detail="Direction은 forward, backward, both 중 하나여야 합니다.")
+            clicks = [(req.FrameNo, req.Coordinate)] if req.FrameNo is not None else []
+            clicks += [(p.FrameNo, p.Coordinate) for p in req.Points or []]
+            for frame_no, coordinate in clicks:
+                try:
+                    int(frame_no)
+                except ValueError:
+                    raise HTTPException(status_code=422, detail="FrameNo는 유효한 숫자여야 합니다.")
+                coords = coordinate.split(',')
+                if len(coords) != 2:
+                    raise HTTPException(status_code=422, detail="Coordinate는 'x,y' 형식이어야 합니다.")
+                try:
+                    [int(c.strip()) for c in coords]
+                except ValueError:
+                    raise HTTPException(status_code=422, detail="Coordinate의 각 값은 유효한 숫자여야 합니다.")
         elif event == "3":
             if req.FrameNo is not None or req.Coordinate is not None:
                 raise HTTPException(status_code=422, detail="Event 3 요청 시 FrameNo와 Coordinate 필드는 사용할 수 없습니다.")
@@ -132,121 +297,7 @@ def autodetect_route(
         # 작업 상태 저장
         save_job_state(job_id)
 
-        def task(current_job_id: str, event_type: str, video_path_to_process: str, request_data: AutodetectRequest):
-            """ 백그라운드에서 실제 비디오 처리를 수행하는 함수 """
-            try:
-                logger.info(f"[TASK] 작업 시작: job_id={current_job_id}, event={event_type}, video={video_path_to_process}")
-                if current_job_id not in jobs:
-                    logging.info(f"경고: 존재하지 않는 job_id({current_job_id})에 대한 작업 시작 시도됨.")
-                    log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
-                                            message=f"[API] /autodetect 경고: 존재하지 않는 job_id({current_job_id})에 대한 작업 시작 시도됨."))
-                    release_job_slot()
-                    return
-                
-                # 작업 상태 업데이트
-                jobs[current_job_id]["status"] = "running"
-                jobs[current_job_id]["phase"] = "initializing"
-                save_job_state(current_job_id)
-                
-                if event_type == "1":  # 자동 탐지
-                    logger.info(f"[TASK] 자동 탐지 시작: job_id={current_job_id}")
-                    logger.debug("main.py: init_model import 전")
-                    from detector import autodetector
-                    logger.debug("main.py: init_model import 후")
-                    _, conf_thres, classid = get_config(event_type)
-                    logger.info(f"[TASK] 설정 로드 완료: conf_thres={conf_thres}, classid={classid}")
-                    result = autodetector(video_path_to_process, conf_thres, classid, log_queue,
-                                         lambda frac: util.update_progress(current_job_id, frac, 5, 100),
-                                         job_id=current_job_id)
-                    logger.info(f"[TASK] 자동 탐지 완료: result={result}")
-
-                elif event_type == "2":  # 선택 탐지 (SAM2)
-                    from sam2_detector import selectdetector_sam2
-                    result = selectdetector_sam2(
-                        video_path_to_process, request_data.FrameNo, request_data.Coordinate,
-                        log_queue, lambda frac: util.update_progress(current_job_id, frac, 5, 100),
-                        job_id=current_job_id,
-                    )
-
-                elif event_type == "3":  # 마스킹 → (옵션) 워터마킹
-                    from blur import output_masking, output_allmasking
-                    MaskingRange, MaskingTool, MaskingStrength = get_config(event_type)
-                    logger.debug(f"적용할 마스킹 값: MaskingRange={MaskingRange}, MaskingTool={MaskingTool}, MaskingStrength={MaskingStrength}")
-
-                    # 진행률 콜백: 마스킹 0~80%, 워터마킹 80~100%
-                    mask_callback = lambda frac: util.update_progress(current_job_id, frac, 0, 80)
-                    wm_callback   = lambda frac: util.update_progress(current_job_id, frac, 80, 100)
-
-                    # 1) 마스킹
-                    if request_data.AllMasking and request_data.AllMasking.lower() == "yes":
-                        result = output_allmasking(
-                            video_path_to_process, MaskingTool, MaskingStrength,
-                            log_queue, mask_callback
-                        )
-                    else:
-                        result = output_masking(
-                            video_path_to_process, MaskingRange, MaskingTool, MaskingStrength,
-                            log_queue, mask_callback
-                        )
-
-                    # 2) (옵션) 워터마킹 — 일반 내보내기이므로 마스킹 중간파일 삭제
-                    config_local = get_config_data()
-                    if config_local['export'].get('WaterMarking', 'no').lower() == 'yes':
-                        from watermarking import apply_watermark
-                        wm_text  = config_local['export'].get('WaterText', '')
-                        wm_trans = int(config_local['export'].get('WaterTransparency', '100'))
-                        wm_logo  = config_local['export'].get('WaterImgPath', '')
-                        wm_loc   = int(config_local['export'].get('WaterLocation', '4'))
-                        result = apply_watermark(
-                            result, wm_text, wm_trans, wm_logo, wm_loc,
-                            log_queue, wm_callback, remove_input=True,
-                        )
-
-                else:
-                    log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
-                                            message=f"[API] /autodetect 경고: 작업 실행 중 유효하지 않은 Event 값 발견: {event_type}"))
-                    raise ValueError(f"작업 실행 중 유효하지 않은 Event 값 발견: {event_type}")
-
-                # 작업 결과 기록 (취소된 경우 completed로 변경하지 않음)
-                if current_job_id in jobs:
-                    if jobs[current_job_id].get("status") == "cancelled":
-                        log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
-                                                message=f"[API] /autodetect 작업 취소됨: job_id={current_job_id}, event={event_type}"))
-                        save_job_state(current_job_id)
-                    else:
-                        jobs[current_job_id]["result"] = result
-                        jobs[current_job_id]["status"] = "completed"
-                        util.update_progress(current_job_id, 1.0, 0, 100)
-                        log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
-                                                message=f"[API] /autodetect 작업 완료: job_id={current_job_id}, event={event_type}"))
-                        save_job_state(current_job_id)
-
-            except (FileNotFoundError, ValueError, ImportError) as e:
-                error_message = f"작업 오류 ({type(e).__name__}): {e}"
-                logger.error(f"[TASK] 작업 오류: {error_message}")
-                logger.error(traceback.format_exc())
-                if current_job_id in jobs:
-                    jobs[current_job_id]["error"] = error_message
-                    jobs[current_job_id]["status"] = "error"
-                    log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
-                                            message=f"[API] /autodetect 작업 오류: job_id={current_job_id}, event={event_type}, error={error_message}"))
-                    save_job_state(current_job_id)
-            except Exception as e:
-                error_message = f"작업 처리 중 예상치 못한 오류 발생: {e}"
-                logger.error(f"[TASK] 예상치 못한 오류: {error_message}")
-                logger.error(traceback.format_exc())
-                if current_job_id in jobs:
-                    jobs[current_job_id]["error"] = str(e)
-                    jobs[current_job_id]["status"] = "error"
-                    log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
-                                            message=f"[API] /autodetect 작업 오류: job_id={current_job_id}, event={event_type}, error={error_message}"))
-                    save_job_state(current_job_id)
-            finally:
-                # 항상 슬롯 해제
-                logger.info(f"[TASK] 작업 종료: job_id={current_job_id}")
-                release_job_slot()
-
-        threading.Thread(target=lambda: task(job_id, event, validated_video_path, req), daemon=True).start()
+        threading.Thread(target=lambda: _run_detection_task(job_id, event, validated_video_path, req), daemon=True).start()
         log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'), message=f"[API] /autodetect 작업 시작: job_id={job_id}, event={event}"))
         return {"job_id": job_id}
     except HTTPException as e:
@@ -290,6 +341,63 @@ def cancel_job(job_id: str):
     }
 
 
+@router.post("/resume/{job_id}", summary="중단된 탐지 작업 재개", response_description="재개된 작업 ID")
+def resume_job(job_id: str):
+    """
+    중단(interrupted/error)된 탐지 작업을 마지막 체크포인트부터 이어서 실행합니다.
+
+    - **Event 1**: 체크포인트의 영상/프레임으로 seek 후 저장된 트래커 상태로 추적 재개
+    - **Event 2**: 체크포인트의 청크부터 같은 track_id로 SAM2 연속 추적 재개
+
+    진행 상태는 기존 `job_id`로 `/progress/{job_id}`에서 확인합니다.
+    """
+    log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                             message=f"[API] /resume 요청: job_id={job_id}"))
+
+    if jobs.get(job_id, {}).get("status") == "running":
+        api_error(409, "JOB_ALREADY_RUNNING", "이미 실행 중인 작업입니다", suggestion="/progress/{job_id}로 진행 상태를 확인해주세요", context={"job_id": job_id})
+
+    ckpt = load_checkpoint(job_id)
+    if ckpt is None:
+        api_error(404, "CHECKPOINT_NOT_FOUND", "재개할 체크포인트가 없습니다",
+                  suggestion="작업을 /autodetect로 다시 시작해주세요", context={"job_id": job_id})
+
+    if ckpt["kind"] == "autodetect":
+        event = "1"
+        req = AutodetectRequest(Event=event, VideoPath=ckpt["video_path"])
+        resumed_from = ckpt["frame_index"]
+    else:
+        event = "2"
+        req = AutodetectRequest(Event=event, VideoPath=ckpt["video_path"], FrameNo=ckpt["FrameNo"], Coordinate=ckpt["Coordinate"],
+                                Direction=ckpt.get("direction"))
+        resumed_from = ckpt.get("next_frame", int(ckpt["FrameNo"]) + ckpt["next_chunk_idx"] * ckpt["chunk_size"])
+
+    for vp in ckpt["video_path"].split(','):
+        if not os.path.exists(vp):
+            api_error(400, "FILE_NOT_FOUND", "영상 파일을 찾을 수 없습니다", suggestion="파일 경로를 확인해주세요", context={"path": vp})
+
+    if not acquire_job_slot():
+        api_error(429, "TOO_MANY_JOBS", "동시 작업 제한에 도달했습니다.",
+                  suggestion=f"현재 작업이 완료될 때까지 기다려주세요. 최대 {MAX_CONCURRENT_JOBS}개 작업 동시 실행 가능",
+                  context={"max_concurrent_jobs": MAX_CONCURRENT_JOBS})
+
+    job = jobs.setdefault(job_id, {"progress": 0, "result": None, "created_at": time.time()})
+    job.update({
+        "status": "running",
+        "error": None,
+        "event_type": event,
+        "phase": "model_loading",
+        "video_path": ckpt["video_path"],
+        "resumed_from": resumed_from,
+    })
+    save_job_state(job_id)
+
+    threading.Thread(target=lambda: _run_detection_task(job_id, event, ckpt["video_path"], req, resume=True), daemon=True).start()
+    log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                             message=f"[API] /resume 작업 재개: job_id={job_id}, event={event}, frame={resumed_from}"))
+    return {"job_id": job_id, "event": event, "resumed_from": resumed_from}
+
+
 @router.get("/progress/{job_id}", summary="작업 진행 상태 조회", response_description="작업 진행 상태 정보 (JSON)")
 def get_progress(job_id: str):
     """작업 진행 상태를 0~100% 스케일로 반환하며, ETA를 포함합니다"""
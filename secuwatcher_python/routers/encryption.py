@@ -2,6 +2,7 @@
 암호화/복호화 라우터
 - POST /encrypt : LEA GCM 암호화 (마스킹 → 워터마킹 → 암호화 → DRM 기록)
 - POST /decrypt : LEA GCM 복호화 스트리밍
+- GET  /drm/lookup : 파일 해시 기반 DRM 정보 조회
 """
 import os
 import json
@@ -15,16 +16,15 @@ import threading
 import configparser
 import base64
 
+from typing import Optional
 from datetime import datetime, timedelta
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Form, Header, UploadFile, File
-from Crypto.Random import get_random_bytes
-from Crypto.Cipher import PKCS1_OAEP
 from util import logLine, timeToStr, get_resource_path
 import util
 
 from core.state import jobs, log_queue
 from core.config import get_config_data
-from core.database import insert_drm_info
+from core.database import drm_writer, lookup_drm_by_hashes
 from core import security  # 모듈 참조: security.private_key, security.lea_gcm_lib
 from core.errors import api_error
 
@@ -37,6 +37,34 @@ video_log_path: str = ""
 router = APIRouter()
 
 
+_META_TAIL = 64 * 1024     # META 트레일러를 찾을 파일 끝 범위 (메타 JSON은 수십 바이트)
+
+
+def _sphereax_hashes(path):
+    """암호화 파일의 SHA-256 → (파일 전체, META 트레일러 제외)
+
+    이전 버전은 META를 붙이기 전(nonce + 암호문 + 태그)에 해시를 계산해 tb_drm_info에 저장했으므로
+    조회 시 두 기준을 모두 사용합니다. 트레일러가 없으면 두 값이 같습니다.
+    """
+    size = os.path.getsize(path)
+    body_end = size
+    full, body = hashlib.sha256(), hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(max(0, size - _META_TAIL))
+        tail = f.read()
+        idx = tail.rfind(b'META')
+        if idx != -1 and idx + 8 <= len(tail) and idx + 8 + struct.unpack('>I', tail[idx + 4:idx + 8])[0] == len(tail):
+            body_end = size - len(tail) + idx
+        f.seek(0)
+        pos = 0
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            full.update(chunk)
+            if pos < body_end:
+                body.update(chunk[:body_end - pos])
+            pos += len(chunk)
+    return full.hexdigest(), body.hexdigest()
+
+
 def init_log_paths(daily: str, video: str):
     """main.py에서 호출하여 로그 경로를 설정"""
     global daily_log_path, video_log_path
@@ -90,6 +118,7 @@ async def encrypt_endpoint(
         if not os.path.exists(input_path):
             api_error(400, "FILE_NOT_FOUND", "암호화할 입력 파일을 찾을 수 없습니다", suggestion="파일 경로를 확인해주세요", context={"file": file})
 
+        from Crypto.Cipher import PKCS1_OAEP
         key = encryption_key.encode('utf-8')
         try:
             enc_key = base64.b64decode(encryption_key)
@@ -209,6 +238,7 @@ async def encrypt_endpoint(
                 out_name = f"{name_wo_ext}.sphereax"
                 output_path = os.path.join(mask_output_dir, out_name)
 
+                from Crypto.Random import get_random_bytes
                 nonce = get_random_bytes(12)
                 gcm = security.lea_gcm_lib.LEA_GCM(key)
                 gcm.set_iv(nonce)
@@ -230,16 +260,22 @@ async def encrypt_endpoint(
                     outf.write(tag)
                     logging.info(f"[encrypt_task DEBUG] Generated tag: {tag.hex()}")
 
-                # 5) DRM 정보 DB 기록
-                sha256 = hashlib.sha256()
-                with open(output_path, 'rb') as f:
-                    for chunk in iter(lambda: f.read(4096), b''):
-                        sha256.update(chunk)
-                file_hash = sha256.hexdigest()
+                # 5) DRM 메타 정보 추가 기록
                 play_date = datetime.now() + timedelta(days=30)
                 play_count = 99
                 play_date_str = play_date.strftime('%Y-%m-%d')
-                insert_drm_info(
+                meta_obj = {'play_date': play_date_str, 'play_count': play_count}
+                meta_bytes = json.dumps(meta_obj).encode('utf-8')
+                with open(output_path, 'ab') as meta_file:
+                    meta_file.write(b'META')
+                    meta_file.write(struct.pack('>I', len(meta_bytes)))
+                    meta_file.write(meta_bytes)
+                    logging.info(f"[encrypt_task DEBUG] Written marker 'META' and length {len(meta_bytes)}")
+
+                # 6) DRM 정보 DB 기록 — 해시는 META까지 붙은 최종 .sphereax 파일 전체 기준 (/drm/lookup과 동일)
+                file_hash, _ = _sphereax_hashes(output_path)
+                # 일괄 암호화 시 동시에 끝난 작업들과 한 트랜잭션으로 기록 (기록 완료까지 대기)
+                drm_writer.submit(dict(
                     file_hash=file_hash,
                     ori_file_name=os.path.basename(input_file_path),
                     org_filepath=os.path.dirname(input_file_path),
@@ -249,16 +285,7 @@ async def encrypt_endpoint(
                     enc_status="s0",
                     play_date=play_date_str,
                     play_count=play_count
-                )
-
-                # 6) DRM 메타 정보 추가 기록
-                meta_obj = {'play_date': play_date_str, 'play_count': play_count}
-                meta_bytes = json.dumps(meta_obj).encode('utf-8')
-                with open(output_path, 'ab') as meta_file:
-                    meta_file.write(b'META')
-                    meta_file.write(struct.pack('>I', len(meta_bytes)))
-                    meta_file.write(meta_bytes)
-                    logging.info(f"[encrypt_task DEBUG] Written marker 'META' and length {len(meta_bytes)}")
+                )).result(timeout=60)
 
                 # 성공 처리
                 success = True
@@ -355,6 +382,7 @@ async def decrypt_endpoint(
         if encryption_key is None:
             api_error(422, "INVALID_REQUEST", "필수 암호화 키 헤더가 누락되었습니다", suggestion="Encryption-Key 헤더를 포함해주세요")
 
+        from Crypto.Cipher import PKCS1_OAEP
         key = encryption_key.encode('utf-8')
         try:
             enc_key = base64.b64decode(encryption_key)
@@ -487,6 +515,43 @@ async def decrypt_endpoint(
         api_error(500, "ENCRYPTION_FAILED", "복호화 처리 중 오류가 발생했습니다", suggestion="로그를 확인해주세요", context={"error": str(e)})
 
 
+@router.get("/drm/lookup", summary="파일 해시로 DRM 정보 조회", response_description="일치하는 DRM 정보 목록 (최신순)")
+def drm_lookup(file_hash: Optional[str] = None, file_path: Optional[str] = None, limit: int = 10):
+    """
+    암호화 파일(.sphereax)의 SHA-256 해시로 tb_drm_info를 조회합니다.
+    해시 대상은 전달된 .sphereax 파일 전체(nonce + 암호문 + 태그 + META 트레일러)입니다.
+    이전 버전으로 암호화한 파일은 META를 제외한 해시로 기록되어 있으므로, file_path를 전달하면
+    서버가 두 기준의 해시를 모두 계산해 조회합니다.
+    file_hash 인덱스를 사용하므로 테이블 크기와 관계없이 빠르게 응답합니다.
+    """
+    log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                             message=f"[API] /drm/lookup 요청: file_hash={file_hash}, file_path={file_path}"))
+    limit = max(1, min(int(limit), 100))
+    if file_path:
+        if not os.path.isfile(file_path):
+            api_error(400, "FILE_NOT_FOUND", "암호화 파일을 찾을 수 없습니다",
+                      suggestion="파일 경로를 확인해주세요", context={"path": file_path})
+        hashes = _sphereax_hashes(file_path)
+    else:
+        file_hash = (file_hash or "").strip().lower()
+        if len(file_hash) != 64 or any(c not in "0123456789abcdef" for c in file_hash):
+            api_error(422, "INVALID_REQUEST", "file_hash 형식이 올바르지 않습니다",
+                      suggestion="SHA-256 16진수 문자열(64자) 또는 file_path를 전달해주세요")
+        hashes = (file_hash,)
+    file_hash = hashes[0]
+
+    try:
+        records = lookup_drm_by_hashes(hashes, limit=limit)
+    except Exception as e:
+        log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'), message=f"[API] /drm/lookup 오류: {e}"))
+        api_error(500, "DB_ERROR", "DRM 정보 조회 중 오류가 발생했습니다", suggestion="로그를 확인해주세요", context={"error": str(e)})
+    if not records:
+        api_error(404, "DRM_NOT_FOUND", "해당 해시의 DRM 정보가 없습니다",
+                  suggestion="암호화 파일의 해시를 확인해주세요 (이전 버전으로 암호화한 파일은 file_path로 조회)",
+                  context={"file_hash": file_hash})
+    return {"file_hash": file_hash, "count": len(records), "records": records}
+
+
 @router.get("/progress/{job_id}/stream", summary="작업 진행률 SSE 스트림", response_description="실시간 진행률 업데이트 스트림")
 async def progress_stream(job_id: str):
     """
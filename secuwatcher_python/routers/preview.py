@@ -0,0 +1,96 @@
+"""
+프리뷰 라우터
+- GET /preview/frame : 지정 프레임을 내보내기와 같은 마스킹(+워터마크)으로 렌더링한 JPEG/WebP 이미지
+
+preview(→ cv2/blur)는 첫 요청 때 import (서버 시작 시간 유지)
+"""
+import os
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Response
+from util import logLine, timeToStr
+
+from core.state import log_queue
+from core.config import get_config_data, get_config, resolve_video_path
+from core.errors import api_error
+
+# 로그 경로는 main.py에서 초기화 후 설정됨
+daily_log_path: str = ""
+video_log_path: str = ""
+
+router = APIRouter()
+
+
+def init_log_paths(daily: str, video: str):
+    """main.py에서 호출하여 로그 경로를 설정"""
+    global daily_log_path, video_log_path
+    daily_log_path = daily
+    video_log_path = video
+
+
+@router.get("/preview/frame", summary="마스킹 프리뷰 프레임", response_description="마스킹된 프레임 이미지 (image/jpeg 또는 image/webp)")
+def preview_frame(
+    VideoPath: str,
+    FrameNo: int,
+    MaskingRange: Optional[str] = None,
+    MaskingTool: Optional[str] = None,
+    MaskingStrength: Optional[str] = None,
+    AllMasking: Optional[str] = None,
+    Watermark: Optional[str] = None,
+    Format: str = "jpeg",
+    Quality: int = 90,
+):
+    """
+    VideoPath의 FrameNo 프레임을 내보내기(Event 3)와 같은 경로로 마스킹해 이미지로 반환합니다.
+    MaskingRange/MaskingTool/MaskingStrength, Watermark(yes/no)를 생략하면 config.ini [export] 값을 사용합니다.
+    디코딩 프레임은 LRU 캐시에 보관되어 같은 프레임의 설정만 바꾼 요청은 디코딩 없이 처리됩니다.
+    """
+    if Format not in ("jpeg", "webp"):
+        api_error(422, "INVALID_FORMAT", "지원하지 않는 이미지 형식입니다",
+                  suggestion="Format은 jpeg 또는 webp여야 합니다", context={"Format": Format})
+    if not 1 <= Quality <= 100:
+        api_error(422, "INVALID_QUALITY", "Quality는 1~100이어야 합니다", context={"Quality": Quality})
+
+    config = get_config_data()
+    video_path = resolve_video_path(config['path']['video_path'].strip(), VideoPath)
+    if not video_path or not os.path.isfile(video_path):
+        api_error(400, "FILE_NOT_FOUND", "영상 파일을 찾을 수 없습니다",
+                  suggestion="파일 경로를 확인해주세요", context={"path": VideoPath})
+
+    cfg_range, cfg_tool, cfg_strength = get_config("3")
+    watermark = None
+    wm_on = Watermark if Watermark is not None else config['export'].get('WaterMarking', 'no')
+    if wm_on.lower() == 'yes':
+        watermark = (
+            config['export'].get('WaterText', ''),
+            int(config['export'].get('WaterTransparency', '100')),
+            config['export'].get('WaterImgPath', ''),
+            int(config['export'].get('WaterLocation', '4')),
+        )
+
+    import preview
+    try:
+        frame, hit = preview.render_frame(
+            video_path, FrameNo,
+            MaskingRange if MaskingRange is not None else cfg_range,
+            MaskingTool if MaskingTool is not None else cfg_tool,
+            MaskingStrength if MaskingStrength is not None else cfg_strength,
+            all_masking=bool(AllMasking) and AllMasking.lower() == "yes",
+            watermark=watermark,
+        )
+    except FileNotFoundError:
+        api_error(400, "FILE_NOT_FOUND", "영상 파일을 열 수 없습니다",
+                  suggestion="지원하는 영상 형식인지 확인해주세요", context={"path": VideoPath})
+    except IndexError:
+        api_error(422, "FRAME_OUT_OF_RANGE", "프레임 번호가 영상 범위를 벗어났습니다",
+                  suggestion="0 이상 전체 프레임 수 미만의 FrameNo를 지정해주세요",
+                  context={"path": VideoPath, "FrameNo": FrameNo})
+    except Exception as e:
+        log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'),
+                                 message=f"[API] /preview/frame 오류: {VideoPath}#{FrameNo} {e}"))
+        api_error(500, "PREVIEW_FAILED", "프리뷰 렌더링 중 오류가 발생했습니다", context={"error": str(e)})
+
+    content, media_type = preview.encode_image(frame, Format, Quality)
+    return Response(content=content, media_type=media_type,
+                    headers={"Cache-Control": "no-store", "X-Frame-Cache": "hit" if hit else "miss"})
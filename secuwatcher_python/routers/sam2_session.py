@@ -0,0 +1,150 @@
+"""
+SAM2 대화형 선택 세션 라우터
+- POST   /sam2/session                      : 세션 생성 (첫 클릭 → 구간 프레임 준비 + 첫 마스크 bbox)
+- POST   /sam2/session/{id}/point           : 포인트 추가 (마스크 디코더만 재실행 → bbox)
+- POST   /sam2/session/{id}/negative-point  : 네거티브 포인트 추가 (제외할 영역)
+- POST   /sam2/session/{id}/propagate       : 현재 프롬프트로 구간 전파 → 영상 JSON에 type:2 저장
+- DELETE /sam2/session/{id}                 : 세션 종료 (미사용 시 [sam2] session_ttl 후 자동 종료)
+
+sam2_session(→ torch/cv2)은 첫 요청 때 import (서버 시작 시간 유지)
+"""
+import time
+import logging
+
+from fastapi import APIRouter
+from util import logLine, timeToStr
+
+from core.state import log_queue
+from core.config import get_config_data, resolve_video_path
+from models.schemas import Sam2SessionRequest, Sam2PointRequest
+from core.errors import api_error
+
+logger = logging.getLogger(__name__)
+
+# 로그 경로는 main.py에서 초기화 후 설정됨
+daily_log_path: str = ""
+video_log_path: str = ""
+
+router = APIRouter()
+
+
+def init_log_paths(daily: str, video: str):
+    """main.py에서 호출하여 로그 경로를 설정"""
+    global daily_log_path, video_log_path
+    daily_log_path = daily
+    video_log_path = video
+
+
+def _log(message):
+    log_queue.append(logLine(path=daily_log_path, time=timeToStr(time.time(), 'datetime'), message=message))
+
+
+def _parse_click(frame_no, coordinate):
+    """FrameNo, "x,y" → (frame, x, y) (형식 오류는 422)"""
+    try:
+        x, y = (int(v.strip()) for v in coordinate.split(','))
+        return int(frame_no), x, y
+    except (ValueError, AttributeError):
+        api_error(422, "INVALID_COORDINATE", "FrameNo/Coordinate 형식이 올바르지 않습니다",
+                  suggestion="FrameNo는 정수, Coordinate는 'x,y' 형식이어야 합니다",
+                  context={"FrameNo": frame_no, "Coordinate": coordinate})
+
+
+def _session_not_found(session_id):
+    api_error(404, "SESSION_NOT_FOUND", "SAM2 세션을 찾을 수 없습니다",
+              suggestion="세션이 만료되었을 수 있습니다. /sam2/session으로 다시 생성해주세요",
+              context={"session_id": session_id})
+
+
+def _get_session(session_id):
+    from sam2_session import store
+    try:
+        return store.get(session_id)
+    except KeyError:
+        _session_not_found(session_id)
+
+
+def _add_point(session_id, req, label):
+    from sam2_session import ObjectAfterPropagateError
+    session = _get_session(session_id)
+    frame_no, x, y = _parse_click(req.FrameNo, req.Coordinate)
+    try:
+        result = session.add_point(frame_no, x, y, label=label, obj_id=req.ObjId)
+    except KeyError:
+        # 조회 후 TTL 만료/DELETE로 닫힌 세션
+        _session_not_found(session_id)
+    except ObjectAfterPropagateError as e:
+        api_error(409, "OBJECT_AFTER_PROPAGATE", str(e),
+                  suggestion="전파된 객체의 ObjId로 보정하거나, 새 객체는 새 세션에서 선택해주세요",
+                  context={"session_id": session_id, "ObjId": req.ObjId})
+    except ValueError as e:
+        api_error(422, "POINT_OUT_OF_SESSION", str(e), suggestion="세션 구간/크롭 영역 안을 클릭하거나 새 세션을 만들어주세요",
+                  context={"session_id": session_id})
+    return {"session_id": session_id, **result}
+
+
+@router.post("/sam2/session", summary="SAM2 대화형 선택 세션 생성", response_description="세션 ID와 첫 클릭 bbox")
+def create_session(req: Sam2SessionRequest):
+    if not req.VideoPath:
+        api_error(422, "MISSING_VIDEO_PATH", "VideoPath가 필요합니다")
+    frame_no, x, y = _parse_click(req.FrameNo, req.Coordinate)
+
+    from sam2_session import Sam2Session, store
+    try:
+        store.reserve()
+    except RuntimeError as e:
+        api_error(429, "TOO_MANY_SESSIONS", str(e), suggestion="사용하지 않는 세션을 DELETE /sam2/session/{id}로 종료해주세요",
+                  context={"max_sessions": store.max_sessions})
+
+    video_path = resolve_video_path(get_config_data()['path']['video_path'].strip(), req.VideoPath)
+    try:
+        session = Sam2Session(video_path, frame_no, x, y, req.Direction)
+    except ValueError as e:
+        api_error(400, "FILE_NOT_FOUND", str(e), suggestion="파일 경로를 확인해주세요", context={"path": video_path})
+
+    try:
+        store.add(session)
+    except RuntimeError as e:
+        session.close()
+        api_error(429, "TOO_MANY_SESSIONS", str(e), suggestion="사용하지 않는 세션을 DELETE /sam2/session/{id}로 종료해주세요",
+                  context={"max_sessions": store.max_sessions})
+
+    result = session.add_point(frame_no, x, y, label=1, obj_id=1)
+    _log(f"[SAM2-SESSION] 세션 생성: {session.session_id} ({video_path}, 프레임 {session.extract_start}~"
+         f"{session.extract_start + session.extracted - 1})")
+    return {"session_id": session.session_id, "start_frame": session.extract_start,
+            "end_frame": session.extract_start + session.extracted - 1, **result}
+
+
+@router.post("/sam2/session/{session_id}/point", summary="SAM2 세션 포인트 추가", response_description="갱신된 마스크 bbox")
+def add_point(session_id: str, req: Sam2PointRequest):
+    return _add_point(session_id, req, label=1)
+
+
+@router.post("/sam2/session/{session_id}/negative-point", summary="SAM2 세션 네거티브 포인트 추가", response_description="갱신된 마스크 bbox")
+def add_negative_point(session_id: str, req: Sam2PointRequest):
+    return _add_point(session_id, req, label=0)
+
+
+@router.post("/sam2/session/{session_id}/propagate", summary="SAM2 세션 전파 및 저장", response_description="저장된 track_id와 프레임 수")
+def propagate(session_id: str):
+    session = _get_session(session_id)
+    try:
+        result = session.propagate()
+    except KeyError:
+        _session_not_found(session_id)
+    except ValueError as e:
+        api_error(422, "EMPTY_SESSION", str(e), suggestion="포인트를 먼저 추가해주세요", context={"session_id": session_id})
+    _log(f"[SAM2-SESSION] 전파 완료: {session_id} → {result['track_ids']}")
+    return {"session_id": session_id, **result}
+
+
+@router.delete("/sam2/session/{session_id}", summary="SAM2 세션 종료", response_description="종료 결과")
+def close_session(session_id: str):
+    from sam2_session import store
+    try:
+        store.close(session_id)
+    except KeyError:
+        _session_not_found(session_id)
+    _log(f"[SAM2-SESSION] 세션 종료: {session_id}")
+    return {"session_id": session_id, "status": "closed"}
@@ -3,7 +3,14 @@ SAM2 기반 선택객체 탐지 모듈
 - YOLO+DeepSORT 기반 selectdetector를 대체
 - forward_frames > 0: 클릭 프레임 + N프레임 추적
 - forward_frames = -1: 객체가 사라질 때까지 연속 추적 (청크 단위)
+- direction = forward|backward|both: 클릭 프레임 기준 전파 방향 (both는 init_state 하나로 양방향)
+- 다중 선택: 여러 클릭(프레임이 달라도 됨)을 한 inference_state에 객체별 obj_id로 등록해 함께 전파
 - 클릭 지점 반경 크롭으로 SAM2 입력 최소화
+- adaptive_crop: 연속 추적 시 마스크 크기 + 이동 여유로 크롭 크기를 정하고, 객체가 크롭 가장자리에
+  가까워지면 청크를 나눠 다시 중심을 잡음 (크롭은 crop_size 정사각으로 리사이즈해 연산량 고정)
+- 메모리: offload_video/offload_state(CPU 오프로드), memory_frames(최근 N프레임만 메모리 뱅크 유지),
+  chunk_size = auto(가용 메모리 기준 청크 크기) — 청크마다 AI 로그에 메모리 사용량 기록
+- save_mask: bbox와 함께 객체 마스크를 RLE로 저장 (bbox_type "mask", 내보내기 시 마스크 안쪽만 효과)
 """
 import os
 import sys
@@ -14,14 +21,18 @@ import shutil
 import threading
 import configparser
 import time
+import functools
 from collections import deque
 from typing import Optional, Callable
 
 import cv2
 import numpy as np
-import torch
 
 from util import logLine, timeToStr, get_log_dir, is_cancelled
+from core.checkpoint import save_checkpoint, load_checkpoint
+from core import precision as _precision
+from core import model_warmup as _model_warmup
+import mask_rle
 
 logger = logging.getLogger(__name__)
 
@@ -31,12 +42,51 @@ _config.read(os.path.join(os.path.dirname(__file__), 'config.ini'), encoding='ut
 
 # ─── SAM2 모델 싱글톤 (Lazy Loading) ──────────────────────────────────
 SAM2_MODEL = None
+SAM2_PRECISION = None   # [sam2] precision 확정값 (첫 추론 시 결정)
 _SAM2_LOCK = threading.Lock()
 
 
+def _sam2_device():
+    """config.ini [sam2] device → torch device (gpu=cuda, MPS 미지원 시 cpu 폴백)"""
+    import torch
+    device = _config.get('sam2', 'device', fallback='cpu')
+
+    # device 매핑: 'gpu' → 'cuda' (PyTorch 호환)
+    if device == 'gpu':
+        device = 'cuda'
+
+    # MPS 가용성 체크: 요청했지만 사용 불가 시 CPU 폴백
+    if device == 'mps' and not (hasattr(torch.backends, 'mps') and torch.backends.mps.is_available()):
+        logger.warning("MPS 요청되었으나 사용 불가 — CPU로 폴백")
+        device = 'cpu'
+    return device
+
+
+def _sam2_precision():
+    """[sam2] precision 확정값 (fp32|fp16|bf16, 장치 미지원 시 fp32)"""
+    global SAM2_PRECISION
+    if SAM2_PRECISION is None:
+        SAM2_PRECISION = _precision.resolve_precision(
+            _config.get('sam2', 'precision', fallback='fp32'), _sam2_device())
+    return SAM2_PRECISION
+
+
+def _with_sam2_precision(fn):
+    """SAM2 추론(init_state/프롬프트/전파)을 [sam2] precision autocast 안에서 실행"""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with _precision.autocast(_sam2_precision(), _sam2_device()):
+            return fn(*args, **kwargs)
+    return wrapper
+
+
 def _get_sam2_model():
-    """SAM2VideoPredictor lazy singleton — 첫 호출 시 로컬 체크포인트에서 로드"""
+    """SAM2VideoPredictor lazy singleton — 첫 호출 시 로컬 체크포인트에서 로드
+
+    백그라운드 사전 로드가 진행 중이면 워밍업 전파가 끝난 뒤 반환 (같은 predictor 동시 사용 방지)
+    """
     global SAM2_MODEL
+    _model_warmup.wait_for_warmup("sam2")
     if SAM2_MODEL is not None:
         return SAM2_MODEL
     with _SAM2_LOCK:
@@ -44,29 +94,105 @@ def _get_sam2_model():
             return SAM2_MODEL
         from sam2.build_sam import build_sam2_video_predictor
         ckpt_path = _config.get('sam2', 'model_path', fallback='model/sam2.1_hiera_base_plus.pt')
-        device = _config.get('sam2', 'device', fallback='cpu')
-
-        # device 매핑: 'gpu' → 'cuda' (PyTorch 호환)
-        if device == 'gpu':
-            device = 'cuda'
-
-        # MPS 가용성 체크: 요청했지만 사용 불가 시 CPU 폴백
-        if device == 'mps' and not (hasattr(torch.backends, 'mps') and torch.backends.mps.is_available()):
-            logger.warning("MPS 요청되었으나 사용 불가 — CPU로 폴백")
-            device = 'cpu'
+        device = _sam2_device()
 
         base_path = sys._MEIPASS if getattr(sys, 'frozen', False) else os.path.dirname(os.path.abspath(__file__))
         full_ckpt = os.path.join(base_path, ckpt_path)
         logger.info(f"SAM2 모델 로드 시작: {full_ckpt} (device={device})")
-        SAM2_MODEL = build_sam2_video_predictor(
+        predictor = build_sam2_video_predictor(
             config_file="configs/sam2.1/sam2.1_hiera_b+.yaml",
             ckpt_path=full_ckpt,
             device=device,
         )
-        logger.info(f"SAM2 모델 로드 완료 (device={device})")
+        # 가중치는 fp32로 두고 추론만 autocast (SAM2 후처리/메모리 어텐션이 fp32 입력을 가정)
+        if _config.getboolean('sam2', 'channels_last', fallback=False):
+            _precision.to_channels_last(predictor.image_encoder)
+        SAM2_MODEL = predictor
+        logger.info(f"SAM2 모델 로드 완료 (device={device}, precision={_sam2_precision()})")
         return SAM2_MODEL
 
 
+# ─── 추론 상태 / 메모리 ───────────────────────────────────────────────
+
+_MIN_MEMORY_FRAMES = 16     # SAM2가 참조하는 최근 프레임 (마스크 메모리 7, 객체 포인터 16) — 이보다 작으면 결과가 달라짐
+_AUTO_CHUNK_BUDGET = 0.5    # chunk_size = auto: 가용 메모리 중 청크 프레임 텐서에 쓸 비율
+_AUTO_CHUNK_MIN = 30
+_AUTO_CHUNK_MAX = 600
+_FRAME_OUTPUT_BYTES = 1_400_000   # 프레임당 추적 출력 (maskmem 64×64×64 + 저해상도 마스크, fp32) — 메모리 뱅크 제한이 없을 때
+
+
+def _init_state(predictor, frames_dir):
+    """[sam2] offload_video / offload_state 설정을 적용한 init_state"""
+    return predictor.init_state(
+        video_path=frames_dir,
+        async_loading_frames=False,
+        offload_video_to_cpu=_config.getboolean('sam2', 'offload_video', fallback=False),
+        offload_state_to_cpu=_config.getboolean('sam2', 'offload_state', fallback=False),
+    )
+
+
+def _memory_frames():
+    """[sam2] memory_frames → 유지할 최근 비조건 프레임 수 (0=제한 없음, 최소 _MIN_MEMORY_FRAMES)"""
+    keep = _config.getint('sam2', 'memory_frames', fallback=_MIN_MEMORY_FRAMES)
+    return max(keep, _MIN_MEMORY_FRAMES) if keep > 0 else 0
+
+
+def _prune_memory(inference_state, frame_idx, reverse, keep):
+    """전파 방향 뒤쪽으로 keep 프레임보다 먼 비조건 프레임 출력(메모리 특징/마스크) 삭제
+
+    프롬프트가 있는 조건 프레임은 유지. 추적 길이와 무관하게 상태 크기가 일정해집니다.
+    """
+    if not keep:
+        return
+    limit = frame_idx + keep if reverse else frame_idx - keep
+    banks = [d["non_cond_frame_outputs"] for d in inference_state.get("output_dict_per_obj", {}).values()]
+    if "output_dict" in inference_state:
+        banks.append(inference_state["output_dict"]["non_cond_frame_outputs"])
+    for outputs in banks:
+        for t in [t for t in outputs if (t > limit if reverse else t < limit)]:
+            del outputs[t]
+
+
+def _available_memory():
+    """청크 프레임 텐서가 올라갈 메모리의 가용량 (bytes, 알 수 없으면 None)
+
+    CUDA(오프로드 없음)는 VRAM, 그 외(CPU, MPS 통합 메모리, offload_video)는 시스템 메모리
+    """
+    if _sam2_device() == 'cuda' and not _config.getboolean('sam2', 'offload_video', fallback=False):
+        import torch
+        return torch.cuda.mem_get_info()[0]
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        return None
+
+
+def _chunk_size(image_size=1024):
+    """[sam2] chunk_size (숫자 또는 auto) → 청크당 프레임 수
+
+    auto: SAM2가 청크 프레임을 image_size² fp32로 보관하므로 가용 메모리 × _AUTO_CHUNK_BUDGET을
+    프레임당 바이트로 나눈 값 (_AUTO_CHUNK_MIN~_AUTO_CHUNK_MAX)
+    """
+    value = _config.get('sam2', 'chunk_size', fallback=str(_CHUNK_SIZE)).strip().lower()
+    if value != 'auto':
+        return int(value)
+    available = _available_memory()
+    if available is None:
+        return _CHUNK_SIZE
+    per_frame = 3 * image_size * image_size * 4 + (0 if _memory_frames() else _FRAME_OUTPUT_BYTES)
+    return max(_AUTO_CHUNK_MIN, min(_AUTO_CHUNK_MAX, int(available * _AUTO_CHUNK_BUDGET / per_frame)))
+
+
+def _empty_device_cache():
+    """청크 사이에 캐싱 할당자가 잡고 있는 메모리 반환 (CUDA/MPS)"""
+    import torch
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+    elif hasattr(torch.backends, 'mps') and torch.backends.mps.is_available():
+        torch.mps.empty_cache()
+
+
 # ─── 크롭 영역 계산 ───────────────────────────────────────────────────
 
 def _compute_crop_region(click_x, click_y, frame_w, frame_h, crop_size):
@@ -105,10 +231,11 @@ def _compute_crop_region(click_x, click_y, frame_w, frame_h, crop_size):
 
 # ─── 프레임 추출 ──────────────────────────────────────────────────────
 
-def _extract_crop_frames(video_path, start_frame, crop_region, num_frames=6):
+def _extract_crop_frames(video_path, start_frame, crop_region, num_frames=6, out_size=None):
     """start_frame부터 최대 num_frames개 크롭 프레임을 JPEG로 저장
 
     SAM2VideoPredictor는 JPEG 디렉토리 필요 (000000.jpg, 000001.jpg, ...)
+    out_size가 주어지면 크롭을 out_size × out_size로 리사이즈 (adaptive_crop)
     반환: (temp_dir, actual_count)
     """
     cx1, cy1, cx2, cy2 = crop_region
@@ -131,6 +258,8 @@ def _extract_crop_frames(video_path, start_frame, crop_region, num_frames=6):
         if not ret:
             break
         cropped = frame[cy1:cy2, cx1:cx2]
+        if out_size is not None:
+            cropped = cv2.resize(cropped, (out_size, out_size), interpolation=cv2.INTER_AREA)
         cv2.imwrite(os.path.join(temp_dir, f'{i:06d}.jpg'), cropped)
         extracted += 1
 
@@ -145,24 +274,77 @@ def _extract_crop_frames(video_path, start_frame, crop_region, num_frames=6):
 
 # ─── 좌표 변환 ────────────────────────────────────────────────────────
 
-def _remap_point_to_crop(click_x, click_y, crop_x1, crop_y1):
-    """원본 좌표 → 크롭 좌표 (SAM2 포인트 입력용)"""
-    return (click_x - crop_x1, click_y - crop_y1)
+def _remap_point_to_crop(click_x, click_y, crop_x1, crop_y1, scale=(1.0, 1.0)):
+    """원본 좌표 → 크롭 좌표 (SAM2 포인트 입력용, scale: 리사이즈 배율 (sx, sy))"""
+    return ((click_x - crop_x1) * scale[0], (click_y - crop_y1) * scale[1])
 
 
-def _remap_bbox_to_original(bbox_crop, crop_x1, crop_y1, frame_w, frame_h):
+def _remap_bbox_to_original(bbox_crop, crop_x1, crop_y1, frame_w, frame_h, scale=(1.0, 1.0)):
     """크롭 좌표 bbox → 원본 좌표 bbox + 프레임 경계 클리핑
 
-    bbox_crop: [x1, y1, x2, y2] (크롭 좌표계)
+    bbox_crop: [x1, y1, x2, y2] (크롭 좌표계, 리사이즈된 크롭이면 scale 배율 적용 상태)
     반환: [x1, y1, x2, y2] (원본 좌표계)
     """
-    ox1 = max(0, min(bbox_crop[0] + crop_x1, frame_w))
-    oy1 = max(0, min(bbox_crop[1] + crop_y1, frame_h))
-    ox2 = max(0, min(bbox_crop[2] + crop_x1, frame_w))
-    oy2 = max(0, min(bbox_crop[3] + crop_y1, frame_h))
+    sx, sy = scale
+    ox1 = max(0, min(int(round(bbox_crop[0] / sx)) + crop_x1, frame_w))
+    oy1 = max(0, min(int(round(bbox_crop[1] / sy)) + crop_y1, frame_h))
+    ox2 = max(0, min(int(round(bbox_crop[2] / sx)) + crop_x1, frame_w))
+    oy2 = max(0, min(int(round(bbox_crop[3] / sy)) + crop_y1, frame_h))
     return [ox1, oy1, ox2, oy2]
 
 
+def _bbox_to_crop(bbox, crop_region, scale=(1.0, 1.0)):
+    """원본 좌표 bbox → 크롭 좌표 bbox + 크롭 경계 클리핑 (다음 청크 box prompt용)"""
+    cx1, cy1, cx2, cy2 = crop_region
+    sx, sy = scale
+    return [
+        max(0, min(bbox[0] - cx1, cx2 - cx1)) * sx,
+        max(0, min(bbox[1] - cy1, cy2 - cy1)) * sy,
+        max(0, min(bbox[2] - cx1, cx2 - cx1)) * sx,
+        max(0, min(bbox[3] - cy1, cy2 - cy1)) * sy,
+    ]
+
+
+# ─── 적응형 크롭 (adaptive_crop) ──────────────────────────────────────
+
+_CROP_MASK_MARGIN = 0.25    # 마스크 bbox 한 변 대비 양쪽 여유 비율
+_MOTION_HORIZON = 10        # 이동 여유: 프레임당 이동량 × 이 프레임 수 (가장자리 분할이 반응하기 전까지)
+_EDGE_MARGIN = 0.1          # 크롭 한 변 대비 이 비율 이내로 가장자리에 붙으면 청크 분할
+_MIN_SPLIT_FRAMES = 8       # 청크 분할 최소 간격 (큰 객체가 매 프레임 분할되는 것 방지)
+
+
+def _crop_scale(crop_region, out_size):
+    """크롭 → out_size 정사각 리사이즈 배율 (sx, sy)"""
+    cx1, cy1, cx2, cy2 = crop_region
+    return (out_size / max(cx2 - cx1, 1), out_size / max(cy2 - cy1, 1))
+
+
+def _adaptive_crop_size(bbox, velocity, min_size, frame_w, frame_h):
+    """마스크 bbox 크기 + 이동 여유 → 크롭 한 변 (min_size 이상, 프레임 긴 변 이하)"""
+    extent = max(bbox[2] - bbox[0], bbox[3] - bbox[1]) * (1 + 2 * _CROP_MASK_MARGIN)
+    size = max(min_size, extent + 2 * velocity * _MOTION_HORIZON)
+    return int(min(size, max(frame_w, frame_h)))
+
+
+def _near_crop_edge(bbox, crop_region, frame_w, frame_h):
+    """원본 좌표 bbox가 크롭 가장자리(프레임 경계와 겹치지 않는 변)에 가까운지"""
+    cx1, cy1, cx2, cy2 = crop_region
+    margin = _EDGE_MARGIN * min(cx2 - cx1, cy2 - cy1)
+    return ((cx1 > 0 and bbox[0] - cx1 < margin) or
+            (cy1 > 0 and bbox[1] - cy1 < margin) or
+            (cx2 < frame_w and cx2 - bbox[2] < margin) or
+            (cy2 < frame_h and cy2 - bbox[3] < margin))
+
+
+def _bbox_velocity(prev_bbox, bbox, velocity):
+    """bbox 중심 이동량(px/프레임) 지수 이동 평균"""
+    if prev_bbox is None:
+        return velocity
+    dx = abs((bbox[0] + bbox[2]) - (prev_bbox[0] + prev_bbox[2])) / 2
+    dy = abs((bbox[1] + bbox[3]) - (prev_bbox[1] + prev_bbox[3])) / 2
+    return 0.7 * velocity + 0.3 * max(dx, dy)
+
+
 # ─── 마스크 → bbox ────────────────────────────────────────────────────
 
 def _mask_to_bbox(mask_binary):
@@ -176,10 +358,195 @@ def _mask_to_bbox(mask_binary):
     return [int(x_min), int(y_min), int(x_max), int(y_max)]
 
 
+def _mask_to_hit(mask_binary):
+    """이진 마스크 → (크롭 bbox, bbox 영역 마스크) 또는 None"""
+    bbox = _mask_to_bbox(mask_binary)
+    if bbox is None:
+        return None
+    return bbox, mask_binary[bbox[1]:bbox[3] + 1, bbox[0]:bbox[2] + 1]
+
+
+def _save_mask():
+    """[sam2] save_mask → bbox와 함께 RLE 마스크 저장 여부"""
+    return _config.getboolean('sam2', 'save_mask', fallback=False)
+
+
+def _hit_to_original(hit, crop_x1, crop_y1, frame_w, frame_h, scale=(1.0, 1.0), save_mask=False):
+    """(크롭 bbox, bbox 영역 마스크) → {"bbox": 원본 bbox[, "mask": RLE]} (결과 엔트리 필드)
+
+    리사이즈된 크롭이면 마스크를 원본 bbox 크기로 되돌림 (INTER_NEAREST)
+    """
+    crop_bbox, crop_mask = hit
+    bbox = _remap_bbox_to_original(crop_bbox, crop_x1, crop_y1, frame_w, frame_h, scale)
+    fields = {"bbox": bbox}
+    if save_mask:
+        size = (bbox[2] - bbox[0] + 1, bbox[3] - bbox[1] + 1)
+        mask = crop_mask.astype(np.uint8)
+        if (mask.shape[1], mask.shape[0]) != size:
+            mask = cv2.resize(mask, size, interpolation=cv2.INTER_NEAREST)
+        fields["mask"] = mask_rle.encode(mask)
+    return fields
+
+
+# ─── 전파 방향 ────────────────────────────────────────────────────────
+
+_DIRECTIONS = ("forward", "backward", "both")
+
+
+def _select_direction(direction=None):
+    """요청 Direction 또는 config.ini [sam2] direction → forward|backward|both (알 수 없는 값은 forward)"""
+    direction = (direction or _config.get('sam2', 'direction', fallback='forward')).strip().lower()
+    if direction not in _DIRECTIONS:
+        logger.warning(f"알 수 없는 direction '{direction}' → forward")
+        return "forward"
+    return direction
+
+
+def _direction_span(forward_frames, direction):
+    """direction → 클릭 프레임 (앞, 뒤) 추적 프레임 수"""
+    before = forward_frames if direction in ("backward", "both") else 0
+    after = forward_frames if direction in ("forward", "both") else 0
+    return before, after
+
+
+def _direction_window(start_frame, forward_frames, direction, end_frame=None):
+    """고정 프레임 모드 추출 구간 → (추출 시작 프레임, 클릭 프레임 로컬 인덱스, 추출 프레임 수)
+
+    backward/both는 클릭 프레임 앞 forward_frames개를 같은 JPEG 디렉토리에 함께 추출해
+    init_state 한 번으로 양방향 전파 (영상 시작 이전은 잘림).
+    end_frame: 다중 선택 시 마지막 클릭 프레임 (start_frame은 첫 클릭 프레임)
+    """
+    before, after = _direction_span(forward_frames, direction)
+    end_frame = start_frame if end_frame is None else end_frame
+    extract_start = max(0, start_frame - before)
+    click_idx = start_frame - extract_start
+    return extract_start, click_idx, end_frame - extract_start + after + 1
+
+
+def _propagate_bboxes(predictor, inference_state, start_idx=0, reverse=False, obj_ids=(1,)):
+    """SAM2 전파 → (로컬 프레임 인덱스, {obj_id: (크롭 bbox, bbox 영역 마스크) 또는 None}) 순회
+
+    등록된 객체가 한 inference_state에서 함께 전파되므로 이미지 인코딩은 프레임당 한 번이고
+    객체별로는 마스크 디코더만 추가로 실행됩니다.
+    reverse=True면 start_idx에서 0 방향으로 전파 (start_idx 프레임부터 yield)
+    [sam2] memory_frames만큼의 최근 프레임만 메모리 뱅크에 남깁니다.
+    """
+    keep = _memory_frames()
+    for out_idx, out_obj_ids, out_mask_logits in predictor.propagate_in_video(
+            inference_state, start_frame_idx=start_idx, reverse=reverse):
+        out_obj_ids = list(out_obj_ids)
+        boxes = {}
+        for obj_id in obj_ids:
+            if obj_id not in out_obj_ids:
+                boxes[obj_id] = None
+                continue
+            mask = out_mask_logits[out_obj_ids.index(obj_id)].squeeze(0)
+            boxes[obj_id] = _mask_to_hit((mask > 0).byte().cpu().numpy())
+        _prune_memory(inference_state, out_idx, reverse, keep)
+        yield out_idx, boxes
+
+
+def _track_objects(predictor, inference_state, prompt_idx, ranges, direction, extracted, on_frame,
+                   progress=None, cancelled=None, log=None):
+    """프롬프트가 등록된 inference_state를 direction대로 전파하며 객체별 bbox 수집
+
+    같은 inference_state에서 정방향 → 역방향 순서로 전파 (프롬프트 프레임 인코딩 공유).
+    객체마다 자기 프롬프트 프레임부터 전파 방향 쪽, ranges[obj_id] 구간 안의 프레임만 받고,
+    연속 _EMPTY_STOP_THRESHOLD 프레임 미검출이면 그 방향에서 추적을 끝냅니다.
+
+    on_frame(로컬 인덱스, {obj_id: (크롭 bbox, bbox 영역 마스크)}): 프레임마다 새로 검출된 객체 (비어 있으면 호출 안 함)
+    progress(0~1), cancelled() → True면 중단, log(obj_id, 메시지)
+    반환: {obj_id: 검출된 로컬 프레임 집합}, 취소 시 None
+    """
+    obj_ids = list(prompt_idx)
+    passes = [reverse for d, reverse in (("forward", False), ("backward", True)) if direction in (d, "both")]
+    recorded = {obj_id: set() for obj_id in obj_ids}
+
+    for pass_no, reverse in enumerate(passes):
+        pass_start = max(prompt_idx.values()) if reverse else min(prompt_idx.values())
+        pass_frames = pass_start + 1 if reverse else extracted - pass_start
+        consecutive_empty = dict.fromkeys(obj_ids, 0)
+        finished = set()
+        for n, (out_frame_idx, boxes) in enumerate(
+                _propagate_bboxes(predictor, inference_state, pass_start, reverse, obj_ids)):
+            if cancelled is not None and cancelled():
+                return None
+            if progress is not None:
+                progress((pass_no + (n + 1) / pass_frames) / len(passes))
+
+            detected = {}
+            for obj_id, hit in boxes.items():
+                # 이미 저장된 프레임(클릭 프레임 등), 이 방향에서 아직 클릭 프레임에 도달하지 않은 객체는 건너뜀
+                if obj_id in finished or out_frame_idx in recorded[obj_id]:
+                    continue
+                if (out_frame_idx > prompt_idx[obj_id]) if reverse else (out_frame_idx < prompt_idx[obj_id]):
+                    continue
+                lo, hi = ranges[obj_id]
+                if not lo <= out_frame_idx <= hi:
+                    finished.add(obj_id)
+                    continue
+
+                if hit is None:
+                    consecutive_empty[obj_id] += 1
+                    if consecutive_empty[obj_id] >= _EMPTY_STOP_THRESHOLD:
+                        if log is not None:
+                            log(obj_id, f"연속 {_EMPTY_STOP_THRESHOLD}프레임 미검출 → 추적 종료 (local {out_frame_idx})")
+                        finished.add(obj_id)
+                    continue
+
+                consecutive_empty[obj_id] = 0
+                recorded[obj_id].add(out_frame_idx)
+                detected[obj_id] = hit
+
+            if detected:
+                on_frame(out_frame_idx, detected)
+            if len(finished) == len(obj_ids):
+                break
+
+    return recorded
+
+
+# ─── 다중 객체 선택 ───────────────────────────────────────────────────
+
+def _parse_clicks(FrameNo, Coordinate, points=None):
+    """FrameNo/Coordinate + points [(FrameNo, Coordinate), ...] → [(frame, x, y), ...]
+
+    순서대로 obj_id 1, 2, ...가 됩니다.
+    """
+    pairs = [(FrameNo, Coordinate)] if FrameNo is not None and Coordinate is not None else []
+    pairs += list(points or [])
+    if not pairs:
+        raise ValueError("선택 좌표가 없습니다")
+    clicks = []
+    for frame_no, coordinate in pairs:
+        coord_parts = coordinate.split(',')
+        clicks.append((int(frame_no), int(coord_parts[0].strip()), int(coord_parts[1].strip())))
+    return clicks
+
+
+def _union_crop_region(clicks, frame_w, frame_h, crop_size):
+    """클릭별 crop_size 크롭 영역의 합집합 (클릭이 하나면 _compute_crop_region과 동일)"""
+    regions = [_compute_crop_region(x, y, frame_w, frame_h, crop_size) for _, x, y in clicks]
+    return (min(r[0] for r in regions), min(r[1] for r in regions),
+            max(r[2] for r in regions), max(r[3] for r in regions))
+
+
+def _object_ranges(clicks, extract_start, forward_frames, direction):
+    """obj_id → 저장할 로컬 프레임 구간 (lo, hi) — 객체별 클릭 프레임 기준 direction 쪽 forward_frames개"""
+    before, after = _direction_span(forward_frames, direction)
+    return {obj_id: (f - extract_start - before, f - extract_start + after)
+            for obj_id, (f, _, _) in enumerate(clicks, start=1)}
+
+
 # ─── Track ID 자동 생성 ───────────────────────────────────────────────
 
 def _next_select_track_id(output_file):
     """기존 type:2 track_id 최대 번호 + 1 반환 ("2_1" → "2_2" → ...)"""
+    return _next_select_track_ids(output_file, 1)[0]
+
+
+def _next_select_track_ids(output_file, count):
+    """다중 선택용: 기존 type:2 최대 번호 다음부터 count개 track_id"""
     max_num = 0
     if os.path.exists(output_file):
         try:
@@ -196,7 +563,7 @@ def _next_select_track_id(output_file):
                             pass
         except (json.JSONDecodeError, IOError):
             pass
-    return f"2_{max_num + 1}"
+    return [f"2_{max_num + i}" for i in range(1, count + 1)]
 
 
 # ─── JSON 병합 저장 ───────────────────────────────────────────────────
@@ -218,12 +585,14 @@ def _write_merged_json(output_file, new_results, metadata):
         existing["frames"][fkey].append({
             "track_id": entry["track_id"],
             "bbox": entry["bbox"],
-            "bbox_type": "rect",
+            "bbox_type": "mask" if entry.get("mask") else "rect",
             "score": 1.0,
             "class_id": 0,
             "type": entry["type"],
             "object": entry["object"]
         })
+        if entry.get("mask"):
+            existing["frames"][fkey][-1]["mask"] = entry["mask"]
 
     tmp = output_file + '.tmp'
     with open(tmp, 'w', encoding='utf-8') as f:
@@ -231,6 +600,33 @@ def _write_merged_json(output_file, new_results, metadata):
     os.replace(tmp, output_file)
 
 
+def _truncate_track(output_file, track_id, from_frame, reverse=False):
+    """track_id의 from_frame 이후 엔트리 제거 (재개 시 중단된 청크의 부분 결과 정리)
+
+    reverse=True면 from_frame 이하 엔트리 제거 (역방향 전파 결과 정리)
+    """
+    if not os.path.exists(output_file):
+        return
+    try:
+        with open(output_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (json.JSONDecodeError, IOError):
+        return
+
+    frames = {}
+    for fkey, entries in data.get("frames", {}).items():
+        if (int(fkey) <= from_frame) if reverse else (int(fkey) >= from_frame):
+            entries = [e for e in entries if e.get("track_id") != track_id]
+        if entries:
+            frames[fkey] = entries
+    data["frames"] = frames
+
+    tmp = output_file + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, output_file)
+
+
 # ─── 연속 추적 (forward_frames = -1) ─────────────────────────────────
 
 _CHUNK_SIZE = 300           # 청크당 최대 프레임 수
@@ -241,21 +637,30 @@ def _continuous_tracking(
     video_path, start_frame, click_x, click_y,
     crop_region, frame_w, frame_h, total_video_frames,
     output_file, track_id, metadata, _log, _progress,
-    job_id=None,
+    job_id=None, checkpoint_base=None, resume_state=None,
+    reverse=False, record_start=True, memory_log=None,
 ):
     """forward_frames=-1: 객체가 사라질 때까지 청크 단위 연속 추적
 
     청크별로 JPEG 추출 → SAM2 전파 → bbox 수집 → 정리.
     연속 미검출 _EMPTY_STOP_THRESHOLD 프레임 도달 시 조기 종료.
+    청크가 끝날 때마다 다음 청크의 크롭 영역/box 프롬프트를 체크포인트로 저장하고,
+    resume_state가 주어지면 해당 청크부터 이어서 추적합니다.
+    reverse=True면 클릭 프레임에서 영상 시작 방향으로 추적합니다 (청크 마지막 프레임에 프롬프트,
+    체크포인트 없음). record_start=False면 클릭 프레임은 저장하지 않습니다 (both의 정방향에서 저장됨).
+    [sam2] adaptive_crop이면 청크마다 마스크 크기 + 이동 여유로 크롭을 다시 잡고, 객체가 크롭
+    가장자리에 가까워지면 그 프레임에서 청크를 끊습니다 (크롭은 crop_size 정사각으로 리사이즈).
+    memory_log(prefix)가 주어지면 청크마다 장치 메모리 사용량을 기록합니다.
     """
-    chunk_size = _config.getint('sam2', 'chunk_size', fallback=_CHUNK_SIZE)
     crop_size = _config.getint('sam2', 'crop_size', fallback=384)
-    cx1, cy1 = crop_region[0], crop_region[1]
-    remaining = total_video_frames - start_frame
+    adaptive = _config.getboolean('sam2', 'adaptive_crop', fallback=False)
+    save_mask = _save_mask()
+    step = -1 if reverse else 1
+    last_frame = 0 if reverse else total_video_frames - 1     # 이 방향의 마지막 프레임
+    remaining = start_frame + 1 if reverse else total_video_frames - start_frame
     if remaining <= 0:
         return "시작 프레임 이후 추출 가능한 프레임이 없습니다."
 
-    _log(f"연속 추적 시작: frame={start_frame}, remaining={remaining}, chunk={chunk_size}")
     # 모델 로딩 진행률 (0-5%)
     if job_id:
         from util import update_progress
@@ -271,46 +676,68 @@ def _continuous_tracking(
         if job_id in globals().get('jobs', {}):
             jobs[job_id]['phase'] = 'processing'
     _progress(0.05)
-    local_x, local_y = _remap_point_to_crop(click_x, click_y, cx1, cy1)
 
-    all_results = []
-    last_crop_bbox = None       # 다음 청크의 box prompt로 사용
+    # 재개 시 체크포인트의 청크 크기 유지 (auto면 가용 메모리에 따라 달라지므로)
+    chunk_size = resume_state["chunk_size"] if resume_state is not None else _chunk_size(predictor.image_size)
+    _log(f"연속 추적 시작: frame={start_frame}, remaining={remaining}, chunk={chunk_size}"
+         f"{', 역방향' if reverse else ''}{', adaptive_crop' if adaptive else ''}, memory_frames={_memory_frames() or '전체'}")
+
+    last_bbox = None            # 마지막 검출 bbox (원본 좌표) → 다음 청크의 box prompt
+    velocity = 0.0              # bbox 중심 이동량 (px/프레임, adaptive_crop 이동 여유)
     consecutive_empty = 0
     total_detected = 0
     stopped_early = False
-
-    num_chunks = (remaining + chunk_size - 1) // chunk_size
-
-    for chunk_idx in range(num_chunks):
+    chunk_idx = 0
+    next_frame = start_frame    # 다음 청크의 프롬프트 프레임
+
+    if resume_state is not None:
+        # 체크포인트 청크부터 재개: 저장된 크롭 영역 + box 프롬프트 사용, 중단된 청크의 부분 결과 제거
+        chunk_idx = resume_state["next_chunk_idx"]
+        next_frame = resume_state.get("next_frame", start_frame + chunk_idx * chunk_size)
+        crop_region = tuple(resume_state["crop_region"])
+        last_bbox = resume_state.get("last_bbox")
+        if last_bbox is None:
+            # 이전 형식 체크포인트: 크롭 좌표 box prompt
+            last_bbox = _remap_bbox_to_original(resume_state["last_crop_bbox"], crop_region[0], crop_region[1],
+                                                frame_w, frame_h)
+        velocity = resume_state.get("velocity", 0.0)
+        consecutive_empty = resume_state["consecutive_empty"]
+        total_detected = resume_state["total_detected"]
+        _truncate_track(output_file, track_id, next_frame)
+        _log(f"체크포인트에서 재개: chunk={chunk_idx}, frame={next_frame}")
+
+    while (next_frame >= last_frame) if reverse else (next_frame <= last_frame):
         # 취소 체크
         if job_id and is_cancelled(job_id):
             _log(f"작업 취소됨 (chunk {chunk_idx})")
             return "cancelled"
 
-        chunk_offset = chunk_idx * chunk_size
-        chunk_start = start_frame + chunk_offset
-        chunk_frames = min(chunk_size, remaining - chunk_offset)
-        chunk_results = []  # 청크별 결과 (증분저장용)
+        chunk_frames = min(chunk_size, abs(last_frame - next_frame) + 1)
+        # 역방향: 청크 마지막 프레임이 이전 청크(더 뒤 프레임)와 맞닿는 프롬프트 프레임
+        chunk_start = next_frame - chunk_frames + 1 if reverse else next_frame
+        cx1, cy1 = crop_region[0], crop_region[1]
+        resize = adaptive and (crop_region[2] - cx1, crop_region[3] - cy1) != (crop_size, crop_size)
+        scale = _crop_scale(crop_region, crop_size) if resize else (1.0, 1.0)
+        split_at = None
 
         # ── 청크 프레임 추출 ──
         temp_dir = None
         try:
             temp_dir, extracted = _extract_crop_frames(
-                video_path, chunk_start, crop_region, chunk_frames
+                video_path, chunk_start, crop_region, chunk_frames, out_size=crop_size if resize else None
             )
             _log(f"청크 {chunk_idx}: 프레임 {chunk_start}~{chunk_start+extracted-1} ({extracted}개)")
+            prompt_idx = extracted - 1 if reverse else 0
 
             # ── SAM2 초기화 + 프롬프트 ──
-            inference_state = predictor.init_state(
-                video_path=temp_dir,
-                async_loading_frames=False,
-            )
+            inference_state = _init_state(predictor, temp_dir)
 
-            if chunk_idx == 0:
+            if last_bbox is None:
                 # 첫 청크: 클릭 포인트 프롬프트
+                local_x, local_y = _remap_point_to_crop(click_x, click_y, cx1, cy1, scale)
                 predictor.add_new_points_or_box(
                     inference_state=inference_state,
-                    frame_idx=0,
+                    frame_idx=prompt_idx,
                     obj_id=1,
                     points=np.array([[local_x, local_y]], dtype=np.float32),
                     labels=np.array([1], dtype=np.int32),
@@ -319,34 +746,19 @@ def _continuous_tracking(
                 # 후속 청크: 이전 청크 마지막 bbox를 box prompt로 사용
                 predictor.add_new_points_or_box(
                     inference_state=inference_state,
-                    frame_idx=0,
+                    frame_idx=prompt_idx,
                     obj_id=1,
-                    box=np.array(last_crop_bbox, dtype=np.float32),
+                    box=np.array(_bbox_to_crop(last_bbox, crop_region, scale), dtype=np.float32),
                 )
 
             # ── 전파 + bbox 추출 + 증분저장 (통합) ──
-            chunk_base = 0.05 + 0.85 * chunk_offset / remaining
-            chunk_range = 0.85 * chunk_frames / remaining
-            pending_save = []
-
-            for out_idx, out_obj_ids, out_mask_logits in predictor.propagate_in_video(inference_state):
-                _progress(min(chunk_base + chunk_range * (out_idx + 1) / extracted, 0.9))
+            for n, (out_idx, boxes) in enumerate(
+                    _propagate_bboxes(predictor, inference_state, prompt_idx, reverse)):
                 actual_frame = chunk_start + out_idx
+                _progress(min(0.05 + 0.85 * (abs(actual_frame - start_frame) + 1) / remaining, 0.9))
+                hit = boxes[1]
 
-                if 1 not in out_obj_ids:
-                    consecutive_empty += 1
-                    if consecutive_empty >= _EMPTY_STOP_THRESHOLD:
-                        _log(f"연속 {_EMPTY_STOP_THRESHOLD}프레임 미검출 → 추적 종료 (frame {actual_frame})")
-                        stopped_early = True
-                        break
-                    continue
-
-                mask_idx = list(out_obj_ids).index(1)
-                mask = out_mask_logits[mask_idx].squeeze(0)
-                mask_binary = (mask > 0).byte().cpu().numpy()
-                crop_bbox = _mask_to_bbox(mask_binary)
-
-                if crop_bbox is None:
+                if hit is None:
                     consecutive_empty += 1
                     if consecutive_empty >= _EMPTY_STOP_THRESHOLD:
                         _log(f"연속 {_EMPTY_STOP_THRESHOLD}프레임 미검출 → 추적 종료 (frame {actual_frame})")
@@ -355,57 +767,72 @@ def _continuous_tracking(
                     continue
 
                 consecutive_empty = 0
-                last_crop_bbox = crop_bbox
-                orig_bbox = _remap_bbox_to_original(crop_bbox, cx1, cy1, frame_w, frame_h)
-
-                entry = {
-                    "frame": actual_frame,
-                    "track_id": track_id,
-                    "bbox": orig_bbox,
-                    "type": 2,
-                    "object": 1,
-                }
-                chunk_results.append(entry)
-                all_results.append(entry)
-                total_detected += 1
-                pending_save.append(entry)
-
-                # 1프레임마다 증분저장 (프론트엔드 실시간 반영)
-                _write_merged_json(output_file, pending_save, metadata)
-                pending_save = []
+                fields = _hit_to_original(hit, cx1, cy1, frame_w, frame_h, scale, save_mask)
+                orig_bbox = fields["bbox"]
+                velocity = _bbox_velocity(last_bbox, orig_bbox, velocity)
+                last_bbox = orig_bbox
+
+                if actual_frame != start_frame or record_start:
+                    entry = {
+                        "frame": actual_frame,
+                        "track_id": track_id,
+                        **fields,
+                        "type": 2,
+                        "object": 1,
+                    }
+                    total_detected += 1
+                    # 1프레임마다 증분저장 (프론트엔드 실시간 반영)
+                    _write_merged_json(output_file, [entry], metadata)
+
+                # 객체가 크롭 가장자리에 가까우면 여기서 청크를 끊고 다음 프레임부터 크롭을 다시 잡음
+                if adaptive and n + 1 >= _MIN_SPLIT_FRAMES and _near_crop_edge(orig_bbox, crop_region, frame_w, frame_h):
+                    split_at = actual_frame
+                    break
 
         finally:
             if temp_dir and os.path.isdir(temp_dir):
                 shutil.rmtree(temp_dir, ignore_errors=True)
+            # 청크 상태(프레임 텐서, 메모리 뱅크) 해제 후 메모리 기록
+            inference_state = None
+            _empty_device_cache()
+            if memory_log is not None:
+                memory_log(f"SAM2 청크 {chunk_idx} 완료 (frame {chunk_start}, {chunk_frames}프레임)")
 
         if stopped_early:
             break
 
         # 다음 청크 프롬프트를 위한 bbox가 없으면 중단
-        if last_crop_bbox is None:
+        if last_bbox is None:
             _log("첫 청크에서 객체 미검출 → 추적 종료")
             break
 
-        # ── 다음 청크를 위한 크롭 영역 갱신 ──
-        bbox_cx = cx1 + (last_crop_bbox[0] + last_crop_bbox[2]) // 2
-        bbox_cy = cy1 + (last_crop_bbox[1] + last_crop_bbox[3]) // 2
-
-        new_crop_region = _compute_crop_region(bbox_cx, bbox_cy, frame_w, frame_h, crop_size)
-        new_cx1, new_cy1 = new_crop_region[0], new_crop_region[1]
-        new_crop_w = new_crop_region[2] - new_crop_region[0]
-        new_crop_h = new_crop_region[3] - new_crop_region[1]
-
-        # last_crop_bbox를 새 크롭 좌표계로 변환 + 경계 클리핑
-        last_crop_bbox = [
-            max(0, min(last_crop_bbox[0] + cx1 - new_cx1, new_crop_w)),
-            max(0, min(last_crop_bbox[1] + cy1 - new_cy1, new_crop_h)),
-            max(0, min(last_crop_bbox[2] + cx1 - new_cx1, new_crop_w)),
-            max(0, min(last_crop_bbox[3] + cy1 - new_cy1, new_crop_h)),
-        ]
-
-        crop_region = new_crop_region
-        cx1, cy1 = new_cx1, new_cy1
-        _log(f"크롭 영역 갱신: ({new_cx1},{new_cy1})-({new_crop_region[2]},{new_crop_region[3]})")
+        if split_at is not None:
+            _log(f"객체가 크롭 가장자리에 근접 → frame {split_at}에서 청크 분할")
+            next_frame = split_at + step
+        else:
+            next_frame = (chunk_start if reverse else chunk_start + chunk_frames - 1) + step
+
+        # ── 다음 청크를 위한 크롭 영역 갱신 (마지막 bbox 중심, adaptive_crop이면 크기도 조정) ──
+        size = _adaptive_crop_size(last_bbox, velocity, crop_size, frame_w, frame_h) if adaptive else crop_size
+        crop_region = _compute_crop_region((last_bbox[0] + last_bbox[2]) // 2, (last_bbox[1] + last_bbox[3]) // 2,
+                                           frame_w, frame_h, size)
+        _log(f"크롭 영역 갱신: ({crop_region[0]},{crop_region[1]})-({crop_region[2]},{crop_region[3]})")
+        chunk_idx += 1
+
+        # ── 청크 경계 체크포인트 (다음 청크 시작 상태) ──
+        if job_id and checkpoint_base is not None:
+            save_checkpoint(job_id, "sam2", dict(
+                checkpoint_base,
+                track_id=track_id,
+                chunk_size=chunk_size,
+                next_chunk_idx=chunk_idx,
+                next_frame=next_frame,
+                crop_region=list(crop_region),
+                last_bbox=last_bbox,
+                velocity=velocity,
+                consecutive_empty=consecutive_empty,
+                total_detected=total_detected,
+            ))
 
     _log(f"연속 추적 완료: {total_detected}프레임 검출")
 
@@ -420,15 +847,21 @@ def _continuous_tracking(
 
 # ─── 메인 함수 ────────────────────────────────────────────────────────
 
-def selectdetector_sam2(video_path, FrameNo, Coordinate, log_queue, progress_callback=None, job_id=None):
+@_with_sam2_precision
+def selectdetector_sam2(video_path, FrameNo, Coordinate, log_queue, progress_callback=None, job_id=None, resume=False,
+                        direction=None, points=None):
     """SAM2 기반 선택객체 탐지
 
     Args:
         video_path: 비디오 파일 경로
-        FrameNo: 클릭 프레임 번호 (문자열)
-        Coordinate: 클릭 좌표 ("x,y" 문자열)
+        FrameNo: 클릭 프레임 번호 (문자열, points만 쓰면 None)
+        Coordinate: 클릭 좌표 ("x,y" 문자열, points만 쓰면 None)
         log_queue: 로그 deque
         progress_callback: 진행률 콜백 (0.0~1.0)
+        job_id: 진행률/취소/체크포인트에 사용할 작업 ID
+        resume: True면 job_id의 체크포인트 청크부터 연속 추적 재개
+        direction: forward|backward|both (None이면 config.ini [sam2] direction)
+        points: 추가 선택 [(FrameNo, Coordinate), ...] — 모든 객체를 한 번의 전파로 추적 (고정 프레임 모드)
 
     Returns:
         성공 시 output_file 경로, 실패 시 에러 문자열
@@ -453,16 +886,19 @@ def selectdetector_sam2(video_path, FrameNo, Coordinate, log_queue, progress_cal
             except Exception:
                 pass
 
+    def _memory_log(prefix):
+        from detector import _gpu_snapshot
+        _gpu_snapshot(prefix, log_queue, log_file_path)
+
     temp_dir = None
     try:
         # ─── 1. 입력 파싱 ──────────────────────────────────────
-        coord_parts = Coordinate.split(',')
-        click_x = int(coord_parts[0].strip())
-        click_y = int(coord_parts[1].strip())
-        start_frame = int(FrameNo)
+        clicks = _parse_clicks(FrameNo, Coordinate, points)
+        start_frame, click_x, click_y = clicks[0]
 
         crop_size = _config.getint('sam2', 'crop_size', fallback=384)
         forward_frames = _config.getint('sam2', 'forward_frames', fallback=5)
+        direction = _select_direction(direction)
         output_file = os.path.splitext(video_path)[0] + ".json"
 
         # 비디오 정보 읽기
@@ -475,8 +911,8 @@ def selectdetector_sam2(video_path, FrameNo, Coordinate, log_queue, progress_cal
         total_video_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         cap.release()
 
-        # 크롭 영역 계산
-        crop_region = _compute_crop_region(click_x, click_y, frame_w, frame_h, crop_size)
+        # 크롭 영역 계산 (다중 선택은 클릭별 크롭 영역의 합집합)
+        crop_region = _union_crop_region(clicks, frame_w, frame_h, crop_size)
         cx1, cy1, cx2, cy2 = crop_region
         _log(f"크롭 영역: ({cx1},{cy1})-({cx2},{cy2}), 크기: {cx2-cx1}x{cy2-cy1}")
 
@@ -487,25 +923,68 @@ def selectdetector_sam2(video_path, FrameNo, Coordinate, log_queue, progress_cal
             "video_height": frame_h,
             "video_fps": video_fps,
         }
-        track_id = _next_select_track_id(output_file)
-
-        if forward_frames == -1:
+        checkpoint_base = {"video_path": video_path, "FrameNo": str(start_frame), "Coordinate": f"{click_x},{click_y}",
+                           "direction": direction}
+        resume_state = None
+        if resume and job_id:
+            resume_state = load_checkpoint(job_id, kind="sam2")
+            if resume_state is not None and any(resume_state.get(k) != v for k, v in checkpoint_base.items()):
+                _log("체크포인트 무시 (요청 파라미터 불일치)")
+                resume_state = None
+
+        if forward_frames == -1 or resume_state is not None:
+            if len(clicks) > 1:
+                return "연속 추적 모드(forward_frames=-1)는 한 번에 한 객체만 선택할 수 있습니다."
+            # 재개 시 기존 track_id를 이어서 사용 (새 번호를 받으면 같은 객체가 두 트랙으로 나뉨)
+            track_id = resume_state["track_id"] if resume_state else _next_select_track_id(output_file)
             # ─── 연속 추적 모드 (청크 단위) ────────────────────
-            return _continuous_tracking(
-                video_path, start_frame, click_x, click_y,
-                crop_region, frame_w, frame_h, total_video_frames,
-                output_file, track_id, metadata,
-                _log, _progress, job_id=job_id,
-            )
+            # both: 정방향(체크포인트/재개 대상) → 역방향 순서로 같은 track_id에 저장
+            results = []
+            if direction in ("forward", "both"):
+                span = 0.5 if direction == "both" else 1.0
+                results.append(_continuous_tracking(
+                    video_path, start_frame, click_x, click_y,
+                    crop_region, frame_w, frame_h, total_video_frames,
+                    output_file, track_id, metadata,
+                    _log, lambda frac: _progress(frac * span), job_id=job_id,
+                    checkpoint_base=checkpoint_base, resume_state=resume_state, memory_log=_memory_log,
+                ))
+                if results[-1] == "cancelled":
+                    return "cancelled"
+            if direction in ("backward", "both"):
+                base = 0.5 if direction == "both" else 0.0
+                if resume_state is not None:
+                    # 재개 전 실행에서 저장된 역방향 결과 제거 (중복 방지)
+                    _truncate_track(output_file, track_id, start_frame - 1, reverse=True)
+                results.append(_continuous_tracking(
+                    video_path, start_frame, click_x, click_y,
+                    crop_region, frame_w, frame_h, total_video_frames,
+                    output_file, track_id, metadata,
+                    _log, lambda frac: _progress(base + frac * (1.0 - base)), job_id=job_id,
+                    reverse=True, record_start=direction == "backward", memory_log=_memory_log,
+                ))
+            if output_file in results:
+                _progress(1.0)
+                return output_file
+            return "cancelled" if "cancelled" in results else results[0]
         else:
             # ─── 고정 프레임 추적 모드 ─────────────────────────
-            num_frames = forward_frames + 1
-            _log(f"selectdetector_sam2 시작: frame={start_frame}, click=({click_x},{click_y}), crop={crop_size}, frames={num_frames}")
+            click_frames = [f for f, _, _ in clicks]
+            extract_start, _, num_frames = _direction_window(
+                min(click_frames), forward_frames, direction, end_frame=max(click_frames))
+            max_frames = _chunk_size()
+            if len(clicks) > 1 and num_frames > max_frames:
+                return (f"선택 프레임 간격이 너무 넓습니다 ({num_frames}프레임 > chunk_size {max_frames}) "
+                        f"— 가까운 프레임끼리 나누어 요청해주세요.")
+            _log(f"selectdetector_sam2 시작: frame={start_frame}, clicks={len(clicks)}, crop={crop_size}, "
+                 f"frames={num_frames}, direction={direction}")
             _progress(0.05)
 
-        # ─── 2. 크롭 프레임 추출 ──────────────────────────────
-        temp_dir, extracted = _extract_crop_frames(video_path, start_frame, crop_region, num_frames)
-        _log(f"크롭 프레임 추출: {extracted}개 → {temp_dir}")
+        # ─── 2. 크롭 프레임 추출 (backward/both는 클릭 프레임 앞 구간 포함) ──
+        temp_dir, extracted = _extract_crop_frames(video_path, extract_start, crop_region, num_frames)
+        _log(f"크롭 프레임 추출: {extracted}개 (frame {extract_start}~) → {temp_dir}")
+        if extracted <= max(click_frames) - extract_start:
+            raise ValueError(f"클릭 프레임 {max(click_frames)} 추출 실패 (추출 {extracted}개)")
         _progress(0.1)
 
         # Model loading progress tracking
@@ -524,82 +1003,61 @@ def selectdetector_sam2(video_path, FrameNo, Coordinate, log_queue, progress_cal
                 jobs[job_id]['phase'] = 'processing'
         _progress(0.2)
 
-        # ─── 4. 추론 상태 초기화 + 포인트 프롬프트 ────────────
-        inference_state = predictor.init_state(
-            video_path=temp_dir,
-            async_loading_frames=False,
-        )
-
-        local_x, local_y = _remap_point_to_crop(click_x, click_y, cx1, cy1)
-        _log(f"SAM2 포인트: local=({local_x},{local_y})")
-
-        predictor.add_new_points_or_box(
-            inference_state=inference_state,
-            frame_idx=0,
-            obj_id=1,
-            points=np.array([[local_x, local_y]], dtype=np.float32),
-            labels=np.array([1], dtype=np.int32),
-        )
+        # ─── 4. 추론 상태 초기화 + 객체별 포인트 프롬프트 ──────
+        inference_state = _init_state(predictor, temp_dir)
+
+        obj_ids = list(range(1, len(clicks) + 1))
+        track_ids = dict(zip(obj_ids, _next_select_track_ids(output_file, len(clicks))))
+        prompt_idx = {}
+        for obj_id, (frame_no, x, y) in zip(obj_ids, clicks):
+            prompt_idx[obj_id] = frame_no - extract_start
+            local_x, local_y = _remap_point_to_crop(x, y, cx1, cy1)
+            _log(f"SAM2 포인트: obj={obj_id}, frame={frame_no}, local=({local_x},{local_y})")
+            predictor.add_new_points_or_box(
+                inference_state=inference_state,
+                frame_idx=prompt_idx[obj_id],
+                obj_id=obj_id,
+                points=np.array([[local_x, local_y]], dtype=np.float32),
+                labels=np.array([1], dtype=np.int32),
+            )
+        ranges = _object_ranges(clicks, extract_start, forward_frames, direction)
         _progress(0.3)
 
         # ─── 5. 전파 + bbox 추출 + 증분저장 (통합) ──────────────
-        tracking_results = []
         detected_count = 0
-        consecutive_empty = 0
-        pending_save = []
-
-        for out_frame_idx, out_obj_ids, out_mask_logits in predictor.propagate_in_video(inference_state):
-            # 취소 체크
-            if job_id and is_cancelled(job_id):
-                _log(f"작업 취소됨 (frame {start_frame + out_frame_idx})")
-                return "cancelled"
-            _progress(0.3 + 0.6 * (out_frame_idx + 1) / extracted)
-            actual_frame = start_frame + out_frame_idx
-
-            if 1 not in out_obj_ids:
-                consecutive_empty += 1
-                if consecutive_empty >= _EMPTY_STOP_THRESHOLD:
-                    _log(f"연속 {_EMPTY_STOP_THRESHOLD}프레임 미검출 → 추적 종료 (frame {actual_frame})")
-                    break
-                continue
 
-            mask_idx = list(out_obj_ids).index(1)
-            mask = out_mask_logits[mask_idx].squeeze(0)
-            mask_binary = (mask > 0).byte().cpu().numpy()
-            crop_bbox = _mask_to_bbox(mask_binary)
+        save_mask = _save_mask()
 
-            if crop_bbox is None:
-                consecutive_empty += 1
-                if consecutive_empty >= _EMPTY_STOP_THRESHOLD:
-                    _log(f"연속 {_EMPTY_STOP_THRESHOLD}프레임 미검출 → 추적 종료 (frame {actual_frame})")
-                    break
-                continue
-
-            consecutive_empty = 0
-            orig_bbox = _remap_bbox_to_original(crop_bbox, cx1, cy1, frame_w, frame_h)
-
-            entry = {
-                "frame": actual_frame,
-                "track_id": track_id,
-                "bbox": orig_bbox,
+        def _save_frame(local_idx, hits):
+            # 1프레임마다 증분저장 (프론트엔드 실시간 반영)
+            nonlocal detected_count
+            _write_merged_json(output_file, [{
+                "frame": extract_start + local_idx,
+                "track_id": track_ids[obj_id],
+                **_hit_to_original(hit, cx1, cy1, frame_w, frame_h, save_mask=save_mask),
                 "type": 2,
                 "object": 1,
-            }
-            tracking_results.append(entry)
-            detected_count += 1
-            pending_save.append(entry)
-
-            # 1프레임마다 증분저장 (프론트엔드 실시간 반영)
-            _write_merged_json(output_file, pending_save, metadata)
-            pending_save = []
+            } for obj_id, hit in hits.items()], metadata)
+            detected_count += len(hits)
+
+        recorded = _track_objects(
+            predictor, inference_state, prompt_idx, ranges, direction, extracted, _save_frame,
+            progress=lambda frac: _progress(0.3 + 0.6 * frac),
+            cancelled=lambda: bool(job_id) and is_cancelled(job_id),
+            log=lambda obj_id, msg: _log(f"{track_ids[obj_id]}: {msg}"),
+        )
+        if recorded is None:
+            _log("작업 취소됨")
+            return "cancelled"
 
-        _log(f"bbox 변환 완료: {detected_count}/{extracted} 프레임 검출")
+        _log(f"bbox 변환 완료: {detected_count}/{extracted * len(obj_ids)} 프레임 검출 "
+             f"({', '.join(f'{track_ids[o]}={len(recorded[o])}' for o in obj_ids)})")
 
         if detected_count == 0:
             _log("에러: 모든 프레임에서 객체 미검출")
             return "선택한 위치에서 객체를 찾을 수 없습니다."
 
-        _log(f"JSON 저장 완료: {output_file} (track_id={track_id}, {detected_count}프레임)")
+        _log(f"JSON 저장 완료: {output_file} (track_id={','.join(track_ids.values())}, {detected_count}프레임)")
         _progress(1.0)
 
         return output_file
@@ -0,0 +1,253 @@
+"""
+SAM2 대화형 선택 세션 (/sam2/session)
+- 세션 생성 시 클릭 프레임 주변 크롭 구간을 한 번 추출해 inference_state(프레임 텐서)를 메모리에 유지
+- 같은 프레임의 추가 클릭(포인트/네거티브 포인트)은 캐시된 이미지 인코더 특징을 재사용하고
+  프롬프트 인코더 + 마스크 디코더만 다시 실행 → 클릭마다 bbox 즉시 반환
+- propagate: 현재 프롬프트로 구간 전파 → 영상 JSON에 type:2 저장 (다시 전파하면 세션 트랙 교체)
+- session_ttl초 동안 사용이 없으면 자동 종료, 동시 세션 수는 max_sessions로 제한
+
+config.ini [sam2]:
+    session_ttl = 300       ; 미사용 세션 자동 종료 (초)
+    max_sessions = 2        ; 동시에 유지할 세션 수 (세션마다 구간 프레임 텐서가 메모리에 상주)
+"""
+import os
+import time
+import uuid
+import shutil
+import logging
+import threading
+
+import cv2
+import numpy as np
+
+import sam2_detector as _sam2
+
+logger = logging.getLogger(__name__)
+
+_SWEEP_INTERVAL = 30    # 만료 세션 정리 주기 (초)
+
+
+class ObjectAfterPropagateError(RuntimeError):
+    """propagate 이후 새 obj_id 추가 (SAM2는 추적 시작 후 새 객체를 받지 않음)"""
+
+
+class Sam2Session:
+    """클릭 프레임 주변 크롭 구간의 SAM2 inference_state를 유지하는 세션
+
+    obj_id별로 포인트를 누적하고(clear_old_points=False), propagate 시 객체별 track_id를 할당합니다.
+    SAM2 호출은 세션 lock 안에서 실행 (같은 inference_state 동시 접근 방지).
+    """
+
+    def __init__(self, video_path, frame_no, click_x, click_y, direction=None):
+        self.session_id = uuid.uuid4().hex
+        self.video_path = video_path
+        self.output_file = os.path.splitext(video_path)[0] + ".json"
+        self.direction = _sam2._select_direction(direction)
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+        self.prompt_idx = {}    # obj_id → 첫 프롬프트 로컬 프레임
+        self.track_ids = {}     # obj_id → track_id (첫 propagate 시 할당, 이후 유지)
+
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"비디오 파일을 열 수 없습니다: {video_path}")
+        self.frame_w = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.frame_h = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.metadata = {
+            "video_file": os.path.basename(video_path),
+            "video_width": self.frame_w,
+            "video_height": self.frame_h,
+            "video_fps": cap.get(cv2.CAP_PROP_FPS),
+        }
+        cap.release()
+
+        crop_size = _sam2._config.getint('sam2', 'crop_size', fallback=384)
+        forward_frames = max(_sam2._config.getint('sam2', 'forward_frames', fallback=5), 1)
+        self.forward_frames = forward_frames
+        self.crop_region = _sam2._compute_crop_region(click_x, click_y, self.frame_w, self.frame_h, crop_size)
+        self.extract_start, _, num_frames = _sam2._direction_window(frame_no, forward_frames, self.direction)
+
+        temp_dir, self.extracted = _sam2._extract_crop_frames(video_path, self.extract_start, self.crop_region, num_frames)
+        try:
+            self.predictor = _sam2._get_sam2_model()
+            with self._autocast():
+                self.state = _sam2._init_state(self.predictor, temp_dir)
+        finally:
+            # init_state가 프레임을 텐서로 읽어 두므로 JPEG는 바로 삭제
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _autocast():
+        return _sam2._precision.autocast(_sam2._sam2_precision(), _sam2._sam2_device())
+
+    def _local_frame(self, frame_no):
+        local_idx = frame_no - self.extract_start
+        if not 0 <= local_idx < self.extracted:
+            raise ValueError(f"프레임 {frame_no}은 세션 구간({self.extract_start}~{self.extract_start + self.extracted - 1}) 밖입니다")
+        return local_idx
+
+    def add_point(self, frame_no, x, y, label=1, obj_id=1):
+        """포인트(label=1) 또는 네거티브 포인트(label=0) 추가 → 해당 프레임 마스크의 원본 좌표 bbox
+
+        같은 프레임이면 이미지 특징은 캐시를 쓰고 마스크 디코더만 다시 실행됩니다.
+        propagate 이후에는 이미 전파한 obj_id만 보정할 수 있습니다 (새 obj_id는 ObjectAfterPropagateError).
+        닫힌 세션이면 KeyError.
+        """
+        cx1, cy1, cx2, cy2 = self.crop_region
+        if not (cx1 <= x < cx2 and cy1 <= y < cy2):
+            raise ValueError(f"좌표 ({x},{y})가 세션 크롭 영역 ({cx1},{cy1})-({cx2},{cy2}) 밖입니다")
+        local_idx = self._local_frame(frame_no)
+        local_x, local_y = _sam2._remap_point_to_crop(x, y, cx1, cy1)
+
+        with self.lock, self._autocast():
+            if self.state is None:
+                raise KeyError(self.session_id)
+            if self.track_ids and obj_id not in self.track_ids:
+                raise ObjectAfterPropagateError(
+                    f"전파 후에는 새 객체(ObjId={obj_id})를 추가할 수 없습니다 (전파된 객체: {sorted(self.track_ids)})")
+            self.last_used = time.monotonic()
+            t0 = time.perf_counter()
+            _, out_obj_ids, out_masks = self.predictor.add_new_points_or_box(
+                inference_state=self.state,
+                frame_idx=local_idx,
+                obj_id=obj_id,
+                points=np.array([[local_x, local_y]], dtype=np.float32),
+                labels=np.array([label], dtype=np.int32),
+                clear_old_points=False,
+            )
+            self.prompt_idx[obj_id] = min(self.prompt_idx.get(obj_id, local_idx), local_idx)
+            mask = out_masks[list(out_obj_ids).index(obj_id)].squeeze(0)
+            crop_bbox = _sam2._mask_to_bbox((mask > 0).byte().cpu().numpy())
+            latency_ms = (time.perf_counter() - t0) * 1000.0
+
+        bbox = None if crop_bbox is None else _sam2._remap_bbox_to_original(crop_bbox, cx1, cy1, self.frame_w, self.frame_h)
+        return {"frame": frame_no, "obj_id": obj_id, "bbox": bbox, "latency_ms": round(latency_ms, 1)}
+
+    def propagate(self):
+        """현재 프롬프트로 세션 구간 전파 → 영상 JSON에 type:2 저장
+
+        이전 propagate 결과(같은 track_id)는 지우고 다시 저장합니다. 닫힌 세션이면 KeyError.
+        반환: {"output_file", "track_ids": {obj_id: track_id}, "frames": {track_id: 프레임 수}}
+        """
+        if not self.prompt_idx:
+            raise ValueError("세션에 포인트가 없습니다")
+        cx1, cy1 = self.crop_region[0], self.crop_region[1]
+
+        with self.lock, self._autocast():
+            if self.state is None:
+                raise KeyError(self.session_id)
+            self.last_used = time.monotonic()
+            new_objs = [o for o in self.prompt_idx if o not in self.track_ids]
+            self.track_ids.update(zip(new_objs, _sam2._next_select_track_ids(self.output_file, len(new_objs))))
+            for track_id in self.track_ids.values():
+                _sam2._truncate_track(self.output_file, track_id, 0)
+
+            before, after = _sam2._direction_span(self.forward_frames, self.direction)
+            ranges = {o: (idx - before, idx + after) for o, idx in self.prompt_idx.items()}
+
+            save_mask = _sam2._save_mask()
+
+            def _save_frame(local_idx, hits):
+                _sam2._write_merged_json(self.output_file, [{
+                    "frame": self.extract_start + local_idx,
+                    "track_id": self.track_ids[obj_id],
+                    **_sam2._hit_to_original(hit, cx1, cy1, self.frame_w, self.frame_h, save_mask=save_mask),
+                    "type": 2,
+                    "object": 1,
+                } for obj_id, hit in hits.items()], self.metadata)
+
+            recorded = _sam2._track_objects(
+                self.predictor, self.state, dict(self.prompt_idx), ranges, self.direction, self.extracted,
+                _save_frame)
+            self.last_used = time.monotonic()
+
+        return {
+            "output_file": self.output_file,
+            "track_ids": {str(o): t for o, t in self.track_ids.items()},
+            "frames": {self.track_ids[o]: len(recorded[o]) for o in recorded},
+        }
+
+    def close(self):
+        """inference_state 해제 (프레임 텐서/특징 캐시 메모리 반환)"""
+        with self.lock:
+            self.state = None
+        try:
+            _sam2._empty_device_cache()
+        except Exception:
+            pass
+
+
+class SessionStore:
+    """세션 ID → 세션, TTL 만료 정리 + 최대 세션 수 제한"""
+
+    def __init__(self, ttl=300, max_sessions=2):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._sweeper = None
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def reserve(self):
+        """새 세션 자리 확인 (만료 세션 정리 후에도 가득 차면 RuntimeError)"""
+        self.sweep()
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError(f"동시 세션 제한({self.max_sessions}개)에 도달했습니다")
+
+    def add(self, session):
+        with self._lock:
+            if len(self._sessions) >= self.max_sessions:
+                raise RuntimeError(f"동시 세션 제한({self.max_sessions}개)에 도달했습니다")
+            self._sessions[session.session_id] = session
+            self._start_sweeper()
+        return session
+
+    def get(self, session_id):
+        """세션 조회 (없거나 만료되면 KeyError), 조회 시 사용 시각 갱신"""
+        self.sweep()
+        with self._lock:
+            session = self._sessions[session_id]
+            session.last_used = time.monotonic()
+            return session
+
+    def close(self, session_id):
+        with self._lock:
+            session = self._sessions.pop(session_id)
+        session.close()
+
+    def sweep(self, now=None):
+        """last_used 이후 ttl초가 지난 세션 종료 → 닫은 세션 ID 목록"""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [sid for sid, s in self._sessions.items() if now - s.last_used > self.ttl]
+            sessions = [self._sessions.pop(sid) for sid in expired]
+        for session in sessions:
+            logger.info(f"[SAM2-SESSION] TTL 만료로 세션 종료: {session.session_id}")
+            session.close()
+        return expired
+
+    def _start_sweeper(self):
+        """세션이 있는 동안만 도는 만료 정리 데몬 스레드 (self._lock 안에서 호출)"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+
+        def _loop():
+            while True:
+                time.sleep(min(_SWEEP_INTERVAL, self.ttl))
+                self.sweep()
+                with self._lock:
+                    if not self._sessions:
+                        self._sweeper = None
+                        return
+
+        self._sweeper = threading.Thread(target=_loop, daemon=True)
+        self._sweeper.start()
+
+
+store = SessionStore(
+    ttl=_sam2._config.getint('sam2', 'session_ttl', fallback=300),
+    max_sessions=_sam2._config.getint('sam2', 'max_sessions', fallback=2),
+)
@@ -0,0 +1,163 @@
+"""
+Blur Tests
+
+Tests for the per-frame ROI planner in blur.py
+"""
+
+import numpy as np
+
+import blur
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+
+class TestRoiPlanner:
+    """Test cases for merging overlapping masking targets"""
+
+    def test_plan_regions(self):
+        """
+        Test grouping of overlapping, nearby and distant rects
+
+        Expected:
+        - Overlapping rects and rects within gap share one region
+        - A distant rect keeps its own region
+        - A merged region that grows into another rect absorbs it too
+        """
+        regions = blur._plan_regions([(0, 0, 10, 10), (8, 0, 20, 10), (100, 100, 110, 110)], 0)
+        assert regions == [((0, 0, 20, 10), [0, 1]), ((100, 100, 110, 110), [2])]
+        assert blur._plan_regions([(0, 0, 10, 10), (14, 0, 20, 10)], 5) == [((0, 0, 20, 10), [0, 1])]
+        assert len(blur._plan_regions([(0, 0, 10, 10), (14, 0, 20, 10)], 3)) == 2
+        chain = blur._plan_regions([(0, 0, 10, 10), (30, 0, 40, 10), (9, 0, 31, 10)], 0)
+        assert chain == [((0, 0, 40, 10), [0, 1, 2])]
+
+    def test_overlapping_boxes_blurred_once(self):
+        """
+        Test that overlapping boxes are masked like the single box of their union
+
+        Expected:
+        - Two overlapping boxes give the same frame as their union box (no double blur)
+        """
+        frame = _frame()
+        pair = [{"bbox": [20, 20, 80, 60], "object": 1}, {"bbox": [50, 20, 110, 60], "object": 1}]
+        union = [{"bbox": [20, 20, 110, 60], "object": 1}]
+        for tool in ('0', '1'):
+            assert np.array_equal(blur._process_frame_with_logs(frame, pair, '2', tool, 3),
+                                  blur._process_frame_with_logs(frame, union, '2', tool, 3))
+
+    def test_merged_coverage_is_union(self):
+        """
+        Test that a merged region changes only pixels covered by its members
+
+        Expected:
+        - Pixels between two nearby boxes stay original
+        - Both boxes are changed
+        """
+        frame = _frame()
+        logs = [{"bbox": [20, 20, 50, 60], "object": 1}, {"bbox": [60, 20, 90, 60], "object": 1}]
+        out = blur._process_frame_with_logs(frame, logs, '2', '1', 3)
+        assert np.array_equal(out[20:60, 50:60], frame[20:60, 50:60])
+        assert not np.array_equal(out[20:60, 20:50], frame[20:60, 20:50])
+        assert not np.array_equal(out[20:60, 60:90], frame[20:60, 60:90])
+
+
+class TestPolyMaskCache:
+    """Test cases for the cached polygon rasterization"""
+
+    def test_repeated_polygon_reuses_mask(self):
+        """
+        Test that a polygon repeated over frames is rasterized once
+
+        Expected:
+        - A static zone on several frames is a cache hit after the first frame
+        - Cached masks are shared and read-only
+        """
+        cache = blur._PolyMaskCache()
+        masks = [cache.get(40, 60, np.array([[0, 0], [59, 0], [30, 39]])) for _ in range(5)]
+        assert cache.misses == 1 and cache.hits == 4
+        assert all(m is masks[0] for m in masks)
+        assert not masks[0].flags.writeable
+
+    def test_eviction_by_size(self):
+        """
+        Test that the least recently used masks are evicted over the byte limit
+
+        Expected:
+        - The cache keeps at most max_bytes of masks, dropping the oldest first
+        """
+        cache = blur._PolyMaskCache(max_bytes=2 * 100 * 100)
+        tri = np.array([[0, 0], [99, 0], [0, 99]])
+        a = cache.get(100, 100, tri)
+        cache.get(100, 100, tri[::-1])
+        cache.get(100, 100, tri)                 # a를 최근 사용으로 갱신
+        cache.get(100, 100, np.array([[0, 0], [99, 99], [0, 99]]))
+        assert cache.get(100, 100, tri) is a
+        assert cache.misses == 3
+
+    def test_static_zone_masking(self, monkeypatch):
+        """
+        Test that masking the same polygon zone on many frames uses the cache
+
+        Expected:
+        - Output matches the uncached rasterization
+        - Only the first frame rasterizes the polygon
+        """
+        cache = blur._PolyMaskCache()
+        monkeypatch.setattr(blur, "_poly_mask_cache", cache)
+        frame = _frame()
+        zone = [{"bbox": [[10, 10], [90, 15], [60, 80]], "object": 1, "type": 4}]
+        outs = [blur._process_frame_with_logs(frame, zone, '2', '1', 3) for _ in range(10)]
+        assert cache.misses == 1 and cache.hits == 9
+
+        expected = frame.copy()
+        mask = blur._poly_to_mask(71, 81, [(0, 0), (80, 5), (50, 70)]) == 255
+        pad = blur._effect_pad('1', 3)
+        effected = blur._apply_effect_roi(frame[0:81 + pad, 0:91 + pad], '1', 3)[10:81, 10:91]
+        np.copyto(expected[10:81, 10:91], effected, where=mask[..., None])
+        assert np.array_equal(outs[-1], expected)
+
+
+class TestInplaceMasking:
+    """Test cases for the allocation-free masking path"""
+
+    def test_inplace_matches_copy(self):
+        """
+        Test that in-place processing gives the same frame as the copying path
+
+        Expected:
+        - Every range and tool matches the copy result
+        - The result is written into the decoded frame buffer itself
+        """
+        from detection_table import DetectionTable
+
+        frame = _frame()
+        entries = [{"bbox": [10, 10, 50, 40], "object": 1},
+                   {"bbox": [[60, 20], [120, 30], [90, 90]], "object": 1},
+                   {"bbox": [100, 70, 150, 110], "object": 2}]
+        table = DetectionTable.from_entries((0, e) for e in entries)
+        scratch = blur._Scratch()
+        for masking_range in ('0', '1', '2', '3'):
+            for tool in ('0', '1'):
+                expected = blur._process_frame_rows(frame, table, 0, len(table), masking_range, tool, 3)
+                buf = frame.copy()
+                out = blur._process_frame_rows(buf, table, 0, len(table), masking_range, tool, 3,
+                                               inplace=True, scratch=scratch)
+                assert out is buf
+                assert np.array_equal(out, expected)
+
+    def test_scratch_reuses_buffer(self):
+        """
+        Test that scratch buffers are reused across frames
+
+        Expected:
+        - A smaller or equal request returns a view of the same memory
+        - A larger request grows the buffer
+        """
+        scratch = blur._Scratch()
+        a = scratch.take('effect', (40, 60, 3))
+        b = scratch.take('effect', (30, 20, 3))
+        assert np.shares_memory(a, b) and b.flags.c_contiguous
+        c = scratch.take('effect', (100, 100, 3))
+        assert c.shape == (100, 100, 3)
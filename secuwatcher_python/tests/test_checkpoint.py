@@ -0,0 +1,246 @@
+"""
+Checkpoint Tests
+
+Tests for resumable detection jobs (core.checkpoint, detector/sam2_detector
+resume helpers and the /resume/{job_id} endpoint)
+"""
+
+import os
+import json
+import time
+
+import pytest
+
+from core import state
+from core import checkpoint
+
+
+@pytest.fixture
+def jobs_dir(temp_config_dir, monkeypatch):
+    monkeypatch.setattr(state, "_jobs_state_dir", temp_config_dir)
+    return temp_config_dir
+
+
+def _write_frames(path, frames):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"schema_version": "1.0.0", "metadata": {}, "frames": frames}, f)
+
+
+class TestCheckpointStore:
+    """Test cases for saving, loading and deleting checkpoints"""
+
+    def test_save_load_roundtrip(self, jobs_dir):
+        """
+        Test that a saved checkpoint loads back with its payload
+
+        Expected:
+        - Payload fields and kind are preserved
+        - No temporary file is left behind
+        """
+        assert checkpoint.save_checkpoint("job1", "autodetect", {"frame_index": 300, "tracker": {"frame_id": 300}})
+        ckpt = checkpoint.load_checkpoint("job1", kind="autodetect")
+        assert ckpt["frame_index"] == 300
+        assert ckpt["tracker"] == {"frame_id": 300}
+        assert ckpt["kind"] == "autodetect"
+        assert os.listdir(jobs_dir) == ["job1.ckpt"]
+
+    def test_load_rejects_missing_corrupt_and_wrong_kind(self, jobs_dir):
+        """
+        Test that unusable checkpoints are ignored
+
+        Expected:
+        - Missing, corrupt and kind-mismatched checkpoints return None
+        """
+        assert checkpoint.load_checkpoint("missing") is None
+
+        with open(os.path.join(jobs_dir, "bad.ckpt"), "wb") as f:
+            f.write(b"not a pickle")
+        assert checkpoint.load_checkpoint("bad") is None
+
+        checkpoint.save_checkpoint("job2", "sam2", {})
+        assert checkpoint.load_checkpoint("job2", kind="autodetect") is None
+
+    def test_stale_checkpoint_removed_with_job_state(self, jobs_dir):
+        """
+        Test that the 24h cleanup in load_job_states also removes the checkpoint
+
+        Expected:
+        - Both the job state and checkpoint files are deleted
+        """
+        with open(os.path.join(jobs_dir, "old.json"), "w") as f:
+            json.dump({"job_id": "old", "status": "running", "updated_at": time.time() - 48 * 3600}, f)
+        checkpoint.save_checkpoint("old", "autodetect", {})
+
+        state.load_job_states()
+        assert not os.path.exists(os.path.join(jobs_dir, "old.json"))
+        assert checkpoint.load_checkpoint("old") is None
+
+    def test_interrupted_job_marked_resumable(self, jobs_dir):
+        """
+        Test that a restored interrupted job reports whether it can be resumed
+
+        Expected:
+        - status becomes interrupted and resumable is True when a checkpoint exists
+        """
+        with open(os.path.join(jobs_dir, "live.json"), "w") as f:
+            json.dump({"job_id": "live", "status": "running", "updated_at": time.time()}, f)
+        checkpoint.save_checkpoint("live", "autodetect", {})
+
+        state.load_job_states()
+        try:
+            assert state.jobs["live"]["status"] == "interrupted"
+            assert state.jobs["live"]["resumable"] is True
+        finally:
+            state.jobs.pop("live", None)
+
+
+class TestResumeHelpers:
+    """Test cases for restoring partial results on resume"""
+
+    def test_load_detected_results_before_frame(self, temp_config_dir):
+        """
+        Test that only type:1 entries before the checkpoint frame are restored
+
+        Expected:
+        - Entries at or after the checkpoint frame are dropped
+        - Non type:1 entries are not restored
+        """
+        from detector import _load_detected_results
+
+        path = os.path.join(temp_config_dir, "v.json")
+        entry = {"track_id": "1_1", "bbox": [0, 0, 1, 1], "score": 0.9, "class_id": 0, "type": 1, "object": 1}
+        _write_frames(path, {
+            "10": [entry, dict(entry, track_id="2_1", type=2)],
+            "299": [entry],
+            "300": [entry],
+        })
+        restored = _load_detected_results(path, 300)
+        assert [(r["frame"], r["track_id"]) for r in restored] == [(10, "1_1"), (299, "1_1")]
+
+    def test_truncate_track_from_frame(self, temp_config_dir):
+        """
+        Test that a resumed SAM2 track drops the partial chunk only
+
+        Expected:
+        - The track's entries from from_frame on are removed
+        - Other tracks and earlier frames are kept
+        """
+        from sam2_detector import _truncate_track
+
+        path = os.path.join(temp_config_dir, "v.json")
+        a = {"track_id": "2_1", "bbox": [0, 0, 1, 1], "type": 2}
+        b = {"track_id": "1_5", "bbox": [0, 0, 1, 1], "type": 1}
+        _write_frames(path, {"5": [a], "10": [a, b], "11": [a]})
+        _truncate_track(path, "2_1", 10)
+
+        with open(path, encoding="utf-8") as f:
+            frames = json.load(f)["frames"]
+        assert frames == {"5": [a], "10": [b]}
+
+
+class TestResumeEndpoint:
+    """Test cases for POST /resume/{job_id}"""
+
+    def test_resume_without_checkpoint(self, test_client, jobs_dir):
+        """
+        Test resuming a job that has no checkpoint
+
+        Expected:
+        - Status code should be 404
+        """
+        response = test_client.post("/resume/nojob")
+        assert response.status_code == 404
+
+    def test_resume_running_job_conflicts(self, test_client, jobs_dir):
+        """
+        Test that a running job cannot be resumed twice
+
+        Expected:
+        - Status code should be 409
+        """
+        state.jobs["busy"] = {"status": "running"}
+        try:
+            response = test_client.post("/resume/busy")
+            assert response.status_code == 409
+        finally:
+            state.jobs.pop("busy", None)
+
+
+class TestDetectionTaskResult:
+    """Test cases for finishing a detection job from its result"""
+
+    def _run(self, monkeypatch, job_id, result):
+        import detector
+        from routers import detection
+        from models.schemas import AutodetectRequest
+
+        monkeypatch.setattr(detector, "autodetector", lambda *args, **kwargs: result)
+        monkeypatch.setattr(detection, "get_config", lambda event: (None, 0.5, [0]))
+        state.jobs[job_id] = {"status": "running"}
+        checkpoint.save_checkpoint(job_id, "autodetect", {"frame_index": 900})
+        detection._run_detection_task(job_id, "1", "video.mp4", AutodetectRequest(Event="1", VideoPath="video.mp4"))
+
+    def test_error_result_keeps_checkpoint(self, jobs_dir, monkeypatch):
+        """
+        Test that an error string returned by the detector fails the job but keeps it resumable
+
+        Expected:
+        - status is error with the returned message
+        - The checkpoint is kept for /resume
+        """
+        try:
+            self._run(monkeypatch, "failjob", "JSON 파일 저장 실패: disk full")
+            assert state.jobs["failjob"]["status"] == "error"
+            assert "JSON 파일 저장 실패" in state.jobs["failjob"]["error"]
+            assert checkpoint.load_checkpoint("failjob", kind="autodetect") is not None
+        finally:
+            state.jobs.pop("failjob", None)
+
+    def test_success_result_deletes_checkpoint(self, jobs_dir, monkeypatch):
+        """
+        Test that a list of result files completes the job
+
+        Expected:
+        - status is completed and the checkpoint is deleted
+        """
+        try:
+            self._run(monkeypatch, "okjob", [os.path.join(jobs_dir, "video.json")])
+            assert state.jobs["okjob"]["status"] == "completed"
+            assert checkpoint.load_checkpoint("okjob") is None
+        finally:
+            state.jobs.pop("okjob", None)
+
+    def test_select_fallback_track_id_per_click(self, jobs_dir, monkeypatch):
+        """
+        Test that the DeepSORT fallback saves every click of one request as its own track
+
+        Expected:
+        - Each click gets a distinct type:2 track_id
+        - Direction is passed through to selectdetector
+        """
+        import detector
+        from routers import detection
+        from models.schemas import AutodetectRequest
+
+        calls = []
+        video = os.path.join(jobs_dir, "video.mp4")
+        output = os.path.join(jobs_dir, "video.json")
+        with open(output, "w", encoding="utf-8") as f:
+            f.write('{"frames": {"0": [{"track_id": "2_3", "type": 2}]}}')
+
+        def select(video_path, frame_no, coordinate, conf, log_queue, progress, direction=None, track_id=None):
+            calls.append((frame_no, direction, track_id))
+            return output
+
+        monkeypatch.setattr(detection.importlib.util, "find_spec", lambda name: None)
+        monkeypatch.setattr(detector, "selectdetector", select)
+        monkeypatch.setattr(detection, "get_config", lambda event: (None, 0.5))
+        state.jobs["selectjob"] = {"status": "running"}
+        try:
+            request = AutodetectRequest(Event="2", VideoPath="video.mp4", FrameNo="5", Coordinate="1,1",
+                                        Direction="backward", Points=[{"FrameNo": "9", "Coordinate": "2,2"}])
+            detection._run_detection_task("selectjob", "2", video, request)
+            assert calls == [("5", "backward", "2_4"), ("9", "backward", "2_5")]
+            assert state.jobs["selectjob"]["status"] == "completed"
+        finally:
+            state.jobs.pop("selectjob", None)
@@ -0,0 +1,201 @@
+"""
+Database Tests
+
+Tests for the SQLite DRM layer (core.database) and the /drm/lookup endpoint
+"""
+
+import os
+import hashlib
+import threading
+
+import pytest
+
+from core import database
+
+
+def _row(n):
+    return {
+        "file_hash": hashlib.sha256(str(n).encode()).hexdigest(),
+        "ori_file_name": f"video{n}.mp4",
+        "org_filepath": "/videos",
+        "masking_file_name": f"video{n}_masked.mp4",
+        "masking_status": "s0",
+        "enc_file_name": f"video{n}.sphereax",
+        "enc_status": "s0",
+        "play_date": "2030-01-01",
+        "play_count": 99,
+    }
+
+
+@pytest.fixture
+def db_path(temp_config_dir):
+    path = os.path.join(temp_config_dir, "test.db")
+    yield path
+    database.close_connections()
+
+
+class TestDrmDatabase:
+    """Test cases for connection reuse, indexes and inserts"""
+
+    def test_connection_is_reused_per_thread(self, db_path):
+        """
+        Test that the same thread gets the same persistent connection
+
+        Expected:
+        - Two calls return the identical connection object
+        - Journal mode is WAL
+        """
+        conn = database.get_connection(db_path)
+        assert database.get_connection(db_path) is conn
+        assert conn.execute("PRAGMA journal_mode;").fetchone()[0].lower() == "wal"
+
+    def test_lookup_indexes_exist(self, db_path):
+        """
+        Test that file_hash and enc_file_name are indexed
+
+        Expected:
+        - Both indexes are present in sqlite_master
+        - Lookup by hash uses the file_hash index
+        """
+        conn = database.get_connection(db_path)
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+        assert "idx_drm_info_file_hash" in names
+        assert "idx_drm_info_enc_file_name" in names
+
+        plan = " ".join(str(tuple(r)) for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM tb_drm_info WHERE file_hash = ?", ("x",)))
+        assert "idx_drm_info_file_hash" in plan
+
+    def test_insert_and_lookup(self, db_path):
+        """
+        Test single insert followed by lookup by hash
+
+        Expected:
+        - The inserted row is returned with its columns
+        """
+        row = _row(1)
+        database.insert_drm_info(**row, db_path=db_path)
+        found = database.lookup_drm_by_hash(row["file_hash"], db_path=db_path)
+        assert len(found) == 1
+        assert found[0]["enc_file_name"] == "video1.sphereax"
+
+    def test_bulk_insert(self, db_path):
+        """
+        Test bulk insert in a single transaction
+
+        Expected:
+        - Return value equals the number of rows
+        - Every row can be looked up
+        """
+        rows = [_row(n) for n in range(50)]
+        assert database.insert_drm_info_many(rows, db_path=db_path) == 50
+        assert database.insert_drm_info_many([], db_path=db_path) == 0
+        for r in rows[::10]:
+            assert database.lookup_drm_by_hash(r["file_hash"], db_path=db_path)
+
+
+class TestDrmWriter:
+    """Test cases for the batched DRM writer used by /encrypt jobs"""
+
+    def test_concurrent_jobs_are_batched(self, db_path, monkeypatch):
+        """
+        Test that rows submitted from many job threads are written in few transactions
+
+        Expected:
+        - Every future resolves and every row can be looked up
+        - Rows are grouped into fewer insert_drm_info_many calls than jobs
+        - All writes happen on the single writer thread
+        """
+        calls = []
+        original = database.insert_drm_info_many
+
+        def recording(rows, db_path=None):
+            calls.append((len(rows), threading.get_ident()))
+            return original(rows, db_path=db_path)
+
+        monkeypatch.setattr(database, "insert_drm_info_many", recording)
+        writer = database.DrmWriter(db_path=db_path, linger=0.2)
+        futures = []
+        lock = threading.Lock()
+
+        def job(n):
+            future = writer.submit(_row(n))
+            with lock:
+                futures.append(future)
+
+        threads = [threading.Thread(target=job, args=(n,)) for n in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert all(f.result(timeout=5) for f in futures)
+        assert sum(n for n, _ in calls) == 20
+        assert len(calls) < 20
+        assert len({ident for _, ident in calls}) == 1
+        assert database.lookup_drm_by_hash(_row(7)["file_hash"], db_path=db_path)
+
+    def test_failure_is_reported(self, db_path, monkeypatch):
+        """
+        Test that a failed batch write is raised to the submitting job
+
+        Expected:
+        - The future raises the insert error
+        """
+        def failing(rows, db_path=None):
+            raise RuntimeError("disk full")
+
+        monkeypatch.setattr(database, "insert_drm_info_many", failing)
+        writer = database.DrmWriter(db_path=db_path)
+        with pytest.raises(RuntimeError):
+            writer.submit(_row(1)).result(timeout=5)
+
+
+class TestDrmLookupEndpoint:
+    """Test cases for GET /drm/lookup input validation"""
+
+    def test_invalid_hash_rejected(self, test_client):
+        """
+        Test that a malformed hash is rejected before touching the database
+
+        Expected:
+        - Status code should be 422
+        """
+        response = test_client.get("/drm/lookup", params={"file_hash": "not-a-hash"})
+        assert response.status_code == 422
+
+    def test_file_path_matches_both_hash_bases(self, test_client, temp_config_dir, monkeypatch):
+        """
+        Test that a file encrypted by an earlier version is found by file_path
+
+        Expected:
+        - A row hashed without the META trailer (earlier versions) is found
+        - A row hashed over the whole file is found
+        - The full-file hash alone does not match the earlier row
+        """
+        import struct
+        from routers import encryption
+
+        db = os.path.join(temp_config_dir, "lookup.db")
+        monkeypatch.setattr(database, "DB_FILE", db)
+        body = b"\x01" * 12 + b"ciphertext" + b"\x02" * 16
+        meta = b'{"play_count": 99}'
+        path = os.path.join(temp_config_dir, "video.sphereax")
+        with open(path, "wb") as f:
+            f.write(body + b"META" + struct.pack(">I", len(meta)) + meta)
+        with open(path, "rb") as f:
+            full_hash = hashlib.sha256(f.read()).hexdigest()
+        legacy_hash = hashlib.sha256(body).hexdigest()
+        assert encryption._sphereax_hashes(path) == (full_hash, legacy_hash)
+
+        try:
+            database.insert_drm_info(**dict(_row(1), file_hash=legacy_hash, enc_file_name="old.sphereax"))
+            response = test_client.get("/drm/lookup", params={"file_path": path})
+            assert response.status_code == 200
+            assert [r["enc_file_name"] for r in response.json()["records"]] == ["old.sphereax"]
+            assert test_client.get("/drm/lookup", params={"file_hash": full_hash}).status_code == 404
+
+            database.insert_drm_info(**dict(_row(2), file_hash=full_hash, enc_file_name="new.sphereax"))
+            response = test_client.get("/drm/lookup", params={"file_path": path})
+            assert [r["enc_file_name"] for r in response.json()["records"]] == ["new.sphereax", "old.sphereax"]
+        finally:
+            database.close_connections()
@@ -0,0 +1,134 @@
+"""
+Detection Cache Tests
+
+Tests for the content-addressed detection result cache (core.detect_cache)
+"""
+
+import os
+import time
+
+from core.detect_cache import DetectCache, video_fingerprint, cache_key
+
+
+def _entry(frame, track_id, interpolated=False):
+    entry = {"frame": frame, "track_id": track_id, "bbox": [1, 2, 30, 40], "score": 0.87,
+             "class_id": 0, "type": 1, "object": 1}
+    if interpolated:
+        entry["interpolated"] = True
+    return entry
+
+
+class TestFingerprint:
+    """Test cases for video fingerprints and cache keys"""
+
+    def test_fingerprint_tracks_content(self, temp_config_dir):
+        """
+        Test that the fingerprint follows file content, not path
+
+        Expected:
+        - Identical files give the same fingerprint
+        - A changed byte inside a large file changes the fingerprint
+        """
+        a = os.path.join(temp_config_dir, "a.mp4")
+        b = os.path.join(temp_config_dir, "b.mp4")
+        data = bytearray(os.urandom(4 * 1024 * 1024))
+        for path in (a, b):
+            with open(path, "wb") as f:
+                f.write(data)
+        assert video_fingerprint(a) == video_fingerprint(b)
+
+        data[-10] ^= 0xFF
+        with open(b, "wb") as f:
+            f.write(data)
+        assert video_fingerprint(a) != video_fingerprint(b)
+
+    def test_cache_key_depends_on_model_and_params(self):
+        """
+        Test that model weights and detection parameters are part of the key
+
+        Expected:
+        - Param order does not matter
+        - A different model hash or threshold gives a different key
+        """
+        base = cache_key("fp", "m1", {"conf_thres": 0.5, "classid": [0, 1]})
+        assert base == cache_key("fp", "m1", {"classid": [0, 1], "conf_thres": 0.5})
+        assert base != cache_key("fp", "m2", {"conf_thres": 0.5, "classid": [0, 1]})
+        assert base != cache_key("fp", "m1", {"conf_thres": 0.6, "classid": [0, 1]})
+
+    def test_multi_mode_params(self, monkeypatch):
+        """
+        Test the cache params of multi-video parallel detection
+
+        Expected:
+        - Stride, motion gate, tiling and segment settings are left out
+        - GPU batching and the CPU process pool get different keys from each other and from sequential detection
+        """
+        import detector
+
+        monkeypatch.setitem(detector.config["detect"], "tiled", "yes")
+        monkeypatch.setitem(detector.config["detect"], "detect_stride", "4")
+        batched = detector._cache_params(0.5, [0], multi="batched")
+        assert not {"detect_stride", "motion_threshold", "tiled", "segments"} & set(batched)
+        sequential = detector._cache_params(0.5, [0])
+        assert sequential["detect_stride"] == 4 and "tiled" in sequential
+        keys = {cache_key("fp", "m", p) for p in (batched, sequential, detector._cache_params(0.5, [0], multi="pool"))}
+        assert len(keys) == 3
+
+
+class TestDetectCache:
+    """Test cases for storing, loading and evicting cached results"""
+
+    def test_roundtrip_preserves_entries(self, temp_config_dir):
+        """
+        Test that cached results load back in autodetector format
+
+        Expected:
+        - Entries, info and the interpolated flag are preserved
+        - A missing key returns None
+        """
+        cache = DetectCache(temp_config_dir)
+        results = [_entry(0, "1_1"), _entry(1, "1_1", interpolated=True), _entry(1, "1_2")]
+        cache.put("k1", results, {"fps": 30.0})
+
+        loaded, info = cache.get("k1")
+        assert loaded == results
+        assert info == {"fps": 30.0}
+        assert cache.get("missing") is None
+
+    def test_corrupt_entry_removed(self, temp_config_dir):
+        """
+        Test that an unreadable cache file is treated as a miss
+
+        Expected:
+        - get returns None and the file is deleted
+        """
+        cache = DetectCache(temp_config_dir)
+        path = os.path.join(temp_config_dir, "bad.json.gz")
+        with open(path, "wb") as f:
+            f.write(b"not gzip")
+        assert cache.get("bad") is None
+        assert not os.path.exists(path)
+
+    def test_evicts_least_recently_used(self, temp_config_dir):
+        """
+        Test that eviction removes the least recently used entries first
+
+        Expected:
+        - A recently read entry survives eviction, the oldest one is removed
+        """
+        cache = DetectCache(temp_config_dir)
+        results = [_entry(i, f"1_{i}") for i in range(200)]
+        for key in ("old", "used", "new"):
+            cache.put(key, results)
+        now = time.time()
+        os.utime(os.path.join(temp_config_dir, "old.json.gz"), (now - 300, now - 300))
+        os.utime(os.path.join(temp_config_dir, "used.json.gz"), (now - 200, now - 200))
+        os.utime(os.path.join(temp_config_dir, "new.json.gz"), (now - 100, now - 100))
+        assert cache.get("used") is not None
+
+        cache.max_bytes = sum(os.path.getsize(os.path.join(temp_config_dir, f"{k}.json.gz"))
+                              for k in ("used", "new"))
+        cache.evict()
+        assert cache.get("old") is None
+        assert cache.get("used") is not None
+        assert cache.get("new") is not None
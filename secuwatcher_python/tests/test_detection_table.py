@@ -0,0 +1,102 @@
+"""
+Detection Table Tests
+
+Tests for the columnar detection map used by the masking engine
+"""
+
+import numpy as np
+
+import blur
+from detection_table import DetectionTable, KIND_POLY, KIND_MASK
+
+
+class TestDetectionTable:
+    """Test cases for building and indexing DetectionTable"""
+
+    def test_frame_index(self):
+        """
+        Test the CSR frame index over JSON frames
+
+        Expected:
+        - Rows of a frame are a contiguous slice in input order
+        - A frame without detections gives an empty range
+        """
+        table = DetectionTable.from_json_frames({
+            "3": [{"track_id": "1_1", "bbox": [0, 0, 10, 10], "type": 1, "object": 1},
+                  {"track_id": "1_2", "bbox": [5, 5, 8, 8], "type": 1, "object": 2}],
+            "7": [{"track_id": "1_1", "bbox": [1, 1, 11, 11], "type": 1, "object": 1}],
+        })
+        start, end = table.frame_rows(3)
+        assert (start, end) == (0, 2)
+        assert table.track[start:end].tolist() == ["1_1", "1_2"]
+        assert table.object[start:end].tolist() == [1, 2]
+        assert table.frame_rows(7) == (2, 3)
+        assert table.frame_rows(5) == (0, 0)
+
+    def test_rects_normalized_once(self):
+        """
+        Test that boxes are rounded and ordered at load time
+
+        Expected:
+        - Swapped corners are ordered, float corners rounded to int32
+        - Invalid boxes are dropped
+        """
+        table = DetectionTable.from_entries([
+            (0, {"bbox": [10.6, 20.2, 2.4, 3.5]}),
+            (0, {"bbox": "broken"}),
+            (0, {"bbox": [1, 2, "x", 4]}),
+        ])
+        assert len(table) == 1
+        assert table.rects.dtype == np.int32
+        assert table.rects.tolist() == [[2, 4, 11, 20]]
+
+    def test_unsorted_entries_with_polygons(self):
+        """
+        Test that out-of-order entries are sorted with their polygon points
+
+        Expected:
+        - Rows are in frame order, polygons keep their own points
+        - Polygon rows hold their bounding rect, mask rows keep the RLE
+        """
+        table = DetectionTable.from_entries([
+            (5, {"bbox": [[0, 0], [4, 0], [4, 4]]}),
+            (2, {"bbox": [1, 2, 3, 4], "mask": {"size": [3, 3], "counts": "09"}}),
+            (1, {"bbox": [[1, 1], [2, 1], [2, 2], [1, 2]]}),
+        ])
+        assert table.frame.tolist() == [1, 2, 5]
+        assert table.kind.tolist() == [KIND_POLY, KIND_MASK, KIND_POLY]
+        assert table.polygon(0).tolist() == [[1, 1], [2, 1], [2, 2], [1, 2]]
+        assert table.polygon(1).tolist() == []
+        assert table.polygon(2).tolist() == [[0, 0], [4, 0], [4, 4]]
+        assert table.rects[2].tolist() == [0, 0, 5, 5]
+        assert table.masks[1] == {"size": [3, 3], "counts": "09"}
+
+
+class TestTableMasking:
+    """Test cases for masking frames from table rows"""
+
+    def test_frame_rows_select_objects(self):
+        """
+        Test masking one frame of a multi-frame table by its row range
+
+        Expected:
+        - Unselected range changes only the unselected box of that frame
+        - Selected range leaves the unselected box untouched
+        """
+        rng = np.random.default_rng(0)
+        frame = rng.integers(0, 255, (80, 100, 3), dtype=np.uint8)
+        table = DetectionTable.from_entries([
+            (9, {"bbox": [10, 10, 40, 30], "object": 1}),
+            (9, {"bbox": [50, 40, 90, 70], "object": 2}),
+            (10, {"bbox": [0, 0, 100, 80], "object": 2}),
+        ])
+        start, end = table.frame_rows(9)
+
+        out = blur._process_frame_rows(frame, table, start, end, '3', '1', 3)
+        changed = np.any(out != frame, axis=2)
+        assert changed[40:70, 50:90].any()
+        assert not changed[:40].any() and not changed[:, :50].any()
+
+        out = blur._process_frame_rows(frame, table, start, end, '2', '1', 3)
+        assert np.array_equal(out[40:70, 50:90], frame[40:70, 50:90])
+        assert not np.array_equal(out[10:30, 10:40], frame[10:30, 10:40])
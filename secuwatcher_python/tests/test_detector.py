@@ -0,0 +1,270 @@
+"""
+Detector Tests
+
+Tests for model-independent helpers in detector.py
+"""
+
+import os
+
+import numpy as np
+
+import detector
+
+
+class TestInferenceBackend:
+    """Test cases for the [detect] backend selector and export cache"""
+
+    def test_unknown_backend_falls_back_to_torch(self, monkeypatch):
+        """
+        Test that an unsupported backend value is treated as torch
+
+        Expected:
+        - onnx/openvino are kept, anything else becomes torch
+        """
+        monkeypatch.setitem(detector.config['detect'], 'backend', 'ONNX')
+        assert detector._yolo_backend() == "onnx"
+        monkeypatch.setitem(detector.config['detect'], 'backend', 'tensorrt')
+        assert detector._yolo_backend() == "torch"
+
+    def test_export_cache_key(self, temp_config_dir, monkeypatch):
+        """
+        Test that an exported model is reused when model hash and imgsz match
+
+        Expected:
+        - A cached export is returned without re-exporting
+        - A different imgsz or changed weights give a different cache path
+        """
+        monkeypatch.setattr(detector, "_model_cache_dir", lambda: temp_config_dir)
+        model_path = os.path.join(temp_config_dir, "best.pt")
+        with open(model_path, "wb") as f:
+            f.write(b"weights-v1")
+
+        key = f"best_{detector._file_hash(model_path)}_640.onnx"
+        open(os.path.join(temp_config_dir, key), "wb").close()
+        assert detector._export_cached(model_path, "onnx", 640) == os.path.join(temp_config_dir, key)
+
+        assert f"best_{detector._file_hash(model_path)}_320.onnx" != key
+        with open(model_path, "wb") as f:
+            f.write(b"weights-v2")
+        assert f"best_{detector._file_hash(model_path)}_640.onnx" != key
+
+
+def _entry(track_id, frame, bbox):
+    return {"frame": frame, "track_id": track_id, "bbox": bbox, "score": 0.9,
+            "class_id": 0, "type": 1, "object": 1}
+
+
+class TestDetectStride:
+    """Test cases for keyframe interpolation and adaptive stride"""
+
+    def test_interpolate_gap_linear(self):
+        """
+        Test linear interpolation of a track present in both keyframes
+
+        Expected:
+        - One entry per in-between frame, flagged as interpolated
+        - Boxes move linearly between the keyframe boxes
+        """
+        filled = detector._interpolate_gap(
+            [_entry("1_1", 0, [0, 0, 10, 10])], [_entry("1_1", 4, [40, 0, 50, 10])], 0, 4)
+        assert [e["frame"] for e in filled] == [1, 2, 3]
+        assert [e["bbox"][0] for e in filled] == [10, 20, 30]
+        assert all(e["interpolated"] and e["type"] == 1 for e in filled)
+
+    def test_interpolate_gap_holds_one_sided_tracks(self):
+        """
+        Test that tracks in only one keyframe keep their box over the gap
+
+        Expected:
+        - A disappearing track holds its last box
+        - An appearing track holds its first box
+        """
+        filled = detector._interpolate_gap(
+            [_entry("1_1", 0, [0, 0, 10, 10])], [_entry("1_2", 3, [5, 5, 9, 9])], 0, 3)
+        by_id = {}
+        for e in filled:
+            by_id.setdefault(e["track_id"], []).append(e["bbox"])
+        assert by_id["1_1"] == [[0, 0, 10, 10]] * 2
+        assert by_id["1_2"] == [[5, 5, 9, 9]] * 2
+
+    def test_adapt_stride(self):
+        """
+        Test that the stride shrinks on fast motion or track changes and grows when static
+
+        Expected:
+        - Static boxes increase the stride up to the maximum
+        - Fast motion or a new track halves the stride
+        """
+        still = [_entry("1_1", 0, [0, 0, 100, 100])]
+        assert detector._adapt_stride(still, still, 4, 4, 8) == 5
+        assert detector._adapt_stride(still, still, 4, 8, 8) == 8
+
+        moved = [_entry("1_1", 4, [100, 0, 200, 100])]
+        assert detector._adapt_stride(still, moved, 4, 8, 8) == 4
+        assert detector._adapt_stride(still, still + [_entry("1_2", 4, [0, 0, 5, 5])], 4, 8, 8) == 4
+
+
+class TestMotionGate:
+    """Test cases for the static-frame motion gate"""
+
+    def test_static_frames_skipped_until_refresh(self):
+        """
+        Test that unchanged frames skip detection with a forced refresh
+
+        Expected:
+        - The first frame is detected
+        - Identical frames are skipped until refresh frames have been skipped
+        """
+        gate = detector._MotionGate(threshold=0.01, refresh=3)
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        decisions = [gate.should_detect(frame) for _ in range(6)]
+        assert decisions == [True, False, False, False, True, False]
+
+    def test_motion_triggers_detection(self):
+        """
+        Test that a changed region above the threshold triggers detection
+
+        Expected:
+        - A frame with a moving bright block is detected
+        """
+        gate = detector._MotionGate(threshold=0.01, refresh=100)
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        assert gate.should_detect(frame)
+        moved = frame.copy()
+        moved[60:140, 100:200] = 255
+        assert gate.should_detect(moved)
+        assert not gate.should_detect(moved)
+
+
+class TestSelectSeek:
+    """Test cases for the seek helpers of the DeepSORT select fallback"""
+
+    def _write_clip(self, path, count):
+        import cv2
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (32, 32))
+        for i in range(count):
+            writer.write(np.full((32, 32, 3), i * 10, dtype=np.uint8))
+        writer.release()
+
+    def test_frames_forward_starts_at_seek_frame(self, temp_config_dir):
+        """
+        Test that forward reading starts at the warmup frame instead of frame 0
+
+        Expected:
+        - The first yielded frame index and content match the seek target
+        """
+        import cv2
+        path = os.path.join(temp_config_dir, "clip.avi")
+        self._write_clip(path, 20)
+        cap = cv2.VideoCapture(path)
+        frames = list(detector._frames_forward(cap, 12))
+        cap.release()
+        assert [i for i, _ in frames] == list(range(12, 20))
+        assert abs(int(frames[0][1].mean()) - 120) <= 3
+
+    def test_frames_backward_in_blocks(self, temp_config_dir):
+        """
+        Test that backward reading yields every frame once in reverse order
+
+        Expected:
+        - Indices run from first down to last across block boundaries
+        - Frame content matches the index
+        """
+        import cv2
+        path = os.path.join(temp_config_dir, "clip.avi")
+        self._write_clip(path, 20)
+        cap = cv2.VideoCapture(path)
+        frames = list(detector._frames_backward(cap, 15, 2, block=4))
+        cap.release()
+        assert [i for i, _ in frames] == list(range(15, 1, -1))
+        assert all(abs(int(f.mean()) - i * 10) <= 3 for i, f in frames)
+
+    def test_match_detection(self):
+        """
+        Test that a track box picks the detection whose center lies inside it
+
+        Expected:
+        - Score and class of the contained detection, None when nothing matches
+        """
+        detections = [[[100, 100, 10, 10], 0.876, 2], [[0, 0, 20, 20], 0.9, 0]]
+        assert detector._match_detection([0, 0, 30, 30], detections) == (0.9, 0)
+        assert detector._match_detection([200, 200, 210, 210], detections) == (None, None)
+
+    def test_selections_get_distinct_track_ids(self, temp_config_dir, monkeypatch):
+        """
+        Test that separate selections in one video are saved as separate tracks
+
+        Expected:
+        - Each call gets the next free 2_<n> even though DeepSORT restarts at ID 1
+        - Both tracks are kept in the JSON
+        """
+        import json
+        from collections import deque
+        path = os.path.join(temp_config_dir, "clip.avi")
+        self._write_clip(path, 20)
+        monkeypatch.setattr(detector, "_get_predict_model", lambda: object())
+        monkeypatch.setattr(detector, "_select_pass",
+                            lambda frames, model, conf, start, x, y, record, on_frame=None:
+                            (1, [(start, [0, 0, 8, 8], 0.9, 0)]))
+
+        out = detector.selectdetector(path, "5", "4,4", 0.5, deque(), direction="forward")
+        detector.selectdetector(path, "9", "4,4", 0.5, deque(), direction="forward")
+        with open(out, encoding="utf-8") as f:
+            frames = json.load(f)["frames"]
+        assert [e["track_id"] for e in frames["5"]] == ["2_1"]
+        assert [e["track_id"] for e in frames["9"]] == ["2_2"]
+
+    def test_backward_only(self, temp_config_dir, monkeypatch):
+        """
+        Test Direction=backward in the DeepSORT fallback
+
+        Expected:
+        - Only the click frame and the frames before it are recorded
+        """
+        import json
+        from collections import deque
+        path = os.path.join(temp_config_dir, "clip.avi")
+        self._write_clip(path, 20)
+        passes = []
+
+        def select_pass(frames, model, conf, start, x, y, record, on_frame=None):
+            indices = [i for i, _ in frames]
+            passes.append(indices[0])
+            return 1, [(i, [0, 0, 8, 8], 0.9, 0) for i in indices if record(i)]
+
+        monkeypatch.setattr(detector, "_get_predict_model", lambda: object())
+        monkeypatch.setattr(detector, "_select_pass", select_pass)
+        out = detector.selectdetector(path, "10", "4,4", 0.5, deque(), direction="backward")
+        with open(out, encoding="utf-8") as f:
+            frames = json.load(f)["frames"]
+        assert passes == [19]
+        assert sorted(int(k) for k in frames) == list(range(0, 11))
+
+
+class TestWarmupGate:
+    """Test cases for jobs waiting on the background model pre-warm"""
+
+    def test_model_getter_waits_for_warmup(self, monkeypatch):
+        """
+        Test that a job does not get the YOLO singleton while the warmup inference runs
+
+        Expected:
+        - _get_yolo_model blocks while the yolo pre-warm is in progress
+        - It returns the model once the pre-warm has finished
+        """
+        import threading
+        from core import model_warmup
+
+        done = threading.Event()
+        monkeypatch.setitem(model_warmup._done, "yolo", done)
+        sentinel = object()
+        monkeypatch.setattr(detector, "MODEL", sentinel)
+
+        result = []
+        job = threading.Thread(target=lambda: result.append(detector._get_yolo_model()))
+        job.start()
+        job.join(timeout=0.2)
+        assert job.is_alive() and not result
+        done.set()
+        job.join(timeout=5)
+        assert result == [sentinel]
@@ -80,6 +80,22 @@ class TestHealthEndpoints:
         response = test_client.get("/invalid/endpoint/that/does/not/exist")
         assert response.status_code == 404
 
+    def test_models_health_endpoint(self, test_client):
+        """
+        Test that the model readiness endpoint reports every model
+
+        Expected:
+        - Status code should be 200
+        - Response should contain an overall ready flag and yolo/sam2 states
+        """
+        response = test_client.get("/health/models")
+        assert response.status_code == 200
+        data = response.json()
+        assert isinstance(data["ready"], bool)
+        assert set(data["models"]) == {"yolo", "sam2"}
+        for st in data["models"].values():
+            assert "state" in st
+
 
 class TestServerBasics:
     """Basic server functionality tests"""
@@ -0,0 +1,55 @@
+"""
+Import Time Tests
+
+Guards backend startup: `import main` must not pull in heavy libraries
+(they are imported lazily on first use) and must stay within a time budget
+"""
+
+import os
+import sys
+import subprocess
+
+# 모델/코덱/암호화 라이브러리는 첫 사용 시점에 import
+HEAVY_MODULES = ("torch", "ultralytics", "pandas", "av", "cv2", "Crypto", "uvicorn")
+
+# 누적 import 시간 상한 (마이크로초) — torch/ultralytics가 섞이면 수 초 단위로 늘어남
+IMPORT_BUDGET_US = 3_000_000
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _import_main_with_importtime():
+    """새 인터프리터에서 `python -X importtime -c "import main"` 실행 → {모듈: 누적 us}"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=PACKAGE_DIR, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) != 3 or not parts[1].isdigit():
+            continue
+        cumulative[parts[2].strip()] = int(parts[1])
+    return cumulative
+
+
+class TestImportTime:
+    """Test cases for deferred heavy imports at backend startup"""
+
+    def test_main_import_defers_heavy_modules(self):
+        """
+        Test that importing main does not load heavy libraries and stays within budget
+
+        Expected:
+        - None of the heavy modules appear in the import trace
+        - Cumulative import time of main is below IMPORT_BUDGET_US
+        """
+        cumulative = _import_main_with_importtime()
+        assert "main" in cumulative
+
+        loaded = {name.split(".")[0] for name in cumulative}
+        assert not loaded & set(HEAVY_MODULES), sorted(loaded & set(HEAVY_MODULES))
+        assert cumulative["main"] < IMPORT_BUDGET_US
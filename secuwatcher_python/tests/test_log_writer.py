@@ -0,0 +1,196 @@
+"""
+Log Writer Tests
+
+Tests for the batched log sink (util.LogQueue / util.LogSink / util.log_writer)
+"""
+
+import os
+import threading
+from collections import deque
+
+from util import LogQueue, LogSink, log_writer, logLine
+
+
+class TestLogQueue:
+    """Test cases for the bounded, notifying log queue"""
+
+    def test_log_queue_is_deque(self):
+        """
+        Test that LogQueue stays compatible with isinstance(log_queue, deque) checks
+
+        Expected:
+        - LogQueue instance should be a deque
+        """
+        assert isinstance(LogQueue(), deque)
+
+    def test_log_queue_drops_when_full(self):
+        """
+        Test back-pressure when the queue reaches capacity
+
+        Expected:
+        - Items beyond capacity are not enqueued
+        - dropped counter reflects the number of rejected items
+        """
+        q = LogQueue(capacity=3)
+        for i in range(5):
+            q.append(i)
+        assert list(q) == [0, 1, 2]
+        assert q.dropped == 2
+
+    def test_log_queue_drain(self):
+        """
+        Test that drain pops at most max_items in FIFO order
+
+        Expected:
+        - First call returns the oldest items
+        - Remaining items stay queued
+        """
+        q = LogQueue()
+        for i in range(5):
+            q.append(i)
+        assert q.drain(3) == [0, 1, 2]
+        assert list(q) == [3, 4]
+
+
+class TestLogSink:
+    """Test cases for grouped writes and cached file handles"""
+
+    def test_write_batch_groups_by_path(self, temp_config_dir):
+        """
+        Test that lines are appended to their own files in order
+
+        Expected:
+        - Each path receives only its own lines
+        - Missing parent folders are created
+        """
+        a = os.path.join(temp_config_dir, 'a', 'a.txt')
+        b = os.path.join(temp_config_dir, 'b', 'b.txt')
+        sink = LogSink()
+        sink.write_batch([
+            logLine(path=a, time="t1", message="one"),
+            logLine(path=b, time="t2", message="two"),
+            logLine(path=a, time="t3", message="three"),
+        ])
+        sink.close()
+
+        with open(a) as f:
+            assert f.read() == "[t1]\tone\n[t3]\tthree\n"
+        with open(b) as f:
+            assert f.read() == "[t2]\ttwo\n"
+
+    def test_handle_cache_is_bounded(self, temp_config_dir):
+        """
+        Test that the least recently used handle is closed beyond max_open
+
+        Expected:
+        - At most max_open handles stay open
+        """
+        sink = LogSink(max_open=2)
+        for i in range(4):
+            sink.write_batch([logLine(path=os.path.join(temp_config_dir, f"{i}.txt"), time="t", message="m")])
+        assert len(sink._handles) == 2
+        sink.close()
+
+    def test_daily_rotation_rewrites_dated_path(self, temp_config_dir):
+        """
+        Test that paths containing the start date move to the new day
+
+        Expected:
+        - After the day changes, a path with the start date is redirected to today's date
+        """
+        sink = LogSink()
+        sink._start_day = "20000101"
+        path = os.path.join(temp_config_dir, "20000101", "20000101_log.txt")
+        sink.write_batch([logLine(path=path, time="t", message="m")])
+        sink.close()
+
+        rotated = path.replace("20000101", sink._day)
+        assert os.path.exists(rotated)
+        assert not os.path.exists(path)
+
+    def test_rotation_only_touches_date_stamps(self, temp_config_dir):
+        """
+        Test that rotation rewrites only the generated date folder and file prefix
+
+        Expected:
+        - Other directories and file names containing the start date digits are kept
+        - A file directly in the date folder keeps its own name
+        """
+        sink = LogSink()
+        sink._start_day = "20000101"
+        sink._day = "20000102"
+        root = os.path.join(temp_config_dir, "cam_20000101")
+        assert sink._resolve(os.path.join(root, "Daily Log", "20000101", "20000101_log.txt")) == \
+            os.path.join(root, "Daily Log", "20000102", "20000102_log.txt")
+        assert sink._resolve(os.path.join(root, "AI Log", "20000101", "detector.200001.log")) == \
+            os.path.join(root, "AI Log", "20000102", "detector.200001.log")
+        other = os.path.join(root, "export_20000101.txt")
+        assert sink._resolve(other) == other
+
+
+class TestLogWriter:
+    """Test cases for the background writer loop"""
+
+    def test_writer_flushes_and_reports_drops(self, temp_config_dir):
+        """
+        Test the writer drains the queue, converts raw strings and reports drops
+
+        Expected:
+        - logLine entries and raw strings are written
+        - A drop report line is written to the default log path
+        """
+        default_path = os.path.join(temp_config_dir, "daily.txt")
+        q = LogQueue(capacity=2)
+        q.append(logLine(path=default_path, time="t", message="first"))
+        q.append("raw message")
+        q.append("dropped message")
+
+        stop = threading.Event()
+        stop.set()
+        t = threading.Thread(target=log_writer, args=(q, default_path, stop))
+        t.start()
+        t.join(timeout=5)
+        assert not t.is_alive()
+
+        with open(default_path) as f:
+            content = f.read()
+        assert "first" in content
+        assert "raw message" in content
+        assert "dropped message" not in content
+        assert "[LOG]" in content
+
+    def test_lifespan_shutdown_drains_queue(self, temp_config_dir, monkeypatch):
+        """
+        Test that lines still queued at server shutdown are written
+
+        Expected:
+        - The writer started by lifespan is stopped and joined after yield
+        - A line queued just before shutdown is in the log file
+        """
+        import asyncio
+        import main
+        from core import security
+
+        path = os.path.join(temp_config_dir, "daily.txt")
+        monkeypatch.setattr(main, "initialize_config_paths", lambda: None)
+        monkeypatch.setattr(security, "initialize_security", lambda: None)
+        monkeypatch.setattr(main, "load_job_states", lambda: None)
+        monkeypatch.setattr(main, "start_prewarm", lambda *args: None)
+        monkeypatch.setattr(main, "daily_log_path", path)
+        writers = []
+        real_thread = threading.Thread
+
+        def thread(*args, **kwargs):
+            writers.append(real_thread(*args, **kwargs))
+            return writers[-1]
+
+        monkeypatch.setattr(main.threading, "Thread", thread)
+
+        async def serve():
+            async with main.lifespan(main.app):
+                main.log_queue.append(logLine(path=path, time="t", message="pending at shutdown"))
+
+        asyncio.run(serve())
+        assert writers and not writers[0].is_alive()
+        with open(path) as f:
+            assert "pending at shutdown" in f.read()
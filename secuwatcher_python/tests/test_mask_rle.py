@@ -0,0 +1,111 @@
+"""
+Mask RLE Tests
+
+Tests for mask_rle.py and mask-shaped masking in blur.py
+"""
+
+import numpy as np
+import pytest
+
+import blur
+import mask_rle
+
+
+def _ellipse_mask(h, w):
+    yy, xx = np.mgrid[:h, :w]
+    return ((xx - w / 2) / (w / 2)) ** 2 + ((yy - h / 2) / (h / 2)) ** 2 <= 1.0
+
+
+class TestMaskRle:
+    """Test cases for the compact mask encoding"""
+
+    def test_roundtrip(self):
+        """
+        Test that encode/decode restores the mask exactly
+
+        Expected:
+        - Masks starting with 0 or 1, empty and full masks round-trip
+        """
+        masks = [_ellipse_mask(37, 53), ~_ellipse_mask(20, 20),
+                 np.zeros((4, 6), dtype=bool), np.ones((5, 3), dtype=bool)]
+        for mask in masks:
+            rle = mask_rle.encode(mask)
+            assert rle["size"] == list(mask.shape)
+            assert np.array_equal(mask_rle.decode(rle), mask)
+
+    def test_encoding_is_compact(self):
+        """
+        Test that a typical object mask is much smaller than its pixel count
+
+        Expected:
+        - The counts string of a 200x120 ellipse is under 2% of its pixels
+        """
+        rle = mask_rle.encode(_ellipse_mask(200, 120))
+        assert len(rle["counts"]) < 200 * 120 * 0.02
+
+    def test_size_mismatch(self):
+        """
+        Test that counts not matching the size are rejected
+
+        Expected:
+        - ValueError
+        """
+        rle = mask_rle.encode(np.ones((4, 4), dtype=bool))
+        rle["size"] = [5, 5]
+        with pytest.raises(ValueError):
+            mask_rle.decode(rle)
+
+
+class TestMaskExport:
+    """Test cases for applying the effect inside a stored mask"""
+
+    def _frame(self):
+        rng = np.random.default_rng(0)
+        return rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+    def test_selected_mask_only_inside(self):
+        """
+        Test that selected masking changes only pixels inside the mask
+
+        Expected:
+        - Pixels of the bbox outside the mask keep their original value
+        - Pixels inside the mask are changed
+        """
+        frame = self._frame()
+        mask = _ellipse_mask(40, 60)
+        log = {"bbox": [50, 30, 109, 69], "mask": mask_rle.encode(mask), "object": 1}
+        out = blur._process_frame_with_logs(frame, [log], '2', '1', 3)
+
+        roi_in, roi_out = out[30:70, 50:110], frame[30:70, 50:110]
+        assert np.array_equal(roi_in[~mask], roi_out[~mask])
+        assert not np.array_equal(roi_in[mask], roi_out[mask])
+        assert np.array_equal(out[:30], frame[:30])
+
+    def test_background_restores_mask_only(self):
+        """
+        Test that background masking restores only the mask pixels of selected objects
+
+        Expected:
+        - Mask pixels equal the original frame, bbox corners outside the mask do not
+        """
+        frame = self._frame()
+        mask = _ellipse_mask(40, 60)
+        log = {"bbox": [50, 30, 109, 69], "mask": mask_rle.encode(mask), "object": 1}
+        out = blur._process_frame_with_logs(frame, [log], '1', '1', 3)
+
+        roi_in, roi_out = out[30:70, 50:110], frame[30:70, 50:110]
+        assert np.array_equal(roi_in[mask], roi_out[mask])
+        assert not np.array_equal(roi_in[~mask], roi_out[~mask])
+
+    def test_invalid_mask_falls_back_to_rect(self):
+        """
+        Test that an undecodable mask is masked as its bbox rectangle
+
+        Expected:
+        - The result equals masking the plain bbox entry
+        """
+        frame = self._frame()
+        rect = {"bbox": [50, 30, 110, 70], "object": 1}
+        broken = dict(rect, mask={"size": [3, 3], "counts": "0"})
+        assert np.array_equal(blur._process_frame_with_logs(frame, [broken], '2', '1', 3),
+                              blur._process_frame_with_logs(frame, [rect], '2', '1', 3))
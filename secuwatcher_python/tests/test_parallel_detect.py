@@ -0,0 +1,203 @@
+"""
+Parallel Detection Tests
+
+Tests for segment splitting, cross-segment track stitching and the
+multi-video executor helpers (parallel_detect.py)
+"""
+
+import os
+
+import cv2
+import pytest
+import numpy as np
+
+import detector
+import parallel_detect
+import util
+from core import state
+from parallel_detect import split_segments, use_segments, stitch_tracks, probe_video, default_workers
+
+
+def _rows(raw_id, frames, x=0, cls=0):
+    return [(f, raw_id, [x + f, 0, x + f + 20, 20], 0.9, cls) for f in frames]
+
+
+class TestSplitSegments:
+    """Test cases for dividing a video into overlapping segments"""
+
+    def test_segments_cover_video_with_overlap(self):
+        """
+        Test that output ranges tile the video and read ranges overlap
+
+        Expected:
+        - Output ranges are contiguous and cover every frame once
+        - Each segment after the first starts reading overlap frames early
+        """
+        segments = split_segments(1000, 4, 30)
+        assert [(s, e) for s, e, _ in segments] == [(0, 250), (250, 500), (500, 750), (750, 1000)]
+        assert [r for _, _, r in segments] == [0, 220, 470, 720]
+
+    def test_short_videos_not_split(self):
+        """
+        Test that short videos stay on the sequential path
+
+        Expected:
+        - use_segments is False when segments would be shorter than a few overlaps
+        """
+        assert not use_segments(200, 4, 30)
+        assert not use_segments(10000, 1, 30)
+        assert use_segments(10000, 4, 30)
+
+
+class TestStitchTracks:
+    """Test cases for joining track IDs across segment boundaries"""
+
+    def test_track_continues_across_boundary(self):
+        """
+        Test that a track seen in the overlap keeps one global ID
+
+        Expected:
+        - The same object gets the same 1_<id> in both segments
+        - Overlap frames come from the earlier segment only
+        """
+        segments = [(0, 100, 0), (100, 200, 90)]
+        seg_rows = [_rows(7, range(0, 100)), _rows(3, range(92, 200))]
+        entries = stitch_tracks(segments, seg_rows)
+
+        assert {e["track_id"] for e in entries} == {"1_1"}
+        assert [e["frame"] for e in entries] == list(range(0, 200))
+
+    def test_unmatched_and_other_class_get_new_ids(self):
+        """
+        Test that only overlapping boxes of the same class are joined
+
+        Expected:
+        - A distant track and a same-place track of another class get new IDs
+        - Untracked boxes keep the 1_-1 ID
+        """
+        segments = [(0, 100, 0), (100, 200, 90)]
+        seg_rows = [
+            _rows(1, range(0, 100)),
+            _rows(5, range(90, 200), x=500) + _rows(6, range(90, 200), cls=2) + _rows(-1, [150]),
+        ]
+        entries = stitch_tracks(segments, seg_rows)
+        ids = {(e["frame"] >= 100, e["class_id"], e["bbox"][0] >= 500): e["track_id"] for e in entries}
+
+        assert ids[(False, 0, False)] == "1_1"
+        assert ids[(True, 0, True)] not in ("1_1", "1_-1")
+        assert ids[(True, 2, False)] not in ("1_1", "1_-1", ids[(True, 0, True)])
+        assert any(e["track_id"] == "1_-1" for e in entries)
+
+
+class TestMultiVideo:
+    """Test cases for the multi-video executor helpers and per-video progress"""
+
+    def test_probe_video(self, temp_config_dir):
+        """
+        Test that video info is read without decoding the whole file
+
+        Expected:
+        - Width, height and frame count match the written clip
+        """
+        path = os.path.join(temp_config_dir, "clip.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+        for i in range(12):
+            writer.write(np.full((48, 64, 3), i * 10, dtype=np.uint8))
+        writer.release()
+
+        info = probe_video(path)
+        assert (info["width"], info["height"], info["total_frames"]) == (64, 48, 12)
+
+    def test_default_workers(self):
+        """
+        Test the automatic number of concurrent videos
+
+        Expected:
+        - Never more than the number of videos and at least one
+        - GPU batches up to four videos
+        """
+        assert default_workers(0, 20) == 4
+        assert default_workers("cpu", 1) == 1
+        assert 1 <= default_workers("cpu", 20) <= 20
+
+    def test_update_video_progress(self):
+        """
+        Test that per-video progress is recorded in the job by absolute path
+
+        Expected:
+        - Percentages are stored under jobs[job_id]["videos"]
+        - Progress never goes backwards
+        - Videos with the same file name in different folders are kept apart
+        """
+        a, b, other_a = (os.path.abspath(p) for p in ("/videos/a.mp4", "/videos/b.mp4", "/other/a.mp4"))
+        state.jobs["multi"] = {"status": "running"}
+        try:
+            util.update_video_progress("multi", a, 0.5)
+            util.update_video_progress("multi", b, 1.0)
+            util.update_video_progress("multi", a, 0.25)
+            util.update_video_progress("multi", other_a, 0.1)
+            assert state.jobs["multi"]["videos"] == {a: 50.0, b: 100.0, other_a: 10.0}
+        finally:
+            state.jobs.pop("multi", None)
+
+    def test_batched_uses_predict_model(self, monkeypatch):
+        """
+        Test that GPU batching after a tracked job does not use the tracking singleton
+
+        Expected:
+        - detect_videos_batched receives the predict-only instance, not MODEL
+        """
+        loaded = []
+
+        def load(backend=None):
+            loaded.append(object())
+            return loaded[-1], "torch"
+
+        monkeypatch.setattr(detector, "MODEL", None)
+        monkeypatch.setattr(detector, "PREDICT_MODEL", None)
+        monkeypatch.setattr(detector, "_load_yolo", load)
+        monkeypatch.setattr(detector, "_apply_precision", lambda *args, **kwargs: "fp32")
+        monkeypatch.setattr(detector, "_yolo_device", lambda: 0)
+        monkeypatch.setattr(parallel_detect, "probe_video", lambda video: {"fps": 30, "total_frames": 1})
+        used = []
+
+        def batched(videos, infos, workers, model, *args, **kwargs):
+            used.append(model)
+            return {video: [] for video in videos}
+
+        monkeypatch.setattr(parallel_detect, "detect_videos_batched", batched)
+
+        tracking = detector._get_yolo_model()
+        result = detector._autodetect_multi(["a.mp4", "b.mp4"], 0.25, None, None, "",
+                                            None, lambda video, frac: None, 0, 2, None)
+        assert set(result) == {"a.mp4", "b.mp4"}
+        assert used == [detector.PREDICT_MODEL] and used[0] is not tracking
+
+    def test_segments_skip_tiler(self, temp_config_dir, monkeypatch):
+        """
+        Test that tiled mode does not build a tiler for a video detected in segments
+
+        Expected:
+        - The predict-only model/tiler is never created on the segment path
+        - The AI log says that tiling is ignored
+        """
+        from collections import deque
+
+        path = os.path.join(temp_config_dir, "clip.avi")
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (32, 32))
+        for i in range(12):
+            writer.write(np.full((32, 32, 3), i * 10, dtype=np.uint8))
+        writer.release()
+
+        for key, value in (("tiled", "yes"), ("cache", "no"), ("multifiledetect", "no"),
+                           ("checkpoint_interval", "0"), ("parallel_segments", "2")):
+            monkeypatch.setitem(detector.config["detect"], key, value)
+        monkeypatch.setattr(detector, "_get_yolo_model", lambda: object())
+        monkeypatch.setattr(detector, "_make_tiler", lambda: pytest.fail("tiler built on the segment path"))
+        monkeypatch.setattr(parallel_detect, "use_segments", lambda total, k, overlap: True)
+        monkeypatch.setattr(parallel_detect, "detect_segments", lambda *args, **kwargs: [])
+
+        logs = deque()
+        result = detector.autodetector(path, 0.5, [0], logs)
+        assert result == [os.path.splitext(path)[0] + ".json"]
+        assert any("타일 추론" in line.message for line in logs)
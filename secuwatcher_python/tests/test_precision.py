@@ -0,0 +1,79 @@
+"""
+Precision Tests
+
+Tests for inference precision selection (core.precision) and the
+precision agreement check in benchmark_detector.py
+"""
+
+import numpy as np
+
+from core import precision
+from benchmark_detector import compare_boxes
+
+
+class TestResolvePrecision:
+    """Test cases for mapping the configured precision to a usable one"""
+
+    def test_fp32_and_unknown_values(self):
+        """
+        Test that fp32 is kept and unknown values fall back to fp32
+
+        Expected:
+        - fp32 stays fp32 regardless of device
+        - Unknown strings become fp32
+        """
+        assert precision.resolve_precision("FP32", "mps") == "fp32"
+        assert precision.resolve_precision("int8", 0) == "fp32"
+        assert precision.resolve_precision(None, "cpu") == "fp32"
+
+    def test_fp16_on_cpu_falls_back(self):
+        """
+        Test that fp16 is not used for CPU inference
+
+        Expected:
+        - fp16 on cpu resolves to fp32
+        """
+        assert precision.resolve_precision("fp16", "cpu") == "fp32"
+
+    def test_autocast_noop_for_fp32(self):
+        """
+        Test that fp32 inference is not wrapped in autocast
+
+        Expected:
+        - The context manager runs the body unchanged
+        """
+        with precision.autocast("fp32", "cpu"):
+            value = 1
+        assert value == 1
+
+
+def _boxes(*rows):
+    return np.array(rows, dtype=np.float32).reshape(-1, 6)
+
+
+class TestCompareBoxes:
+    """Test cases for box agreement between precisions"""
+
+    def test_identical_outputs_agree(self):
+        """
+        Test that identical detections give full agreement
+
+        Expected:
+        - Agreement and mean IoU are 1.0, including empty frames
+        """
+        frames = [_boxes([0, 0, 10, 10, 0.9, 0]), _boxes()]
+        assert compare_boxes(frames, frames) == (1.0, 1.0)
+
+    def test_missing_and_shifted_boxes(self):
+        """
+        Test that dropped boxes and class changes reduce agreement
+
+        Expected:
+        - A slightly shifted box still matches with IoU below 1
+        - A box with a different class does not match
+        """
+        ref = [_boxes([0, 0, 10, 10, 0.9, 0], [50, 50, 60, 60, 0.8, 1])]
+        cand = [_boxes([1, 0, 11, 10, 0.9, 0], [50, 50, 60, 60, 0.8, 2])]
+        agreement, miou = compare_boxes(ref, cand)
+        assert agreement == 0.5
+        assert 0.8 < miou < 1.0
@@ -0,0 +1,233 @@
+"""
+Preview Tests
+
+Tests for the decoded-frame cache, keyframe seek and /preview/frame route
+"""
+
+import json
+import os
+
+import cv2
+import numpy as np
+import pytest
+
+import blur
+import preview
+
+
+def _write_clip(path, count, gop=10):
+    """h264 clip with a keyframe every gop frames (frame i is filled with i*4, row i%64 white)"""
+    import av
+    container = av.open(path, mode="w")
+    stream = container.add_stream("h264", rate=30)
+    stream.width = stream.height = 64
+    stream.pix_fmt = "yuv420p"
+    stream.codec_context.gop_size = gop
+    for i in range(count):
+        frame = np.full((64, 64, 3), i * 4, dtype=np.uint8)
+        frame[i % 64] = 255
+        for packet in stream.encode(av.VideoFrame.from_ndarray(frame, format="bgr24")):
+            container.mux(packet)
+    for packet in stream.encode():
+        container.mux(packet)
+    container.close()
+
+
+def _read_all(path):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+
+def _write_detections(video_path, frames):
+    with open(os.path.splitext(video_path)[0] + ".json", "w", encoding="utf-8") as f:
+        json.dump({"frames": frames}, f)
+
+
+class TestFrameCache:
+    """Test cases for the decoded-frame LRU"""
+
+    def test_eviction_by_size(self):
+        """
+        Test that the least recently used frames are evicted over the byte limit
+
+        Expected:
+        - The cache keeps at most max_bytes of frames, dropping the oldest first
+        - Cached frames are read-only
+        """
+        cache = preview._FrameCache(max_bytes=2 * 10 * 10 * 3)
+        frames = [np.zeros((10, 10, 3), dtype=np.uint8) for _ in range(3)]
+        cache.put(("v", 0), frames[0])
+        cache.put(("v", 1), frames[1])
+        assert cache.get(("v", 0)) is frames[0]     # 0을 최근 사용으로 갱신
+        cache.put(("v", 2), frames[2])
+        assert ("v", 1) not in cache
+        assert ("v", 0) in cache and ("v", 2) in cache
+        assert not frames[0].flags.writeable
+
+
+class TestFrameSeek:
+    """Test cases for keyframe-aware frame access"""
+
+    def test_random_access_matches_sequential_decode(self, temp_config_dir):
+        """
+        Test that frames fetched in scrubbing order equal a sequential decode
+
+        Expected:
+        - Every requested frame equals the same index of cap.read() order
+        - Frames just before a decoded target are served from the cache
+        """
+        path = os.path.join(temp_config_dir, "clip.mp4")
+        _write_clip(path, 60)
+        expected = _read_all(path)
+        for frame_no in (35, 3, 59, 12, 40, 0, 20):
+            frame, _ = preview.get_frame(path, frame_no)
+            assert np.array_equal(frame, expected[frame_no])
+        frame, hit = preview.get_frame(path, 34)
+        assert hit and np.array_equal(frame, expected[34])
+
+    def test_seek_starts_at_keyframe(self, temp_config_dir):
+        """
+        Test the decode start chosen from the keyframe index
+
+        Expected:
+        - Frame 0 is a keyframe and the index is ascending
+        - A backward target seeks to its preceding keyframe
+        - A target ahead of the current position within the same GOP reads on without seeking
+        """
+        path = os.path.join(temp_config_dir, "clip.mp4")
+        _write_clip(path, 60)
+        reader = preview._VideoReader(path)
+        try:
+            keys = reader.keyframes
+            assert keys[0] == 0 and np.all(np.diff(keys) > 0)
+            target = int(keys[1]) + 1
+            reader.pos = 59
+            assert reader._start_for(target) == keys[1]
+            reader.pos = int(keys[1])
+            assert reader._start_for(target) == reader.pos
+        finally:
+            reader.release()
+
+    def test_out_of_range(self, temp_config_dir):
+        """
+        Test frame numbers outside the video
+
+        Expected:
+        - IndexError for a negative frame and for a frame past the end
+        """
+        path = os.path.join(temp_config_dir, "clip.mp4")
+        _write_clip(path, 12)
+        with pytest.raises(IndexError):
+            preview.get_frame(path, -1)
+        with pytest.raises(IndexError):
+            preview.get_frame(path, 12)
+
+
+class TestRenderFrame:
+    """Test cases for rendering a preview with the export masking path"""
+
+    def test_matches_export_masking(self, temp_config_dir):
+        """
+        Test that the preview equals masking the same frame with blur.py
+
+        Expected:
+        - Every range/tool gives the same pixels as _process_frame_with_logs
+        - All-masking equals the whole-frame effect of output_allmasking
+        """
+        path = os.path.join(temp_config_dir, "clip.mp4")
+        _write_clip(path, 30)
+        entries = [{"track_id": "1_1", "bbox": [4, 4, 30, 30], "type": 1, "object": 1},
+                   {"track_id": "1_2", "bbox": [[34, 10], [60, 20], [50, 60]], "type": 1, "object": 2}]
+        _write_detections(path, {"17": entries})
+        original = _read_all(path)[17]
+
+        for masking_range in ("0", "1", "2", "3"):
+            for tool in ("0", "1"):
+                out, _ = preview.render_frame(path, 17, masking_range, tool, "3")
+                assert np.array_equal(out, blur._process_frame_with_logs(original, entries, masking_range, tool, "3"))
+        out, _ = preview.render_frame(path, 17, "2", "1", "3", all_masking=True)
+        assert np.array_equal(out, blur._apply_effect_roi(original.copy(), "1", 3))
+
+    def test_detection_change_reloads(self, temp_config_dir):
+        """
+        Test that an edited detection file is picked up on the next request
+
+        Expected:
+        - A frame without detections is returned unchanged
+        - After the JSON gains a box for that frame, the preview is masked
+        - The cached decoded frame itself is never modified
+        """
+        path = os.path.join(temp_config_dir, "clip.mp4")
+        _write_clip(path, 10)
+        _write_detections(path, {"1": [{"bbox": [0, 0, 10, 10], "object": 1}]})
+        cached, _ = preview.get_frame(path, 5)
+        before = cached.copy()
+
+        out, hit = preview.render_frame(path, 5, "2", "1", "3")
+        assert hit and np.array_equal(out, before)
+
+        _write_detections(path, {"5": [{"bbox": [0, 0, 40, 40], "object": 1}]})
+        mtime = os.path.getmtime(path) + 10
+        os.utime(os.path.splitext(path)[0] + ".json", (mtime, mtime))
+        out, _ = preview.render_frame(path, 5, "2", "1", "3")
+        assert not np.array_equal(out[:40, :40], before[:40, :40])
+        assert np.array_equal(cached, before)
+
+
+class TestPreviewRoute:
+    """Test cases for GET /preview/frame"""
+
+    def test_returns_image(self, test_client, temp_config_dir):
+        """
+        Test that the route returns an encoded frame and reports cache hits
+
+        Expected:
+        - 200 with image/jpeg that decodes to the frame size
+        - A repeated request is served from the decoded-frame cache
+        - Format=webp returns image/webp
+        """
+        path = os.path.join(temp_config_dir, "clip.mp4")
+        _write_clip(path, 10)
+        params = {"VideoPath": path, "FrameNo": 4, "MaskingRange": "0", "Watermark": "no"}
+
+        response = test_client.get("/preview/frame", params=params)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+        image = cv2.imdecode(np.frombuffer(response.content, np.uint8), cv2.IMREAD_COLOR)
+        assert image.shape == (64, 64, 3)
+
+        response = test_client.get("/preview/frame", params=params)
+        assert response.headers["x-frame-cache"] == "hit"
+
+        response = test_client.get("/preview/frame", params={**params, "Format": "webp"})
+        assert response.headers["content-type"] == "image/webp"
+
+    def test_errors(self, test_client, temp_config_dir):
+        """
+        Test error responses of the route
+
+        Expected:
+        - 400 FILE_NOT_FOUND for a missing video
+        - 422 FRAME_OUT_OF_RANGE past the last frame
+        - 422 INVALID_FORMAT for an unsupported format
+        """
+        path = os.path.join(temp_config_dir, "clip.mp4")
+        _write_clip(path, 5)
+
+        response = test_client.get("/preview/frame", params={"VideoPath": path + ".x", "FrameNo": 0})
+        assert response.status_code == 400
+        assert response.json()["detail"]["code"] == "FILE_NOT_FOUND"
+
+        response = test_client.get("/preview/frame", params={"VideoPath": path, "FrameNo": 5, "Watermark": "no"})
+        assert response.status_code == 422
+        assert response.json()["detail"]["code"] == "FRAME_OUT_OF_RANGE"
+
+        response = test_client.get("/preview/frame", params={"VideoPath": path, "FrameNo": 0, "Format": "png"})
+        assert response.json()["detail"]["code"] == "INVALID_FORMAT"
@@ -0,0 +1,277 @@
+"""
+SAM2 Detector Tests
+
+Tests for model-independent helpers in sam2_detector.py
+"""
+
+import os
+import json
+
+import numpy as np
+import pytest
+
+import mask_rle
+import sam2_detector
+
+
+class TestDirection:
+    """Test cases for bidirectional propagation from the click frame"""
+
+    def test_direction_window(self):
+        """
+        Test the extraction range for each direction
+
+        Expected:
+        - forward starts at the click frame
+        - backward/both include forward_frames frames before the click
+        - The window is clipped at the start of the video
+        """
+        assert sam2_detector._direction_window(100, 14, "forward") == (100, 0, 15)
+        assert sam2_detector._direction_window(100, 14, "backward") == (86, 14, 15)
+        assert sam2_detector._direction_window(100, 14, "both") == (86, 14, 29)
+        assert sam2_detector._direction_window(5, 14, "both") == (0, 5, 20)
+
+    def test_select_direction(self, monkeypatch):
+        """
+        Test that the request value overrides config and unknown values fall back
+
+        Expected:
+        - Request value is normalized, config is used when omitted
+        - Unknown values become forward
+        """
+        monkeypatch.setattr(sam2_detector, "_config", sam2_detector.configparser.ConfigParser())
+        sam2_detector._config.read_dict({"sam2": {"direction": "both"}})
+        assert sam2_detector._select_direction(None) == "both"
+        assert sam2_detector._select_direction("Backward") == "backward"
+        assert sam2_detector._select_direction("sideways") == "forward"
+
+    def test_truncate_track_reverse(self, temp_config_dir):
+        """
+        Test that reverse truncation removes only earlier frames of the track
+
+        Expected:
+        - Entries of the track at or before from_frame are removed
+        - Other tracks and later frames are kept
+        """
+        path = os.path.join(temp_config_dir, "video.json")
+        frames = {str(f): [{"track_id": "2_1", "bbox": [0, 0, 1, 1]}, {"track_id": "1_1", "bbox": [0, 0, 1, 1]}]
+                  for f in (8, 9, 10, 11)}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"frames": frames}, f)
+
+        sam2_detector._truncate_track(path, "2_1", 9, reverse=True)
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)["frames"]
+        assert [e["track_id"] for e in data["8"]] == ["1_1"]
+        assert [e["track_id"] for e in data["9"]] == ["1_1"]
+        assert [e["track_id"] for e in data["10"]] == ["2_1", "1_1"]
+
+
+class TestMultiSelect:
+    """Test cases for registering several clicks in one SAM2 inference state"""
+
+    def test_parse_clicks(self):
+        """
+        Test that FrameNo/Coordinate and Points become one ordered click list
+
+        Expected:
+        - The FrameNo/Coordinate click comes first (obj_id 1)
+        - Points alone are accepted, an empty request is rejected
+        """
+        clicks = sam2_detector._parse_clicks("10", "5, 6", [("12", "7,8")])
+        assert clicks == [(10, 5, 6), (12, 7, 8)]
+        assert sam2_detector._parse_clicks(None, None, [("3", "1,2")]) == [(3, 1, 2)]
+        with pytest.raises(ValueError):
+            sam2_detector._parse_clicks(None, None, [])
+
+    def test_union_crop_region(self):
+        """
+        Test that the crop covers every click
+
+        Expected:
+        - A single click gives the same region as _compute_crop_region
+        - Distant clicks give the union of their regions
+        """
+        assert sam2_detector._union_crop_region([(0, 500, 500)], 1920, 1080, 384) == \
+            sam2_detector._compute_crop_region(500, 500, 1920, 1080, 384)
+        region = sam2_detector._union_crop_region([(0, 300, 300), (5, 1500, 700)], 1920, 1080, 384)
+        assert region == (108, 108, 1692, 892)
+
+    def test_window_and_object_ranges(self):
+        """
+        Test the shared extraction window and the per-object frame ranges
+
+        Expected:
+        - The window spans from the first click to the last click plus forward_frames
+        - Each object keeps only forward_frames around its own click
+        """
+        clicks = [(100, 0, 0), (110, 0, 0)]
+        assert sam2_detector._direction_window(100, 14, "forward", end_frame=110) == (100, 0, 25)
+        assert sam2_detector._object_ranges(clicks, 100, 14, "forward") == {1: (0, 14), 2: (10, 24)}
+        assert sam2_detector._direction_window(100, 14, "both", end_frame=110) == (86, 14, 39)
+        assert sam2_detector._object_ranges(clicks, 86, 14, "both") == {1: (0, 28), 2: (10, 38)}
+
+    def test_next_select_track_ids(self, temp_config_dir):
+        """
+        Test that consecutive type:2 IDs follow the existing maximum
+
+        Expected:
+        - IDs continue after the largest existing 2_<n>
+        """
+        path = os.path.join(temp_config_dir, "video.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"frames": {"0": [{"track_id": "2_3"}, {"track_id": "1_9"}]}}, f)
+        assert sam2_detector._next_select_track_ids(path, 3) == ["2_4", "2_5", "2_6"]
+        assert sam2_detector._next_select_track_id(path) == "2_4"
+
+
+class TestAdaptiveCrop:
+    """Test cases for the object-following crop scheduler"""
+
+    def test_crop_size_from_mask_and_motion(self):
+        """
+        Test that the crop grows with the mask extent and motion
+
+        Expected:
+        - A small still object keeps the minimum crop size
+        - A large or fast object gets a larger crop, capped at the frame
+        """
+        assert sam2_detector._adaptive_crop_size([0, 0, 100, 80], 0.0, 384, 1920, 1080) == 384
+        assert sam2_detector._adaptive_crop_size([0, 0, 400, 300], 0.0, 384, 1920, 1080) == 600
+        assert sam2_detector._adaptive_crop_size([0, 0, 100, 80], 20.0, 384, 1920, 1080) == 550
+        assert sam2_detector._adaptive_crop_size([0, 0, 1800, 900], 50.0, 384, 1920, 1080) == 1920
+
+    def test_near_crop_edge_ignores_frame_border(self):
+        """
+        Test the edge check that triggers a chunk split
+
+        Expected:
+        - A box close to an inner crop edge is near the edge
+        - A box close to a crop edge that is also the frame border is not
+        """
+        crop = (100, 100, 484, 484)
+        assert not sam2_detector._near_crop_edge([200, 200, 300, 300], crop, 1920, 1080)
+        assert sam2_detector._near_crop_edge([400, 200, 470, 300], crop, 1920, 1080)
+        assert not sam2_detector._near_crop_edge([5, 200, 100, 300], (0, 100, 384, 484), 1920, 1080)
+
+    def test_resized_crop_roundtrip(self):
+        """
+        Test the coordinate mapping of a crop resized to crop_size
+
+        Expected:
+        - A box mapped into the resized crop maps back to the same frame box
+        """
+        crop = (100, 50, 868, 818)
+        scale = sam2_detector._crop_scale(crop, 384)
+        assert scale == (0.5, 0.5)
+        local = sam2_detector._bbox_to_crop([300, 250, 500, 450], crop, scale)
+        assert local == [100.0, 100.0, 200.0, 200.0]
+        assert sam2_detector._remap_bbox_to_original(local, 100, 50, 1920, 1080, scale) == [300, 250, 500, 450]
+
+
+class TestMemoryControls:
+    """Test cases for the SAM2 memory bank window and automatic chunk size"""
+
+    def _config(self, monkeypatch, **values):
+        config = sam2_detector.configparser.ConfigParser()
+        config.read_dict({"sam2": values})
+        monkeypatch.setattr(sam2_detector, "_config", config)
+
+    def test_prune_memory_keeps_recent_window(self):
+        """
+        Test that only the last keep non-conditioning frames stay in the state
+
+        Expected:
+        - Older non-conditioning outputs are dropped, conditioning outputs are kept
+        - Reverse propagation drops frames after the window instead
+        """
+        state = {"output_dict_per_obj": {0: {"cond_frame_outputs": {0: "c"},
+                                             "non_cond_frame_outputs": {t: "m" for t in range(1, 40)}}}}
+        sam2_detector._prune_memory(state, 39, False, 16)
+        assert sorted(state["output_dict_per_obj"][0]["non_cond_frame_outputs"]) == list(range(23, 40))
+        assert state["output_dict_per_obj"][0]["cond_frame_outputs"] == {0: "c"}
+
+        state = {"output_dict_per_obj": {0: {"non_cond_frame_outputs": {t: "m" for t in range(0, 40)}}}}
+        sam2_detector._prune_memory(state, 0, True, 16)
+        assert sorted(state["output_dict_per_obj"][0]["non_cond_frame_outputs"]) == list(range(0, 17))
+
+    def test_memory_frames_minimum(self, monkeypatch):
+        """
+        Test that the window never drops frames SAM2 still attends to
+
+        Expected:
+        - Values below the minimum are raised to it, 0 disables pruning
+        """
+        self._config(monkeypatch, memory_frames="4")
+        assert sam2_detector._memory_frames() == sam2_detector._MIN_MEMORY_FRAMES
+        self._config(monkeypatch, memory_frames="0")
+        assert sam2_detector._memory_frames() == 0
+
+    def test_auto_chunk_size(self, monkeypatch):
+        """
+        Test the chunk size derived from available memory
+
+        Expected:
+        - A number is used as is
+        - auto divides half the available memory by the per-frame tensor size, within limits
+        """
+        self._config(monkeypatch, chunk_size="120")
+        assert sam2_detector._chunk_size() == 120
+
+        self._config(monkeypatch, chunk_size="auto", memory_frames="16")
+        frame = 3 * 1024 * 1024 * 4
+        monkeypatch.setattr(sam2_detector, "_available_memory", lambda: 200 * frame)
+        assert sam2_detector._chunk_size(1024) == 100
+        monkeypatch.setattr(sam2_detector, "_available_memory", lambda: 10 * frame)
+        assert sam2_detector._chunk_size(1024) == sam2_detector._AUTO_CHUNK_MIN
+        monkeypatch.setattr(sam2_detector, "_available_memory", lambda: None)
+        assert sam2_detector._chunk_size(1024) == sam2_detector._CHUNK_SIZE
+
+
+class TestTrackObjects:
+    """Test cases for the shared per-object propagation loop"""
+
+    def test_ranges_and_prompt_frames(self, monkeypatch):
+        """
+        Test that each object keeps only frames from its prompt frame within its range
+
+        Expected:
+        - Frames before an object's prompt frame or past its range are not reported
+        - Each (frame, object) pair is reported once across both directions
+        """
+        def fake_propagate(predictor, state, start_idx, reverse, obj_ids):
+            order = range(start_idx, -1, -1) if reverse else range(start_idx, 10)
+            for idx in order:
+                yield idx, {obj_id: [idx, 0, idx + 1, 1] for obj_id in obj_ids}
+
+        monkeypatch.setattr(sam2_detector, "_propagate_bboxes", fake_propagate)
+        seen = []
+        recorded = sam2_detector._track_objects(
+            None, None, {1: 2, 2: 5}, {1: (2, 4), 2: (3, 7)}, "both", 10,
+            lambda idx, boxes: seen.append((idx, sorted(boxes))))
+        assert recorded == {1: {2, 3, 4}, 2: {3, 4, 5, 6, 7}}
+        pairs = [(idx, obj_id) for idx, obj_ids in seen for obj_id in obj_ids]
+        assert len(pairs) == len(set(pairs)) == 8
+
+
+class TestMaskStorage:
+    """Test cases for storing SAM2 masks next to the bbox"""
+
+    def test_hit_to_original_with_mask(self):
+        """
+        Test the entry fields of a mask detected in a resized crop
+
+        Expected:
+        - Without save_mask only the bbox is returned
+        - The stored mask has the size of the original-coordinate bbox
+        """
+        mask = np.zeros((100, 100), dtype=np.uint8)
+        mask[10:30, 20:60] = 1
+        hit = sam2_detector._mask_to_hit(mask)
+        assert hit[0] == [20, 10, 59, 29]
+
+        assert sam2_detector._hit_to_original(hit, 100, 50, 1920, 1080) == {"bbox": [120, 60, 159, 79]}
+        fields = sam2_detector._hit_to_original(hit, 100, 50, 1920, 1080, scale=(0.5, 0.5), save_mask=True)
+        assert fields["bbox"] == [140, 70, 218, 108]
+        decoded = mask_rle.decode(fields["mask"])
+        assert decoded.shape == (39, 79) and decoded.all()
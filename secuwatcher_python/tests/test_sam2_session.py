@@ -0,0 +1,199 @@
+"""
+SAM2 Session Tests
+
+Tests for the interactive SAM2 session store and /sam2/session routes
+"""
+
+import contextlib
+import time
+
+import numpy as np
+import pytest
+
+import sam2_session
+
+
+class _FakeSession:
+    def __init__(self, session_id, last_used):
+        self.session_id = session_id
+        self.last_used = last_used
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeMask:
+    """마스크 로짓 텐서 대용 (squeeze / > / byte / cpu / numpy만 지원)"""
+
+    def __init__(self, data):
+        self.data = data
+
+    def squeeze(self, dim):
+        return _FakeMask(self.data.squeeze(dim))
+
+    def __gt__(self, other):
+        return _FakeMask(self.data > other)
+
+    def byte(self):
+        return _FakeMask(self.data.astype(np.uint8))
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.data
+
+
+class _FakePredictor:
+    """add_new_points_or_box 호출 기록 + 크롭 좌상단 4x4 마스크 반환"""
+
+    def __init__(self):
+        self.calls = []
+
+    def add_new_points_or_box(self, inference_state, frame_idx, obj_id, points, labels, clear_old_points):
+        self.calls.append(obj_id)
+        mask = np.zeros((1, 16, 16), dtype=np.float32)
+        mask[:, :4, :4] = 1.0
+        return frame_idx, [obj_id], [_FakeMask(mask)]
+
+
+def _make_session(monkeypatch, track_ids=None):
+    """모델/프레임 추출 없이 구성한 Sam2Session (크롭 (0,0)-(16,16), 프레임 0~9)"""
+    monkeypatch.setattr(sam2_session.Sam2Session, "_autocast", staticmethod(contextlib.nullcontext))
+    session = object.__new__(sam2_session.Sam2Session)
+    session.session_id = "fake"
+    session.lock = sam2_session.threading.Lock()
+    session.last_used = time.monotonic()
+    session.crop_region = (0, 0, 16, 16)
+    session.extract_start, session.extracted = 0, 10
+    session.frame_w = session.frame_h = 16
+    session.prompt_idx = {1: 0}
+    session.track_ids = dict(track_ids or {})
+    session.predictor = _FakePredictor()
+    session.state = object()
+    return session
+
+
+class TestSessionPrompts:
+    """Test cases for prompt validation inside a session"""
+
+    def test_new_object_after_propagate(self, monkeypatch):
+        """
+        Test adding points once the session has been propagated
+
+        Expected:
+        - A new obj_id raises ObjectAfterPropagateError without calling SAM2
+        - A point for a propagated obj_id is still accepted
+        """
+        session = _make_session(monkeypatch, track_ids={1: 7})
+        with pytest.raises(sam2_session.ObjectAfterPropagateError):
+            session.add_point(0, 2, 2, obj_id=2)
+        assert session.predictor.calls == []
+        assert session.add_point(0, 2, 2, obj_id=1)["bbox"] is not None
+
+    def test_closed_session(self, monkeypatch):
+        """
+        Test a session closed between lookup and use
+
+        Expected:
+        - add_point and propagate raise KeyError instead of using a released state
+        """
+        session = _make_session(monkeypatch)
+        session.close()
+        with pytest.raises(KeyError):
+            session.add_point(0, 2, 2)
+        with pytest.raises(KeyError):
+            session.propagate()
+        assert session.predictor.calls == []
+
+
+class TestSessionStore:
+    """Test cases for session TTL and capacity"""
+
+    def test_sweep_closes_expired_sessions(self):
+        """
+        Test that sessions unused for longer than the TTL are closed
+
+        Expected:
+        - Only the expired session is removed and closed
+        - get() refreshes last_used and raises KeyError for removed sessions
+        """
+        store = sam2_session.SessionStore(ttl=60, max_sessions=4)
+        now = time.monotonic()
+        old, fresh = _FakeSession("old", now - 120), _FakeSession("fresh", now)
+        store.add(old)
+        store.add(fresh)
+
+        assert store.sweep(now) == ["old"]
+        assert old.closed and not fresh.closed
+        assert store.get("fresh") is fresh
+        with pytest.raises(KeyError):
+            store.get("old")
+
+    def test_capacity_limit(self):
+        """
+        Test that max_sessions limits concurrent sessions
+
+        Expected:
+        - reserve() raises RuntimeError when the store is full
+        - Closing a session frees its slot
+        """
+        store = sam2_session.SessionStore(ttl=60, max_sessions=1)
+        store.add(_FakeSession("a", time.monotonic()))
+        with pytest.raises(RuntimeError):
+            store.reserve()
+        store.close("a")
+        store.reserve()
+        assert len(store) == 0
+
+
+class TestSessionRoutes:
+    """Test cases for /sam2/session error responses"""
+
+    def test_unknown_session(self, test_client):
+        """
+        Test requests for a session that does not exist
+
+        Expected:
+        - point/propagate/delete return 404 SESSION_NOT_FOUND
+        """
+        body = {"FrameNo": "10", "Coordinate": "100,100"}
+        for response in (test_client.post("/sam2/session/missing/point", json=body),
+                         test_client.post("/sam2/session/missing/propagate"),
+                         test_client.delete("/sam2/session/missing")):
+            assert response.status_code == 404
+            assert response.json()["detail"]["code"] == "SESSION_NOT_FOUND"
+
+    def test_invalid_coordinate(self, test_client):
+        """
+        Test that a malformed click is rejected before loading SAM2
+
+        Expected:
+        - 422 INVALID_COORDINATE
+        """
+        response = test_client.post("/sam2/session", json={"VideoPath": "v.mp4", "FrameNo": "1", "Coordinate": "abc"})
+        assert response.status_code == 422
+        assert response.json()["detail"]["code"] == "INVALID_COORDINATE"
+
+    def test_point_conflicts(self, test_client, monkeypatch):
+        """
+        Test point requests that SAM2 cannot apply
+
+        Expected:
+        - A new ObjId after propagate returns 409 OBJECT_AFTER_PROPAGATE
+        - point/propagate on a session closed after lookup return 404 SESSION_NOT_FOUND
+        """
+        session = _make_session(monkeypatch, track_ids={1: 7})
+        monkeypatch.setattr(sam2_session.store, "get", lambda session_id: session)
+        body = {"FrameNo": "0", "Coordinate": "2,2", "ObjId": 2}
+
+        response = test_client.post("/sam2/session/fake/point", json=body)
+        assert response.status_code == 409
+        assert response.json()["detail"]["code"] == "OBJECT_AFTER_PROPAGATE"
+
+        session.close()
+        for response in (test_client.post("/sam2/session/fake/point", json=body),
+                         test_client.post("/sam2/session/fake/propagate")):
+            assert response.status_code == 404
+            assert response.json()["detail"]["code"] == "SESSION_NOT_FOUND"
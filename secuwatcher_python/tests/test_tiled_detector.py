@@ -0,0 +1,160 @@
+"""
+Tiled Detector Tests
+
+Tests for tile layout and cross-tile merging (tiled_detector.py)
+"""
+
+import numpy as np
+
+import detector
+import tiled_detector
+from tiled_detector import tile_grid, merge_detections, _motion_tiles
+
+
+class TestTileGrid:
+    """Test cases for overlapping tile layout"""
+
+    def test_grid_covers_frame_with_fixed_size_tiles(self):
+        """
+        Test that 4K frames are covered by full-size overlapping tiles
+
+        Expected:
+        - Every tile is tile_size x tile_size
+        - The last row/column ends exactly at the frame edge
+        - Neighbouring tiles overlap
+        """
+        tiles = tile_grid(3840, 2160, 640, 0.2)
+        assert all(x2 - x1 == 640 and y2 - y1 == 640 for x1, y1, x2, y2 in tiles)
+        assert max(t[2] for t in tiles) == 3840
+        assert max(t[3] for t in tiles) == 2160
+        xs = sorted({t[0] for t in tiles})
+        assert all(b - a < 640 for a, b in zip(xs, xs[1:]))
+
+    def test_small_frame_is_single_tile(self):
+        """
+        Test that a frame smaller than a tile becomes one tile
+
+        Expected:
+        - A single tile equal to the frame
+        """
+        assert tile_grid(320, 240, 640, 0.2) == [(0, 0, 320, 240)]
+
+
+class TestMergeDetections:
+    """Test cases for cross-tile NMS"""
+
+    def test_duplicates_and_cut_fragments_removed(self):
+        """
+        Test that overlapping duplicates and contained fragments are merged
+
+        Expected:
+        - The higher-confidence duplicate survives
+        - A fragment mostly inside a larger box is dropped
+        - Boxes of another class are kept
+        """
+        dets = np.array([
+            [100, 100, 200, 200, 0.9, 0],
+            [102, 101, 201, 199, 0.6, 0],   # 중복
+            [100, 100, 140, 200, 0.5, 0],   # 타일 경계에서 잘린 조각
+            [100, 100, 200, 200, 0.7, 1],   # 다른 클래스
+            [500, 500, 540, 540, 0.4, 0],
+        ], dtype=np.float32)
+        merged = merge_detections(dets)
+        assert merged[:, 4].tolist() == [np.float32(0.9), np.float32(0.7), np.float32(0.4)]
+
+    def test_empty_input(self):
+        """
+        Test merging an empty detection array
+
+        Expected:
+        - Returns an empty (0, 6) array
+        """
+        assert merge_detections(np.zeros((0, 6), dtype=np.float32)).shape == (0, 6)
+
+
+class TestMotionTiles:
+    """Test cases for motion-only tile selection"""
+
+    def test_only_changed_tiles_selected(self):
+        """
+        Test that only tiles containing changed pixels are re-run
+
+        Expected:
+        - The first frame selects all tiles
+        - A change in the top-left corner selects only tiles covering it
+        """
+        tiles = tile_grid(1280, 640, 640, 0.0)
+        prev = np.zeros((160, 320), dtype=np.uint8)
+        assert _motion_tiles(None, prev, tiles, 0.25) == {0, 1}
+        cur = prev.copy()
+        cur[10:40, 10:40] = 255
+        assert _motion_tiles(prev, cur, tiles, 0.25) == {0}
+
+
+class _FakeData:
+    def __init__(self, data):
+        self.data = data
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.data
+
+
+class _FakeBoxes:
+    def __init__(self, rows):
+        self.data = _FakeData(np.asarray(rows, dtype=np.float32).reshape(-1, 6))
+
+    def __len__(self):
+        return len(self.data.data)
+
+
+class _FakeResult:
+    def __init__(self, rows):
+        self.boxes = _FakeBoxes(rows)
+
+
+class _FakeYOLO:
+    """predict마다 이미지당 박스 1개, track()은 ultralytics처럼 predict 결과를 트래커 출력으로 바꾸는 콜백 등록"""
+
+    def __init__(self):
+        self.callbacks = {"on_predict_postprocess_end": []}
+
+    def track(self, frame, persist=False, **kwargs):
+        if not self.callbacks["on_predict_postprocess_end"]:
+            # 트래커에 확정 트랙이 아직 없으면 박스가 모두 사라짐 (register_tracker 동작 모사)
+            self.callbacks["on_predict_postprocess_end"].append(lambda results: [_FakeResult([]) for _ in results])
+        return self.predict([frame])
+
+    def predict(self, images, **kwargs):
+        results = [_FakeResult([[1, 1, 9, 9, 0.9, 0]]) for _ in images]
+        for callback in self.callbacks["on_predict_postprocess_end"]:
+            results = callback(results)
+        return results
+
+
+class TestTiledPredictModel:
+    """Test cases for tiled inference after the shared model has tracked"""
+
+    def test_detect_after_track(self, monkeypatch):
+        """
+        Test that TiledTracker.detect is not routed through tracker callbacks of model.track()
+
+        Expected:
+        - The tiler uses a YOLO instance other than the tracking singleton
+        - Tile detections are returned after MODEL.track(persist=True) registered its callbacks
+        """
+        monkeypatch.setattr(detector, "MODEL", None)
+        monkeypatch.setattr(detector, "PREDICT_MODEL", None)
+        monkeypatch.setattr(detector, "_load_yolo", lambda backend=None: (_FakeYOLO(), "torch"))
+        monkeypatch.setattr(detector, "_apply_precision", lambda *args, **kwargs: "fp32")
+        monkeypatch.setattr(tiled_detector, "make_tracker", lambda cfg, frame_rate=30: None)
+        monkeypatch.setitem(detector.config["detect"], "tile_full_frame", "false")
+
+        frame = np.zeros((640, 1280, 3), dtype=np.uint8)
+        detector._get_yolo_model().track(frame, persist=True)
+        tiler = detector._make_tiler()
+        assert tiler.model is not detector.MODEL
+        dets = tiler.detect(frame, 0.25, None, "cpu")
+        assert len(dets) > 0
@@ -0,0 +1,188 @@
+"""
+타일 분할 추론 (SAHI 방식) — 4K/광각 영상의 작은 객체(원거리 얼굴·번호판) 탐지용
+- tile_grid(): 프레임을 겹치는 타일로 분할
+- merge_detections(): 타일 간 중복 박스 병합 (클래스별 NMS + 작은 박스 포함 제거)
+- TiledTracker: 타일을 한 번의 배치 추론으로 처리 → 병합 → ByteTrack 갱신
+
+config.ini [detect]:
+    tiled = no              ; yes면 autodetector가 타일 추론 사용
+    tile_size = 640         ; 타일 한 변 (px, 모델 입력 크기로도 사용)
+    tile_overlap = 0.2      ; 인접 타일 겹침 비율 (0~0.5)
+    tile_full_frame = yes   ; 큰 객체용 전체 프레임 1회 추론을 배치에 포함
+    tile_motion_only = no   ; 움직임이 있는 타일만 추론, 나머지는 직전 결과 재사용
+"""
+import cv2
+import numpy as np
+
+# 박스 배열 형식: (N, 6) float32 = [x1, y1, x2, y2, conf, cls]
+_EMPTY = np.zeros((0, 6), dtype=np.float32)
+
+_MOTION_PIXEL_DIFF = 25     # 움직임 판정 픽셀 밝기 차 (0~255)
+_MOTION_TILE_RATIO = 0.002  # 타일 내 변화 픽셀 비율이 이 값 이상이면 움직임 있음
+_MOTION_REFRESH = 30        # tile_motion_only에서 전체 타일 강제 재추론 주기 (프레임)
+
+
+def tile_grid(width, height, tile_size, overlap):
+    """프레임을 tile_size 정사각 타일로 분할 (가장자리 타일은 안쪽으로 밀어 크기 유지)
+
+    반환: [(x1, y1, x2, y2), ...] — 프레임이 tile_size보다 작으면 해당 축은 프레임 전체
+    """
+    stride = max(1, int(tile_size * (1.0 - overlap)))
+
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        pos = list(range(0, length - tile_size, stride))
+        pos.append(length - tile_size)
+        return pos
+
+    return [(x, y, min(x + tile_size, width), min(y + tile_size, height))
+            for y in starts(height) for x in starts(width)]
+
+
+def _iou_and_ios(box, boxes):
+    """box와 boxes의 IoU, 그리고 교집합 / 작은 박스 면적(IoS)"""
+    xx1 = np.maximum(box[0], boxes[:, 0])
+    yy1 = np.maximum(box[1], boxes[:, 1])
+    xx2 = np.minimum(box[2], boxes[:, 2])
+    yy2 = np.minimum(box[3], boxes[:, 3])
+    inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+    area = (box[2] - box[0]) * (box[3] - box[1])
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    iou = inter / np.maximum(area + areas - inter, 1e-6)
+    ios = inter / np.maximum(np.minimum(area, areas), 1e-6)
+    return iou, ios
+
+
+def merge_detections(dets, iou_thres=0.5, ios_thres=0.8):
+    """타일 간 중복 제거 — 클래스별로 신뢰도 순 greedy NMS
+
+    IoU가 iou_thres 이상이거나, 타일 경계에서 잘린 조각처럼 한쪽 박스가 다른 박스에
+    ios_thres 이상 포함되면 낮은 신뢰도 박스를 제거합니다.
+    """
+    if len(dets) == 0:
+        return _EMPTY
+    keep = []
+    for cls in np.unique(dets[:, 5]):
+        idx = np.where(dets[:, 5] == cls)[0]
+        idx = idx[np.argsort(-dets[idx, 4])]
+        while len(idx):
+            best, rest = idx[0], idx[1:]
+            keep.append(best)
+            if not len(rest):
+                break
+            iou, ios = _iou_and_ios(dets[best], dets[rest])
+            idx = rest[(iou < iou_thres) & (ios < ios_thres)]
+    return dets[np.sort(np.array(keep))]
+
+
+def _motion_tiles(prev_gray, gray, tiles, scale):
+    """이전 프레임 대비 변화 픽셀 비율이 기준 이상인 타일 인덱스 집합 (축소 흑백 기준)"""
+    if prev_gray is None or prev_gray.shape != gray.shape:
+        return set(range(len(tiles)))
+    changed = cv2.threshold(cv2.absdiff(prev_gray, gray), _MOTION_PIXEL_DIFF, 1, cv2.THRESH_BINARY)[1]
+    moving = set()
+    for i, (x1, y1, x2, y2) in enumerate(tiles):
+        region = changed[int(y1 * scale):max(int(y2 * scale), int(y1 * scale) + 1),
+                         int(x1 * scale):max(int(x2 * scale), int(x1 * scale) + 1)]
+        if region.size and cv2.countNonZero(region) / region.size >= _MOTION_TILE_RATIO:
+            moving.add(i)
+    return moving
+
+
+def make_tracker(tracker_cfg, frame_rate=30):
+    """트래커 설정 yaml로 독립 BYTETracker 생성 (model.track 밖에서 직접 update 호출용)"""
+    from ultralytics.utils import YAML, IterableSimpleNamespace
+    from ultralytics.utils.checks import check_yaml
+    from ultralytics.trackers.byte_tracker import BYTETracker
+
+    return BYTETracker(args=IterableSimpleNamespace(**YAML.load(check_yaml(tracker_cfg))), frame_rate=frame_rate)
+
+
+def track_detections(tracker, dets, frame):
+    """(N, 6) 탐지 배열로 트래커 갱신 → 활성 트랙 (N, 8) = [x1, y1, x2, y2, track_id, score, cls, idx]"""
+    from ultralytics.engine.results import Boxes
+
+    tracks = tracker.update(Boxes(dets, frame.shape[:2]), frame)
+    return tracks if len(tracks) else np.zeros((0, 8), dtype=np.float32)
+
+
+def result_to_array(result, ox=0, oy=0):
+    """ultralytics Results → (N, 6) 프레임 좌표 배열 (ox, oy만큼 평행 이동)"""
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return _EMPTY
+    data = boxes.data.cpu().numpy()[:, :6].astype(np.float32)
+    data[:, [0, 2]] += ox
+    data[:, [1, 3]] += oy
+    return data
+
+
+class TiledTracker:
+    """겹치는 타일 배치 추론 + 타일 간 병합 + ByteTrack
+
+    model.track() 대신 사용하며, 트래커는 영상마다 새로 만듭니다 (self.tracker).
+    track() 반환: ByteTrack 결과 (N, 8) = [x1, y1, x2, y2, track_id, score, cls, idx]
+    """
+
+    def __init__(self, model, tracker_cfg, tile_size=640, overlap=0.2, full_frame=True,
+                 motion_only=False, frame_rate=30):
+        self.model = model
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.full_frame = full_frame
+        self.motion_only = motion_only
+        self.tracker = make_tracker(tracker_cfg, frame_rate)
+        self._tiles = None
+        self._tile_dets = []        # 타일별 직전 결과 (tile_motion_only 재사용용, 프레임 좌표)
+        self._prev_gray = None
+        self._since_refresh = 0
+
+    def _gray(self, frame):
+        scale = 320.0 / max(frame.shape[:2])
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return cv2.GaussianBlur(cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), (5, 5), 0), scale
+
+    def detect(self, frame, conf, classes, device, half=False):
+        """타일(+전체 프레임)을 한 번의 배치로 추론하고 프레임 좌표로 병합 → (N, 6)
+
+        배치 입력 크기는 tile_size (타일은 리사이즈 없이, 전체 프레임은 tile_size로 letterbox)
+        """
+        h, w = frame.shape[:2]
+        if self._tiles is None:
+            self._tiles = tile_grid(w, h, self.tile_size, self.overlap)
+            self._tile_dets = [_EMPTY] * len(self._tiles)
+
+        run = set(range(len(self._tiles)))
+        if self.motion_only:
+            gray, scale = self._gray(frame)
+            if self._since_refresh < _MOTION_REFRESH:
+                run = _motion_tiles(self._prev_gray, gray, self._tiles, scale)
+                self._since_refresh += 1
+            else:
+                self._since_refresh = 0
+            self._prev_gray = gray
+
+        order = sorted(run)
+        batch = [frame[y1:y2, x1:x2] for (x1, y1, x2, y2) in (self._tiles[i] for i in order)]
+        if self.full_frame:
+            batch.append(frame)
+        if batch:
+            results = self.model.predict(batch, imgsz=self.tile_size, conf=conf, classes=classes,
+                                         device=device, half=half, verbose=False)
+        else:
+            results = []
+
+        for i, res in zip(order, results):
+            x1, y1 = self._tiles[i][0], self._tiles[i][1]
+            self._tile_dets[i] = result_to_array(res, x1, y1)
+
+        parts = list(self._tile_dets)
+        if self.full_frame and results:
+            parts.append(result_to_array(results[-1], 0, 0))
+        dets = np.concatenate(parts, axis=0) if parts else _EMPTY
+        return merge_detections(dets)
+
+    def track(self, frame, conf, classes, device, half=False):
+        """병합된 탐지로 ByteTrack 갱신 → 활성 트랙 배열"""
+        return track_detections(self.tracker, self.detect(frame, conf, classes, device, half), frame)
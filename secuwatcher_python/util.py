@@ -4,7 +4,7 @@ import time
 import logging
 import threading
 from datetime import datetime
-from collections import deque, defaultdict
+from collections import deque, defaultdict, OrderedDict
 import configparser
 
 logger = logging.getLogger(__name__)
@@ -44,24 +44,177 @@ def log_write(log_line):
         f.flush()
     logger.debug(line.rstrip())
 
-def log_writer(log_queue, log_path):
+
+# ─── 배치 로그 싱크 ───────────────────────────────────────────────────
+LOG_QUEUE_CAPACITY = 50000    # 큐 최대 적재량 (초과분은 버리고 dropped로 집계)
+LOG_BATCH_SIZE = 1000         # writer가 한 번에 꺼내는 최대 라인 수
+LOG_FLUSH_INTERVAL = 0.5      # 파일 flush 주기 (초)
+LOG_MAX_OPEN_FILES = 32       # 캐시할 파일 핸들 수 (AI Log는 작업마다 새 파일)
+
+
+class LogQueue(deque):
+    """
+    log_queue 전용 deque.
+    - append 시 Condition으로 writer 스레드를 깨움 (sleep 폴링 제거)
+    - capacity 초과 시 새 항목을 버리고 dropped 카운터 증가 (back-pressure)
+    deque 하위 클래스이므로 기존 isinstance(log_queue, deque) 검사와 호환됩니다.
+    """
+
+    def __init__(self, iterable=(), capacity: int = LOG_QUEUE_CAPACITY):
+        super().__init__(iterable)
+        self.capacity = capacity
+        self.dropped = 0
+        self.cond = threading.Condition()
+
+    def append(self, item):
+        with self.cond:
+            if self.capacity and len(self) >= self.capacity:
+                self.dropped += 1
+                return
+            super().append(item)
+            self.cond.notify()
+
+    def drain(self, max_items: int = LOG_BATCH_SIZE) -> list:
+        """최대 max_items개를 꺼내 리스트로 반환"""
+        with self.cond:
+            n = min(len(self), max_items)
+            return [self.popleft() for _ in range(n)]
+
+
+class LogSink:
+    """
+    경로별 파일 핸들을 캐시해 묶음으로 쓰고 주기적으로 flush 합니다.
+    - 날짜가 바뀌면 모든 핸들을 닫고, 날짜 스탬프 구성요소만 오늘 날짜로 교체 (일별 회전)
+      (get_log_dir의 '<YYYYMMDD>' 날짜 폴더, setup_logging의 '<YYYYMMDD>_' 파일명 접두)
+    - 폴더 생성(createFolder)은 파일을 처음 열 때 한 번만 수행
+    """
+
+    def __init__(self, max_open: int = LOG_MAX_OPEN_FILES):
+        self.max_open = max_open
+        self._handles = OrderedDict()
+        self._start_day = datetime.now().strftime("%Y%m%d")
+        self._day = self._start_day
+        self.failed = 0
+
+    def _rotate(self):
+        today = datetime.now().strftime("%Y%m%d")
+        if today != self._day:
+            self.close()
+            self._day = today
+
+    def _resolve(self, path: str) -> str:
+        """시작일 날짜 폴더/파일명 접두만 오늘 날짜로 — 같은 숫자가 들어간 다른 폴더·파일명은 그대로"""
+        if self._day == self._start_day:
+            return path
+        folder, name = os.path.split(path)
+        parent, day_dir = os.path.split(folder)
+        if day_dir == self._start_day:
+            folder = os.path.join(parent, self._day)
+        if name.startswith(self._start_day + "_"):
+            name = self._day + name[len(self._start_day):]
+        return os.path.join(folder, name)
+
+    def _open(self, path: str):
+        f = self._handles.get(path)
+        if f is not None:
+            self._handles.move_to_end(path)
+            return f
+        createFolder(os.path.dirname(path))
+        f = open(path, 'a')
+        self._handles[path] = f
+        while len(self._handles) > self.max_open:
+            _, old = self._handles.popitem(last=False)
+            try:
+                old.close()
+            except OSError:
+                pass
+        return f
+
+    def write_batch(self, entries):
+        """logLine 리스트를 경로별로 묶어 한 번의 write로 기록"""
+        if not entries:
+            return
+        self._rotate()
+        grouped = OrderedDict()
+        for e in entries:
+            line = "[" + e.time + "]\t" + e.message + "\n"
+            grouped.setdefault(self._resolve(e.path), []).append(line)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(line.rstrip())
+        for path, lines in grouped.items():
+            try:
+                self._open(path).write(''.join(lines))
+            except (OSError, ValueError) as e:
+                self.failed += len(lines)
+                logger.error(f"[LOG] 로그 파일 쓰기 실패 ({path}): {e}")
+
+    def flush(self):
+        for f in list(self._handles.values()):
+            try:
+                f.flush()
+            except (OSError, ValueError):
+                pass
+
+    def close(self):
+        for f in list(self._handles.values()):
+            try:
+                f.close()
+            except (OSError, ValueError):
+                pass
+        self._handles.clear()
+
+
+def log_writer(log_queue, log_path, stop_event: threading.Event = None, flush_interval: float = LOG_FLUSH_INTERVAL):
     """
-    백그라운드에서 log_queue(deque)를 모니터링하며
-    새로 들어온 logLine을 즉시 기록합니다.
+    백그라운드에서 log_queue를 모니터링하며 새로 들어온 logLine을 묶음으로 기록합니다.
+    - LogQueue면 Condition 대기로 즉시 깨어나고, 일반 deque면 0.1초 폴링 (하위 호환)
+    - 파일 핸들 캐시 + flush_interval 주기 flush
+    - 큐 포화로 버려진 라인 수는 log_path에 별도 기록
+    - stop_event가 set되면 남은 로그를 모두 기록하고 종료 (파일 핸들은 이 스레드에서만 사용 → stop 후 join으로 마무리)
     """
+    sink = LogSink()
+    cond = getattr(log_queue, 'cond', None)
+    reported_drops = 0
+    last_flush = time.monotonic()
+
     while True:
-        if not log_queue:
-            time.sleep(0.1)
-            continue
-        entry = log_queue.popleft()
-        # entry가 logLine 객체가 아닐 경우 log_path와 현재 시간을 사용하여 logLine 객체로 변환
-        if not isinstance(entry, logLine):
-            entry = logLine(
+        stopping = stop_event is not None and stop_event.is_set()
+        if cond is not None:
+            with cond:
+                if not log_queue and not stopping:
+                    cond.wait(timeout=flush_interval)
+                batch = log_queue.drain(LOG_BATCH_SIZE)
+        else:
+            batch = []
+            while log_queue and len(batch) < LOG_BATCH_SIZE:
+                batch.append(log_queue.popleft())
+            if not batch and not stopping:
+                time.sleep(0.1)
+
+        dropped = getattr(log_queue, 'dropped', 0)
+        if dropped != reported_drops:
+            batch.append(logLine(
                 path=log_path,
-                time=timeToStr(time.time()),
-                message=str(entry)
-            )
-        log_write(entry)
+                time=timeToStr(time.time(), 'datetime'),
+                message=f"[LOG] 로그 큐 포화로 {dropped - reported_drops}건 유실 (누적 {dropped}건)"
+            ))
+            reported_drops = dropped
+
+        # entry가 logLine 객체가 아닐 경우 log_path와 현재 시간을 사용하여 logLine 객체로 변환
+        entries = [
+            e if isinstance(e, logLine) else logLine(path=log_path, time=timeToStr(time.time()), message=str(e))
+            for e in batch
+        ]
+        sink.write_batch(entries)
+
+        now = time.monotonic()
+        if now - last_flush >= flush_interval:
+            sink.flush()
+            last_flush = now
+
+        if stopping and not log_queue:
+            sink.close()
+            return
 
 def get_resource_path(relative_path: str) -> str:
     """ PyInstaller 실행 환경에서도 리소스를 찾을 수 있게 경로를 보정합니다. """
@@ -129,4 +282,16 @@ def update_progress(job_id, frac, start_pct=0, end_pct=100):
             eta_seconds = max(0, total_estimated - elapsed)
             jobs[job_id]["eta_seconds"] = round(eta_seconds, 1)
         else:
-            jobs[job_id]["eta_seconds"] = 0
\ No newline at end of file
+            jobs[job_id]["eta_seconds"] = 0
+
+def update_video_progress(job_id, video_path, frac):
+    """다중 영상 작업의 영상별 진행률(0~100) → jobs[job_id]["videos"][영상 절대 경로]
+
+    다른 폴더의 같은 파일명 영상이 섞이지 않도록 파일명이 아닌 절대 경로로 구분합니다.
+    """
+    if jobs is None or job_id not in jobs: return
+    name = os.path.abspath(video_path)
+    pct = round(_clamp01(frac) * 100.0, 1)
+    with _job_locks[job_id]:
+        videos = jobs[job_id].setdefault("videos", {})
+        videos[name] = max(pct, videos.get(name, 0.0))
@@ -4,10 +4,8 @@ import logging
 from PIL import Image, ImageFont, ImageDraw
 from util import logLine, timeToStr, get_resource_path
 import os
-import uuid
 import time
 import configparser
-import av
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +50,118 @@ def myPutText(src, text, pos, font, font_color) :
     return cv2.cvtColor(np.array(img_pil), cv2.COLOR_RGB2BGR)
 
 
+def prepare_watermark(width: int, height: int, text: str, transparency: int, logo_path: str, location: int) -> dict:
+    """
+    프레임 크기 기준 워터마크 합성 준비(로고 리사이즈·폰트 로드·위치 계산)를 한 번만 수행합니다.
+    결과는 draw_watermark에 그대로 전달 (apply_watermark와 /preview/frame 공용)
+    - location: 1 좌상, 2 우상, 3 중앙, 4 좌하, 5 우하
+    """
+    # ----- 로고 준비(없어도 동작하도록) -----
+    transparency = max(0, min(100, int(transparency)))  # 0~100 클램프
+    resolved_logo = _resolve_logo_path(logo_path)
+    logo_bgra = None
+    logo_w = logo_h = 0
+
+    if resolved_logo:
+        try:
+            logo_img = Image.open(resolved_logo).convert("RGBA")
+            orig_w, orig_h = logo_img.size
+            target_w = max(1, width // 10)
+            scale = target_w / max(1, orig_w)
+            target_h = max(1, int(orig_h * scale))
+            logo_img = logo_img.resize((target_w, target_h), resample=Image.LANCZOS)
+
+            # RGBA → BGRA (OpenCV 합성용)
+            logo_bgra = cv2.cvtColor(np.array(logo_img), cv2.COLOR_RGBA2BGRA)
+            logo_h, logo_w = logo_bgra.shape[:2]
+        except Exception:
+            # 로고 문제가 있어도 텍스트만으로 진행
+            logo_bgra = None
+            logo_w = logo_h = 0
+
+    # ----- 위치 계산 유틸 -----
+    margin = 50
+
+    def get_pos(box_w: int, box_h: int, loc: int) -> tuple[int, int]:
+        if loc == 1:  # 좌상
+            return (margin, margin)
+        if loc == 2:  # 우상
+            return (max(0, width - box_w - margin), margin)
+        if loc == 3:  # 중앙
+            return ((max(0, width - box_w)) // 2, (max(0, height - box_h)) // 2)
+        if loc == 4:  # 좌하
+            return (margin, max(0, height - box_h - margin))
+        # 기본: 5 우하
+        return (max(0, width - box_w - margin), max(0, height - box_h - margin))
+
+    # ----- 텍스트 렌더링 설정 -----
+    text = text or ""  # None 방지
+    font_path = get_resource_path("NanumGothic.ttf")
+    font_size = 16
+    try:
+        font = ImageFont.truetype(font_path, font_size)
+    except IOError:
+        logger.warning(f"Font file not found at '{font_path}'. Using default.")
+        font = ImageFont.load_default()
+
+    if text:
+        text_bbox = font.getbbox(text)
+        text_w = text_bbox[2] - text_bbox[0]
+        text_h = text_bbox[3] - text_bbox[1]
+    else:
+        text_w, text_h = 0, 0
+
+    # 로고+텍스트 전체 박스 크기(로고 없으면 텍스트만 기준)
+    box_w = max(logo_w, text_w) if text else logo_w
+    box_h = logo_h + (text_h + 5 if text else 0)
+    # 박스 좌상단
+    x0, y0 = get_pos(box_w, box_h, location)
+
+    # 텍스트 위치(로고 있으면 로고 아래, 없으면 박스 중앙 정렬)
+    text_pos = None
+    if text:
+        text_x = x0 + ((logo_w if logo_bgra is not None else box_w) - text_w) // 2
+        text_y = y0 + (logo_h if logo_bgra is not None else 0) + text_h + 5
+        text_x = max(0, min(text_x, width - text_w))
+        text_y = max(text_h + 1, min(text_y, height - 5))
+        text_pos = (text_x, text_y)
+
+    # 로고 알파(투명도 반영)는 프레임마다 같으므로 미리 계산
+    logo_bgr = logo_alpha = None
+    if logo_bgra is not None:
+        logo_bgr = logo_bgra[..., :3].astype(float)
+        logo_alpha = ((logo_bgra[..., 3].astype(float) / 255.0) * (transparency / 100.0))[..., np.newaxis]
+
+    return {
+        "logo_bgr": logo_bgr, "logo_alpha": logo_alpha, "origin": (x0, y0),
+        "text": text, "text_pos": text_pos, "font": font, "text_color": (255, 255, 255),
+    }
+
+
+def draw_watermark(frame: np.ndarray, wm: dict) -> np.ndarray:
+    """prepare_watermark 결과로 로고(선택)+텍스트를 프레임에 합성해 반환 (로고는 frame에 직접 기록)"""
+    height, width = frame.shape[:2]
+    x0, y0 = wm["origin"]
+
+    # 로고 합성 (있을 때만)
+    if wm["logo_bgr"] is not None:
+        logo_h, logo_w = wm["logo_bgr"].shape[:2]
+        y_end = min(y0 + logo_h, height)
+        x_end = min(x0 + logo_w, width)
+        h_roi = max(0, y_end - y0)
+        w_roi = max(0, x_end - x0)
+        if h_roi > 0 and w_roi > 0:
+            alpha = wm["logo_alpha"][:h_roi, :w_roi]
+            roi = frame[y0:y_end, x0:x_end].astype(float)
+            overlay = wm["logo_bgr"][:h_roi, :w_roi]
+            frame[y0:y_end, x0:x_end] = cv2.convertScaleAbs(roi * (1 - alpha) + overlay * alpha)
+
+    # 텍스트 합성 (문자열 있을 때만)
+    if wm["text"]:
+        frame = myPutText(frame, wm["text"], wm["text_pos"], wm["font"], wm["text_color"])
+    return frame
+
+
 # --- 교체: 텍스트만/로고+텍스트 모두 안전하게 처리 ---
 def apply_watermark(
     input_video_path: str,
@@ -110,91 +220,14 @@ def apply_watermark(
 
     try:
         # PyAV 컨테이너/스트림 준비
+        import av  # cv2 이후 로드 (FFmpeg 중복 로드 충돌 방지)
         container = av.open(output_path, mode='w')
         stream = container.add_stream('h264', rate=fps)
         stream.width = width
         stream.height = height
         stream.pix_fmt = 'yuv420p'
 
-        # ----- 로고 준비(없어도 동작하도록) -----
-        transparency = max(0, min(100, int(transparency)))  # 0~100 클램프
-        resolved_logo = _resolve_logo_path(logo_path)
-        logo_bgra = None
-        logo_w = logo_h = 0
-
-        if resolved_logo:
-            try:
-                logo_img = Image.open(resolved_logo).convert("RGBA")
-                orig_w, orig_h = logo_img.size
-                target_w = max(1, width // 10)
-                scale = target_w / max(1, orig_w)
-                target_h = max(1, int(orig_h * scale))
-                logo_img = logo_img.resize((target_w, target_h), resample=Image.LANCZOS)
-
-                # OpenCV 사용을 위해 임시 파일로 저장 후 로드
-                tmp_logo = os.path.join(output_dir, f"{uuid.uuid4().hex}_tmp_logo.png")
-                logo_img.save(tmp_logo)
-                logo_bgra = cv2.imread(tmp_logo, cv2.IMREAD_UNCHANGED)
-                try:
-                    os.remove(tmp_logo)
-                except OSError:
-                    pass
-
-                if logo_bgra is not None and logo_bgra.shape[2] == 4:
-                    logo_h, logo_w = logo_bgra.shape[:2]
-                else:
-                    logo_bgra = None
-                    logo_w = logo_h = 0
-            except Exception:
-                # 로고 문제가 있어도 텍스트만으로 진행
-                logo_bgra = None
-                logo_w = logo_h = 0
-
-        # ----- 위치 계산 유틸 -----
-        margin = 50
-
-        def get_pos(box_w: int, box_h: int, loc: int) -> tuple[int, int]:
-            if loc == 1:  # 좌상
-                return (margin, margin)
-            if loc == 2:  # 우상
-                return (max(0, width - box_w - margin), margin)
-            if loc == 3:  # 중앙
-                return ((max(0, width - box_w)) // 2, (max(0, height - box_h)) // 2)
-            if loc == 4:  # 좌하
-                return (margin, max(0, height - box_h - margin))
-            # 기본: 5 우하
-            return (max(0, width - box_w - margin), max(0, height - box_h - margin))
-
-        # ----- 텍스트 렌더링 설정 -----
-        text = text or ""  # None 방지
-        font_path = get_resource_path("NanumGothic.ttf")
-        font_size = 16
-        text_color = (255, 255, 255)
-        try:
-            font = ImageFont.truetype(font_path, font_size)
-        except IOError:
-            logger.warning(f"Font file not found at '{font_path}'. Using default.")
-            font = ImageFont.load_default()
-        
-        if text:
-            text_bbox = font.getbbox(text)
-            text_w = text_bbox[2] - text_bbox[0]
-            text_h = text_bbox[3] - text_bbox[1]
-        else:
-            text_w, text_h = 0,0
-
-        # 로고+텍스트 전체 박스 크기(로고 없으면 텍스트만 기준)
-        box_w = max(logo_w, text_w) if text else logo_w
-        box_h = logo_h + (text_h + 5 if text else 0)
-        # 박스 좌상단
-        x0, y0 = get_pos(box_w, box_h, location)
-
-        # 텍스트 위치(로고 있으면 로고 아래, 없으면 박스 중앙 정렬)
-        if text:
-            text_x = x0 + ((logo_w if logo_bgra is not None else box_w) - text_w) // 2
-            text_y = y0 + (logo_h if logo_bgra is not None else 0) + text_h + 5
-            text_x = max(0, min(text_x, width - text_w))
-            text_y = max(text_h + 1, min(text_y, height - 5))
+        wm = prepare_watermark(width, height, text, transparency, logo_path, location)
 
         total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or 1
         count = 0
@@ -207,25 +240,7 @@ def apply_watermark(
             if not ret:
                 break
 
-            # 로고 합성 (있을 때만)
-            if logo_bgra is not None:
-                b, g, r, a = cv2.split(logo_bgra)
-                alpha = (a.astype(float) / 255.0) * (transparency / 100.0)
-                alpha = alpha[..., np.newaxis]
-
-                y_end = min(y0 + logo_h, height)
-                x_end = min(x0 + logo_w, width)
-                h_roi = max(0, y_end - y0)
-                w_roi = max(0, x_end - x0)
-                if h_roi > 0 and w_roi > 0:
-                    roi = frame[y0:y_end, x0:x_end].astype(float)
-                    overlay = np.dstack((b[:h_roi, :w_roi], g[:h_roi, :w_roi], r[:h_roi, :w_roi])).astype(float)
-                    blended = cv2.convertScaleAbs(roi * (1 - alpha[:h_roi, :w_roi]) + overlay * alpha[:h_roi, :w_roi])
-                    frame[y0:y_end, x0:x_end] = blended
-
-            # 텍스트 합성 (문자열 있을 때만)
-            if text:
-                frame = myPutText(frame, text, (text_x, text_y), font, text_color)
+            frame = draw_watermark(frame, wm)
 
             # 인코딩
             video_frame = av.VideoFrame.from_ndarray(frame, format='bgr24')